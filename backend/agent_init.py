@@ -192,14 +192,21 @@ except Exception:
     psutil = None
 
 # Music video motion pipeline (local ComfyUI + ffmpeg)
+from musicvideo.audio_analysis import cached_analysis
 from musicvideo.comfyui_client import ComfyUIClient, get_default_comfyui_url
 from musicvideo.ffmpeg_utils import (
     ffprobe_duration_seconds,
     transcode_h264,
     concat_videos,
     mux_audio,
+    run_ffmpeg,
 )
-from musicvideo.interpolation import interpolate_to_fps
+from musicvideo.filtergraph import compile_assembly, single_pass_unsupported
+from musicvideo.interpolation import interpolate_to_fps, interpolation_engine
+from musicvideo.job_bus import JobProgressBus
+from musicvideo.plan import generate_cache_params, retry_plan
+from musicvideo.render_cache import RenderCache, file_digest
+from musicvideo.scheduler import DagNode, DagScheduler
 
 # Connection pooling for faster HTTP
 _session = requests.Session()
@@ -3760,13 +3767,16 @@ class CreateModTemplateRequest(BaseModel):
     mod_type: Optional[str] = "basic"
 
 class ScanMemoryRequest(BaseModel):
-    value: Any
+    value: Any = None
     data_type: str = "int"
     scan_type: str = "exact"
+    alignment: int = 1
+    background: bool = False
 
 class NextScanRequest(BaseModel):
     filter_type: str = "exact"
     value: Optional[Any] = None
+    background: bool = False
 
 class WriteMemoryRequest(BaseModel):
     address: int
@@ -3783,7 +3793,9 @@ class UnfreezeValueRequest(BaseModel):
     address: int
 
 class AOBScanRequest(BaseModel):
-    pattern: str
+    pattern: Optional[str] = None
+    patterns: Optional[List[str]] = None
+    module: Optional[str] = None
 
 class PointerScanRequest(BaseModel):
     target_address: int
@@ -8753,8 +8765,11 @@ def _build_media_urls(req: Request, media_type: str, filename: str) -> Dict[str,
 
 # --- Music Video (Anime MV) generation jobs ---
 MUSICVIDEO_JOBS_FILE = str((MEDIA_ROOT / "musicvideo_jobs.json").resolve())
-MUSICVIDEO_JOBS: Dict[str, dict] = {}
-_MUSICVIDEO_LOCK = threading.Lock()
+# In-memory job store: coalesced journal writes + SSE fan-out (see musicvideo/job_bus.py).
+# SSE events leave out the audio analysis (~100 KB, set once per job; GET the job for it).
+MUSICVIDEO_BUS = JobProgressBus(MUSICVIDEO_JOBS_FILE, stream_omit=("analysis",))
+MUSICVIDEO_JOBS: Dict[str, dict] = MUSICVIDEO_BUS.jobs
+_MUSICVIDEO_LOCK = MUSICVIDEO_BUS.lock
 
 
 # --- ComfyUI management (auto-detect + start) ---
@@ -9085,11 +9100,7 @@ def _mv_safe_stem(name: str) -> str:
 
 def _mv_load_jobs_from_disk() -> None:
     try:
-        if os.path.exists(MUSICVIDEO_JOBS_FILE):
-            with open(MUSICVIDEO_JOBS_FILE, "r", encoding="utf-8") as fh:
-                data = json.load(fh)
-            if isinstance(data, dict):
-                MUSICVIDEO_JOBS.update(data)
+        MUSICVIDEO_BUS.load()
     except Exception:
         pass
 
@@ -9097,12 +9108,15 @@ def _mv_load_jobs_from_disk() -> None:
 def _mv_reconcile_jobs_on_startup() -> None:
     """Reconcile persisted MV job state after backend restarts.
 
-    MV jobs are executed in background threads and are not resumable after a
-    process restart. If the backend restarts mid-job, the persisted job record
-    can remain stuck in `queued`/`running` forever (e.g. 20% animating).
+    MV jobs are executed in background threads. If the backend restarts
+    mid-job, the persisted job record can remain stuck in `queued`/`running`
+    forever (e.g. 20% animating).
 
-    On startup we mark those jobs as cancelled/failed with a clear message so
-    the UI doesn't show zombie jobs and the user can press Retry.
+    Jobs that reached the scene DAG persisted its node states; those are
+    flagged `resume_pending` and restarted by the startup hook, skipping
+    the scenes that already finished. Other jobs are marked cancelled/failed
+    with a clear message so the UI doesn't show zombie jobs and the user can
+    press Retry.
     """
     try:
         changed = False
@@ -9122,6 +9136,13 @@ def _mv_reconcile_jobs_on_startup() -> None:
                     job.setdefault("progress", 0)
                     job["completed_at"] = job.get("completed_at") or now
                     job["error"] = job.get("error") or "Cancelled (backend restarted)."
+                elif job.get("resumable") and job.get("scenes") and os.path.exists(
+                    str(MEDIA_ROOT / "_tmp" / "musicvideo" / jid / "dag_state.json")
+                ):
+                    job["status"] = "queued"
+                    job["stage"] = "resuming"
+                    job["resume_pending"] = True
+                    job["stage_detail"] = "Backend restarted; resuming from the last finished step."
                 else:
                     job["status"] = "failed"
                     job["stage"] = "error"
@@ -9137,52 +9158,26 @@ def _mv_reconcile_jobs_on_startup() -> None:
 
             if changed:
                 # Persist the reconciliation results.
-                try:
-                    with open(MUSICVIDEO_JOBS_FILE, "w", encoding="utf-8") as fh:
-                        fh.write(json.dumps(MUSICVIDEO_JOBS))
-                except Exception:
-                    pass
+                MUSICVIDEO_BUS.compact()
     except Exception:
         # Best-effort only; never block startup.
         pass
 
 
-def _mv_save_jobs_to_disk() -> None:
-    try:
-        with _MUSICVIDEO_LOCK:
-            with open(MUSICVIDEO_JOBS_FILE, "w", encoding="utf-8") as fh:
-                fh.write(json.dumps(MUSICVIDEO_JOBS))
-    except Exception:
-        pass
-
-
 def _mv_set_job(job_id: str, **updates) -> None:
-    with _MUSICVIDEO_LOCK:
-        job = MUSICVIDEO_JOBS.get(job_id) or {"id": job_id}
-        # Always track last update time for UI "is it moving?" feedback.
-        if "updated_at" not in updates:
-            updates["updated_at"] = time.time()
-        job.update(updates)
-        MUSICVIDEO_JOBS[job_id] = job
-    _mv_save_jobs_to_disk()
+    # Always track last update time for UI "is it moving?" feedback.
+    if "updated_at" not in updates:
+        updates["updated_at"] = time.time()
+    MUSICVIDEO_BUS.update(job_id, **updates)
 
 
 def _mv_get_job(job_id: str) -> Optional[dict]:
-    with _MUSICVIDEO_LOCK:
-        j = MUSICVIDEO_JOBS.get(job_id)
-        return dict(j) if isinstance(j, dict) else None
+    return MUSICVIDEO_BUS.get(job_id)
 
 
 def _mv_delete_job(job_id: str) -> bool:
     """Delete a job record from the MV job store (does not delete media files)."""
-    removed = False
-    with _MUSICVIDEO_LOCK:
-        if job_id in MUSICVIDEO_JOBS:
-            MUSICVIDEO_JOBS.pop(job_id, None)
-            removed = True
-    if removed:
-        _mv_save_jobs_to_disk()
-    return removed
+    return MUSICVIDEO_BUS.delete(job_id)
 
 
 _mv_load_jobs_from_disk()
@@ -9192,175 +9187,10 @@ _mv_reconcile_jobs_on_startup()
 def _mv_analyze_audio(audio_path: str) -> Dict[str, Any]:
     """Analyze an audio file to estimate BPM, beat times, energy curve, mood and sections.
 
-    We prefer librosa (better beat/structure detection). If unavailable, fallback to
-    pydub + simple RMS/onset heuristics.
-    """
-    analysis: Dict[str, Any] = {
-        "duration_s": None,
-        "bpm": None,
-        "beats": [],
-        "mood": None,
-        "energy_curve": [],
-        "sections": [],
-        "method": "fallback",
-    }
-
-    # Duration + librosa analysis when possible
-    try:
-        try:
-            import numpy as _np
-            import librosa  # type: ignore
-
-            y, sr = librosa.load(audio_path, mono=True)
-            duration_s = float(librosa.get_duration(y=y, sr=sr))
-            analysis["duration_s"] = duration_s
-
-            # Beats / tempo
-            tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
-            bpm = float(tempo) if tempo else None
-            if bpm and 40 <= bpm <= 240:
-                analysis["bpm"] = float(round(bpm, 2))
-                analysis["method"] = "librosa"
-
-            if beat_frames is not None and len(beat_frames) > 0:
-                beat_times = librosa.frames_to_time(beat_frames, sr=sr)
-                analysis["beats"] = [float(x) for x in beat_times.tolist()]
-
-            # Energy curve (RMS) at 50ms hop
-            hop_length = max(1, int(sr * 0.05))
-            frame_length = max(hop_length * 2, 2048)
-            rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
-            if rms.size:
-                r = _np.array(rms, dtype=_np.float32)
-                r = r - float(r.min())
-                denom = float(r.max()) or 1.0
-                r = r / denom
-                analysis["energy_curve"] = [float(x) for x in r.tolist()]
-
-            # Structure detection via clustering on MFCC/chroma (approximate sections)
-            try:
-                mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=20)
-                mfcc = librosa.util.normalize(mfcc)
-                # 6-8 segments depending on duration
-                k = 6
-                if duration_s > 150:
-                    k = 8
-                boundaries = librosa.segment.agglomerative(mfcc, k=k)
-                # boundaries are frame indices in mfcc time; convert to seconds.
-                # mfcc hop length defaults to 512
-                seg_times = librosa.frames_to_time(boundaries, sr=sr, hop_length=512)
-                seg_times = [0.0] + [float(x) for x in seg_times.tolist()] + [float(duration_s)]
-                # De-dup and sort
-                seg_times = sorted(set([max(0.0, min(duration_s, t)) for t in seg_times]))
-
-                section_labels = ["Intro", "Verse", "Chorus", "Bridge", "Final Chorus", "Outro"]
-                sections = []
-                for i in range(len(seg_times) - 1):
-                    a, b = seg_times[i], seg_times[i + 1]
-                    if b - a < 2.0:
-                        continue
-                    name = section_labels[min(i, len(section_labels) - 1)]
-                    sections.append({"name": name, "start": float(a), "end": float(b)})
-                analysis["sections"] = sections
-            except Exception:
-                # Fall back to rule-based if structure fails
-                pass
-
-        except Exception:
-            # librosa not available or failed; pydub fallback
-            from pydub import AudioSegment
-            import numpy as _np
-
-            seg = AudioSegment.from_file(audio_path)
-            duration_s = float(len(seg)) / 1000.0
-            analysis["duration_s"] = duration_s
-
-            frame_ms = 50
-            energies = []
-            for t0 in range(0, len(seg), frame_ms):
-                frame = seg[t0 : t0 + frame_ms]
-                samples = _np.array(frame.get_array_of_samples())
-                if samples.size == 0:
-                    energies.append(0.0)
-                    continue
-                rms = float(_np.sqrt(_np.mean(samples.astype(_np.float32) ** 2)))
-                energies.append(rms)
-
-            if energies:
-                e = _np.array(energies, dtype=_np.float32)
-                e = e - float(e.min())
-                denom = float(e.max()) or 1.0
-                e = e / denom
-                analysis["energy_curve"] = e.tolist()
-
-            # Basic BPM estimation from energy derivative peaks
-            if analysis.get("energy_curve"):
-                ec = analysis["energy_curve"]
-                d = _np.diff(_np.array(ec, dtype=_np.float32))
-                thresh = float(_np.percentile(d, 95)) if d.size else 0.0
-                peaks = _np.where(d >= max(thresh, 0.05))[0]
-                if peaks.size >= 8:
-                    times = peaks * (frame_ms / 1000.0)
-                    itv = _np.diff(times)
-                    itv = itv[(itv > 0.15) & (itv < 1.5)]
-                    if itv.size:
-                        median = float(_np.median(itv))
-                        bpm2 = 60.0 / median
-                        while bpm2 < 60:
-                            bpm2 *= 2
-                        while bpm2 > 180:
-                            bpm2 /= 2
-                        analysis["bpm"] = float(round(bpm2, 2))
-
-        # Mood classification (simple)
-        avg_energy = None
-        if analysis.get("energy_curve"):
-            import numpy as _np
-
-            avg_energy = float(_np.mean(_np.array(analysis["energy_curve"], dtype=_np.float32)))
-        mood = "uplifting"
-        if avg_energy is not None:
-            if avg_energy < 0.25:
-                mood = "chill"
-            elif avg_energy < 0.45:
-                mood = "emotional"
-            elif avg_energy < 0.65:
-                mood = "epic"
-            else:
-                mood = "high-energy"
-        analysis["mood"] = mood
-
-        # Section detection fallback (rule-based timeline buckets)
-        if not analysis.get("sections"):
-            dur = float(analysis.get("duration_s") or 0.0)
-            if dur > 0.0:
-                intro_end = min(15.0, dur * 0.10)
-                outro_start = max(dur - min(15.0, dur * 0.10), intro_end)
-                p2 = dur * 0.35
-                p3 = dur * 0.55
-                p4 = dur * 0.70
-                p5 = dur * 0.90
-
-                sections = []
-                def _add(name: str, a: float, b: float):
-                    if b - a >= 2.0:
-                        sections.append({"name": name, "start": float(a), "end": float(b)})
-
-                _add("Intro", 0.0, intro_end)
-                _add("Verse", intro_end, p2)
-                _add("Chorus", p2, p3)
-                _add("Bridge", p3, p4)
-                _add("Final Chorus", p4, p5)
-                _add("Outro", max(p5, outro_start), dur)
-                analysis["sections"] = sections
-
-    except Exception as exc:
-        analysis["error"] = str(exc)[:500]
-
-    # Ensure BPM exists
-    if not analysis.get("bpm"):
-        analysis["bpm"] = 120.0
-    return analysis
+    Results are cached on disk by content hash + analysis version; misses run
+    in a separate process (see musicvideo/audio_analysis.py).
+    """
+    return cached_analysis(audio_path, str(_mv_render_cache().root / "analysis"))
 
 
 def _mv_theme_from_mood(mood: str) -> str:
@@ -9501,6 +9331,60 @@ def _mv_generate_motion_clip_cloud(
     return result
 
 
+def _mv_dag_limits(use_cloud: bool) -> Dict[str, int]:
+    """Concurrency per resource class for the MV scene DAG (env overrides)."""
+
+    def _env_int(name: str, default: int) -> int:
+        try:
+            return max(1, int(os.environ.get(name) or default))
+        except ValueError:
+            return default
+
+    cpu = os.cpu_count() or 2
+    return {
+        # A local ComfyUI server renders one prompt at a time; cloud providers take a few in parallel.
+        "generate": _env_int("MV_GENERATE_CONCURRENCY", 2 if use_cloud else 1),
+        # x264 / minterpolate are multi-threaded themselves; a couple of jobs fill the gaps between them.
+        "cpu": _env_int("MV_CPU_CONCURRENCY", max(1, min(4, cpu // 4))),
+        "io": _env_int("MV_IO_CONCURRENCY", 1),
+    }
+
+
+def _mv_render_cache() -> RenderCache:
+    """Stage output cache shared by all MV jobs (MV_RENDER_CACHE=0 disables it)."""
+    root = (os.environ.get("MV_RENDER_CACHE_DIR") or "").strip() or str(MEDIA_ROOT / "_cache" / "musicvideo")
+    enabled = (os.environ.get("MV_RENDER_CACHE") or "1").strip().lower() not in {"0", "false", "no", "off"}
+    return RenderCache(root, enabled=enabled)
+
+
+def _mv_prune_render_cache(cache: RenderCache) -> None:
+    try:
+        max_gb = float(os.environ.get("MV_RENDER_CACHE_MAX_GB") or 20)
+        cache.prune(int(max_gb * 1024 ** 3))
+    except Exception:
+        pass
+
+
+def _mv_new_seed() -> int:
+    return int.from_bytes(os.urandom(4), "little")
+
+
+# Share of the 20-95% progress band each finished node is worth.
+# "assemble" (single-pass interpolate+transcode+concat+mux) is weighted per scene.
+_MV_NODE_WEIGHTS = {"generate": 3.0, "interpolate": 1.0, "transcode": 1.0, "concat": 0.5, "mux": 0.5, "assemble": 2.0}
+
+
+def _mv_assembly_mode(scene_count: int, interpolate: bool) -> Tuple[str, str]:
+    """("single-pass" | "per-clip", reason) for assembling the scene clips (env MV_ASSEMBLY)."""
+    requested = (os.environ.get("MV_ASSEMBLY") or "auto").strip().lower()
+    if requested in {"per-clip", "per_clip", "off"}:
+        return "per-clip", "MV_ASSEMBLY=per-clip"
+    reason = single_pass_unsupported(scene_count, interpolate, interpolation_engine())
+    if reason:
+        return "per-clip", reason
+    return "single-pass", ""
+
+
 def _musicvideo_worker(job_id: str) -> None:
     job = _mv_get_job(job_id) or {}
     audio_path = job.get("audio_path")
@@ -9509,51 +9393,70 @@ def _musicvideo_worker(job_id: str) -> None:
         return
 
     try:
-        _mv_set_job(job_id, status="running", stage="analyzing", progress=5)
-
-        analysis = _mv_analyze_audio(audio_path)
-        bpm = float(analysis.get("bpm") or 120.0)
-        mood = str(analysis.get("mood") or "uplifting")
-        theme = _mv_theme_from_mood(mood)
-        sections = analysis.get("sections") or []
+        tmp_dir = (MEDIA_ROOT / "_tmp" / "musicvideo" / job_id)
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        # Node states of the scene DAG; lets a job interrupted by a restart resume mid-way.
+        state_path = str(tmp_dir / "dag_state.json")
+
+        scenes: List[Dict[str, Any]] = job.get("scenes") or []
+        resuming = bool(job.get("resume_pending") and os.path.exists(state_path))
+        if scenes and (resuming or job.get("reuse_plan")):
+            # Resumed job, or a retry carrying over its source job's scene plan
+            bpm = float(job.get("bpm") or 120.0)
+            mood = str(job.get("mood") or "uplifting")
+            theme = str(job.get("theme") or _mv_theme_from_mood(mood))
+            _mv_set_job(job_id, status="running", stage="resuming" if resuming else "planning", resume_pending=False)
+        else:
+            _mv_set_job(job_id, status="running", stage="analyzing", progress=5)
 
-        _mv_set_job(
-            job_id,
-            analysis=analysis,
-            bpm=bpm,
-            mood=mood,
-            theme=theme,
-            status="running",
-            stage="planning",
-            progress=15,
-        )
+            analysis = _mv_analyze_audio(audio_path)
+            bpm = float(analysis.get("bpm") or 120.0)
+            mood = str(analysis.get("mood") or "uplifting")
+            theme = _mv_theme_from_mood(mood)
+            sections = analysis.get("sections") or []
 
-        # Plan scenes anchored to detected sections, then sub-slice into short animated blocks.
-        duration_s = float(analysis.get("duration_s") or 0.0)
-        if duration_s <= 0:
-            duration_s = 60.0
+            _mv_set_job(
+                job_id,
+                analysis=analysis,
+                bpm=bpm,
+                mood=mood,
+                theme=theme,
+                status="running",
+                stage="planning",
+                progress=15,
+            )
 
-        beat_s = 60.0 / max(bpm, 1.0)
-        # 2–5 seconds clips; shorter clips = better motion consistency.
-        clip_len = max(2.5, min(5.0, beat_s * 8))
+            # Plan scenes anchored to detected sections, then sub-slice into short animated blocks.
+            duration_s = float(analysis.get("duration_s") or 0.0)
+            if duration_s <= 0:
+                duration_s = 60.0
 
-        scenes: List[Dict[str, Any]] = []
-        for s in (sections or [{"name": "Scene", "start": 0.0, "end": duration_s}]):
-            try:
-                sec_name = str(s.get("name") or "Scene")
-                a = float(s.get("start", 0.0))
-                b = float(s.get("end", 0.0))
-            except Exception:
-                continue
-            a = max(0.0, min(duration_s, a))
-            b = max(a, min(duration_s, b))
-            t = a
-            while t < b - 0.25:
-                d = min(clip_len, b - t)
-                scenes.append({"index": len(scenes), "start": t, "end": t + d, "section": sec_name})
-                t += d
+            beat_s = 60.0 / max(bpm, 1.0)
+            # 2–5 seconds clips; shorter clips = better motion consistency.
+            clip_len = max(2.5, min(5.0, beat_s * 8))
 
+            scenes = []
+            for s in (sections or [{"name": "Scene", "start": 0.0, "end": duration_s}]):
+                try:
+                    sec_name = str(s.get("name") or "Scene")
+                    a = float(s.get("start", 0.0))
+                    b = float(s.get("end", 0.0))
+                except Exception:
+                    continue
+                a = max(0.0, min(duration_s, a))
+                b = max(a, min(duration_s, b))
+                t = a
+                while t < b - 0.25:
+                    d = min(clip_len, b - t)
+                    scenes.append({"index": len(scenes), "start": t, "end": t + d, "section": sec_name})
+                    t += d
+
+        # Seeds are part of the scene plan so a rerun of an unchanged scene hits the render cache.
+        for sc in scenes:
+            if sc.get("seed") is None:
+                sc["seed"] = _mv_new_seed()
         _mv_set_job(job_id, scenes=scenes, status="running", stage="animating", progress=20)
+        render_cache = _mv_render_cache()
 
         # Motion generation via local ComfyUI workflow (AnimateDiff/Deforum/etc)
         workflow_path = (os.environ.get("COMFYUI_WORKFLOW_PATH") or os.environ.get("MV_COMFYUI_WORKFLOW") or "").strip()
@@ -9591,87 +9494,80 @@ def _musicvideo_worker(job_id: str) -> None:
         target_fps = int(job.get("fps") or 30)
         width, height = 1280, 720  # generate lower, upscale in transcode step
         out_w, out_h = 1920, 1080
+        total_scenes = max(len(scenes), 1)
 
-        tmp_dir = (MEDIA_ROOT / "_tmp" / "musicvideo" / job_id)
-        tmp_dir.mkdir(parents=True, exist_ok=True)
-
-        clips_ready: List[str] = []
         user_style = str(job.get("anime_prompt") or "").strip()
         user_neg = str(job.get("negative_prompt") or "").strip()
         user_motion_hint = str(job.get("motion_hint") or "").strip()
         neg = user_neg if user_neg else _mv_negative_prompt()
 
-        for i, sc in enumerate(scenes):
-            job_now = _mv_get_job(job_id) or {}
-            if job_now.get("cancel_requested"):
-                _mv_set_job(job_id, status="cancelled", stage="cancelled", progress=0)
-                return
+        if use_cloud_fallback:
+            generate_backend = f"cloud:{cloud_backend}"
+        else:
+            generate_backend = f"comfyui:{file_digest(workflow_path)}"
+        mv_steps = int(os.environ.get("MV_STEPS") or 20)
+        mv_cfg = float(os.environ.get("MV_CFG") or 6.0)
+        mv_crf = int(os.environ.get("MV_CRF") or 18)
+        mv_preset = str(os.environ.get("MV_PRESET") or "medium")
+        interp_engine = interpolation_engine()
+        needs_interp = base_fps < target_fps
+        assembly, assembly_note = _mv_assembly_mode(len(scenes), needs_interp)
+        _mv_set_job(job_id, assembly=assembly, assembly_note=assembly_note)
+
+        # Fraction done of running ffmpeg nodes, from their -progress output
+        node_fraction: Dict[str, float] = {}
+
+        def _cancelled() -> bool:
+            return bool((_mv_get_job(job_id) or {}).get("cancel_requested"))
+
+        def _ffmpeg_progress(node_id: str):
+            def _update(p) -> None:
+                if p.percent is None:
+                    return
+                node_fraction[node_id] = p.percent / 100.0
+                job_now = _mv_get_job(job_id) or {}
+                _mv_set_job(
+                    job_id,
+                    progress=max(float(job_now.get("progress") or 20.0), _progress(("done",))),
+                    node_progress={k: round(v * 100, 1) for k, v in list(node_fraction.items())},
+                )
+            return _update
 
+        def _cached(stage: str, params: Dict[str, Any], output_path: str, render) -> Dict[str, Any]:
+            out = render_cache.render(stage, params, output_path, render)
+            return {"path": out["path"], "cached": out["cached"], "cache_key": out["key"]}
+
+        def _generate(i: int, sc: Dict[str, Any]) -> Dict[str, Any]:
             section = str(sc.get("section") or "Scene")
             dur = float(sc.get("end") - sc.get("start"))
             dur = max(2.0, min(dur, 6.0))
 
-            # Prompt includes explicit motion/camera direction.
-            default_motion_hint = "smooth continuous animation, dynamic motion, camera pan, subtle parallax, drifting particles"
-            motion_hint = user_motion_hint if user_motion_hint else default_motion_hint
-            base_prompt = _mv_prompt_for_scene(theme=theme, section=section, mood=mood)
-            if user_style:
-                prompt = f"{user_style} {base_prompt} {motion_hint}".strip()
-            else:
-                prompt = f"{base_prompt} {motion_hint}".strip()
+            prompt = str(sc.get("prompt") or "").strip()
+            if not prompt:
+                # Prompt includes explicit motion/camera direction.
+                default_motion_hint = "smooth continuous animation, dynamic motion, camera pan, subtle parallax, drifting particles"
+                motion_hint = user_motion_hint if user_motion_hint else default_motion_hint
+                base_prompt = _mv_prompt_for_scene(theme=theme, section=section, mood=mood)
+                if user_style:
+                    prompt = f"{user_style} {base_prompt} {motion_hint}".strip()
+                else:
+                    prompt = f"{base_prompt} {motion_hint}".strip()
 
             frames = int(max(16, min(48, round(dur * base_fps))))
-            seed = int.from_bytes(os.urandom(4), "little")
-
-            # Allocate progress smoothly across all scenes so long songs still show
-            # continuous movement (even when there are many scenes).
-            total_scenes = float(max(len(scenes), 1))
-            start_p = 20.0 + (float(i) / total_scenes) * 45.0
-            end_p = 20.0 + (float(i + 1) / total_scenes) * 45.0
-            if end_p <= start_p:
-                end_p = start_p + 0.5
+            seed = int(sc["seed"])
 
             _mv_set_job(
                 job_id,
-                stage="animating",
-                progress=float(start_p),
                 current_scene=i,
                 current_section=section,
                 current_prompt=prompt[:300],
-                stage_detail=f"Scene {i + 1}/{int(total_scenes)}: preparing request",
             )
 
-            # Heartbeat thread: while we're blocked waiting for a clip to render,
-            # nudge progress forward in tiny increments so the UI shows activity.
-            hb_stop = threading.Event()
-
-            def _heartbeat() -> None:
-                try:
-                    # Keep a little headroom so we never overshoot the scene's allocation.
-                    cap = float(end_p) - 0.1
-                    while not hb_stop.is_set():
-                        j = _mv_get_job(job_id) or {}
-                        if j.get("cancel_requested"):
-                            return
-                        p = float(j.get("progress") or start_p)
-                        # Small, steady increments.
-                        p2 = min(cap, p + 0.2)
-                        _mv_set_job(
-                            job_id,
-                            progress=float(p2),
-                            stage="animating",
-                            stage_detail=f"Scene {i + 1}/{int(total_scenes)}: rendering motion clip…",
-                        )
-                        time.sleep(2.0)
-                except Exception:
-                    return
-
-            threading.Thread(target=_heartbeat, daemon=True).start()
-
             raw_clip = str(tmp_dir / f"clip_{i:03d}_raw.mp4")
-            try:
-                if use_cloud_fallback:
-                    _mv_set_job(job_id, stage_detail=f"Scene {i + 1}/{int(total_scenes)}: calling {cloud_backend}…")
+            params = generate_cache_params(prompt, neg, seed, generate_backend, dur, base_fps)
+
+            if use_cloud_fallback:
+                def _render_cloud() -> str:
                     cloud = _mv_generate_motion_clip_cloud(
                         prompt=prompt,
                         negative_prompt=neg,
@@ -9680,76 +9576,92 @@ def _musicvideo_worker(job_id: str) -> None:
                         preferred_backend=cloud_backend,
                     )
                     if not cloud.get("success") or not os.path.exists(raw_clip):
-                        _mv_set_job(job_id, status="failed", stage="error", error=cloud.get("error") or "Cloud motion generation failed")
-                        return
-                    clip_for_transcode = raw_clip
-                else:
-                    _mv_set_job(job_id, stage_detail=f"Scene {i + 1}/{int(total_scenes)}: rendering via ComfyUI…")
-                    res = comfy.generate_video(
-                        workflow_path=workflow_path,
-                        prompt=prompt,
-                        negative_prompt=neg,
-                        width=width,
-                        height=height,
-                        frames=frames,
-                        fps=base_fps,
-                        seed=seed,
-                        steps=int(os.environ.get("MV_STEPS") or 20),
-                        cfg=float(os.environ.get("MV_CFG") or 6.0),
-                        output_path=raw_clip,
-                        max_wait_s=int(os.environ.get("MV_COMFYUI_MAX_WAIT_S") or 3600),
-                    )
-                    if not res.success or not res.output_video_path or not os.path.exists(res.output_video_path):
-                        _mv_set_job(job_id, status="failed", stage="error", error=res.error or "ComfyUI generation failed")
-                        return
-                    clip_for_transcode = res.output_video_path
-            finally:
-                hb_stop.set()
-
-            # Scene finished: lock in the progress for this scene.
-            _mv_set_job(
-                job_id,
-                stage="animating",
-                progress=float(end_p),
-                stage_detail=f"Scene {i + 1}/{int(total_scenes)}: clip ready",
-            )
+                        raise RuntimeError(cloud.get("error") or "Cloud motion generation failed")
+                    return raw_clip
+
+                return _cached("generate", params, raw_clip, _render_cloud)
+
+            def _render_comfy() -> str:
+                res = comfy.generate_video(
+                    workflow_path=workflow_path,
+                    prompt=prompt,
+                    negative_prompt=neg,
+                    width=width,
+                    height=height,
+                    frames=frames,
+                    fps=base_fps,
+                    seed=seed,
+                    steps=mv_steps,
+                    cfg=mv_cfg,
+                    output_path=raw_clip,
+                    max_wait_s=int(os.environ.get("MV_COMFYUI_MAX_WAIT_S") or 3600),
+                )
+                if not res.success or not res.output_video_path or not os.path.exists(res.output_video_path):
+                    raise RuntimeError(res.error or "ComfyUI generation failed")
+                return res.output_video_path
 
-            # Optional interpolation to target fps
-            if base_fps < target_fps:
-                _mv_set_job(job_id, stage="interpolating", progress=max(float(end_p), 65.0), stage_detail="Interpolating FPS…")
-                interp_path = str(tmp_dir / f"clip_{i:03d}_interp.mp4")
-                ok_i, msg_i = interpolate_to_fps(clip_for_transcode, interp_path, target_fps)
-                if ok_i and os.path.exists(interp_path):
-                    clip_for_transcode = interp_path
-                else:
-                    # Keep moving: motion clip still exists; record warning.
-                    _mv_set_job(job_id, interpolation_warning=(msg_i or "interpolation skipped"))
+            params.update(width=width, height=height, frames=frames, steps=mv_steps, cfg=mv_cfg)
+            return _cached("generate", params, raw_clip, _render_comfy)
+
+        def _interpolate(i: int) -> Dict[str, Any]:
+            clip = scheduler.result(f"generate_{i:03d}")["path"]
+            interp_path = str(tmp_dir / f"clip_{i:03d}_interp.mp4")
 
+            def _render() -> str:
+                ok_i, msg_i = interpolate_to_fps(
+                    clip, interp_path, target_fps,
+                    on_progress=_ffmpeg_progress(f"interpolate_{i:03d}"), cancel=_cancelled,
+                )
+                if not ok_i or not os.path.exists(interp_path):
+                    raise RuntimeError(msg_i or "interpolation skipped")
+                return interp_path
+
+            params = {"source": file_digest(clip), "fps": target_fps, "engine": interp_engine}
+            try:
+                return _cached("interpolate", params, interp_path, _render)
+            except RuntimeError as exc:
+                # Keep moving: motion clip still exists; record warning.
+                _mv_set_job(job_id, interpolation_warning=str(exc))
+                return {"path": clip, "warning": str(exc)}
+
+        def _transcode(i: int, source: str) -> Dict[str, Any]:
             # Transcode to normalized 1080p for concat
+            input_path = scheduler.result(source)["path"]
             norm_path = str(tmp_dir / f"clip_{i:03d}_1080p.mp4")
-            ok_t, msg_t = transcode_h264(
-                input_path=clip_for_transcode,
-                output_path=norm_path,
-                width=out_w,
-                height=out_h,
-                fps=target_fps,
-                crf=int(os.environ.get("MV_CRF") or 18),
-                preset=str(os.environ.get("MV_PRESET") or "medium"),
-            )
-            if not ok_t:
-                _mv_set_job(job_id, status="failed", stage="error", error=f"ffmpeg transcode failed: {msg_t}")
-                return
 
-            clips_ready.append(norm_path)
+            def _render() -> str:
+                ok_t, msg_t = transcode_h264(
+                    input_path=input_path,
+                    output_path=norm_path,
+                    width=out_w,
+                    height=out_h,
+                    fps=target_fps,
+                    crf=mv_crf,
+                    preset=mv_preset,
+                    on_progress=_ffmpeg_progress(f"transcode_{i:03d}"),
+                    cancel=_cancelled,
+                )
+                if not ok_t:
+                    raise RuntimeError(f"ffmpeg transcode failed: {msg_t}")
+                return norm_path
+
+            params = {
+                "source": file_digest(input_path),
+                "width": out_w,
+                "height": out_h,
+                "fps": target_fps,
+                "crf": mv_crf,
+                "preset": mv_preset,
+            }
+            return _cached("transcode", params, norm_path, _render)
 
-        _mv_set_job(job_id, stage="assembling", progress=85.0, stage_detail="Stitching clips…")
-
-        # Concatenate clips
-        stitched_path = str(tmp_dir / "stitched.mp4")
-        ok_c, msg_c = concat_videos(clips_ready, stitched_path)
-        if not ok_c:
-            _mv_set_job(job_id, status="failed", stage="error", error=f"ffmpeg concat failed: {msg_c}")
-            return
+        def _concat() -> Dict[str, Any]:
+            clips_ready = [scheduler.result(f"transcode_{i:03d}")["path"] for i in range(len(scenes))]
+            stitched_path = str(tmp_dir / "stitched.mp4")
+            ok_c, msg_c = concat_videos(clips_ready, stitched_path, cancel=_cancelled)
+            if not ok_c:
+                raise RuntimeError(f"ffmpeg concat failed: {msg_c}")
+            return {"path": stitched_path}
 
         # Output file
         out_name = job.get("output_filename")
@@ -9757,10 +9669,177 @@ def _musicvideo_worker(job_id: str) -> None:
             out_name = f"{_mv_safe_stem(job.get('title') or 'song')}_anime_video.mp4"
         out_path = str((MEDIA_ROOT / "videos" / Path(out_name).name).resolve())
 
-        # Mux audio
-        ok_m, msg_m = mux_audio(stitched_path, audio_path, out_path)
-        if not ok_m:
-            _mv_set_job(job_id, status="failed", stage="error", error=f"Audio mux failed: {msg_m}")
+        def _mux() -> Dict[str, Any]:
+            ok_m, msg_m = mux_audio(
+                scheduler.result("concat")["path"], audio_path, out_path,
+                on_progress=_ffmpeg_progress("mux"), cancel=_cancelled,
+            )
+            if not ok_m:
+                raise RuntimeError(f"Audio mux failed: {msg_m}")
+            return {"path": out_path}
+
+        def _assemble() -> Dict[str, Any]:
+            # One ffmpeg pass: per-clip interpolation/normalization, concat and audio mux.
+            clips = [scheduler.result(f"generate_{i:03d}")["path"] for i in range(len(scenes))]
+
+            # Written inside the job dir and moved into place, so out_path is never
+            # written in place (another job's file of the same name may be cached).
+            assembled_path = str(tmp_dir / "assembled.mp4")
+
+            def _render() -> str:
+                args = compile_assembly(
+                    clips, audio_path, assembled_path,
+                    width=out_w, height=out_h, fps=target_fps,
+                    interpolate=needs_interp, engine=interp_engine,
+                    crf=mv_crf, preset=mv_preset,
+                )
+                duration = sum(float(sc.get("end") or 0) - float(sc.get("start") or 0) for sc in scenes)
+                ok_a, msg_a = run_ffmpeg(
+                    args, duration_s=duration or None,
+                    on_progress=_ffmpeg_progress("assemble"), cancel=_cancelled,
+                )
+                if not ok_a:
+                    raise RuntimeError(f"ffmpeg assembly failed: {msg_a}")
+                return assembled_path
+
+            params = {
+                "clips": [file_digest(c) for c in clips],
+                "audio": file_digest(audio_path),
+                "width": out_w,
+                "height": out_h,
+                "fps": target_fps,
+                "interpolation": interp_engine if needs_interp else "none",
+                "crf": mv_crf,
+                "preset": mv_preset,
+            }
+            out = _cached("assemble", params, assembled_path, _render)
+            os.replace(out["path"], out_path)
+            return dict(out, path=out_path)
+
+        # Scene DAG: generate per scene, then either one single-pass assemble node or
+        # (interpolate) -> transcode per scene followed by concat -> mux.
+        # Generation of scene N+1 overlaps the per-clip work of scene N.
+        gen_attempts = int(os.environ.get("MV_GENERATE_ATTEMPTS") or 2)
+        nodes: List[DagNode] = []
+        for i, sc in enumerate(scenes):
+            nodes.append(DagNode(
+                id=f"generate_{i:03d}", resource="generate", priority=i, max_attempts=gen_attempts,
+                fn=lambda i=i, sc=sc: _generate(i, sc),
+            ))
+            if assembly == "single-pass":
+                continue
+            source = f"generate_{i:03d}"
+            if needs_interp:
+                nodes.append(DagNode(
+                    id=f"interpolate_{i:03d}", resource="cpu", priority=i, deps=[source],
+                    fn=lambda i=i: _interpolate(i),
+                ))
+                source = f"interpolate_{i:03d}"
+            nodes.append(DagNode(
+                id=f"transcode_{i:03d}", resource="cpu", priority=i, deps=[source], max_attempts=2,
+                fn=lambda i=i, source=source: _transcode(i, source),
+            ))
+        if assembly == "single-pass":
+            nodes.append(DagNode(
+                id="assemble", resource="cpu", deps=[f"generate_{i:03d}" for i in range(len(scenes))],
+                max_attempts=2, fn=_assemble,
+            ))
+        else:
+            nodes.append(DagNode(
+                id="concat", resource="io", deps=[f"transcode_{i:03d}" for i in range(len(scenes))],
+                max_attempts=2, fn=_concat,
+            ))
+            nodes.append(DagNode(id="mux", resource="io", deps=["concat"], max_attempts=2, fn=_mux))
+
+        def _weight(node_id: str) -> float:
+            share = _MV_NODE_WEIGHTS[node_id.split("_")[0]]
+            return share * total_scenes if node_id == "assemble" else share
+
+        total_weight = sum(_weight(n.id) for n in nodes)
+
+        def _progress(statuses: Tuple[str, ...]) -> float:
+            weight = 0.0
+            for n in scheduler.nodes.values():
+                share = _weight(n.id)
+                if n.status in statuses:
+                    weight += share
+                elif n.status == "running":
+                    # Partial credit for encodes reporting real progress
+                    weight += share * node_fraction.get(n.id, 0.0)
+            return 20.0 + 75.0 * weight / total_weight
+
+        def _on_update(sched: DagScheduler, node: DagNode) -> None:
+            if node.status != "running":
+                node_fraction.pop(node.id, None)
+            running = [n for n in sched.nodes.values() if n.status == "running"]
+            kinds = {n.id.split("_")[0] for n in running}
+            if "generate" in kinds:
+                stage = "animating"
+            elif kinds & {"interpolate", "transcode"}:
+                stage = "interpolating"
+            else:
+                stage = "assembling"
+            generated = sum(1 for n in sched.nodes.values() if n.id.startswith("generate_") and n.status == "done")
+            detail = f"Scenes generated {generated}/{total_scenes}"
+            reused = sum(1 for n in sched.nodes.values() if n.status == "done" and (n.result or {}).get("cached"))
+            if reused:
+                detail += f" · {reused} steps reused from cache"
+            if running:
+                detail += " · running: " + ", ".join(sorted(n.id for n in running))
+            if node.status == "pending" and node.error:
+                detail += f" · retrying {node.id}: {node.error[:120]}"
+            job_now = _mv_get_job(job_id) or {}
+            _mv_set_job(
+                job_id,
+                stage=stage,
+                # Never move backwards (the heartbeat may have nudged ahead)
+                progress=max(float(job_now.get("progress") or 20.0), _progress(("done",))),
+                stage_detail=detail,
+                dag=sched.counts(),
+            )
+
+        scheduler = DagScheduler(
+            nodes,
+            limits=_mv_dag_limits(use_cloud_fallback),
+            state_path=state_path,
+            cancel=_cancelled,
+            on_update=_on_update,
+        )
+        _mv_set_job(job_id, resumable=True, dag_limits=scheduler.limits, dag=scheduler.counts())
+
+        # Heartbeat: while nodes are running, nudge progress forward in tiny increments
+        # (never past the share of the running nodes) so the UI shows activity.
+        # Runs on the bus's flusher thread rather than a thread of its own.
+        def _heartbeat() -> None:
+            j = _mv_get_job(job_id) or {}
+            if j.get("cancel_requested"):
+                return
+            cap = _progress(("done", "running")) - 0.1
+            p = float(j.get("progress") or 20.0)
+            if p + 0.1 <= cap:
+                _mv_set_job(job_id, progress=float(p + 0.1))
+
+        heartbeat = MUSICVIDEO_BUS.add_ticker(_heartbeat)
+        try:
+            summary = scheduler.run()
+        finally:
+            MUSICVIDEO_BUS.remove_ticker(heartbeat)
+            _mv_set_job(job_id, cache_hits=render_cache.hits, cache_misses=render_cache.misses)
+            _mv_prune_render_cache(render_cache)
+
+        if summary["status"] == "cancelled":
+            _mv_set_job(job_id, status="cancelled", stage="cancelled", progress=0, dag=summary["counts"])
+            return
+        if summary["status"] != "completed":
+            failed = summary["failed"][0] if summary["failed"] else ""
+            _mv_set_job(
+                job_id,
+                status="failed",
+                stage="error",
+                error=summary["errors"].get(failed) or "Music video step failed",
+                failed_step=failed,
+                dag=summary["counts"],
+            )
             return
 
         # Best-effort sanity check: video duration shouldn't be trivially small.
@@ -9779,12 +9858,24 @@ def _musicvideo_worker(job_id: str) -> None:
             output_path=out_path,
             output_url=f"/media/videos/{video_name}",
             download_url=f"/media/download/videos/{video_name}",
+            dag=summary["counts"],
         )
 
     except Exception as exc:
         _mv_set_job(job_id, status="failed", stage="error", error=str(exc)[:800])
 
 
+@app.on_event("startup")
+def _on_startup_resume_musicvideo_jobs():
+    """Restart MV jobs that were interrupted mid-DAG (see _mv_reconcile_jobs_on_startup)."""
+    with _MUSICVIDEO_LOCK:
+        pending = [jid for jid, j in MUSICVIDEO_JOBS.items() if isinstance(j, dict) and j.get("resume_pending")]
+    for jid in pending:
+        th = threading.Thread(target=_musicvideo_worker, args=(jid,), daemon=True)
+        th.start()
+        _mv_set_job(jid, thread="started")
+
+
 
 @app.post("/media/upload")
 async def upload_media(request: Request, file: UploadFile = File(...), media_type: str = Form("videos")):
@@ -9908,8 +9999,7 @@ async def musicvideo_upload(
 
 @app.get("/media/musicvideo/jobs")
 def musicvideo_jobs():
-    with _MUSICVIDEO_LOCK:
-        jobs = list(MUSICVIDEO_JOBS.values())
+    jobs = MUSICVIDEO_BUS.values()
     # newest first
     jobs.sort(key=lambda j: j.get("created_at", 0), reverse=True)
     return {"jobs": jobs}
@@ -9923,6 +10013,33 @@ def musicvideo_job(job_id: str):
     return job
 
 
+@app.get("/media/musicvideo/events")
+async def musicvideo_events(request: Request, job_id: Optional[str] = None):
+    """Server-Sent Events stream of MV job changes (all jobs, or one with ?job_id=)"""
+    if job_id and not _mv_get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_source():
+        yield "retry: 3000\n\n"
+        async for changes in MUSICVIDEO_BUS.stream(job_id):
+            if await request.is_disconnected():
+                break
+            if changes is None:
+                yield ": keepalive\n\n"
+                continue
+            for jid, job in changes.items():
+                if job is None:
+                    yield f"event: deleted\ndata: {json.dumps({'id': jid})}\n\n"
+                else:
+                    yield f"event: job\ndata: {json.dumps(job, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/media/musicvideo/status")
 def musicvideo_status():
     """Return MV motion backend readiness for the GUI."""
@@ -10067,10 +10184,19 @@ def musicvideo_cancel(job_id: str):
 
 
 @app.post("/media/musicvideo/job/{job_id}/retry")
-def musicvideo_retry(job_id: str, background_tasks: BackgroundTasks):
-    """Retry a failed/cancelled MV job without re-uploading the audio.
+def musicvideo_retry(
+    job_id: str,
+    background_tasks: BackgroundTasks,
+    scene_prompts: Optional[Dict[str, str]] = Body(None, embed=True),
+    fresh: bool = Body(False, embed=True),
+):
+    """Retry a MV job without re-uploading the audio.
 
     We create a NEW job id so historical results remain visible.
+    The new job keeps the source job's scene plan (sections, seeds, analysis)
+    so unchanged scenes come from the render cache; scene_prompts
+    ({"3": "new prompt", ...}) overrides individual scene prompts, and
+    fresh=true re-analyzes and re-plans with new seeds instead.
     """
     job = _mv_get_job(job_id)
     if not job:
@@ -10084,6 +10210,15 @@ def musicvideo_retry(job_id: str, background_tasks: BackgroundTasks):
     if not audio_path or not os.path.exists(str(audio_path)):
         raise HTTPException(status_code=400, detail="Audio file missing; re-upload required")
 
+    plan: Dict[str, Any] = {}
+    if not fresh:
+        try:
+            plan = retry_plan(job, scene_prompts)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif scene_prompts:
+        raise HTTPException(status_code=400, detail="scene_prompts need the source plan; drop fresh=true")
+
     new_job_id = str(uuid.uuid4())
     title = str(job.get("title") or "")
     safe_title = _mv_safe_stem(title) if title.strip() else _mv_safe_stem(Path(job.get("audio_filename") or "song").stem)
@@ -10108,6 +10243,7 @@ def musicvideo_retry(job_id: str, background_tasks: BackgroundTasks):
         output_filename=out_filename,
         fps=int(job.get("fps") or 30),
         cancel_requested=False,
+        **plan,
     )
 
     def _start():
@@ -10156,22 +10292,17 @@ def musicvideo_clear_jobs(
 
     removed_ids: List[str] = []
     skipped_running: List[str] = []
-    with _MUSICVIDEO_LOCK:
-        # Copy keys to avoid mutation while iterating
-        for jid in list(MUSICVIDEO_JOBS.keys()):
-            j = MUSICVIDEO_JOBS.get(jid) or {}
-            st = str(j.get("status") or "").strip().lower()
-            if st not in stset:
-                continue
-            if st in {"running", "queued"} and not force:
-                skipped_running.append(jid)
-                continue
-            MUSICVIDEO_JOBS.pop(jid, None)
+    for j in MUSICVIDEO_BUS.values():
+        jid = j.get("id")
+        st = str(j.get("status") or "").strip().lower()
+        if not jid or st not in stset:
+            continue
+        if st in {"running", "queued"} and not force:
+            skipped_running.append(jid)
+            continue
+        if MUSICVIDEO_BUS.delete(jid):
             removed_ids.append(jid)
 
-    if removed_ids:
-        _mv_save_jobs_to_disk()
-
     return {
         "success": True,
         "removed": len(removed_ids),
@@ -10949,30 +11080,107 @@ def create_mod_template_api(request: CreateModTemplateRequest):
 
 # --- Memory Scanner Endpoints ---
 
+GAME_SCAN_JOBS: Dict[str, dict] = {}
+_GAME_SCAN_LOCK = threading.Lock()
+# Finished jobs stay pollable this long, then are dropped
+GAME_SCAN_JOB_TTL_S = 600
+
+
+def _game_scan_set(job_id: str, **updates):
+    with _GAME_SCAN_LOCK:
+        GAME_SCAN_JOBS.setdefault(job_id, {"id": job_id}).update(updates)
+
+
+def _game_scan_start(kind: str, run) -> dict:
+    """Run a memory scan on a thread; progress and cancellation go through GAME_SCAN_JOBS.
+
+    Scans share the trainer's scan session, so only one job runs at a time.
+    """
+    job_id = uuid.uuid4().hex[:12]
+    now = time.time()
+    with _GAME_SCAN_LOCK:
+        for old_id, old in list(GAME_SCAN_JOBS.items()):
+            if old.get("finished_at") and now - old["finished_at"] > GAME_SCAN_JOB_TTL_S:
+                del GAME_SCAN_JOBS[old_id]
+        running = next((j["id"] for j in GAME_SCAN_JOBS.values() if j.get("status") == "running"), None)
+        if running:
+            raise HTTPException(status_code=409, detail=f"Scan job {running} is still running")
+        GAME_SCAN_JOBS[job_id] = {"id": job_id, "kind": kind, "status": "running", "progress": 0.0,
+                                  "scanned_mb": 0.0, "cancel_requested": False, "created_at": now}
+
+    def progress(done, total):
+        _game_scan_set(job_id, progress=round(done / total, 4) if total else 1.0,
+                       scanned_mb=round(done / (1024 * 1024), 2))
+
+    def cancelled():
+        with _GAME_SCAN_LOCK:
+            return GAME_SCAN_JOBS[job_id].get("cancel_requested", False)
+
+    def worker():
+        try:
+            result = run(progress, cancelled)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        status = "done" if result.get("success") else ("cancelled" if result.get("cancelled") else "error")
+        _game_scan_set(job_id, status=status, result=result, finished_at=time.time())
+
+    threading.Thread(target=worker, daemon=True, name=f"game-scan-{job_id}").start()
+    with _GAME_SCAN_LOCK:
+        return {"success": True, "job_id": job_id, "status": dict(GAME_SCAN_JOBS[job_id])}
+
+
 @app.post("/game/scan")
 def scan_memory_api(request: ScanMemoryRequest):
-    """Scan memory for a specific value."""
-    result = game_trainer.scan_memory(request.value, request.data_type, request.scan_type)
+    """Scan memory for a specific value (background=true returns a job to poll or cancel)."""
+    def run(progress=None, cancel=None):
+        return game_trainer.scan_memory_for_value(request.value, request.data_type, request.scan_type,
+                                                  request.alignment, progress=progress, cancel=cancel)
+    if request.background:
+        return _game_scan_start("scan", run)
+    result = run()
     if not result.get("success"):
-        raise HTTPException(status_code=400, detail=result.get("error", "Memory scan failed"))
+        raise HTTPException(status_code=409 if result.get("busy") else 400, detail=result.get("error", "Memory scan failed"))
     return result
 
 
 @app.post("/game/next_scan")
 def next_scan_api(request: NextScanRequest):
     """Filter previous scan results."""
-    result = game_trainer.next_scan(request.filter_type, request.value)
+    def run(progress=None, cancel=None):
+        return game_trainer.next_scan(request.value, request.filter_type, progress=progress, cancel=cancel)
+    if request.background:
+        return _game_scan_start("next_scan", run)
+    result = run()
     if not result.get("success"):
-        raise HTTPException(status_code=400, detail=result.get("error", "Next scan failed"))
+        raise HTTPException(status_code=409 if result.get("busy") else 400, detail=result.get("error", "Next scan failed"))
     return result
 
 
+@app.get("/game/scan/job/{job_id}")
+def game_scan_job(job_id: str):
+    with _GAME_SCAN_LOCK:
+        job = GAME_SCAN_JOBS.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return dict(job)
+
+
+@app.post("/game/scan/job/{job_id}/cancel")
+def game_scan_cancel(job_id: str):
+    with _GAME_SCAN_LOCK:
+        if job_id not in GAME_SCAN_JOBS:
+            raise HTTPException(status_code=404, detail="Job not found")
+    _game_scan_set(job_id, cancel_requested=True)
+    return {"success": True, "job_id": job_id}
+
+
 @app.get("/game/scan_results")
-def get_scan_results_api():
-    """Get current scan results."""
-    result = game_trainer.get_scan_results()
+def get_scan_results_api(offset: int = 0, limit: int = 100):
+    """Get a page of current scan results."""
+    result = game_trainer.get_scan_results(limit, offset)
     if not result.get("success"):
-        raise HTTPException(status_code=400, detail=result.get("error", "Failed to get scan results"))
+        raise HTTPException(status_code=409 if result.get("busy") else 400,
+                            detail=result.get("error", "Failed to get scan results"))
     return result
 
 
@@ -11014,8 +11222,10 @@ def unfreeze_all_api():
 
 @app.post("/game/aob_scan")
 def aob_scan_api(request: AOBScanRequest):
-    """Scan memory for an Array of Bytes pattern."""
-    result = game_trainer.aob_scan(request.pattern)
+    """Scan memory for an Array of Bytes pattern, or several in one pass."""
+    if not request.pattern and not request.patterns:
+        raise HTTPException(status_code=400, detail="pattern or patterns is required")
+    result = game_trainer.aob_scan(request.patterns or request.pattern, request.module)
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "AOB scan failed"))
     return result
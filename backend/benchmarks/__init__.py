@@ -0,0 +1,8 @@
+"""
+Agent Amigos - Performance Benchmarks
+
+Reproducible micro/macro benchmarks for backend subsystems. Run from the
+backend directory, e.g.:
+
+    python -m benchmarks.canvas_bench --sizes 1000,10000
+"""
@@ -0,0 +1,121 @@
+"""
+🎮 AOB pattern scan benchmark
+
+Compares the vectorized trainer.pattern_scanner.find_pattern engine with the
+previous per-offset byte loop, and MultiPatternScanner (a cheat table's worth
+of signatures in one pass) with scanning them one by one, on synthetic buffers that look like code
+sections (random bytes with the signature planted at a few offsets).
+
+    cd backend
+    python -m benchmarks.aob_bench --sizes 1,16,256 --json aob.json
+    python -m benchmarks.aob_bench --baseline aob.json
+
+The byte loop is only run up to --naive-limit MB; beyond that it takes minutes.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks.common import Timer, compare_to_baseline, print_table, write_report
+from trainer.pattern_scanner import MultiPatternScanner, _matches_pattern, find_pattern, parse_pattern
+
+PATTERNS = {
+    "long anchor": "48 8B 05 ?? ?? ?? ?? 48 85 C0 74 ??",
+    "short anchor": "89 ?? ?? 8B ?? 24",
+    "leading wildcards": "?? ?? ?? ?? F3 0F 11 40 ??",
+}
+
+
+def naive_scan(data: bytes, pattern: bytes, mask: bytes):
+    """The original _scan_region loop, kept as the reference"""
+    matches = []
+    pattern_len = len(pattern)
+    for i in range(len(data) - pattern_len + 1):
+        if _matches_pattern(data[i:i + pattern_len], pattern, mask):
+            matches.append(i)
+    return matches
+
+
+def synthetic_buffer(size: int, rng: np.random.Generator) -> bytes:
+    data = bytearray(rng.integers(0, 256, size, dtype=np.uint8).tobytes())
+    for text in PATTERNS.values():
+        pattern, mask = parse_pattern(text)
+        for _ in range(8):
+            offset = int(rng.integers(0, size - len(pattern)))
+            data[offset:offset + len(pattern)] = bytes(
+                p if m else data[offset + i] for i, (p, m) in enumerate(zip(pattern, mask))
+            )
+    return bytes(data)
+
+
+def cheat_table_signatures(count: int, rng: np.random.Generator):
+    """Random 5-13 byte signatures with two wildcards each, like a cheat table's"""
+    signatures = []
+    for _ in range(count):
+        tokens = [f"{b:02X}" for b in rng.integers(0, 256, int(rng.integers(5, 14)))]
+        for j in rng.choice(len(tokens), 2, replace=False):
+            tokens[j] = "??"
+        signatures.append(" ".join(tokens))
+    return signatures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="AOB pattern scan benchmark")
+    parser.add_argument("--sizes", default="1,16,256", help="Comma-separated buffer sizes in MB")
+    parser.add_argument("--naive-limit", type=float, default=1, help="Largest size (MB) to run the byte loop on")
+    parser.add_argument("--table-patterns", type=int, default=30,
+                        help="Signatures in the simulated cheat table for the multi-pattern case")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json report")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    report = {"benchmark": "aob", "seed": args.seed, "results": {}}
+    rows = []
+    for size_mb in [float(s) for s in args.sizes.split(",") if s.strip()]:
+        size = int(size_mb * 1024 * 1024)
+        data = synthetic_buffer(size, rng)
+        timer = Timer()
+        for name, text in PATTERNS.items():
+            pattern, mask = parse_pattern(text)
+            with timer.measure(f"{name} (numpy)", ops=size):
+                fast = find_pattern(data, pattern, mask)
+            if size_mb <= args.naive_limit:
+                with timer.measure(f"{name} (byte loop)", ops=size):
+                    slow = naive_scan(data, pattern, mask)
+                if fast != slow:
+                    print(f"Mismatch for {name!r} at {size_mb} MB", file=sys.stderr)
+                    return 2
+        table = cheat_table_signatures(args.table_patterns, rng)
+        with timer.measure(f"{len(table)} signatures (one by one)", ops=size):
+            separate = {text: find_pattern(data, *parse_pattern(text)) for text in table}
+        with timer.measure(f"{len(table)} signatures (multi-pattern)", ops=size):
+            combined = MultiPatternScanner(table).find_all(data)
+        if combined != separate:
+            print(f"Multi-pattern mismatch at {size_mb} MB", file=sys.stderr)
+            return 2
+        report["results"][f"{size_mb:g}MB"] = timer.results
+        for name, result in timer.results.items():
+            rows.append({"case": name, "size": f"{size_mb:g}MB", "seconds": result["seconds"],
+                         "MB/s": round(size_mb / result["seconds"], 2) if result["seconds"] else None})
+
+    print_table("AOB scan", rows, ["case", "size", "seconds", "MB/s"])
+    write_report(report, args.json)
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
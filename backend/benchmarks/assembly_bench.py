@@ -0,0 +1,159 @@
+"""
+🎬 Music video assembly benchmark
+
+Assembles the same synthetic scene clips + audio track two ways and
+reports wall time and bytes of intermediate files written:
+
+- per_clip: interpolate_to_fps + transcode_h264 per clip, concat_videos,
+  mux_audio (the DAG's per-clip path)
+- single_pass: one ffmpeg invocation compiled by musicvideo.filtergraph
+
+Clips are small testsrc2 renders at the generation fps, so the numbers
+compare pipeline overhead and encode generations rather than absolute
+1080p throughput (pass --size/--out-size to scale up).
+
+    cd backend
+    python -m benchmarks.assembly_bench --clips 8 --json assembly.json
+    python -m benchmarks.assembly_bench --baseline assembly.json --tolerance 0.25
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import Timer, compare_to_baseline, print_table, write_report
+from musicvideo.ffmpeg_utils import concat_videos, mux_audio, run_ffmpeg, transcode_h264, which_ffmpeg
+from musicvideo.filtergraph import compile_assembly
+from musicvideo.interpolation import interpolate_to_fps
+
+
+def ensure_ffmpeg_on_path(tmp: str) -> str:
+    """musicvideo looks ffmpeg up on PATH; fall back to the imageio binary"""
+    found = which_ffmpeg()
+    if found:
+        return found
+    from tools.frame_sink import find_ffmpeg
+
+    exe = find_ffmpeg()
+    if not exe:
+        raise SystemExit("ffmpeg not available")
+    link = os.path.join(tmp, "bin", "ffmpeg")
+    os.makedirs(os.path.dirname(link), exist_ok=True)
+    os.symlink(exe, link)
+    os.environ["PATH"] = os.path.dirname(link) + os.pathsep + os.environ.get("PATH", "")
+    return link
+
+
+def make_inputs(ffmpeg: str, tmp: str, clips: int, seconds: float, size: str, fps: int):
+    paths = []
+    for n in range(clips):
+        path = os.path.join(tmp, f"scene_{n:03d}.mp4")
+        subprocess.run([
+            ffmpeg, "-y", "-loglevel", "error", "-f", "lavfi",
+            "-i", f"testsrc2=duration={seconds}:size={size}:rate={fps}",
+            "-vf", f"hue=h={n * 37}", "-c:v", "libx264", "-preset", "veryfast", "-crf", "18", path,
+        ], check=True)
+        paths.append(path)
+    audio = os.path.join(tmp, "song.m4a")
+    subprocess.run([
+        ffmpeg, "-y", "-loglevel", "error", "-f", "lavfi", "-i", f"sine=frequency=440:duration={clips * seconds}",
+        "-c:a", "aac", audio,
+    ], check=True)
+    return paths, audio
+
+
+def size_of(paths) -> int:
+    return sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Music video assembly benchmark")
+    parser.add_argument("--clips", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Length of each clip")
+    parser.add_argument("--size", default="320x180", help="Generated clip size")
+    parser.add_argument("--out-size", default="640x360", help="Assembled video size")
+    parser.add_argument("--base-fps", type=int, default=12)
+    parser.add_argument("--fps", type=int, default=24, help="Target fps (interpolated when above --base-fps)")
+    parser.add_argument("--preset", default="veryfast")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json report")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown vs baseline before failing (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    out_w, out_h = (int(v) for v in args.out_size.split("x"))
+    interpolate = args.base_fps < args.fps
+    timer = Timer()
+    tmp = tempfile.mkdtemp(prefix="assembly_bench_")
+    try:
+        ffmpeg = ensure_ffmpeg_on_path(tmp)
+        clips, audio = make_inputs(ffmpeg, tmp, args.clips, args.seconds, args.size, args.base_fps)
+
+        intermediates = []
+        with timer.measure("per_clip", ops=args.clips):
+            normalized = []
+            for n, clip in enumerate(clips):
+                source = clip
+                if interpolate:
+                    interp = os.path.join(tmp, f"interp_{n:03d}.mp4")
+                    ok, msg = interpolate_to_fps(clip, interp, args.fps)
+                    if not ok:
+                        raise SystemExit(f"interpolation failed: {msg}")
+                    intermediates.append(interp)
+                    source = interp
+                norm = os.path.join(tmp, f"norm_{n:03d}.mp4")
+                ok, msg = transcode_h264(source, norm, out_w, out_h, args.fps, preset=args.preset)
+                if not ok:
+                    raise SystemExit(f"transcode failed: {msg}")
+                intermediates.append(norm)
+                normalized.append(norm)
+            stitched = os.path.join(tmp, "stitched.mp4")
+            ok, msg = concat_videos(normalized, stitched)
+            if not ok:
+                raise SystemExit(f"concat failed: {msg}")
+            intermediates.append(stitched)
+            ok, msg = mux_audio(stitched, audio, os.path.join(tmp, "per_clip.mp4"))
+            if not ok:
+                raise SystemExit(f"mux failed: {msg}")
+        timer.results["per_clip"]["intermediate_mb"] = round(size_of(intermediates) / 1e6, 2)
+        timer.results["per_clip"]["encode_generations"] = 3 if interpolate else 2
+
+        with timer.measure("single_pass", ops=args.clips):
+            ok, msg = run_ffmpeg(compile_assembly(
+                clips, audio, os.path.join(tmp, "single_pass.mp4"), out_w, out_h, args.fps,
+                interpolate=interpolate, preset=args.preset,
+            ))
+            if not ok:
+                raise SystemExit(f"single-pass assembly failed: {msg}")
+        timer.results["single_pass"]["intermediate_mb"] = 0.0
+        timer.results["single_pass"]["encode_generations"] = 2
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    key = f"{args.clips}x{args.size}->{args.out_size}@{args.fps}"
+    report = {"config": vars(args), "results": {key: timer.results}}
+    base = timer.results["per_clip"]["seconds"]
+    rows = [
+        {"case": name, "seconds": r["seconds"], "clips/s": r["ops_per_sec"],
+         "intermediate MB": r["intermediate_mb"], "encodes": r["encode_generations"],
+         "speedup": round(base / r["seconds"], 2)}
+        for name, r in timer.results.items()
+    ]
+    print_table(f"Assembly ({key})", rows, ["case", "seconds", "clips/s", "intermediate MB", "encodes", "speedup"])
+    write_report(report, args.json)
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+🧠🎨 Chalk Board performance benchmark
+
+Builds synthetic sessions (1k / 10k / 100k objects by default) and measures
+CanvasStateManager and router hot paths:
+
+- populate via batch add, then single add / update / delete
+- undo / redo
+- load-from-disk (fresh CanvasStateManager over the saved session)
+- SVG export, cold and after a one-object edit (fragment cache)
+- floor-plan and flowchart template generation
+
+Each size runs in its own interpreter so peak RSS is reported per size.
+Save a report with --json and pass it back with --baseline to fail (exit 1)
+when any case gets slower than the tolerance allows.
+
+    cd backend
+    python -m benchmarks.canvas_bench --sizes 1000,10000,100000 --json canvas.json
+    python -m benchmarks.canvas_bench --baseline canvas.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+from benchmarks.common import (
+    Timer, compare_to_baseline, peak_rss_mb, print_table, run_isolated, write_report
+)
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+OBJECT_TYPES = ["path", "line", "rectangle", "ellipse", "text", "wall"]
+LAYERS = ["sketch", "diagram", "cad", "text"]
+
+
+def synthetic_object(rng: random.Random, n: int) -> dict:
+    """A deterministic, realistic-looking canvas object"""
+    kind = OBJECT_TYPES[n % len(OBJECT_TYPES)]
+    obj = {
+        "id": f"bench_{n:07d}",
+        "type": kind,
+        "layer_id": LAYERS[n % len(LAYERS)],
+        "stroke_color": f"#{rng.randrange(0xffffff):06x}",
+        "stroke_width": rng.choice([1, 2, 3, 6]),
+    }
+    x, y = rng.uniform(0, 4000), rng.uniform(0, 4000)
+    if kind == "path":
+        obj["points"] = [{"x": x + rng.uniform(-50, 50), "y": y + rng.uniform(-50, 50)} for _ in range(rng.randint(4, 24))]
+    elif kind in ("line", "wall"):
+        obj.update(x1=x, y1=y, x2=x + rng.uniform(-200, 200), y2=y + rng.uniform(-200, 200))
+    elif kind == "text":
+        obj.update(x=x, y=y, text=f"Label {n}", font_size=rng.choice([10, 12, 14, 16]))
+    else:
+        obj.update(x=x, y=y, width=rng.uniform(10, 300), height=rng.uniform(10, 300))
+    return obj
+
+
+def run_case(size: int, sample: int, seed: int) -> dict:
+    """Benchmark one session size (runs inside the child interpreter)"""
+    workdir = tempfile.mkdtemp(prefix="canvas_bench_")
+    # Importing the canvas package creates ./canvas_sessions for the global manager
+    os.chdir(workdir)
+
+    from canvas.canvas_models import (
+        CanvasObject, FloorPlanRoom, FloorPlanTemplate,
+        FlowchartConnection, FlowchartNode, FlowchartTemplate,
+    )
+    from canvas.canvas_state import CanvasStateManager
+    from canvas.canvas_router import (
+        _svg_fragment_cache, generate_floor_plan, generate_flowchart, generate_svg,
+    )
+
+    rng = random.Random(seed)
+    timer = Timer()
+    storage = os.path.join(workdir, "sessions")
+    manager = CanvasStateManager(storage)
+    session = manager.create_session(title=f"bench {size}")
+    sid = session.session_id
+
+    objects = [CanvasObject(**synthetic_object(rng, n)) for n in range(size)]
+    with timer.measure("populate (batch add)", ops=size):
+        manager.add_objects(sid, objects)
+
+    sample = min(sample, size)
+    with timer.measure("add", ops=sample):
+        for n in range(sample):
+            manager.add_object(sid, CanvasObject(**synthetic_object(rng, size + n)))
+
+    targets = [obj.id for obj in rng.sample(session.objects, sample)]
+    with timer.measure("update", ops=sample):
+        for object_id in targets:
+            manager.update_object(sid, object_id, {"x": rng.uniform(0, 4000), "stroke_color": "#ff0000"})
+
+    with timer.measure("undo", ops=sample):
+        for _ in range(sample):
+            manager.undo(sid)
+    with timer.measure("redo", ops=sample):
+        for _ in range(sample):
+            manager.redo(sid)
+
+    with timer.measure("delete", ops=sample):
+        for object_id in targets:
+            manager.delete_object(sid, object_id)
+
+    object_count = len(session.objects)
+    with timer.measure("load from disk", ops=object_count):
+        CanvasStateManager(storage)
+
+    _svg_fragment_cache.clear()
+    with timer.measure("svg export (cold)", ops=object_count):
+        generate_svg(session.objects, 1920, 1080, "#1a1a2e", cache=True)
+    manager.update_object(sid, session.objects[0].id, {"x": 1})
+    with timer.measure("svg export (1 edit)", ops=object_count):
+        generate_svg(session.objects, 1920, 1080, "#1a1a2e", cache=True)
+
+    rooms = [
+        FloorPlanRoom(name=f"Room {n}", width=rng.uniform(2, 8), height=rng.uniform(2, 8),
+                      doors=[{"position": rng.choice(["left", "right"])}])
+        for n in range(max(1, size // 3))
+    ]
+    floor_plan = FloorPlanTemplate(name="bench", rooms=rooms)
+    with timer.measure("template floor-plan", ops=len(rooms)):
+        asyncio.run(generate_floor_plan(floor_plan, session_id=None))
+
+    nodes = [FlowchartNode(id=f"n{n}", label=f"Step {n}", x=200, y=80 * n) for n in range(max(2, size // 3))]
+    connections = [FlowchartConnection(**{"from": f"n{n}", "to": f"n{n + 1}"}) for n in range(len(nodes) - 1)]
+    flowchart = FlowchartTemplate(name="bench", nodes=nodes, connections=connections)
+    with timer.measure("template flowchart", ops=len(nodes)):
+        asyncio.run(generate_flowchart(flowchart, session_id=None))
+
+    return {"size": size, "peak_rss_mb": peak_rss_mb(), "results": timer.results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Chalk Board performance benchmark")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated object counts per synthetic session")
+    parser.add_argument("--sample", type=int, default=20,
+                        help="Single-object operations measured per size")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json report")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        import json
+        print(json.dumps(run_case(args.size, args.sample, args.seed)))
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = {"benchmark": "canvas", "seed": args.seed, "sample": args.sample,
+              "results": {}, "peak_rss_mb": {}}
+    rows = []
+    for size in sizes:
+        case = run_isolated("benchmarks.canvas_bench",
+                            ["--size", str(size), "--sample", str(args.sample), "--seed", str(args.seed)])
+        report["results"][str(size)] = case["results"]
+        report["peak_rss_mb"][str(size)] = case["peak_rss_mb"]
+        for name, result in case["results"].items():
+            rows.append({"case": name, "size": size, **result})
+
+    print_table("Chalk Board benchmark", rows, ["case", "size", "ops", "seconds", "ops_per_sec"])
+    print_table("Peak RSS", [{"size": int(s), "peak_rss_mb": mb} for s, mb in report["peak_rss_mb"].items()],
+                ["size", "peak_rss_mb"])
+    write_report(report, args.json)
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Shared helpers for the benchmark scripts: timing, peak RSS, isolated
+subprocess runs, reporting and baseline comparison.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS reports bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class Timer:
+    """Collects named measurements as {"seconds", "ops", "ops_per_sec"}"""
+
+    def __init__(self):
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def measure(self, name: str, ops: int = 1, **extra):
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        self.results[name] = {
+            "seconds": round(elapsed, 6),
+            "ops": ops,
+            "ops_per_sec": round(ops / elapsed, 2) if elapsed > 0 else None,
+            **extra,
+        }
+
+
+def run_isolated(module: str, args: List[str], timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run `python -m <module> --child <args>` in a fresh interpreter and return
+    the JSON it prints last, so peak RSS is measured per case.
+    """
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-m", module, "--child", *args],
+        cwd=backend_dir, capture_output=True, text=True, timeout=timeout,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{module} {' '.join(args)} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def print_table(title: str, rows: List[Dict[str, Any]], columns: List[str]):
+    """Print rows as a fixed-width table"""
+    widths = {c: max(len(c), *(len(_fmt(r.get(c))) for r in rows)) for c in columns}
+    print(f"\n{title}")
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for row in rows:
+        print("  ".join(_fmt(row.get(c)).ljust(widths[c]) for c in columns))
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return "-" if value is None else str(value)
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline_path: str, tolerance: float) -> List[str]:
+    """
+    Compare ops_per_sec of every case against a saved report.
+    Returns human-readable regressions (slower than baseline by > tolerance).
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for size, cases in report.get("results", {}).items():
+        for name, result in cases.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if not isinstance(result, dict) or not isinstance(old, dict):
+                continue
+            new_rate, old_rate = result.get("ops_per_sec"), old.get("ops_per_sec")
+            if new_rate and old_rate and new_rate < old_rate * (1 - tolerance):
+                regressions.append(
+                    f"{size}/{name}: {new_rate:,.0f} ops/s vs baseline {old_rate:,.0f} ops/s"
+                )
+    return regressions
+
+
+def write_report(report: Dict[str, Any], path: Optional[str]):
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {path}")
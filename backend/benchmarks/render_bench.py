@@ -0,0 +1,193 @@
+"""
+🎞️ Ken Burns renderer benchmark
+
+Renders the same zoom/pan over a deterministic synthetic photo with the
+per-frame PIL path animate_image used before (crop, LANCZOS resize,
+UnsharpMask per frame) and with tools.kenburns (precomputed windows,
+cached source pyramid, bilinear sampling in numpy), and reports frames per
+second for each:
+
+- pil_kenburns: the PIL loop
+- numpy_kenburns: the renderer with a warm pyramid cache
+- numpy_kenburns_cold: the same, including building the pyramid
+- pil_crossfade / numpy_crossfade: blending two frames
+
+Encoding is left out so only rendering is compared. The numpy frames are
+checked against the PIL frames (exit 2 if the mean absolute difference is
+above --max-diff). Each resolution runs in its own interpreter so peak RSS
+is reported per resolution.
+
+    cd backend
+    python -m benchmarks.render_bench --resolutions 1280x720,1920x1080 --json render.json
+    python -m benchmarks.render_bench --baseline render.json --tolerance 0.25
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks.common import (
+    Timer, compare_to_baseline, peak_rss_mb, print_table, run_isolated, write_report
+)
+from tools.kenburns import KenBurnsRenderer, SourcePyramid, clear_pyramid_cache, crop_windows, crossfade, get_pyramid
+
+DEFAULT_RESOLUTIONS = ["1280x720", "1920x1080"]
+ZOOM_FACTOR = 1.25
+PAN_DIRECTION = "left"
+
+
+def synthetic_photo(width: int, height: int, seed: int):
+    """A smooth gradient with soft discs and mild grain, like a photo rather than noise"""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([xx / width * 200 + 30, yy / height * 160 + 50, (xx + yy) / (width + height) * 120 + 80], axis=2)
+    base += rng.normal(0, 4, base.shape)
+    image = Image.fromarray(np.clip(base, 0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.integers(0, width), rng.integers(0, height)
+        r = int(rng.integers(min(width, height) // 40, min(width, height) // 8))
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(int(c) for c in rng.integers(0, 255, 3)))
+    return image.filter(ImageFilter.GaussianBlur(1))
+
+
+def pil_frames(image, windows, out_w: int, out_h: int):
+    """The per-frame PIL path: integer crop, LANCZOS resize, UnsharpMask"""
+    from PIL import Image, ImageFilter
+
+    for left, top, crop_w, crop_h in windows:
+        left, top, crop_w, crop_h = int(left), int(top), int(crop_w), int(crop_h)
+        frame = image.crop((left, top, left + crop_w, top + crop_h))
+        if frame.size != (out_w, out_h):
+            frame = frame.resize((out_w, out_h), Image.Resampling.LANCZOS)
+            frame = frame.filter(ImageFilter.UnsharpMask(radius=1.5, percent=80, threshold=2))
+        yield np.asarray(frame)
+
+
+def run_case(resolution: str, frames: int, seed: int) -> dict:
+    from PIL import Image
+
+    out_w, out_h = (int(v) for v in resolution.split("x"))
+    work_w, work_h = int(out_w * (ZOOM_FACTOR + 0.15)), int(out_h * (ZOOM_FACTOR + 0.15))
+    image = synthetic_photo(work_w, work_h, seed)
+    windows = crop_windows(work_w, work_h, out_w, out_h, frames, ZOOM_FACTOR, PAN_DIRECTION)
+    timer = Timer()
+    errors = []
+
+    reference = []
+    with timer.measure("pil_kenburns", ops=frames):
+        for i, frame in enumerate(pil_frames(image, windows, out_w, out_h)):
+            if i % 8 == 0:
+                reference.append(frame.copy())
+
+    clear_pyramid_cache()
+    with timer.measure("numpy_kenburns_cold", ops=frames):
+        pyramid = get_pyramid("bench", lambda: SourcePyramid(image))
+        for frame in KenBurnsRenderer(pyramid, windows, out_w, out_h).frames():
+            pass
+
+    rendered = []
+    with timer.measure("numpy_kenburns", ops=frames):
+        pyramid = get_pyramid("bench", lambda: SourcePyramid(image))
+        for i, frame in enumerate(KenBurnsRenderer(pyramid, windows, out_w, out_h).frames()):
+            if i % 8 == 0:
+                rendered.append(frame.copy())
+
+    diffs = [float(np.abs(a.astype(np.int16) - b).mean()) for a, b in zip(reference, rendered)]
+    mean_diff = round(sum(diffs) / len(diffs), 3) if diffs else 0.0
+
+    a, b = reference[0], reference[-1]
+    image_a, image_b = Image.fromarray(a), Image.fromarray(b)
+    with timer.measure("pil_crossfade", ops=frames):
+        for i in range(frames):
+            np.asarray(Image.blend(image_a, image_b, i / frames))
+
+    out = np.empty_like(a)
+    scratch = np.empty((2,) + a.shape, dtype=np.uint16)
+    with timer.measure("numpy_crossfade", ops=frames):
+        for i in range(frames):
+            crossfade(a, b, i / frames, out, scratch)
+    expected = np.asarray(Image.blend(image_a, image_b, 0.5)).astype(np.int16)
+    if np.abs(crossfade(a, b, 0.5) - expected).max() > 1:
+        errors.append("numpy_crossfade differs from Image.blend")
+
+    return {
+        "results": timer.results,
+        "mean_abs_diff": mean_diff,
+        "pyramid_mb": round(pyramid.nbytes / (1024 * 1024), 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "errors": errors,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ken Burns renderer benchmark")
+    parser.add_argument("--resolutions", default=",".join(DEFAULT_RESOLUTIONS),
+                        help="Comma-separated output resolutions (WxH)")
+    parser.add_argument("--frames", type=int, default=48, help="Frames rendered per case")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--max-diff", type=float, default=6.0,
+                        help="Largest allowed mean absolute difference from the PIL frames")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json report")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--resolution", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        import json
+        print(json.dumps(run_case(args.resolution, args.frames, args.seed)))
+        return 0
+
+    resolutions = [r.strip() for r in args.resolutions.split(",") if r.strip()]
+    report = {"benchmark": "render", "frames": args.frames, "seed": args.seed, "results": {}, "peak_rss_mb": {}}
+    rows = []
+    errors = []
+    for resolution in resolutions:
+        case = run_isolated("benchmarks.render_bench", [
+            "--resolution", resolution, "--frames", str(args.frames), "--seed", str(args.seed),
+        ])
+        report["results"][resolution] = case["results"]
+        report["peak_rss_mb"][resolution] = case["peak_rss_mb"]
+        errors.extend(f"{resolution}: {e}" for e in case["errors"])
+        if case["mean_abs_diff"] > args.max_diff:
+            errors.append(f"{resolution}: numpy frames differ from PIL by {case['mean_abs_diff']} on average")
+        results = case["results"]
+        for name, result in results.items():
+            baseline = results["pil_crossfade" if "crossfade" in name else "pil_kenburns"]["ops_per_sec"]
+            rows.append({
+                "case": name, "resolution": resolution, "fps": result["ops_per_sec"],
+                "vs PIL": round(result["ops_per_sec"] / baseline, 2) if baseline else None,
+            })
+        rows.append({"case": f"(mean diff {case['mean_abs_diff']}, pyramid {case['pyramid_mb']} MB)",
+                     "resolution": resolution})
+
+    print_table("Ken Burns rendering", rows, ["case", "resolution", "fps", "vs PIL"])
+    print_table("Peak RSS", [{"resolution": r, "peak_rss_mb": mb} for r, mb in report["peak_rss_mb"].items()],
+                ["resolution", "peak_rss_mb"])
+    write_report(report, args.json)
+
+    if errors:
+        print("\nRendered frames do not match the PIL path:")
+        for line in errors:
+            print(f"  {line}")
+        return 2
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
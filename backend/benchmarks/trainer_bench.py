@@ -0,0 +1,297 @@
+"""
+🎮 Trainer scanning benchmark
+
+Generates a deterministic synthetic process image per size: a read-only
+"code" region with planted AOB signatures, a static data region holding
+the roots of planted pointer chains, and heap regions of random data with a
+planted int value and decoy pointers. The image is written as dump files
+and attached through FileSnapshotBackend, so the same code paths a live
+game uses are measured on any machine:
+
+- exact first scan (memory_scanner.scan_exact_value)
+- next scan over its results (increased), and unknown-value snapshot + changed
+- AOB: each signature on its own, and all of them in one pass
+- pointer scan: building the pointer map, then resolving paths to the value
+
+Every case is checked against the planted ground truth (exit 2 on a
+mismatch). Throughput is reported as MB/s of image scanned. Each size runs
+in its own interpreter so peak RSS is reported per size.
+
+    cd backend
+    python -m benchmarks.trainer_bench --sizes 16,64,256 --json trainer.json
+    python -m benchmarks.trainer_bench --baseline trainer.json --tolerance 0.25
+"""
+
+import argparse
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.common import (
+    Timer, compare_to_baseline, peak_rss_mb, print_table, run_isolated, write_report
+)
+
+DEFAULT_SIZES = [16, 64, 256]
+
+CODE_BASE = 0x140000000
+STATIC_BASE = 0x150000000
+STATIC_SIZE = 64 * 1024
+HEAP_BASE = 0x20000000000
+HEAP_BLOCK = 16 * 1024 * 1024
+HEAP_GAP = 0x10000000
+
+PLANTED_VALUE = 0x13371337
+PLANTED_COUNT = 64
+CHANGED_COUNT = 16
+CHAIN_COUNT = 4
+# Decoy heap pointers per slot; they create the extra paths a real heap has
+DECOY_DENSITY = 1 / 1000
+MAX_OFFSET = 0x1000
+CHAIN_DEPTH = 3
+
+SIGNATURES = [
+    "48 8B 05 ?? ?? ?? ?? 48 85 C0 74 ??",
+    "F3 0F 11 40 ?? 8B 86 ?? ?? ?? ?? 89",
+    "E8 ?? ?? ?? ?? 84 C0 0F 84 ?? ?? ?? ??",
+]
+SIGNATURE_COPIES = 4
+
+
+class SyntheticImage:
+    """A process image on disk plus the ground truth planted in it"""
+
+    def __init__(self, directory: str, size_mb: int, seed: int):
+        self.directory = directory
+        self.rng = np.random.default_rng(seed)
+        total = size_mb * 1024 * 1024
+        self.code_size = max(64 * 1024, total // 8) // 4096 * 4096
+        heap_size = total - self.code_size - STATIC_SIZE
+
+        self.files = []  # (path, base, writable, executable)
+        self.signatures = {}
+        self.value_addresses = []
+        self.chains = []
+
+        heap = []
+        for i, offset in enumerate(range(0, heap_size, HEAP_BLOCK)):
+            base = HEAP_BASE + i * (HEAP_BLOCK + HEAP_GAP)
+            heap.append((base, self._random(min(HEAP_BLOCK, heap_size - offset))))
+        code = bytearray(self._random(self.code_size))
+        static = bytearray(STATIC_SIZE)
+
+        self._plant_heap(heap, static)
+        self._plant_signatures(code)
+
+        self._write(code, CODE_BASE, writable=False, executable=True)
+        self._write(static, STATIC_BASE, writable=True, executable=False)
+        for base, data in heap:
+            self._write(data, base, writable=True, executable=False)
+        self.size = total
+
+    def _random(self, size: int) -> bytearray:
+        return bytearray(self.rng.integers(0, 256, size, dtype=np.uint8).tobytes())
+
+    def _plant_heap(self, heap, static: bytearray):
+        # Random data matching the planted value by chance would skew the truth
+        for _, data in heap:
+            view = np.frombuffer(data, dtype="<u4")
+            view[view == PLANTED_VALUE] ^= 1
+
+        slot_count = sum(len(data) // 8 for _, data in heap)
+        decoys = int(slot_count * DECOY_DENSITY)
+        picks = self.rng.choice(slot_count, PLANTED_COUNT + 2 * CHAIN_COUNT + decoys, replace=False)
+
+        starts = np.cumsum([0] + [len(data) // 8 for _, data in heap])
+
+        def address_of(pick):
+            block = int(np.searchsorted(starts, pick, side="right")) - 1
+            return heap[block][0] + int(pick - starts[block]) * 8, heap[block][1], int(pick - starts[block]) * 8
+
+        def put(pick, fmt, value):
+            address, data, offset = address_of(pick)
+            struct.pack_into(fmt, data, offset, value)
+            return address
+
+        picks = list(picks)
+        for _ in range(PLANTED_COUNT):
+            self.value_addresses.append(put(picks.pop(), "<I", PLANTED_VALUE))
+        self.value_addresses.sort()
+        target = self.value_addresses[0]
+
+        heap_bounds = [(base, len(data)) for base, data in heap]
+        for _ in range(decoys):
+            base, size = heap_bounds[int(self.rng.integers(len(heap_bounds)))]
+            put(picks.pop(), "<Q", base + int(self.rng.integers(size // 8)) * 8)
+
+        # [root] = node1, [node1 + o1] = node2, [node2 + o2] + o3 = target
+        for i in range(CHAIN_COUNT):
+            o1, o2, o3 = (int(o) * 8 for o in self.rng.integers(0, MAX_OFFSET // 8, 3))
+            node1_pick, node2_pick = picks.pop(), picks.pop()
+            # Nodes must stay inside their block to count as pointers
+            o1 = min(o1, address_of(node1_pick)[2])
+            o2 = min(o2, address_of(node2_pick)[2])
+            node1 = address_of(node1_pick)[0] - o1
+            node2 = address_of(node2_pick)[0] - o2
+            put(node1_pick, "<Q", node2)
+            put(node2_pick, "<Q", target - o3)
+            root = STATIC_BASE + 0x40 + i * 8
+            struct.pack_into("<Q", static, root - STATIC_BASE, node1)
+            self.chains.append((root, [o1, o2, o3]))
+
+    def _plant_signatures(self, code: bytearray):
+        from trainer.pattern_scanner import parse_pattern
+        for text in SIGNATURES:
+            pattern, mask = parse_pattern(text)
+            offsets = sorted(int(o) for o in self.rng.choice(len(code) // 64, SIGNATURE_COPIES, replace=False) * 64)
+            for offset in offsets:
+                for i, (byte, keep) in enumerate(zip(pattern, mask)):
+                    if keep:
+                        code[offset + i] = byte
+            self.signatures[text] = [CODE_BASE + o for o in offsets]
+
+    def _write(self, data, base: int, writable: bool, executable: bool):
+        # Same naming as GameTrainer.dump_memory
+        path = os.path.join(self.directory, f"dump_{hex(base)}_{len(data)}.bin")
+        with open(path, "wb") as f:
+            f.write(data)
+        self.files.append((path, base, writable, executable))
+
+    def attach(self):
+        from trainer import process_manager
+        from trainer.memory_backend import FileSnapshotBackend
+        backend = FileSnapshotBackend(pid=0xBE9C)
+        for path, base, writable, executable in self.files:
+            backend.add_file(path, base, writable, executable)
+        process_manager.attach_backend(backend, "synthetic.exe")
+        return backend
+
+
+def run_case(size_mb: int, seed: int) -> dict:
+    """Benchmark one image size (runs inside the child interpreter)"""
+    from trainer import memory_scanner
+    from trainer.pattern_scanner import scan_patterns
+    from trainer.pointer_scanner import PointerMap, resolve_pointer_chain
+
+    workdir = tempfile.mkdtemp(prefix="trainer_bench_")
+    try:
+        image = SyntheticImage(workdir, size_mb, seed)
+        backend = image.attach()
+        timer = Timer()
+        size = image.size
+        code_size = image.code_size
+        errors = []
+
+        def check(name, ok):
+            if not ok:
+                errors.append(name)
+
+        with timer.measure("exact scan", ops=size):
+            count = memory_scanner.scan_exact_value(PLANTED_VALUE, "int")
+        found = memory_scanner.get_scan_session().addresses()
+        check("exact scan", count == PLANTED_COUNT and found == image.value_addresses)
+
+        changed = image.value_addresses[::PLANTED_COUNT // CHANGED_COUNT]
+        for address in changed:
+            backend.write(address, struct.pack("<I", PLANTED_VALUE + 1))
+        with timer.measure("next scan (increased)", ops=size):
+            count = memory_scanner.scan_next("increased")
+        check("next scan", memory_scanner.get_scan_session().addresses() == changed)
+
+        with timer.measure("unknown scan (snapshot)", ops=size):
+            memory_scanner.scan_unknown_value(type="int")
+        for address in changed:
+            backend.write(address, struct.pack("<I", PLANTED_VALUE))
+        with timer.measure("next scan (changed, snapshot)", ops=size):
+            memory_scanner.scan_next("changed")
+        check("changed scan", memory_scanner.get_scan_session().addresses() == changed)
+        memory_scanner.clear_scan_session()
+
+        for n, (text, planted) in enumerate(image.signatures.items()):
+            with timer.measure(f"aob signature {n + 1}", ops=code_size):
+                matches = memory_scanner.scan_pattern(text)
+            check(f"aob signature {n + 1}", matches == planted)
+        with timer.measure(f"aob {len(SIGNATURES)} signatures (one pass)", ops=code_size):
+            combined = scan_patterns(backend, SIGNATURES)
+        check("aob one pass", {t: [m.address for m in ms] for t, ms in combined.items()} == image.signatures)
+
+        with timer.measure("pointer map build", ops=size):
+            pointer_map = PointerMap.build(backend)
+        target = image.value_addresses[0]
+        with timer.measure("pointer paths", ops=size):
+            paths = pointer_map.find_paths(target, MAX_OFFSET, CHAIN_DEPTH)
+        found_paths = {(p.base_address, tuple(p.offsets)) for p in paths}
+        check("pointer paths planted", all((root, tuple(offsets)) in found_paths for root, offsets in image.chains))
+        check("pointer paths resolve", all(
+            resolve_pointer_chain(backend, p.base_address, p.offsets) == target for p in paths[:1000]
+        ))
+
+        for result in timer.results.values():
+            result["MB_per_sec"] = round(result["ops"] / (1024 * 1024) / result["seconds"], 2) if result["seconds"] else None
+        return {"size": size_mb, "peak_rss_mb": peak_rss_mb(), "results": timer.results,
+                "pointer_paths": len(paths), "pointer_map_entries": len(pointer_map), "errors": errors}
+    finally:
+        from trainer import process_manager
+        process_manager.detach_process()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Trainer scanning benchmark")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated synthetic image sizes in MB")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json report")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        import json
+        print(json.dumps(run_case(args.size, args.seed)))
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = {"benchmark": "trainer", "seed": args.seed, "results": {}, "peak_rss_mb": {}}
+    rows = []
+    errors = []
+    for size in sizes:
+        case = run_isolated("benchmarks.trainer_bench", ["--size", str(size), "--seed", str(args.seed)])
+        key = f"{size}MB"
+        report["results"][key] = case["results"]
+        report["peak_rss_mb"][key] = case["peak_rss_mb"]
+        errors.extend(f"{key}: {name}" for name in case["errors"])
+        for name, result in case["results"].items():
+            rows.append({"case": name, "size": key, "seconds": result["seconds"], "MB/s": result["MB_per_sec"]})
+        rows.append({"case": f"({case['pointer_paths']} paths, {case['pointer_map_entries']} pointers)", "size": key})
+
+    print_table("Trainer scans", rows, ["case", "size", "seconds", "MB/s"])
+    print_table("Peak RSS", [{"size": s, "peak_rss_mb": mb} for s, mb in report["peak_rss_mb"].items()],
+                ["size", "peak_rss_mb"])
+    write_report(report, args.json)
+
+    if errors:
+        print("\nResults differ from the planted ground truth:")
+        for line in errors:
+            print(f"  {line}")
+        return 2
+
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ from .canvas_models import (
     FloorPlanTemplate, FloorPlanRoom, FlowchartTemplate, FlowchartNode, FlowchartConnection
 )
 from .canvas_state import state_manager, CanvasStateManager
+from .canvas_events import canvas_events, CanvasEventBus
 from .canvas_router import router as canvas_router
 from .canvas_controller import (
     canvas_controller,
@@ -44,6 +45,8 @@ __all__ = [
     # State Management
     "state_manager",
     "CanvasStateManager",
+    "canvas_events",
+    "CanvasEventBus",
     # Router
     "canvas_router",
     # MCP Controller
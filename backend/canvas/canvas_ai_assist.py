@@ -17,9 +17,16 @@ Mode: OBSERVER–ASSISTANT
 - Always adds content on new layers with clear AI labels
 """
 
+import asyncio
+import hashlib
+import inspect
 import logging
 import json
-from typing import Dict, Any, List, Optional
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Callable
 from datetime import datetime
 
 from tools.agent_coordinator import (
@@ -34,6 +41,12 @@ from .canvas_controller import canvas_controller, CommandType
 
 logger = logging.getLogger(__name__)
 
+# LLM responses are reused for identical (mode, prompt, canvas) requests
+_RESPONSE_CACHE_TTL = 600  # 10 minutes
+_RESPONSE_CACHE_MAX = 256
+# Independent sub-plans (e.g. floor plan rooms) run concurrently
+_PLANNER_WORKERS = 4
+
 SHARED_SKILLS = """
 You are Agent Amigos, a VISUAL THINKING & TECHNICAL DESIGN SPECIALIST.
 
@@ -55,6 +68,66 @@ When asked to draw, plan, or brainstorm, use this knowledge to create accurate,
 Focus on clarity, precision, and logical organization in your visual outputs.
 """
 
+def iter_json_array(chunks: Iterable[str]) -> Iterator[Any]:
+    """
+    Incrementally parse the first JSON array found in a stream of text chunks,
+    yielding each element as soon as it is complete.
+    
+    Text before the array (prose, markdown fences) is skipped. Elements that
+    fail to parse are dropped, so a truncated or slightly malformed response
+    still yields everything that was complete.
+    """
+    depth = 0
+    in_string = False
+    escape = False
+    buf: List[str] = []
+    
+    def flush():
+        item = "".join(buf).strip()
+        buf.clear()
+        if item:
+            try:
+                return True, json.loads(item)
+            except ValueError:
+                logger.debug(f"Skipping unparseable JSON element: {item[:80]}")
+        return False, None
+    
+    for chunk in chunks:
+        for ch in chunk:
+            if depth == 0:
+                if ch == "[":
+                    depth = 1
+                continue
+            if in_string:
+                buf.append(ch)
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+                continue
+            if depth == 1 and ch in ",]":
+                ok, item = flush()
+                if ok:
+                    yield item
+                if ch == "]":
+                    return
+                continue
+            if ch == '"':
+                in_string = True
+            elif ch in "[{":
+                depth += 1
+            elif ch in "]}":
+                depth -= 1
+            buf.append(ch)
+            # Emit objects/arrays the moment they close, without waiting for ","
+            if depth == 1 and ch in "]}":
+                ok, item = flush()
+                if ok:
+                    yield item
+
+
 class SimpleChatMessage:
     """Simple compatible class for ChatMessage to avoid circular imports"""
     def __init__(self, role: str, content: str):
@@ -85,6 +158,10 @@ class CanvasAIAssist:
         self.corner_note_shown = False
         self.agent_engine = None
         
+        self._response_cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        
         # Register as listener for Canvas events
         canvas_controller.add_listener(self._on_canvas_event)
         
@@ -118,12 +195,106 @@ class CanvasAIAssist:
             # Use process() to allow tool execution (read files, search web, etc.)
             # require_approval=False allows autonomous tool usage
             response = self.agent_engine.process(messages, require_approval=False)
+            if inspect.isawaitable(response):
+                # AgentEngine.process is async; assist modes run in worker threads
+                response = asyncio.run(response)
             
             return response.content
         except Exception as e:
             logger.error(f"Agent Engine process error: {e}")
             return f"Error processing request: {e}"
     
+    @staticmethod
+    def _normalize_prompt(text: Optional[str]) -> str:
+        return re.sub(r"\s+", " ", text or "").strip().lower()
+    
+    @staticmethod
+    def _context_digest(context_objects: Optional[List[Dict[str, Any]]]) -> str:
+        """Digest of the canvas the request was made against.
+        
+        Uses (id, revision) pairs when every object carries a revision,
+        otherwise hashes the objects themselves.
+        """
+        if not context_objects:
+            return ""
+        if all(obj.get("id") and obj.get("revision") for obj in context_objects):
+            payload = sorted((obj["id"], obj["revision"]) for obj in context_objects)
+        else:
+            payload = context_objects
+        return hashlib.md5(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _cached_request(self, mode: str, prompt: str, system_instruction: str = None,
+                        context_objects: Optional[List[Dict[str, Any]]] = None) -> str:
+        """
+        _process_request with a response cache keyed by
+        (mode, normalized prompt, canvas digest). Failures are not cached.
+        
+        Pass context_objects only when the prompt is built from them; modes
+        whose prompt ignores the canvas (plan, brainstorm, floor plans) leave
+        it out so an unrelated canvas edit does not miss the cache.
+        """
+        key = hashlib.md5(json.dumps([
+            mode,
+            self._normalize_prompt(prompt),
+            self._normalize_prompt(system_instruction),
+            self._context_digest(context_objects),
+        ]).encode()).hexdigest()
+        
+        with self._cache_lock:
+            cached = self._response_cache.get(key)
+            if cached and time.time() - cached["time"] < _RESPONSE_CACHE_TTL:
+                logger.info(f"🧠 Canvas AI cache hit ({mode})")
+                return cached["response"]
+        
+        response = self._process_request(prompt, system_instruction)
+        if not self.agent_engine or response.startswith("Error processing request"):
+            return response
+        
+        with self._cache_lock:
+            self._response_cache[key] = {"time": time.time(), "response": response}
+            while len(self._response_cache) > _RESPONSE_CACHE_MAX:
+                self._response_cache.pop(next(iter(self._response_cache)))
+        return response
+    
+    def clear_cache(self):
+        """Drop all cached LLM responses"""
+        with self._cache_lock:
+            self._response_cache.clear()
+    
+    def _run_parallel(self, fn: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Run independent sub-plans concurrently, returning results in order"""
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=_PLANNER_WORKERS, thread_name_prefix="canvas-ai")
+        return list(self._executor.map(fn, items))
+    
+    def _iter_shapes(self, chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield shape dicts from an LLM response as each element is parsed.
+        Falls back to _extract_json when no JSON array is found.
+        """
+        seen = []
+        
+        def tee():
+            for chunk in chunks:
+                seen.append(chunk)
+                yield chunk
+        
+        found = False
+        for item in iter_json_array(tee()):
+            if isinstance(item, dict):
+                found = True
+                yield item
+        
+        if not found:
+            parsed = self._extract_json("".join(seen))
+            if isinstance(parsed, dict):
+                parsed = parsed.get("shapes") or [parsed]
+            for item in parsed or []:
+                if isinstance(item, dict):
+                    yield item
+    
     def _on_canvas_event(self, command):
         """
         Observes Canvas events without blocking them.
@@ -238,7 +409,7 @@ class CanvasAIAssist:
 
                 prompt = f"Topic: {topic}{context_str}"
                 
-                response = self._process_request(prompt, system_prompt)
+                response = self._cached_request("discuss", prompt, system_prompt, context_objects)
                 insight = response
                 
                 # Split into points
@@ -335,6 +506,98 @@ class CanvasAIAssist:
             logger.warning(f"JSON extraction failed: {e}")
             return None
 
+    def _draw_shapes(self, shapes: Iterable[Dict[str, Any]], command_ids: List[str]) -> int:
+        """
+        Queue draw commands for LLM-described shapes as they are parsed.
+        Returns how many shapes were drawn; malformed shapes are skipped.
+        """
+        drawn = 0
+        for shape in shapes:
+            try:
+                sid = None
+                stype = shape.get("type")
+                color = shape.get("color", "#8b5cf6")
+
+                if stype == "rectangle":
+                    sid = canvas_controller.draw_rectangle(
+                        x=shape.get("x"), y=shape.get("y"), 
+                        width=shape.get("width"), height=shape.get("height"),
+                        stroke_color=color, fill_color="rgba(139, 92, 246, 0.1)",
+                        layer_id=self.ai_layer_id
+                    )
+                    if shape.get("text"):
+                        canvas_controller.draw_text(
+                            text=shape.get("text"), 
+                            x=shape.get("x") + 10, 
+                            y=shape.get("y") + shape.get("height")/2 - 5,
+                            color="#e2e8f0", font_size=12,
+                            layer_id=self.ai_layer_id
+                        )
+                elif stype == "ellipse":
+                    sid = canvas_controller.draw_ellipse(
+                        cx=shape.get("cx"), cy=shape.get("cy"),
+                        rx=shape.get("rx"), ry=shape.get("ry"),
+                        stroke_color=color, fill_color="rgba(139, 92, 246, 0.1)",
+                        layer_id=self.ai_layer_id
+                    )
+                    if shape.get("text"):
+                        canvas_controller.draw_text(
+                            text=shape.get("text"), 
+                            x=shape.get("cx") - 20, 
+                            y=shape.get("cy") - 5,
+                            color="#e2e8f0", font_size=12,
+                            layer_id=self.ai_layer_id
+                        )
+                elif stype == "diamond":
+                    # Draw diamond using 4 lines
+                    cx, cy = shape.get("cx"), shape.get("cy")
+                    w, h = shape.get("width"), shape.get("height")
+                    hw, hh = w/2, h/2
+
+                    # Top to Right
+                    canvas_controller.draw_line(x1=cx, y1=cy-hh, x2=cx+hw, y2=cy, color=color, layer_id=self.ai_layer_id)
+                    # Right to Bottom
+                    canvas_controller.draw_line(x1=cx+hw, y1=cy, x2=cx, y2=cy+hh, color=color, layer_id=self.ai_layer_id)
+                    # Bottom to Left
+                    canvas_controller.draw_line(x1=cx, y1=cy+hh, x2=cx-hw, y2=cy, color=color, layer_id=self.ai_layer_id)
+                    # Left to Top
+                    sid = canvas_controller.draw_line(x1=cx-hw, y1=cy, x2=cx, y2=cy-hh, color=color, layer_id=self.ai_layer_id)
+
+                    if shape.get("text"):
+                        canvas_controller.draw_text(
+                            text=shape.get("text"), 
+                            x=cx - 20, 
+                            y=cy - 5,
+                            color="#e2e8f0", font_size=12,
+                            layer_id=self.ai_layer_id
+                        )
+
+                elif stype == "line":
+                    sid = canvas_controller.draw_line(
+                        x1=shape.get("x1"), y1=shape.get("y1"),
+                        x2=shape.get("x2"), y2=shape.get("y2"),
+                        color=color, layer_id=self.ai_layer_id
+                    )
+                elif stype == "arrow":
+                    sid = canvas_controller.draw_arrow(
+                        x1=shape.get("x1"), y1=shape.get("y1"),
+                        x2=shape.get("x2"), y2=shape.get("y2"),
+                        color=color, layer_id=self.ai_layer_id
+                    )
+                elif stype == "text":
+                    sid = canvas_controller.draw_text(
+                        text=shape.get("text"), x=shape.get("x"), y=shape.get("y"),
+                        color=color, font_size=shape.get("font_size", 12),
+                        layer_id=self.ai_layer_id
+                    )
+
+                if sid:
+                    command_ids.append(sid)
+                    drawn += 1
+            except Exception as e:
+                logger.debug(f"Skipping malformed shape {shape}: {e}")
+        return drawn
+
     def draw(self, description: str, position: Optional[Dict[str, int]] = None, snapshot: Optional[str] = None, context_objects: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         AI-assisted drawing: Add sketches, arrows, highlights, callouts.
@@ -421,92 +684,9 @@ class CanvasAIAssist:
                 ```
                 """
                 
-                response = self._process_request(prompt, system_prompt)
-                shapes = self._extract_json(response)
-                
-                if shapes:
-                    for shape in shapes:
-                        sid = None
-                        stype = shape.get("type")
-                        color = shape.get("color", "#8b5cf6")
-                        
-                        if stype == "rectangle":
-                            sid = canvas_controller.draw_rectangle(
-                                x=shape.get("x"), y=shape.get("y"), 
-                                width=shape.get("width"), height=shape.get("height"),
-                                stroke_color=color, fill_color="rgba(139, 92, 246, 0.1)",
-                                layer_id=self.ai_layer_id
-                            )
-                            if shape.get("text"):
-                                canvas_controller.draw_text(
-                                    text=shape.get("text"), 
-                                    x=shape.get("x") + 10, 
-                                    y=shape.get("y") + shape.get("height")/2 - 5,
-                                    color="#e2e8f0", font_size=12,
-                                    layer_id=self.ai_layer_id
-                                )
-                        elif stype == "ellipse":
-                            sid = canvas_controller.draw_ellipse(
-                                cx=shape.get("cx"), cy=shape.get("cy"),
-                                rx=shape.get("rx"), ry=shape.get("ry"),
-                                stroke_color=color, fill_color="rgba(139, 92, 246, 0.1)",
-                                layer_id=self.ai_layer_id
-                            )
-                            if shape.get("text"):
-                                canvas_controller.draw_text(
-                                    text=shape.get("text"), 
-                                    x=shape.get("cx") - 20, 
-                                    y=shape.get("cy") - 5,
-                                    color="#e2e8f0", font_size=12,
-                                    layer_id=self.ai_layer_id
-                                )
-                        elif stype == "diamond":
-                            # Draw diamond using 4 lines
-                            cx, cy = shape.get("cx"), shape.get("cy")
-                            w, h = shape.get("width"), shape.get("height")
-                            hw, hh = w/2, h/2
-                            
-                            # Top to Right
-                            canvas_controller.draw_line(x1=cx, y1=cy-hh, x2=cx+hw, y2=cy, color=color, layer_id=self.ai_layer_id)
-                            # Right to Bottom
-                            canvas_controller.draw_line(x1=cx+hw, y1=cy, x2=cx, y2=cy+hh, color=color, layer_id=self.ai_layer_id)
-                            # Bottom to Left
-                            canvas_controller.draw_line(x1=cx, y1=cy+hh, x2=cx-hw, y2=cy, color=color, layer_id=self.ai_layer_id)
-                            # Left to Top
-                            sid = canvas_controller.draw_line(x1=cx-hw, y1=cy, x2=cx, y2=cy-hh, color=color, layer_id=self.ai_layer_id)
-                            
-                            if shape.get("text"):
-                                canvas_controller.draw_text(
-                                    text=shape.get("text"), 
-                                    x=cx - 20, 
-                                    y=cy - 5,
-                                    color="#e2e8f0", font_size=12,
-                                    layer_id=self.ai_layer_id
-                                )
-
-                        elif stype == "line":
-                            sid = canvas_controller.draw_line(
-                                x1=shape.get("x1"), y1=shape.get("y1"),
-                                x2=shape.get("x2"), y2=shape.get("y2"),
-                                color=color, layer_id=self.ai_layer_id
-                            )
-                        elif stype == "arrow":
-                            sid = canvas_controller.draw_arrow(
-                                x1=shape.get("x1"), y1=shape.get("y1"),
-                                x2=shape.get("x2"), y2=shape.get("y2"),
-                                color=color, layer_id=self.ai_layer_id
-                            )
-                        elif stype == "text":
-                            sid = canvas_controller.draw_text(
-                                text=shape.get("text"), x=shape.get("x"), y=shape.get("y"),
-                                color=color, font_size=shape.get("font_size", 12),
-                                layer_id=self.ai_layer_id
-                            )
-                        
-                        if sid:
-                            command_ids.append(sid)
-                    
-                    llm_success = True
+                response = self._cached_request("draw", prompt, system_prompt, context_objects)
+                drawn = self._draw_shapes(self._iter_shapes([response]), command_ids)
+                llm_success = drawn > 0
                 
             except Exception as e:
                 logger.error(f"LLM drawing error: {e}")
@@ -601,7 +781,8 @@ class CanvasAIAssist:
                     """
                     prompt = f"Goal: {goal}"
                     
-                    response = self._process_request(prompt, system_prompt)
+                    # The steps depend on the goal alone (the canvas is not in the prompt)
+                    response = self._cached_request("plan", prompt, system_prompt)
                     
                     # Parse response
                     generated_steps = [line.strip().lstrip("1234567890.- ") for line in response.split('\n') if line.strip()]
@@ -761,91 +942,9 @@ class CanvasAIAssist:
                 ```
                 """
                 
-                response = self._process_request(prompt, system_prompt)
-                shapes = self._extract_json(response)
-                
-                if shapes:
-                    for shape in shapes:
-                        sid = None
-                        stype = shape.get("type")
-                        color = shape.get("color", "#8b5cf6")
-                        
-                        if stype == "rectangle":
-                            sid = canvas_controller.draw_rectangle(
-                                x=shape.get("x"), y=shape.get("y"), 
-                                width=shape.get("width"), height=shape.get("height"),
-                                stroke_color=color, fill_color="rgba(139, 92, 246, 0.1)",
-                                layer_id=self.ai_layer_id
-                            )
-                            if shape.get("text"):
-                                canvas_controller.draw_text(
-                                    text=shape.get("text"), 
-                                    x=shape.get("x") + 10, 
-                                    y=shape.get("y") + shape.get("height")/2 - 5,
-                                    color="#e2e8f0", font_size=12,
-                                    layer_id=self.ai_layer_id
-                                )
-                        elif stype == "ellipse":
-                            sid = canvas_controller.draw_ellipse(
-                                cx=shape.get("cx"), cy=shape.get("cy"),
-                                rx=shape.get("rx"), ry=shape.get("ry"),
-                                stroke_color=color, fill_color="rgba(139, 92, 246, 0.1)",
-                                layer_id=self.ai_layer_id
-                            )
-                            if shape.get("text"):
-                                canvas_controller.draw_text(
-                                    text=shape.get("text"), 
-                                    x=shape.get("cx") - 20, 
-                                    y=shape.get("cy") - 5,
-                                    color="#e2e8f0", font_size=12,
-                                    layer_id=self.ai_layer_id
-                                )
-                        elif stype == "diamond":
-                            # Draw diamond using 4 lines
-                            cx, cy = shape.get("cx"), shape.get("cy")
-                            w, h = shape.get("width"), shape.get("height")
-                            hw, hh = w/2, h/2
-                            
-                            # Top to Right
-                            canvas_controller.draw_line(x1=cx, y1=cy-hh, x2=cx+hw, y2=cy, color=color, layer_id=self.ai_layer_id)
-                            # Right to Bottom
-                            canvas_controller.draw_line(x1=cx+hw, y1=cy, x2=cx, y2=cy+hh, color=color, layer_id=self.ai_layer_id)
-                            # Bottom to Left
-                            canvas_controller.draw_line(x1=cx, y1=cy+hh, x2=cx-hw, y2=cy, color=color, layer_id=self.ai_layer_id)
-                            # Left to Top
-                            sid = canvas_controller.draw_line(x1=cx-hw, y1=cy, x2=cx, y2=cy-hh, color=color, layer_id=self.ai_layer_id)
-                            
-                            if shape.get("text"):
-                                canvas_controller.draw_text(
-                                    text=shape.get("text"), 
-                                    x=cx - 20, 
-                                    y=cy - 5,
-                                    color="#e2e8f0", font_size=12,
-                                    layer_id=self.ai_layer_id
-                                )
-                        elif stype == "line":
-                            sid = canvas_controller.draw_line(
-                                x1=shape.get("x1"), y1=shape.get("y1"),
-                                x2=shape.get("x2"), y2=shape.get("y2"),
-                                color=color, layer_id=self.ai_layer_id
-                            )
-                        elif stype == "arrow":
-                            sid = canvas_controller.draw_arrow(
-                                x1=shape.get("x1"), y1=shape.get("y1"),
-                                x2=shape.get("x2"), y2=shape.get("y2"),
-                                color=color, layer_id=self.ai_layer_id
-                            )
-                        elif stype == "text":
-                            sid = canvas_controller.draw_text(
-                                text=shape.get("text"), x=shape.get("x"), y=shape.get("y"),
-                                color=color, font_size=shape.get("font_size", 12),
-                                layer_id=self.ai_layer_id
-                            )
-                        
-                        if sid:
-                            command_ids.append(sid)
-                    
-                    llm_success = True
+                response = self._cached_request("design", prompt, system_prompt, context_objects)
+                drawn = self._draw_shapes(self._iter_shapes([response]), command_ids)
+                llm_success = drawn > 0
             except Exception as e:
                 logger.error(f"LLM design error: {e}")
 
@@ -975,7 +1074,8 @@ class CanvasAIAssist:
                     You are a brainstorming assistant. You can use tools to research the central idea. Generate 5 creative, distinct sub-topics or related ideas for the user's central concept. Return ONLY the ideas as a list, one per line."""
                     prompt = f"Central Idea: {central_idea}"
                     
-                    response = self._process_request(prompt, system_prompt)
+                    # The branches depend on the idea alone (the canvas is not in the prompt)
+                    response = self._cached_request("brainstorm", prompt, system_prompt)
                     
                     # Parse response
                     generated_branches = [line.strip().lstrip("1234567890.- ") for line in response.split('\n') if line.strip()]
@@ -1203,6 +1303,7 @@ class CanvasAIAssist:
         """
         agent_working("canvas", "Generating floor plan...")
         
+        response = ""
         if not rooms and description and self.agent_engine:
             try:
                 system_prompt = """You are an expert architect. 
@@ -1229,26 +1330,10 @@ class CanvasAIAssist:
                 ```
                 """
                 prompt = f"Create a floor plan for: {description}"
-                response = self._process_request(prompt, system_prompt)
+                response = self._cached_request("create_floor_plan", prompt, system_prompt)
                 
-                # Parse JSON
-                import re
-                json_str = ""
-                # 1. Try markdown code block
-                json_match = re.search(r'```json\s*([\s\S]*?)\s*```', response)
-                if json_match:
-                    json_str = json_match.group(1)
-                else:
-                    # 2. Try finding the first [ and last ]
-                    start_idx = response.find('[')
-                    end_idx = response.rfind(']')
-                    if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                        json_str = response[start_idx:end_idx+1]
-                    else:
-                        # 3. Fallback cleanup
-                        json_str = response.replace("```json", "").replace("```", "").strip()
-                        
-                rooms = json.loads(json_str)
+                # Parse rooms element by element so a truncated reply keeps the complete ones
+                rooms = list(self._iter_shapes([response]))
                 logger.info(f"Successfully parsed {len(rooms)} rooms for floor plan.")
             except Exception as e:
                 logger.error(f"Floor plan generation error: {e}")
@@ -1256,6 +1341,9 @@ class CanvasAIAssist:
                 # Fallback to default rooms if parsing fails
                 rooms = None
         
+        if rooms:
+            rooms = self._complete_rooms(rooms, description)
+        
         if not rooms:
             logger.warning("Using fallback floor plan layout.")
             # Fallback simple layout (2 rooms)
@@ -1354,6 +1442,53 @@ class CanvasAIAssist:
             "conversational_response": f"I've generated a detailed floor plan layout with {len(rooms)} rooms."
         }
 
+    def _size_room(self, room: Dict[str, Any], description: Optional[str]) -> Dict[str, Any]:
+        """Sub-plan for one room: dimensions plus doors/windows relative to the room"""
+        sized = {"width": 12, "height": 12, "doors": [{"x": 5, "y": 12, "width": 3}], "windows": []}
+        if self.agent_engine:
+            system_prompt = """You are an expert architect sizing a single room.
+            Return ONLY a JSON object in a markdown code block with:
+            width (ft), height (ft), doors[] and windows[] where each opening has
+            x, y (ft, relative to the room's top-left corner) and width (ft)."""
+            prompt = f"Room: {room.get('name', 'Room')}\nHouse: {description or 'residential floor plan'}"
+            try:
+                response = self._cached_request("floor_plan_room", prompt, system_prompt)
+                parsed = self._extract_json(response)
+                if isinstance(parsed, dict):
+                    sized.update({k: parsed[k] for k in ("width", "height", "doors", "windows") if k in parsed})
+            except Exception as e:
+                logger.error(f"Room sizing error for {room.get('name')}: {e}")
+        return sized
+    
+    def _complete_rooms(self, rooms: List[Any], description: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Fill in rooms given only by name (or without dimensions).
+        
+        Each room is sized by an independent sub-plan, run in parallel, and
+        rooms without a position are packed left to right after the placed ones.
+        """
+        rooms = [{"name": r} if isinstance(r, str) else dict(r) for r in rooms if isinstance(r, (str, dict))]
+        pending = [r for r in rooms if not r.get("width") or not r.get("height")]
+        
+        for room, sized in zip(pending, self._run_parallel(lambda r: self._size_room(r, description), pending)):
+            room["width"] = room.get("width") or sized["width"]
+            room["height"] = room.get("height") or sized["height"]
+            room["_relative_openings"] = {"doors": sized.get("doors") or [], "windows": sized.get("windows") or []}
+        
+        cursor_x = max([r.get("x", 0) + r["width"] for r in rooms if "x" in r] or [0])
+        for room in rooms:
+            if "x" not in room or "y" not in room:
+                room["x"], room["y"] = cursor_x, 0
+                cursor_x += room["width"]
+            openings = room.pop("_relative_openings", None)
+            if openings:
+                for kind in ("doors", "windows"):
+                    room.setdefault(kind, [
+                        {**o, "x": room["x"] + o.get("x", 0), "y": room["y"] + o.get("y", 0)}
+                        for o in openings[kind] if isinstance(o, dict)
+                    ])
+        return rooms
+    
     def generate_visual(self, prompt: str, position: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
         """
         Generate a visual image (Photoshop style) using AI image generation tools.
@@ -860,6 +860,54 @@ def get_pending_draw_commands() -> List[Dict[str, Any]]:
     return canvas_controller.get_pending_commands()
 
 
+def draw_command_to_object(command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a queued draw command (DrawCommand.to_dict() shape) into
+    CanvasObject fields, mirroring how the frontend renders agent commands.
+    
+    Returns None for commands that don't create an object (mode, zoom, ...).
+    """
+    params = command.get("parameters") or {}
+    cmd_type = command.get("command_type")
+    layer_id = params.get("layer_id") or command.get("layer_id") or "ai_assist_layer"
+    
+    stroke_color = params.get("strokeColor") or params.get("stroke_color") or params.get("color") or "#6366f1"
+    fill_color = params.get("fillColor") or params.get("fill_color") or "transparent"
+    stroke_width = params.get("strokeWidth") or params.get("stroke_width") or 2
+    style = {"stroke_color": stroke_color, "stroke_width": stroke_width, "layer_id": layer_id}
+    
+    if cmd_type == CommandType.DRAW_RECTANGLE.value:
+        return {"type": "rectangle", "x": params.get("x", 100), "y": params.get("y", 100),
+                "width": params.get("width", 100), "height": params.get("height", 100),
+                "fill_color": fill_color, **style}
+    if cmd_type == CommandType.DRAW_ELLIPSE.value:
+        rx, ry = params.get("rx") or 50, params.get("ry") or 50
+        return {"type": "ellipse", "x": params.get("cx", 0) - rx, "y": params.get("cy", 0) - ry,
+                "width": rx * 2, "height": ry * 2, "fill_color": fill_color, **style}
+    if cmd_type in (CommandType.DRAW_LINE.value, CommandType.DRAW_ARROW.value, CommandType.DRAW_WALL.value):
+        obj = {"type": cmd_type[len("draw_"):], "x1": params.get("x1", 0), "y1": params.get("y1", 0),
+               "x2": params.get("x2", 100), "y2": params.get("y2", 100), **style}
+        if params.get("width") and cmd_type != CommandType.DRAW_WALL.value:
+            obj["stroke_width"] = params["width"]
+        if cmd_type == CommandType.DRAW_WALL.value:
+            obj["thickness"] = params.get("thickness", 6)
+        return obj
+    if cmd_type == CommandType.DRAW_TEXT.value:
+        return {"type": "text", "text": params.get("text") or "Text",
+                "x": params.get("x", 100), "y": params.get("y", 100),
+                "font_size": params.get("fontSize") or params.get("font_size") or 16,
+                "font_family": params.get("fontFamily") or params.get("font_family") or "Arial",
+                "stroke_color": params.get("color") or "#ffffff", "layer_id": layer_id}
+    if cmd_type in (CommandType.DRAW_DOOR.value, CommandType.DRAW_WINDOW.value):
+        return {"type": cmd_type[len("draw_"):], "x": params.get("x", 0), "y": params.get("y", 0),
+                "width": params.get("width", 36), **style}
+    if cmd_type == CommandType.DRAW_IMAGE.value:
+        return {"type": "image", "x": params.get("x", 0), "y": params.get("y", 0),
+                "width": params.get("width", 200), "height": params.get("height", 200),
+                "image_data": params.get("url"), "text": params.get("caption"), "layer_id": layer_id}
+    return None
+
+
 def execute_draw_command(command_type: str, parameters: Dict[str, Any], thought: Optional[str] = None) -> str:
     """Execute a draw command by type."""
     try:
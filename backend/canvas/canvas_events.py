@@ -0,0 +1,164 @@
+"""
+🧠🎨 Agent Amigos Chalk Board - Event Bus
+
+Per-session broadcast of canvas deltas so clients can follow agent-driven
+changes over WebSocket/SSE instead of polling the REST endpoints.
+
+Every delta carries the session revision it produced. A bounded backlog per
+session lets a client that reconnects resume from the last revision it saw;
+if that revision has already been evicted the client is told to resync
+(re-fetch the session and subscribe again from its `revision`).
+
+Created by Darrell Buttigieg (@darrellbuttigieg) #thesoldiersdream
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+
+class CanvasEventBus:
+    """
+    Fan-out of canvas deltas to subscribers, safe to publish from any thread.
+    """
+
+    def __init__(self, backlog_size: int = 512, queue_size: int = 1024):
+        self.backlog_size = backlog_size
+        self.queue_size = queue_size
+
+        self._lock = threading.Lock()
+        self._backlog: Dict[str, Deque[Dict[str, Any]]] = {}
+        # Lowest revision a client may resume from; anything older was never
+        # seen by this process or has been evicted from the backlog.
+        self._floor: Dict[str, int] = {}
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    # ═══════════════════════════════════════════════════════════════
+    # PUBLISHING
+    # ═══════════════════════════════════════════════════════════════
+
+    def publish(self, session_id: str, rev: int, previous_rev: int, op: str,
+                data: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a delta and push it to every subscriber of the session"""
+        event = {
+            "session_id": session_id,
+            "rev": rev,
+            "op": op,
+            "data": data,
+            "ts": time.time(),
+        }
+
+        with self._lock:
+            backlog = self._backlog.get(session_id)
+            if backlog is None:
+                backlog = self._backlog[session_id] = deque()
+                self._floor[session_id] = previous_rev
+            backlog.append(event)
+            while len(backlog) > self.backlog_size:
+                self._floor[session_id] = backlog.popleft()["rev"]
+            subscribers = list(self._subscribers.get(session_id, ()))
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # Subscriber's loop is closed; it will be dropped on unsubscribe
+                pass
+
+        return event
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: Dict[str, Any]):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop what it has not read and ask it to resync
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"session_id": event["session_id"], "rev": event["rev"], "op": "resync", "data": {}})
+
+    def forget(self, session_id: str):
+        """Drop the backlog of a deleted session"""
+        with self._lock:
+            self._backlog.pop(session_id, None)
+            self._floor.pop(session_id, None)
+
+    # ═══════════════════════════════════════════════════════════════
+    # SUBSCRIBING
+    # ═══════════════════════════════════════════════════════════════
+
+    def replay(self, session_id: str, since: int, current_rev: int) -> Optional[List[Dict[str, Any]]]:
+        """Deltas after `since`, or None if they are no longer available
+
+        A `since` ahead of the session (e.g. the server restarted after the
+        client saw revisions that were never persisted) also needs a resync.
+        """
+        if since > current_rev:
+            return None
+        if since == current_rev:
+            return []
+        with self._lock:
+            floor = self._floor.get(session_id)
+            if floor is None or since < floor:
+                return None
+            return [e for e in self._backlog[session_id] if e["rev"] > since]
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        """Register a queue on the running loop that receives live deltas"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(session_id, []).append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(session_id, [])
+            self._subscribers[session_id] = [s for s in subscribers if s[1] is not queue]
+            if not self._subscribers[session_id]:
+                del self._subscribers[session_id]
+
+    def subscriber_count(self, session_id: Optional[str] = None) -> int:
+        with self._lock:
+            if session_id is not None:
+                return len(self._subscribers.get(session_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    async def stream(self, session_id: str, since: Optional[int], current_rev: int,
+                     heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield deltas for a session, starting after `since` when given.
+
+        Yields None every `heartbeat` seconds of inactivity so transports can
+        send keep-alives and notice disconnected clients.
+        """
+        queue = self.subscribe(session_id)
+        try:
+            last_rev = current_rev
+            if since is not None:
+                missed = self.replay(session_id, since, current_rev)
+                if missed is None:
+                    yield {"session_id": session_id, "rev": current_rev, "op": "resync", "data": {}}
+                else:
+                    for event in missed:
+                        yield event
+                    last_rev = max([since] + [e["rev"] for e in missed])
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                # Deltas published between subscribe() and replay() arrive twice
+                if event["op"] != "resync" and event["rev"] <= last_rev:
+                    continue
+                last_rev = event["rev"]
+                yield event
+        finally:
+            self.unsubscribe(session_id, queue)
+
+
+# Global event bus instance
+canvas_events = CanvasEventBus()
@@ -82,6 +82,8 @@ class CanvasObject(BaseModel):
     # Metadata
     author_agent: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
+    # Bumped by the state manager on every change; 0 means "never persisted"
+    revision: int = 0
 
 
 class Layer(BaseModel):
@@ -120,13 +122,16 @@ class CanvasState(BaseModel):
     title: Optional[str] = "Untitled"
     description: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
+    
+    # Revision of the last delta applied (resume point for event streams)
+    revision: int = 0
 
 
 class HistoryEntry(BaseModel):
     """A single entry in the undo/redo history"""
     id: str = Field(default_factory=lambda: f"hist_{uuid.uuid4().hex[:8]}")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
-    action: str  # "add", "delete", "update", "clear"
+    action: str  # "add", "delete", "update", "clear", "batch"
     object_ids: List[str] = Field(default_factory=list)
     previous_state: Optional[Dict[str, Any]] = None
     new_state: Optional[Dict[str, Any]] = None
@@ -191,6 +196,20 @@ class AgentCommandResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+class BatchOperation(BaseModel):
+    """One operation inside a batched, single-transaction canvas edit"""
+    op: str  # "add", "update", "delete", "draw"
+    object: Optional[Dict[str, Any]] = None  # for "add"
+    object_id: Optional[str] = None  # for "update" / "delete"
+    updates: Optional[Dict[str, Any]] = None  # for "update"
+    command: Optional[Dict[str, Any]] = None  # queued draw command, for "draw"
+
+
+class BatchRequest(BaseModel):
+    """Operations applied atomically with one save and one undo step"""
+    operations: List[BatchOperation]
+
+
 # ═══════════════════════════════════════════════════════════════
 # EXPORT MODELS
 # ═══════════════════════════════════════════════════════════════
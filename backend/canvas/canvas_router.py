@@ -6,10 +6,13 @@ FastAPI router for chalk board endpoints.
 Created by Darrell Buttigieg (@darrellbuttigieg) #thesoldiersdream
 """
 
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, HTTPException, Query, Body, Header, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse, JSONResponse
-from typing import Optional, List, Dict, Any
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, List, Dict, Any, Iterable, Iterator
+from collections import OrderedDict
 from datetime import datetime
+from xml.sax.saxutils import escape
 import json
 import io
 
@@ -19,10 +22,11 @@ from .canvas_models import (
     ExportRequest, ExportResponse, ExportFormat,
     FloorPlanTemplate, FloorPlanRoom, FlowchartTemplate,
     DiscussRequest, DrawRequest, PlanRequest, DesignRequest,
-    BrainstormRequest, AnnotateRequest, AskRequest
+    BrainstormRequest, AnnotateRequest, AskRequest, BatchRequest
 )
 from .canvas_state import state_manager
-from .canvas_controller import canvas_controller
+from .canvas_events import canvas_events
+from .canvas_controller import canvas_controller, DrawCommand, draw_command_to_object
 from .canvas_ai_assist import canvas_ai_assist
 try:
     from autonomy.controller import autonomy_controller
@@ -33,6 +37,15 @@ except Exception:
 router = APIRouter(prefix="/canvas", tags=["Canvas"])
 
 
+def _broadcast_controller_command(command: DrawCommand):
+    """Push MCP controller commands to live subscribers of the active session"""
+    session_id = canvas_controller.current_session_id or "default"
+    state_manager.publish_command(session_id, "mcp", command.to_dict())
+
+
+canvas_controller.add_listener(_broadcast_controller_command)
+
+
 # ═══════════════════════════════════════════════════════════════
 # SESSION ENDPOINTS
 # ═══════════════════════════════════════════════════════════════
@@ -105,6 +118,10 @@ async def update_session(
         session.zoom = zoom
     
     session.updated_at = datetime.utcnow()
+    state_manager._publish(session_id, "session", session.model_dump(
+        mode="json",
+        include={"title", "mode", "grid_enabled", "snap_to_grid", "pan_x", "pan_y", "zoom"},
+    ))
     state_manager._save_session(session_id)
     
     return session
@@ -161,6 +178,38 @@ async def clear_objects(session_id: str):
     raise HTTPException(status_code=404, detail="Session not found")
 
 
+@router.post("/session/{session_id}/batch")
+async def apply_batch(session_id: str, request: BatchRequest):
+    """
+    Apply many add/update/delete operations atomically.
+    
+    "draw" operations take a queued agent command (as returned by the AI
+    assist endpoints) and add the object it describes.
+    """
+    operations = []
+    for n, operation in enumerate(request.operations):
+        if operation.op == "draw":
+            fields = draw_command_to_object(operation.command or {})
+            if fields is None:
+                raise HTTPException(status_code=400, detail=f"Operation {n}: command does not draw an object")
+            operations.append({"op": "add", "object": fields})
+        else:
+            operations.append(operation.model_dump(exclude_none=True))
+    
+    try:
+        touched = state_manager.apply_batch(session_id, operations)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if touched is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return {
+        "status": "applied",
+        "object_ids": touched,
+        "revision": state_manager.get_session(session_id).revision,
+    }
+
+
 # ═══════════════════════════════════════════════════════════════
 # LAYER ENDPOINTS
 # ═══════════════════════════════════════════════════════════════
@@ -286,6 +335,60 @@ async def get_pending_commands(session_id: str):
 
 
 
+# ═══════════════════════════════════════════════════════════════
+# LIVE DELTA STREAMS
+# ═══════════════════════════════════════════════════════════════
+
+@router.get("/session/{session_id}/events")
+async def stream_session_events(
+    session_id: str,
+    request: Request,
+    since: Optional[int] = Query(None, description="Resume after this revision"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """Server-Sent Events stream of session deltas (resumable via Last-Event-ID)"""
+    session = state_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    async def event_source():
+        yield f"retry: 3000\n: revision {session.revision}\n\n"
+        async for event in canvas_events.stream(session_id, since, session.revision):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"id: {event['rev']}\nevent: {event['op']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/session/{session_id}/ws")
+async def session_websocket(websocket: WebSocket, session_id: str, since: Optional[int] = None):
+    """WebSocket stream of session deltas; pass ?since=<revision> to resume"""
+    session = state_manager.get_session(session_id)
+    if not session:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    await websocket.send_json({"session_id": session_id, "rev": session.revision, "op": "hello", "data": {}})
+    try:
+        async for event in canvas_events.stream(session_id, since, session.revision):
+            if event is None:
+                await websocket.send_json({"op": "ping"})
+                continue
+            await websocket.send_text(json.dumps(event, default=str))
+    except WebSocketDisconnect:
+        pass
+
+
 @router.get("/agent/queue")
 async def get_global_pending_commands():
     """Get all pending commands from default session"""
@@ -320,12 +423,7 @@ async def export_canvas(request: ExportRequest):
             )
         
         elif request.format == ExportFormat.SVG:
-            svg = generate_svg(request.objects, request.width, request.height, request.background_color)
-            return StreamingResponse(
-                io.BytesIO(svg.encode()),
-                media_type="image/svg+xml",
-                headers={"Content-Disposition": "attachment; filename=canvas.svg"}
-            )
+            return _svg_response(request.objects, request.width, request.height, request.background_color)
         
         # For PNG, PDF, DXF - would need additional libraries
         else:
@@ -338,67 +436,157 @@ async def export_canvas(request: ExportRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def generate_svg(objects: List[CanvasObject], width: int, height: int, bg_color: str) -> str:
-    """Generate SVG from objects"""
-    svg_elements = []
+# Rendered SVG fragments keyed by (object id, revision). Revisions are
+# assigned by the state manager and never reused, so a hit is always current
+# for objects read from a session. Objects posted by a client carry whatever
+# revision they were loaded with plus any unsaved edits, so they bypass it.
+_SVG_FRAGMENT_CACHE_SIZE = 50000
+_svg_fragment_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def _fill(obj: CanvasObject) -> str:
+    return obj.fill_color if obj.fill_color != "transparent" else "none"
+
+
+def render_svg_fragment(obj: CanvasObject) -> str:
+    """Render a single object as an SVG element ("" for unsupported types)"""
+    if obj.type == ObjectType.PATH and obj.points:
+        d = f"M {' L '.join([f'{p.x},{p.y}' for p in obj.points])}"
+        return f'<path d="{d}" stroke="{obj.stroke_color}" stroke-width="{obj.stroke_width}" fill="none"/>'
+    
+    elif obj.type == ObjectType.RECTANGLE:
+        return (
+            f'<rect x="{obj.x}" y="{obj.y}" width="{obj.width}" height="{obj.height}" '
+            f'stroke="{obj.stroke_color}" stroke-width="{obj.stroke_width}" '
+            f'fill="{_fill(obj)}"/>'
+        )
+    
+    elif obj.type == ObjectType.ELLIPSE:
+        cx = obj.x + (obj.width or 0) / 2
+        cy = obj.y + (obj.height or 0) / 2
+        rx = (obj.width or 0) / 2
+        ry = (obj.height or 0) / 2
+        return (
+            f'<ellipse cx="{cx}" cy="{cy}" rx="{rx}" ry="{ry}" '
+            f'stroke="{obj.stroke_color}" stroke-width="{obj.stroke_width}" '
+            f'fill="{_fill(obj)}"/>'
+        )
     
+    elif obj.type == ObjectType.LINE:
+        return (
+            f'<line x1="{obj.x1}" y1="{obj.y1}" x2="{obj.x2}" y2="{obj.y2}" '
+            f'stroke="{obj.stroke_color}" stroke-width="{obj.stroke_width}"/>'
+        )
+    
+    elif obj.type == ObjectType.TEXT and obj.text:
+        return (
+            f'<text x="{obj.x}" y="{obj.y}" fill="{obj.stroke_color}" '
+            f'font-size="{obj.font_size}" font-family="{obj.font_family}">{escape(obj.text)}</text>'
+        )
+    
+    elif obj.type == ObjectType.WALL:
+        return (
+            f'<line x1="{obj.x1}" y1="{obj.y1}" x2="{obj.x2}" y2="{obj.y2}" '
+            f'stroke="{obj.stroke_color}" stroke-width="{obj.thickness or 8}"/>'
+        )
+    
+    return ""
+
+
+def cached_svg_fragment(obj: CanvasObject) -> str:
+    """Return the object's SVG fragment, re-rendering only if its revision changed"""
+    if not obj.revision:
+        # Unversioned objects (e.g. built client-side) can't be cached safely
+        return render_svg_fragment(obj)
+    
+    key = (obj.id, obj.revision)
+    fragment = _svg_fragment_cache.get(key)
+    if fragment is None:
+        fragment = render_svg_fragment(obj)
+        _svg_fragment_cache[key] = fragment
+        if len(_svg_fragment_cache) > _SVG_FRAGMENT_CACHE_SIZE:
+            _svg_fragment_cache.popitem(last=False)
+    else:
+        _svg_fragment_cache.move_to_end(key)
+    return fragment
+
+
+def iter_svg(objects: Iterable[CanvasObject], width: int, height: int, bg_color: str,
+             chunk_size: int = 256, cache: bool = False) -> Iterator[str]:
+    """
+    Stream an SVG document in chunks of up to `chunk_size` elements
+    
+    Pass cache=True only for objects owned by the state manager, whose
+    revision always changes with their content.
+    """
+    render = cached_svg_fragment if cache else render_svg_fragment
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n'
+        f'  <rect width="100%" height="100%" fill="{bg_color}"/>\n'
+    )
+    
+    chunk = []
     for obj in objects:
-        if obj.type == ObjectType.PATH and obj.points:
-            d = f"M {' L '.join([f'{p.x},{p.y}' for p in obj.points])}"
-            svg_elements.append(
-                f'<path d="{d}" stroke="{obj.stroke_color}" stroke-width="{obj.stroke_width}" fill="none"/>'
-            )
-        
-        elif obj.type == ObjectType.RECTANGLE:
-            svg_elements.append(
-                f'<rect x="{obj.x}" y="{obj.y}" width="{obj.width}" height="{obj.height}" '
-                f'stroke="{obj.stroke_color}" stroke-width="{obj.stroke_width}" '
-                f'fill="{obj.fill_color if obj.fill_color != "transparent" else "none"}"/>'
-            )
-        
-        elif obj.type == ObjectType.ELLIPSE:
-            cx = obj.x + (obj.width or 0) / 2
-            cy = obj.y + (obj.height or 0) / 2
-            rx = (obj.width or 0) / 2
-            ry = (obj.height or 0) / 2
-            svg_elements.append(
-                f'<ellipse cx="{cx}" cy="{cy}" rx="{rx}" ry="{ry}" '
-                f'stroke="{obj.stroke_color}" stroke-width="{obj.stroke_width}" '
-                f'fill="{obj.fill_color if obj.fill_color != "transparent" else "none"}"/>'
-            )
-        
-        elif obj.type == ObjectType.LINE:
-            svg_elements.append(
-                f'<line x1="{obj.x1}" y1="{obj.y1}" x2="{obj.x2}" y2="{obj.y2}" '
-                f'stroke="{obj.stroke_color}" stroke-width="{obj.stroke_width}"/>'
-            )
-        
-        elif obj.type == ObjectType.TEXT and obj.text:
-            svg_elements.append(
-                f'<text x="{obj.x}" y="{obj.y}" fill="{obj.stroke_color}" '
-                f'font-size="{obj.font_size}" font-family="{obj.font_family}">{obj.text}</text>'
-            )
-        
-        elif obj.type == ObjectType.WALL:
-            svg_elements.append(
-                f'<line x1="{obj.x1}" y1="{obj.y1}" x2="{obj.x2}" y2="{obj.y2}" '
-                f'stroke="{obj.stroke_color}" stroke-width="{obj.thickness or 8}"/>'
-            )
+        fragment = render(obj)
+        if fragment:
+            chunk.append(f"  {fragment}\n")
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
     
-    return f'''<?xml version="1.0" encoding="UTF-8"?>
-<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">
-  <rect width="100%" height="100%" fill="{bg_color}"/>
-  {chr(10).join(svg_elements)}
-</svg>'''
+    yield "</svg>"
+
+
+def generate_svg(objects: List[CanvasObject], width: int, height: int, bg_color: str,
+                 cache: bool = False) -> str:
+    """Generate SVG from objects"""
+    return "".join(iter_svg(objects, width, height, bg_color, cache=cache))
+
+
+def _svg_response(objects: List[CanvasObject], width: int, height: int, bg_color: str,
+                  cache: bool = False) -> StreamingResponse:
+    return StreamingResponse(
+        (chunk.encode() for chunk in iter_svg(objects, width, height, bg_color, cache=cache)),
+        media_type="image/svg+xml",
+        headers={"Content-Disposition": "attachment; filename=canvas.svg"}
+    )
+
+
+@router.get("/session/{session_id}/export/svg")
+async def export_session_svg(
+    session_id: str,
+    width: int = Query(1920),
+    height: int = Query(1080),
+    background_color: str = Query("#1a1a2e"),
+):
+    """Stream a session's objects as SVG, reusing cached per-object fragments"""
+    session = state_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    # Snapshot the list so edits made while streaming don't affect this export
+    return _svg_response(list(session.objects), width, height, background_color, cache=True)
 
 
 # ═══════════════════════════════════════════════════════════════
 # TEMPLATE ENDPOINTS
 # ═══════════════════════════════════════════════════════════════
 
+def _template_result(objects: List[CanvasObject], session_id: Optional[str]) -> Dict[str, Any]:
+    """Return generated objects, committing them to a session in one batch if asked"""
+    if session_id and state_manager.add_objects(session_id, objects) is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    result = {"objects": [obj.model_dump() for obj in objects]}
+    if session_id:
+        result["revision"] = state_manager.get_session(session_id).revision
+    return result
+
+
 @router.post("/templates/floor-plan")
-async def generate_floor_plan(template: FloorPlanTemplate):
-    """Generate floor plan objects from a template"""
+async def generate_floor_plan(template: FloorPlanTemplate, session_id: Optional[str] = Query(None)):
+    """Generate floor plan objects from a template (added to `session_id` if given)"""
     objects = []
     offset_x = 100
     offset_y = 100
@@ -447,12 +635,12 @@ async def generate_floor_plan(template: FloorPlanTemplate):
         
         offset_x += w + 50
     
-    return {"objects": [obj.model_dump() for obj in objects]}
+    return _template_result(objects, session_id)
 
 
 @router.post("/templates/flowchart")
-async def generate_flowchart(template: FlowchartTemplate):
-    """Generate flowchart objects from a template"""
+async def generate_flowchart(template: FlowchartTemplate, session_id: Optional[str] = Query(None)):
+    """Generate flowchart objects from a template (added to `session_id` if given)"""
     objects = []
     
     for node in template.nodes:
@@ -519,7 +707,7 @@ async def generate_flowchart(template: FlowchartTemplate):
                 layer_id="diagram",
             ))
     
-    return {"objects": [obj.model_dump() for obj in objects]}
+    return _template_result(objects, session_id)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -552,49 +740,49 @@ async def ai_discuss(request: DiscussRequest):
     """AI-assisted discussion"""
     if not canvas_ai_assist.enabled:
         raise HTTPException(status_code=400, detail="AI assist is disabled")
-    return canvas_ai_assist.discuss(request.topic, request.position, request.snapshot, request.context_objects)
+    return await run_in_threadpool(canvas_ai_assist.discuss, request.topic, request.position, request.snapshot, request.context_objects)
 
 @router.post("/ai/draw")
 async def ai_draw(request: DrawRequest):
     """AI-assisted drawing"""
     if not canvas_ai_assist.enabled:
         raise HTTPException(status_code=400, detail="AI assist is disabled")
-    return canvas_ai_assist.draw(request.description, request.position, request.snapshot, request.context_objects)
+    return await run_in_threadpool(canvas_ai_assist.draw, request.description, request.position, request.snapshot, request.context_objects)
 
 @router.post("/ai/plan")
 async def ai_plan(request: PlanRequest):
     """AI-assisted planning"""
     if not canvas_ai_assist.enabled:
         raise HTTPException(status_code=400, detail="AI assist is disabled")
-    return canvas_ai_assist.plan(request.goal, request.steps, request.position, request.snapshot, request.context_objects)
+    return await run_in_threadpool(canvas_ai_assist.plan, request.goal, request.steps, request.position, request.snapshot, request.context_objects)
 
 @router.post("/ai/design")
 async def ai_design(request: DesignRequest):
     """AI-assisted design"""
     if not canvas_ai_assist.enabled:
         raise HTTPException(status_code=400, detail="AI assist is disabled")
-    return canvas_ai_assist.design(request.design_type, request.specs, request.position, request.snapshot, request.context_objects)
+    return await run_in_threadpool(canvas_ai_assist.design, request.design_type, request.specs, request.position, request.snapshot, request.context_objects)
 
 @router.post("/ai/brainstorm")
 async def ai_brainstorm(request: BrainstormRequest):
     """AI-assisted brainstorming"""
     if not canvas_ai_assist.enabled:
         raise HTTPException(status_code=400, detail="AI assist is disabled")
-    return canvas_ai_assist.brainstorm(request.central_idea, request.branches, request.position, request.snapshot, request.context_objects)
+    return await run_in_threadpool(canvas_ai_assist.brainstorm, request.central_idea, request.branches, request.position, request.snapshot, request.context_objects)
 
 @router.post("/ai/annotate")
 async def ai_annotate(request: AnnotateRequest):
     """AI-assisted annotation"""
     if not canvas_ai_assist.enabled:
         raise HTTPException(status_code=400, detail="AI assist is disabled")
-    return canvas_ai_assist.annotate(request.target, request.note, request.position, request.snapshot, request.context_objects)
+    return await run_in_threadpool(canvas_ai_assist.annotate, request.target, request.note, request.position, request.snapshot, request.context_objects)
 
 @router.post("/ai/ask")
 async def ai_ask(request: AskRequest):
     """AI-assisted question asking"""
     if not canvas_ai_assist.enabled:
         raise HTTPException(status_code=400, detail="AI assist is disabled")
-    return canvas_ai_assist.ask_question(request.question, request.options, request.position, request.snapshot, request.context_objects)
+    return await run_in_threadpool(canvas_ai_assist.ask_question, request.question, request.options, request.position, request.snapshot, request.context_objects)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -608,4 +796,5 @@ async def health_check():
         "status": "healthy",
         "service": "Agent Amigos Chalk Board",
         "sessions_count": len(state_manager.sessions),
+        "live_subscribers": canvas_events.subscriber_count(),
     }
@@ -8,6 +8,7 @@ Created by Darrell Buttigieg (@darrellbuttigieg) #thesoldiersdream
 
 import json
 import os
+import threading
 from datetime import datetime
 from typing import Dict, Optional, List, Any
 from pathlib import Path
@@ -16,6 +17,7 @@ from .canvas_models import (
     CanvasState, CanvasObject, Layer, HistoryEntry, SessionHistory,
     AgentDrawCommand, AgentCommandResponse, DrawMode
 )
+from .canvas_events import canvas_events, CanvasEventBus
 
 
 class CanvasStateManager:
@@ -23,7 +25,7 @@ class CanvasStateManager:
     Manages chalk board sessions, history, and persistence.
     """
     
-    def __init__(self, storage_path: str = "./canvas_sessions"):
+    def __init__(self, storage_path: str = "./canvas_sessions", events: Optional[CanvasEventBus] = None):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
@@ -34,6 +36,15 @@ class CanvasStateManager:
         # Agent command queue
         self.pending_commands: Dict[str, List[AgentDrawCommand]] = {}
         
+        # Monotonic revision counter shared by objects and session deltas
+        # (never reused, see _touch / _publish). Assist modes mutate state
+        # from threadpool workers, so bumps go through the lock.
+        self._revision = 0
+        self._revision_lock = threading.Lock()
+        
+        # Delta broadcast to WebSocket/SSE subscribers
+        self.events = events or canvas_events
+        
         # Load existing sessions
         self._load_sessions()
     
@@ -55,9 +66,80 @@ class CanvasStateManager:
 
                     state = CanvasState(**data)
                     self.sessions[state.session_id] = state
+                    self._revision = max(self._revision, state.revision)
+                    for obj in state.objects:
+                        self._revision = max(self._revision, obj.revision)
             except Exception as e:
                 print(f"Error loading session {session_file}: {e}")
     
+    def _touch(self, obj: CanvasObject) -> CanvasObject:
+        """Assign a fresh revision to an object that was added or changed.
+
+        Revisions come from one counter shared by all sessions, so an
+        (object id, revision) pair always identifies the same content and can
+        be used as a cache key (e.g. for SVG fragments).
+        """
+        with self._revision_lock:
+            self._revision += 1
+            obj.revision = self._revision
+        return obj
+    
+    @staticmethod
+    def _apply_updates(obj: CanvasObject, updates: Dict[str, Any]):
+        """Set fields from a raw dict, validating values (e.g. points) first"""
+        fields = {k: v for k, v in updates.items() if k in CanvasObject.model_fields}
+        if not fields:
+            return
+        validated = CanvasObject(**{**obj.model_dump(), **fields})
+        for key in fields:
+            setattr(obj, key, getattr(validated, key))
+    
+    def _publish(self, session_id: str, op: str, data: Dict[str, Any]):
+        """Stamp the session with a new revision and broadcast the delta.
+
+        Ops: "upsert" (objects), "remove" (object_ids), "clear", "layers",
+        "session" (settings) and "command" (queued agent commands).
+        """
+        session = self.sessions.get(session_id)
+        # Held across publish() so the backlog stays in revision order
+        with self._revision_lock:
+            previous_rev = session.revision if session else self._revision
+            self._revision += 1
+            if session:
+                session.revision = self._revision
+            self.events.publish(session_id, self._revision, previous_rev, op, data)
+    
+    def publish_command(self, session_id: str, source: str, command: Dict[str, Any]):
+        """Broadcast a drawing command to live subscribers.
+
+        Commands change no objects, but they still advance the session
+        revision, so the session is saved: a revision clients have seen must
+        not be handed out again after a restart.
+        """
+        self._publish(session_id, "command", {"source": source, "command": command})
+        self._save_session(session_id)
+    
+    def _publish_objects(self, session_id: str, object_ids: List[str]):
+        """Broadcast the current state of the given objects (upsert or remove)"""
+        session = self.sessions.get(session_id)
+        if not session:
+            return
+        wanted = set(object_ids)
+        present = [obj for obj in session.objects if obj.id in wanted]
+        if present:
+            self._publish(session_id, "upsert", {"objects": [obj.model_dump(mode="json") for obj in present]})
+        removed = wanted - {obj.id for obj in present}
+        if removed:
+            self._publish(session_id, "remove", {"object_ids": [i for i in object_ids if i in removed]})
+    
+    def _publish_layers(self, session_id: str):
+        session = self.sessions.get(session_id)
+        if session:
+            self._publish(session_id, "layers", {
+                "layers": [layer.model_dump(mode="json") for layer in session.layers],
+                "object_count": len(session.objects),
+            })
+    
     def _save_session(self, session_id: str):
         """Persist a session to disk"""
         if session_id in self.sessions:
@@ -132,6 +214,7 @@ class CanvasStateManager:
                 del self.histories[session_id]
             if session_id in self.pending_commands:
                 del self.pending_commands[session_id]
+            self.events.forget(session_id)
             
             # Remove from disk
             file_path = self.storage_path / f"{session_id}.json"
@@ -151,11 +234,14 @@ class CanvasStateManager:
         if not session:
             return None
         
+        self._touch(obj)
+        
         # Record history
         self._record_history(session_id, "add", [obj.id], None, obj.model_dump())
         
         session.objects.append(obj)
         session.updated_at = datetime.utcnow()
+        self._publish(session_id, "upsert", {"objects": [obj.model_dump(mode="json")]})
         self._save_session(session_id)
         
         return obj
@@ -172,11 +258,11 @@ class CanvasStateManager:
                 self._record_history(session_id, "update", [object_id], obj.model_dump(), updates)
                 
                 # Apply updates
-                for key, value in updates.items():
-                    if hasattr(obj, key):
-                        setattr(obj, key, value)
+                self._apply_updates(obj, updates)
+                self._touch(obj)
                 
                 session.updated_at = datetime.utcnow()
+                self._publish(session_id, "upsert", {"objects": [obj.model_dump(mode="json")]})
                 self._save_session(session_id)
                 return obj
         
@@ -195,6 +281,7 @@ class CanvasStateManager:
                 
                 session.objects.pop(i)
                 session.updated_at = datetime.utcnow()
+                self._publish(session_id, "remove", {"object_ids": [object_id]})
                 self._save_session(session_id)
                 return True
         
@@ -216,9 +303,107 @@ class CanvasStateManager:
         
         session.objects = []
         session.updated_at = datetime.utcnow()
+        self._publish(session_id, "clear", {})
         self._save_session(session_id)
         return True
     
+    def apply_batch(self, session_id: str, operations: List[Dict[str, Any]]) -> Optional[List[str]]:
+        """
+        Apply many object operations as a single transaction.
+        
+        Operations: {"op": "add", "object": {...}},
+                    {"op": "update", "object_id": ..., "updates": {...}},
+                    {"op": "delete", "object_id": ...}
+        
+        Everything is validated before anything changes, so an invalid
+        operation raises ValueError and leaves the session untouched. A
+        successful batch is persisted once, broadcast once and recorded as one
+        history entry (undoable in a single step).
+        
+        Returns the ids of the touched objects, or None if the session is missing.
+        """
+        session = self.sessions.get(session_id)
+        if not session:
+            return None
+        
+        index = {obj.id: obj for obj in session.objects}
+        staged: Dict[str, Optional[CanvasObject]] = {}  # None = deleted
+        touched: List[str] = []
+        
+        def current(object_id):
+            return staged[object_id] if object_id in staged else index.get(object_id)
+        
+        for n, operation in enumerate(operations):
+            kind = operation.get("op")
+            if kind == "add":
+                obj = operation.get("object")
+                if not isinstance(obj, CanvasObject):
+                    obj = CanvasObject(**(obj or {}))
+                if current(obj.id) is not None:
+                    raise ValueError(f"Operation {n}: object {obj.id} already exists")
+                object_id = obj.id
+                staged[object_id] = obj
+            elif kind in ("update", "delete"):
+                object_id = operation.get("object_id")
+                existing = current(object_id)
+                if existing is None:
+                    raise ValueError(f"Operation {n}: object {object_id} not found")
+                if kind == "update":
+                    updates = {
+                        key: value for key, value in (operation.get("updates") or {}).items()
+                        if key in CanvasObject.model_fields and key not in ("id", "revision")
+                    }
+                    staged[object_id] = CanvasObject(**{**existing.model_dump(), **updates})
+                else:
+                    staged[object_id] = None
+            else:
+                raise ValueError(f"Operation {n}: unknown op {kind!r}")
+            
+            if object_id not in touched:
+                touched.append(object_id)
+        
+        if not touched:
+            return []
+        
+        previous = [index[i].model_dump() for i in touched if i in index]
+        replacements = {i: self._touch(obj) for i, obj in staged.items() if obj is not None}
+        
+        self._record_history(
+            session_id, "batch", touched,
+            {"objects": previous},
+            {"objects": [replacements[i].model_dump() for i in touched if i in replacements]}
+        )
+        
+        self._replace_objects(session, touched, replacements)
+        session.updated_at = datetime.utcnow()
+        self._publish_objects(session_id, touched)
+        self._save_session(session_id)
+        return touched
+    
+    def add_objects(self, session_id: str, objects: List[CanvasObject]) -> Optional[List[CanvasObject]]:
+        """Add many objects with one write and one history entry"""
+        if self.apply_batch(session_id, [{"op": "add", "object": obj} for obj in objects]) is None:
+            return None
+        return objects
+    
+    @staticmethod
+    def _replace_objects(session: CanvasState, object_ids: List[str], replacements: Dict[str, CanvasObject]):
+        """Swap the given objects for their replacements, keeping z-order.
+        
+        Ids without a replacement are removed; replacements for ids not yet
+        on the canvas are appended in `object_ids` order.
+        """
+        wanted = set(object_ids)
+        replacements = dict(replacements)
+        objects = []
+        for obj in session.objects:
+            if obj.id not in wanted:
+                objects.append(obj)
+            elif obj.id in replacements:
+                objects.append(replacements.pop(obj.id))
+        objects.extend(replacements[i] for i in object_ids if i in replacements)
+        session.objects = objects
+    
     def get_objects(self, session_id: str, layer_id: Optional[str] = None) -> List[CanvasObject]:
         """Get objects from a session, optionally filtered by layer"""
         session = self.sessions.get(session_id)
@@ -244,6 +429,7 @@ class CanvasStateManager:
         layer.order = len(session.layers)
         session.layers.append(layer)
         session.updated_at = datetime.utcnow()
+        self._publish_layers(session_id)
         self._save_session(session_id)
         
         return layer
@@ -260,6 +446,7 @@ class CanvasStateManager:
                     if hasattr(layer, key):
                         setattr(layer, key, value)
                 session.updated_at = datetime.utcnow()
+                self._publish_layers(session_id)
                 self._save_session(session_id)
                 return layer
         
@@ -275,9 +462,13 @@ class CanvasStateManager:
         session.layers = [l for l in session.layers if l.id != layer_id]
         
         # Remove objects on this layer
+        removed = [obj.id for obj in session.objects if obj.layer_id == layer_id]
         session.objects = [obj for obj in session.objects if obj.layer_id != layer_id]
         
         session.updated_at = datetime.utcnow()
+        self._publish_layers(session_id)
+        if removed:
+            self._publish(session_id, "remove", {"object_ids": removed})
         self._save_session(session_id)
         return True
     
@@ -296,6 +487,7 @@ class CanvasStateManager:
         
         session.layers = reordered
         session.updated_at = datetime.utcnow()
+        self._publish_layers(session_id)
         self._save_session(session_id)
         return True
     
@@ -345,21 +537,27 @@ class CanvasStateManager:
         elif entry.action == "delete" and entry.previous_state:
             # Restore the deleted object
             obj = CanvasObject(**entry.previous_state)
-            session.objects.append(obj)
+            session.objects.append(self._touch(obj))
         elif entry.action == "update" and entry.previous_state:
             # Restore previous state
             for obj in session.objects:
                 if obj.id in entry.object_ids:
-                    for key, value in entry.previous_state.items():
-                        if hasattr(obj, key):
-                            setattr(obj, key, value)
+                    self._apply_updates(obj, entry.previous_state)
+                    self._touch(obj)
         elif entry.action == "clear" and entry.previous_state:
             # Restore all cleared objects
             for obj_data in entry.previous_state.get("objects", []):
-                session.objects.append(CanvasObject(**obj_data))
+                session.objects.append(self._touch(CanvasObject(**obj_data)))
+        elif entry.action == "batch":
+            # Put every touched object back the way it was before the batch
+            previous = (entry.previous_state or {}).get("objects", [])
+            self._replace_objects(session, entry.object_ids, {
+                data["id"]: self._touch(CanvasObject(**data)) for data in previous
+            })
         
         history.current_index -= 1
         session.updated_at = datetime.utcnow()
+        self._publish_objects(session_id, entry.object_ids)
         self._save_session(session_id)
         return True
     
@@ -376,19 +574,27 @@ class CanvasStateManager:
         # Reapply the action
         if entry.action == "add" and entry.new_state:
             obj = CanvasObject(**entry.new_state)
-            session.objects.append(obj)
+            session.objects.append(self._touch(obj))
         elif entry.action == "delete":
             session.objects = [obj for obj in session.objects if obj.id not in entry.object_ids]
         elif entry.action == "update" and entry.new_state:
             for obj in session.objects:
                 if obj.id in entry.object_ids:
-                    for key, value in entry.new_state.items():
-                        if hasattr(obj, key):
-                            setattr(obj, key, value)
+                    self._apply_updates(obj, entry.new_state)
+                    self._touch(obj)
         elif entry.action == "clear":
             session.objects = []
+        elif entry.action == "batch":
+            final = (entry.new_state or {}).get("objects", [])
+            self._replace_objects(session, entry.object_ids, {
+                data["id"]: self._touch(CanvasObject(**data)) for data in final
+            })
         
         session.updated_at = datetime.utcnow()
+        if entry.action == "clear":
+            self._publish(session_id, "clear", {})
+        else:
+            self._publish_objects(session_id, entry.object_ids)
         self._save_session(session_id)
         return True
     
@@ -411,6 +617,7 @@ class CanvasStateManager:
         if session_id not in self.pending_commands:
             self.pending_commands[session_id] = []
         self.pending_commands[session_id].append(command)
+        self.publish_command(session_id, "agent", command.model_dump(mode="json"))
     
     def get_pending_commands(self, session_id: str) -> List[AgentDrawCommand]:
         """Get and clear pending commands for a session"""
@@ -434,6 +641,7 @@ class CanvasStateManager:
             if command.action == "set_mode" and command.mode:
                 session.mode = command.mode
                 result["mode"] = command.mode.value
+                self._publish(session_id, "session", {"mode": command.mode.value})
             
             elif command.action == "clear":
                 self.clear_objects(session_id)
@@ -0,0 +1,326 @@
+"""Audio analysis for the Music Video pipeline, cached by content hash.
+
+analyze_audio() loads the track with librosa (pydub fallback) and
+estimates BPM, beats, an RMS energy curve, mood and MFCC-based sections;
+for a long track that is tens of seconds of CPU-bound work.
+
+cached_analysis() is what jobs call:
+
+- results are stored as JSON under <cache_root>/v<ANALYSIS_VERSION>/ keyed
+  by the sha256 of the audio file, so re-running or retrying a job on the
+  same song skips the analysis (bump ANALYSIS_VERSION when analyze_audio's
+  output changes)
+- misses run `python -m musicvideo.audio_analysis <path>` in a child
+  process, so librosa holds neither the API worker nor the GIL; at most
+  MV_ANALYSIS_WORKERS (default 1) run at once and concurrent requests for
+  the same file share one run. A child that fails to run falls back to
+  analysing in-process.
+
+A child process per miss is used rather than a multiprocessing pool: spawn
+and forkserver pools re-import the main module in every worker, which for
+`python agent_init.py` means the whole backend.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .render_cache import file_digest
+
+ANALYSIS_VERSION = 1
+
+_BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+
+_inflight_lock = threading.Lock()
+_inflight: Dict[str, threading.Event] = {}
+_worker_slots: Optional[threading.BoundedSemaphore] = None
+
+
+def analyze_audio(audio_path: str) -> Dict[str, Any]:
+    """Analyze an audio file to estimate BPM, beat times, energy curve, mood and sections.
+
+    We prefer librosa (better beat/structure detection). If unavailable, fallback to
+    pydub + simple RMS/onset heuristics.
+    """
+    analysis: Dict[str, Any] = {
+        "duration_s": None,
+        "bpm": None,
+        "beats": [],
+        "mood": None,
+        "energy_curve": [],
+        "sections": [],
+        "method": "fallback",
+    }
+
+    # Duration + librosa analysis when possible
+    try:
+        try:
+            import numpy as _np
+            import librosa  # type: ignore
+
+            y, sr = librosa.load(audio_path, mono=True)
+            duration_s = float(librosa.get_duration(y=y, sr=sr))
+            analysis["duration_s"] = duration_s
+
+            # Beats / tempo
+            tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
+            bpm = float(tempo) if tempo else None
+            if bpm and 40 <= bpm <= 240:
+                analysis["bpm"] = float(round(bpm, 2))
+                analysis["method"] = "librosa"
+
+            if beat_frames is not None and len(beat_frames) > 0:
+                beat_times = librosa.frames_to_time(beat_frames, sr=sr)
+                analysis["beats"] = [float(x) for x in beat_times.tolist()]
+
+            # Energy curve (RMS) at 50ms hop
+            hop_length = max(1, int(sr * 0.05))
+            frame_length = max(hop_length * 2, 2048)
+            rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+            if rms.size:
+                r = _np.array(rms, dtype=_np.float32)
+                r = r - float(r.min())
+                denom = float(r.max()) or 1.0
+                r = r / denom
+                analysis["energy_curve"] = [float(x) for x in r.tolist()]
+
+            # Structure detection via clustering on MFCC/chroma (approximate sections)
+            try:
+                mfcc = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=20)
+                mfcc = librosa.util.normalize(mfcc)
+                # 6-8 segments depending on duration
+                k = 6
+                if duration_s > 150:
+                    k = 8
+                boundaries = librosa.segment.agglomerative(mfcc, k=k)
+                # boundaries are frame indices in mfcc time; convert to seconds.
+                # mfcc hop length defaults to 512
+                seg_times = librosa.frames_to_time(boundaries, sr=sr, hop_length=512)
+                seg_times = [0.0] + [float(x) for x in seg_times.tolist()] + [float(duration_s)]
+                # De-dup and sort
+                seg_times = sorted(set([max(0.0, min(duration_s, t)) for t in seg_times]))
+
+                section_labels = ["Intro", "Verse", "Chorus", "Bridge", "Final Chorus", "Outro"]
+                sections = []
+                for i in range(len(seg_times) - 1):
+                    a, b = seg_times[i], seg_times[i + 1]
+                    if b - a < 2.0:
+                        continue
+                    name = section_labels[min(i, len(section_labels) - 1)]
+                    sections.append({"name": name, "start": float(a), "end": float(b)})
+                analysis["sections"] = sections
+            except Exception:
+                # Fall back to rule-based if structure fails
+                pass
+
+        except Exception:
+            # librosa not available or failed; pydub fallback
+            from pydub import AudioSegment
+            import numpy as _np
+
+            seg = AudioSegment.from_file(audio_path)
+            duration_s = float(len(seg)) / 1000.0
+            analysis["duration_s"] = duration_s
+
+            frame_ms = 50
+            energies = []
+            for t0 in range(0, len(seg), frame_ms):
+                frame = seg[t0 : t0 + frame_ms]
+                samples = _np.array(frame.get_array_of_samples())
+                if samples.size == 0:
+                    energies.append(0.0)
+                    continue
+                rms = float(_np.sqrt(_np.mean(samples.astype(_np.float32) ** 2)))
+                energies.append(rms)
+
+            if energies:
+                e = _np.array(energies, dtype=_np.float32)
+                e = e - float(e.min())
+                denom = float(e.max()) or 1.0
+                e = e / denom
+                analysis["energy_curve"] = e.tolist()
+
+            # Basic BPM estimation from energy derivative peaks
+            if analysis.get("energy_curve"):
+                ec = analysis["energy_curve"]
+                d = _np.diff(_np.array(ec, dtype=_np.float32))
+                thresh = float(_np.percentile(d, 95)) if d.size else 0.0
+                peaks = _np.where(d >= max(thresh, 0.05))[0]
+                if peaks.size >= 8:
+                    times = peaks * (frame_ms / 1000.0)
+                    itv = _np.diff(times)
+                    itv = itv[(itv > 0.15) & (itv < 1.5)]
+                    if itv.size:
+                        median = float(_np.median(itv))
+                        bpm2 = 60.0 / median
+                        while bpm2 < 60:
+                            bpm2 *= 2
+                        while bpm2 > 180:
+                            bpm2 /= 2
+                        analysis["bpm"] = float(round(bpm2, 2))
+
+        # Mood classification (simple)
+        avg_energy = None
+        if analysis.get("energy_curve"):
+            import numpy as _np
+
+            avg_energy = float(_np.mean(_np.array(analysis["energy_curve"], dtype=_np.float32)))
+        mood = "uplifting"
+        if avg_energy is not None:
+            if avg_energy < 0.25:
+                mood = "chill"
+            elif avg_energy < 0.45:
+                mood = "emotional"
+            elif avg_energy < 0.65:
+                mood = "epic"
+            else:
+                mood = "high-energy"
+        analysis["mood"] = mood
+
+        # Section detection fallback (rule-based timeline buckets)
+        if not analysis.get("sections"):
+            dur = float(analysis.get("duration_s") or 0.0)
+            if dur > 0.0:
+                intro_end = min(15.0, dur * 0.10)
+                outro_start = max(dur - min(15.0, dur * 0.10), intro_end)
+                p2 = dur * 0.35
+                p3 = dur * 0.55
+                p4 = dur * 0.70
+                p5 = dur * 0.90
+
+                sections = []
+                def _add(name: str, a: float, b: float):
+                    if b - a >= 2.0:
+                        sections.append({"name": name, "start": float(a), "end": float(b)})
+
+                _add("Intro", 0.0, intro_end)
+                _add("Verse", intro_end, p2)
+                _add("Chorus", p2, p3)
+                _add("Bridge", p3, p4)
+                _add("Final Chorus", p4, p5)
+                _add("Outro", max(p5, outro_start), dur)
+                analysis["sections"] = sections
+
+    except Exception as exc:
+        analysis["error"] = str(exc)[:500]
+
+    # Ensure BPM exists
+    if not analysis.get("bpm"):
+        analysis["bpm"] = 120.0
+    return analysis
+
+
+def _cache_file(cache_root: str, digest: str) -> Path:
+    return Path(cache_root) / f"v{ANALYSIS_VERSION}" / digest[:2] / f"{digest}.json"
+
+
+def load_cached(cache_root: str, digest: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_cache_file(cache_root, digest), "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        return data if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def store_cached(cache_root: str, digest: str, analysis: Dict[str, Any]) -> None:
+    path = _cache_file(cache_root, digest)
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(analysis, fh)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _slots() -> threading.BoundedSemaphore:
+    global _worker_slots
+    with _inflight_lock:
+        if _worker_slots is None:
+            try:
+                workers = max(1, int(os.environ.get("MV_ANALYSIS_WORKERS") or 1))
+            except ValueError:
+                workers = 1
+            _worker_slots = threading.BoundedSemaphore(workers)
+        return _worker_slots
+
+
+def analyze_in_subprocess(audio_path: str, timeout_s: Optional[float] = None) -> Dict[str, Any]:
+    """Run analyze_audio in a child interpreter; raises RuntimeError if it cannot"""
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", "musicvideo.audio_analysis", os.path.abspath(audio_path)],
+            cwd=_BACKEND_DIR, capture_output=True, text=True, timeout=timeout_s,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        raise RuntimeError(f"audio analysis process failed: {exc}") from exc
+    lines = (proc.stdout or "").strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"audio analysis process failed: {(proc.stderr or '').strip()[-500:]}")
+    try:
+        return json.loads(lines[-1])
+    except ValueError as exc:
+        raise RuntimeError(f"audio analysis process returned invalid output: {exc}") from exc
+
+
+def cached_analysis(
+    audio_path: str,
+    cache_root: str,
+    isolate: Optional[bool] = None,
+    timeout_s: Optional[float] = None,
+) -> Dict[str, Any]:
+    """analyze_audio(audio_path) through the on-disk cache (see module docstring)"""
+    if isolate is None:
+        isolate = (os.environ.get("MV_ANALYSIS_ISOLATE") or "1").strip().lower() not in {"0", "false", "no", "off"}
+    digest = file_digest(audio_path)
+
+    while True:
+        cached = load_cached(cache_root, digest)
+        if cached is not None:
+            return cached
+        with _inflight_lock:
+            running = _inflight.get(digest)
+            if running is None:
+                running = _inflight[digest] = threading.Event()
+                owner = True
+            else:
+                owner = False
+        if owner:
+            break
+        # Another thread is analysing the same file: use its result, or (errors
+        # are not cached) take over if it failed
+        running.wait()
+
+    try:
+        with _slots():
+            analysis = None
+            if isolate:
+                try:
+                    analysis = analyze_in_subprocess(audio_path, timeout_s)
+                except RuntimeError:
+                    analysis = None
+            if analysis is None:
+                analysis = analyze_audio(audio_path)
+        analysis["analysis_version"] = ANALYSIS_VERSION
+        if not analysis.get("error"):
+            store_cached(cache_root, digest, analysis)
+        return analysis
+    finally:
+        with _inflight_lock:
+            _inflight.pop(digest, None)
+        running.set()
+
+
+if __name__ == "__main__":
+    print(json.dumps(analyze_audio(sys.argv[1])))
@@ -1,19 +1,259 @@
-"""FFmpeg helper utilities used by the Music Video pipeline."""
+"""FFmpeg helper utilities used by the Music Video pipeline.
+
+Encodes run through a shared asyncio runner instead of blocking
+subprocess.run calls:
+
+- ffmpeg is started with `-progress pipe:1`; its key=value blocks are
+  parsed into FfmpegProgress updates with a real percentage (the total
+  duration comes from the caller or from the input header ffmpeg prints)
+- a cancel callback is polled while ffmpeg runs; the process is terminated
+  (then killed) and the call returns (False, "cancelled")
+- at most MV_FFMPEG_CONCURRENCY encodes run at once (default: half the
+  CPU count, since every x264 encode is multi-threaded itself)
+
+run_ffmpeg() is the blocking entry point used from worker threads;
+run_ffmpeg_async() can be awaited from any event loop.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import collections
 import os
+import re
 import shutil
 import subprocess
 import tempfile
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+ProgressCallback = Callable[["FfmpegProgress"], None]
+CancelCheck = Callable[[], bool]
+
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
 
 
 def which_ffmpeg() -> Optional[str]:
     return shutil.which("ffmpeg")
 
 
+@dataclass
+class FfmpegProgress:
+    out_time_s: float = 0.0
+    frame: int = 0
+    fps: float = 0.0
+    speed: Optional[float] = None
+    duration_s: Optional[float] = None
+    done: bool = False
+
+    @property
+    def percent(self) -> Optional[float]:
+        if self.done:
+            return 100.0
+        if not self.duration_s:
+            return None
+        return max(0.0, min(99.9, 100.0 * self.out_time_s / self.duration_s))
+
+
+def parse_progress_block(fields: Dict[str, str], duration_s: Optional[float]) -> FfmpegProgress:
+    """Turn one `-progress` block (key=value lines up to progress=...) into an update"""
+    out_time_s = 0.0
+    # out_time_us and (despite its name) out_time_ms are both microseconds
+    for key in ("out_time_us", "out_time_ms"):
+        value = fields.get(key, "")
+        if value.lstrip("-").isdigit():
+            out_time_s = max(0.0, int(value) / 1_000_000)
+            break
+    speed = fields.get("speed", "").rstrip("x").strip()
+    try:
+        fps = float(fields.get("fps") or 0.0)
+    except ValueError:
+        fps = 0.0
+    try:
+        speed_value: Optional[float] = float(speed) if speed and speed != "N/A" else None
+    except ValueError:
+        speed_value = None
+    frame = fields.get("frame", "")
+    return FfmpegProgress(
+        out_time_s=out_time_s,
+        frame=int(frame) if frame.isdigit() else 0,
+        fps=fps,
+        speed=speed_value,
+        duration_s=duration_s,
+        done=fields.get("progress") == "end",
+    )
+
+
+def parse_duration(stderr_line: str) -> Optional[float]:
+    """Input duration from ffmpeg's `Duration: HH:MM:SS.ss` header line"""
+    m = _DURATION_RE.search(stderr_line)
+    if not m:
+        return None
+    h, mnt, sec = m.groups()
+    return int(h) * 3600 + int(mnt) * 60 + float(sec)
+
+
+class FfmpegRunner:
+    """Runs ffmpeg processes on one background event loop, bounded by a semaphore"""
+
+    def __init__(self, max_concurrent: Optional[int] = None):
+        if max_concurrent is None:
+            try:
+                max_concurrent = int(os.environ.get("MV_FFMPEG_CONCURRENCY") or 0)
+            except ValueError:
+                max_concurrent = 0
+        self.max_concurrent = max_concurrent or max(1, (os.cpu_count() or 2) // 2)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def _serve() -> None:
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrent)
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=_serve, name="ffmpeg-runner", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def run(self, args: List[str], **kwargs) -> Tuple[bool, str]:
+        """Blocking: run ffmpeg args (without the executable) and wait"""
+        future = asyncio.run_coroutine_threadsafe(self._run(args, **kwargs), self._ensure_loop())
+        return future.result()
+
+    async def run_async(self, args: List[str], **kwargs) -> Tuple[bool, str]:
+        future = asyncio.run_coroutine_threadsafe(self._run(args, **kwargs), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    async def _run(
+        self,
+        args: List[str],
+        duration_s: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel: Optional[CancelCheck] = None,
+        timeout_s: Optional[float] = None,
+    ) -> Tuple[bool, str]:
+        ffmpeg = which_ffmpeg()
+        if not ffmpeg:
+            return False, "ffmpeg not found in PATH"
+        assert self._semaphore is not None
+        async with self._semaphore:
+            if cancel and cancel():
+                return False, "cancelled"
+            proc = await asyncio.create_subprocess_exec(
+                ffmpeg, "-hide_banner", "-nostats", "-progress", "pipe:1", *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stderr_tail: collections.deque = collections.deque(maxlen=40)
+            total = {"duration": duration_s}
+
+            async def _read_stderr() -> None:
+                assert proc.stderr is not None
+                async for raw in proc.stderr:
+                    line = raw.decode("utf-8", "replace").rstrip()
+                    stderr_tail.append(line)
+                    if total["duration"] is None:
+                        total["duration"] = parse_duration(line)
+
+            async def _read_progress() -> None:
+                assert proc.stdout is not None
+                fields: Dict[str, str] = {}
+                async for raw in proc.stdout:
+                    key, _, value = raw.decode("utf-8", "replace").strip().partition("=")
+                    fields[key] = value.strip()
+                    if key == "progress":
+                        if on_progress:
+                            try:
+                                on_progress(parse_progress_block(fields, total["duration"]))
+                            except Exception:
+                                pass
+                        fields = {}
+
+            readers = asyncio.gather(_read_stderr(), _read_progress())
+            waiter = asyncio.ensure_future(proc.wait())
+            started = asyncio.get_running_loop().time()
+            reason = ""
+            while not waiter.done():
+                await asyncio.wait({waiter}, timeout=0.25)
+                if waiter.done():
+                    break
+                if cancel and cancel():
+                    reason = "cancelled"
+                elif timeout_s and asyncio.get_running_loop().time() - started > timeout_s:
+                    reason = f"timed out after {timeout_s:.0f}s"
+                if reason:
+                    await _stop(proc)
+                    break
+            await waiter
+            await readers
+
+        if reason:
+            return False, reason
+        if proc.returncode != 0:
+            return False, "\n".join(stderr_tail).strip()[-2000:] or f"ffmpeg exited with {proc.returncode}"
+        return True, "ok"
+
+
+async def _stop(proc: asyncio.subprocess.Process, grace_s: float = 5.0) -> None:
+    try:
+        proc.terminate()
+        await asyncio.wait_for(proc.wait(), timeout=grace_s)
+    except ProcessLookupError:
+        pass
+    except asyncio.TimeoutError:
+        proc.kill()
+
+
+_RUNNER: Optional[FfmpegRunner] = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def ffmpeg_runner() -> FfmpegRunner:
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = FfmpegRunner()
+        return _RUNNER
+
+
+def run_ffmpeg(
+    args: List[str],
+    duration_s: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelCheck] = None,
+    timeout_s: Optional[float] = None,
+) -> Tuple[bool, str]:
+    """Run `ffmpeg <args>` through the shared runner; blocks the calling thread"""
+    return ffmpeg_runner().run(
+        args, duration_s=duration_s, on_progress=on_progress, cancel=cancel, timeout_s=timeout_s
+    )
+
+
+async def run_ffmpeg_async(
+    args: List[str],
+    duration_s: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelCheck] = None,
+    timeout_s: Optional[float] = None,
+) -> Tuple[bool, str]:
+    """Await `ffmpeg <args>` through the shared runner from any event loop"""
+    return await ffmpeg_runner().run_async(
+        args, duration_s=duration_s, on_progress=on_progress, cancel=cancel, timeout_s=timeout_s
+    )
+
+
 def ffprobe_duration_seconds(path: str) -> Optional[float]:
     ffprobe = shutil.which("ffprobe")
     if not ffprobe:
@@ -42,6 +282,33 @@ def ffprobe_duration_seconds(path: str) -> Optional[float]:
         return None
 
 
+def partial_output_path(output_path: str) -> str:
+    """Sibling temp path for output_path (same directory and container extension)"""
+    out = Path(output_path)
+    return str(out.with_name(f".{out.stem}.{os.getpid()}.{threading.get_ident()}.partial{out.suffix}"))
+
+
+def finish_partial_output(partial: str, output_path: str, ok: bool) -> bool:
+    """Move a finished partial output over output_path (a new inode, so
+    other names of the old file are untouched); drop it on failure"""
+    try:
+        if ok:
+            os.replace(partial, output_path)
+            return True
+        os.remove(partial)
+    except FileNotFoundError:
+        pass
+    return False
+
+
+def normalize_filter(width: int, height: int, fps: int) -> str:
+    """Letterbox to width x height, yuv420p, constant fps: the stream shape every MV clip is concatenated in"""
+    return (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,format=yuv420p,fps={fps}"
+    )
+
+
 def transcode_h264(
     input_path: str,
     output_path: str,
@@ -50,21 +317,18 @@ def transcode_h264(
     fps: int,
     crf: int = 18,
     preset: str = "medium",
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelCheck] = None,
 ) -> Tuple[bool, str]:
-    ffmpeg = which_ffmpeg()
-    if not ffmpeg:
-        return False, "ffmpeg not found in PATH"
-
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
     # Ensure consistent stream properties for concat.
     cmd = [
-        ffmpeg,
         "-y",
         "-i",
         input_path,
         "-vf",
-        f"scale={width}:{height}:force_original_aspect_ratio=decrease,pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,format=yuv420p,fps={fps}",
+        normalize_filter(width, height, fps),
         "-an",
         "-c:v",
         "libx264",
@@ -74,19 +338,15 @@ def transcode_h264(
         str(crf),
         output_path,
     ]
-
-    p = subprocess.run(cmd, capture_output=True, text=True)
-    if p.returncode != 0:
-        err = (p.stderr or p.stdout or "").strip()[-2000:]
-        return False, err
-    return True, "ok"
+    return run_ffmpeg(cmd, on_progress=on_progress, cancel=cancel)
 
 
-def concat_videos(video_paths: List[str], output_path: str) -> Tuple[bool, str]:
-    ffmpeg = which_ffmpeg()
-    if not ffmpeg:
-        return False, "ffmpeg not found in PATH"
-
+def concat_videos(
+    video_paths: List[str],
+    output_path: str,
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelCheck] = None,
+) -> Tuple[bool, str]:
     if not video_paths:
         return False, "No video clips provided"
 
@@ -103,7 +363,6 @@ def concat_videos(video_paths: List[str], output_path: str) -> Tuple[bool, str]:
         lst.write_text("\n".join(lines), encoding="utf-8")
 
         cmd = [
-            ffmpeg,
             "-y",
             "-f",
             "concat",
@@ -115,24 +374,22 @@ def concat_videos(video_paths: List[str], output_path: str) -> Tuple[bool, str]:
             "copy",
             output_path,
         ]
-        p = subprocess.run(cmd, capture_output=True, text=True)
-        if p.returncode != 0:
-            # If stream mismatch, caller should transcode clips first.
-            err = (p.stderr or p.stdout or "").strip()[-2000:]
-            return False, err
-
-    return True, "ok"
-
+        # If stream mismatch, caller should transcode clips first.
+        return run_ffmpeg(cmd, on_progress=on_progress, cancel=cancel)
 
-def mux_audio(video_path: str, audio_path: str, output_path: str) -> Tuple[bool, str]:
-    ffmpeg = which_ffmpeg()
-    if not ffmpeg:
-        return False, "ffmpeg not found in PATH"
 
+def mux_audio(
+    video_path: str,
+    audio_path: str,
+    output_path: str,
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelCheck] = None,
+) -> Tuple[bool, str]:
+    """Mux audio into video_path; output_path is replaced atomically, never written in place"""
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    partial = partial_output_path(output_path)
 
     cmd = [
-        ffmpeg,
         "-y",
         "-i",
         video_path,
@@ -147,10 +404,7 @@ def mux_audio(video_path: str, audio_path: str, output_path: str) -> Tuple[bool,
         "-c:a",
         "aac",
         "-shortest",
-        output_path,
+        partial,
     ]
-    p = subprocess.run(cmd, capture_output=True, text=True)
-    if p.returncode != 0:
-        err = (p.stderr or p.stdout or "").strip()[-2000:]
-        return False, err
-    return True, "ok"
+    ok, msg = run_ffmpeg(cmd, on_progress=on_progress, cancel=cancel)
+    return finish_partial_output(partial, output_path, ok), msg
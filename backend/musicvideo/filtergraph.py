@@ -0,0 +1,102 @@
+"""Single-pass assembly of a music video.
+
+The per-clip path writes three intermediates per job (interpolated clip,
+normalized 1080p clip, stitched video) and re-encodes every frame twice
+before the final stream copy. When the inputs allow it, compile_assembly()
+builds one ffmpeg invocation instead:
+
+    [0:v] minterpolate / fps, scale+pad, setsar [v0]
+    [1:v] ...                                   [v1]
+    [v0][v1]...concat=n=N:v=1:a=0               [vout]
+    -map [vout] -map N:a:0  (libx264 + aac, -shortest)
+
+so every generated clip is decoded once and encoded once, straight into
+the final file.
+
+single_pass_unsupported() names what rules it out: an interpolation engine
+that is not an ffmpeg filter (RIFE runs as its own binary) or more clips
+than one invocation should hold open (MV_SINGLE_PASS_MAX_CLIPS; every
+input keeps a decoder open and the graph must fit on a command line).
+"""
+
+from __future__ import annotations
+
+import os
+from typing import List, Optional
+
+from .ffmpeg_utils import normalize_filter
+from .interpolation import minterpolate_filter
+
+DEFAULT_MAX_CLIPS = 64
+
+_NO_INTERPOLATION = {"none", "off", "false", "0"}
+
+
+def max_single_pass_clips() -> int:
+    try:
+        return max(1, int(os.environ.get("MV_SINGLE_PASS_MAX_CLIPS") or DEFAULT_MAX_CLIPS))
+    except ValueError:
+        return DEFAULT_MAX_CLIPS
+
+
+def single_pass_unsupported(clip_count: int, interpolate: bool, engine: str) -> Optional[str]:
+    """Why these inputs need the per-clip path, or None if one pass can assemble them"""
+    if clip_count < 1:
+        return "no clips"
+    if clip_count > max_single_pass_clips():
+        return f"{clip_count} clips exceed MV_SINGLE_PASS_MAX_CLIPS={max_single_pass_clips()}"
+    if interpolate and engine == "rife":
+        return "RIFE interpolation runs outside ffmpeg"
+    return None
+
+
+def clip_filter(index: int, width: int, height: int, fps: int, interpolate: bool, engine: str) -> str:
+    """Filter chain taking input `index` to a normalized, concat-ready segment [v{index}]"""
+    steps = []
+    if interpolate and engine not in _NO_INTERPOLATION:
+        steps.append(minterpolate_filter(fps))
+    steps.append(normalize_filter(width, height, fps))
+    # concat requires identical sample aspect ratios; restart each segment's clock at 0
+    steps.append("setsar=1,setpts=PTS-STARTPTS")
+    return f"[{index}:v]{','.join(steps)}[v{index}]"
+
+
+def compile_assembly(
+    clips: List[str],
+    audio_path: str,
+    output_path: str,
+    width: int,
+    height: int,
+    fps: int,
+    interpolate: bool = False,
+    engine: str = "ffmpeg-minterpolate",
+    crf: int = 18,
+    preset: str = "medium",
+) -> List[str]:
+    """ffmpeg arguments (without the executable) assembling clips + audio in one pass"""
+    reason = single_pass_unsupported(len(clips), interpolate, engine)
+    if reason:
+        raise ValueError(f"Single-pass assembly not possible: {reason}")
+
+    args: List[str] = ["-y"]
+    for clip in clips:
+        args += ["-i", clip]
+    args += ["-i", audio_path]
+
+    chains = [clip_filter(i, width, height, fps, interpolate, engine) for i in range(len(clips))]
+    segments = "".join(f"[v{i}]" for i in range(len(clips)))
+    chains.append(f"{segments}concat=n={len(clips)}:v=1:a=0[vout]")
+
+    args += [
+        "-filter_complex", ";".join(chains),
+        "-map", "[vout]",
+        "-map", f"{len(clips)}:a:0",
+        # concat does not carry the segments' frame rate to the encoder
+        "-r", str(fps),
+        "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+        "-c:a", "aac",
+        "-shortest",
+        "-movflags", "+faststart",
+        output_path,
+    ]
+    return args
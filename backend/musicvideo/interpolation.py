@@ -15,18 +15,28 @@ The MV pipeline can be configured via env:
 from __future__ import annotations
 
 import os
-import shutil
-import subprocess
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
+from .ffmpeg_utils import CancelCheck, ProgressCallback, run_ffmpeg, which_ffmpeg
 
-def _ffmpeg() -> str | None:
-    return shutil.which("ffmpeg")
 
+def interpolation_engine() -> str:
+    return (os.environ.get("MV_INTERPOLATION_ENGINE") or "ffmpeg-minterpolate").strip().lower()
 
-def interpolate_to_fps(input_path: str, output_path: str, target_fps: int) -> Tuple[bool, str]:
-    engine = (os.environ.get("MV_INTERPOLATION_ENGINE") or "ffmpeg-minterpolate").strip().lower()
+
+def minterpolate_filter(target_fps: int) -> str:
+    return f"minterpolate=fps={int(target_fps)}:mi_mode=mci:mc_mode=aobmc:me_mode=bidir:vsbmc=1"
+
+
+def interpolate_to_fps(
+    input_path: str,
+    output_path: str,
+    target_fps: int,
+    on_progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelCheck] = None,
+) -> Tuple[bool, str]:
+    engine = interpolation_engine()
 
     if engine in {"none", "off", "false", "0"}:
         return False, "interpolation disabled"
@@ -41,18 +51,14 @@ def interpolate_to_fps(input_path: str, output_path: str, target_fps: int) -> Tu
         return False, "RIFE engine requested but no supported invocation configured"
 
     # Default: ffmpeg minterpolate
-    ffmpeg = _ffmpeg()
-    if not ffmpeg:
+    if not which_ffmpeg():
         return False, "ffmpeg not found in PATH"
 
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
-    vf = (
-        f"minterpolate=fps={int(target_fps)}:mi_mode=mci:mc_mode=aobmc:me_mode=bidir:vsbmc=1"
-    )
+    vf = minterpolate_filter(target_fps)
 
     cmd = [
-        ffmpeg,
         "-y",
         "-i",
         input_path,
@@ -68,8 +74,4 @@ def interpolate_to_fps(input_path: str, output_path: str, target_fps: int) -> Tu
         output_path,
     ]
 
-    p = subprocess.run(cmd, capture_output=True, text=True)
-    if p.returncode != 0:
-        err = (p.stderr or p.stdout or "").strip()[-2000:]
-        return False, err
-    return True, "ok"
\ No newline at end of file
+    return run_ffmpeg(cmd, on_progress=on_progress, cancel=cancel)
\ No newline at end of file
@@ -0,0 +1,313 @@
+"""Music Video job store and progress bus.
+
+Job updates used to rewrite the whole jobs JSON file on every call, and
+every running job kept a heartbeat thread nudging its progress. The bus
+keeps jobs in memory and:
+
+- coalesces updates: a job updated many times between flushes is written
+  once, as one line of an append-only journal (status changes flush at
+  once so a crash never loses a finished/failed state)
+- compacts the journal into the JSON snapshot once it grows, and on load
+  replays journal lines over the snapshot (a torn last line is ignored)
+- pushes changes to subscribers (SSE streams) on their event loops; a slow
+  client only ever sees the latest state of each job, without the bulky
+  fields named in stream_omit (fetch the job itself for those)
+- runs registered tickers (e.g. a job's progress nudge) from its single
+  flusher thread, so thread count does not grow with jobs or scenes
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import os
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+_DELETED = object()
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, job_id: Optional[str]):
+        self.loop = loop
+        self.job_id = job_id
+        self.event = asyncio.Event()
+        self.lock = threading.Lock()
+        # job id -> latest job dict (or None when deleted), drained by stream()
+        self.pending: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def offer(self, job_id: str, job: Optional[Dict[str, Any]]) -> None:
+        with self.lock:
+            self.pending[job_id] = job
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            # Loop closed; the stream's finally block unsubscribes
+            pass
+
+    def drain(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        self.event.clear()
+        return pending
+
+
+class JobProgressBus:
+    """
+        bus = JobProgressBus(".../musicvideo_jobs.json")
+        bus.load()
+        bus.update(job_id, stage="animating", progress=42.0)
+        async for changes in bus.stream(job_id): ...   # SSE
+    """
+
+    def __init__(
+        self,
+        snapshot_path: str,
+        journal_path: Optional[str] = None,
+        flush_interval: float = 1.0,
+        compact_after: int = 1000,
+        stream_omit: Iterable[str] = (),
+    ):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or f"{os.path.splitext(snapshot_path)[0]}.journal"
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
+        self.stream_omit = frozenset(stream_omit)
+
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._dirty: Dict[str, Any] = {}
+        self._journal_lines = 0
+        self._subscribers: List[_Subscriber] = []
+        self._tickers: Dict[int, Callable[[], None]] = {}
+        self._next_ticker = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def load(self) -> None:
+        """Read the snapshot, replay the journal over it and compact"""
+        jobs: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if isinstance(data, dict):
+                jobs.update(data)
+        except (OSError, ValueError):
+            pass
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash mid-flush
+                        continue
+                    job_id = entry.get("id")
+                    if not job_id:
+                        continue
+                    if entry.get("deleted"):
+                        jobs.pop(job_id, None)
+                    else:
+                        jobs.setdefault(job_id, {"id": job_id}).update(entry.get("set") or {})
+        except OSError:
+            pass
+        with self.lock:
+            self.jobs.clear()
+            self.jobs.update(jobs)
+        self.compact()
+
+    def flush(self) -> None:
+        """Append coalesced changes to the journal"""
+        with self._io_lock:
+            with self.lock:
+                dirty, self._dirty = self._dirty, {}
+            if not dirty:
+                return
+            lines = []
+            for job_id, patch in dirty.items():
+                if patch is _DELETED:
+                    lines.append(json.dumps({"id": job_id, "deleted": True}))
+                else:
+                    lines.append(json.dumps({"id": job_id, "set": patch}, default=str))
+            try:
+                os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+                with open(self.journal_path, "a", encoding="utf-8") as fh:
+                    fh.write("\n".join(lines) + "\n")
+                self._journal_lines += len(lines)
+            except OSError:
+                return
+        if self._journal_lines >= self.compact_after:
+            self.compact()
+
+    def compact(self) -> None:
+        """Write all jobs to the snapshot and truncate the journal"""
+        with self._io_lock:
+            with self.lock:
+                # Everything dirty is in the snapshot below
+                self._dirty = {}
+                data = json.dumps(self.jobs, default=str)
+            tmp = f"{self.snapshot_path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as fh:
+                    fh.write(data)
+                os.replace(tmp, self.snapshot_path)
+                with open(self.journal_path, "w", encoding="utf-8"):
+                    pass
+                self._journal_lines = 0
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+    def update(self, job_id: str, **updates: Any) -> Dict[str, Any]:
+        """Merge updates into a job (created if missing) and publish it"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            created = job is None
+            if created:
+                job = self.jobs[job_id] = {"id": job_id}
+            urgent = created or ("status" in updates and updates["status"] != job.get("status"))
+            job.update(updates)
+            patch = self._dirty.get(job_id)
+            if patch is _DELETED:
+                # Re-created before its delete was journaled: write it whole so
+                # replay does not merge it into the old record
+                self._dirty[job_id] = dict(job)
+            else:
+                if patch is None:
+                    patch = self._dirty[job_id] = {}
+                patch.update(updates)
+            published = dict(job)
+        if created or not self.stream_omit.issuperset(updates):
+            self._publish(job_id, published)
+        self._ensure_thread()
+        if urgent:
+            self.flush()
+        return published
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if isinstance(job, dict) else None
+
+    def values(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return [dict(j) for j in self.jobs.values() if isinstance(j, dict)]
+
+    def delete(self, job_id: str) -> bool:
+        with self.lock:
+            if job_id not in self.jobs:
+                return False
+            self.jobs.pop(job_id, None)
+            self._dirty[job_id] = _DELETED
+        self._publish(job_id, None)
+        self.flush()
+        return True
+
+    # ------------------------------------------------------------------
+    # Tickers and the flusher thread
+    # ------------------------------------------------------------------
+    def add_ticker(self, fn: Callable[[], None]) -> int:
+        """Call fn about once per flush_interval until remove_ticker(token)"""
+        with self.lock:
+            self._next_ticker += 1
+            token = self._next_ticker
+            self._tickers[token] = fn
+        self._ensure_thread()
+        return token
+
+    def remove_ticker(self, token: int) -> None:
+        with self.lock:
+            self._tickers.pop(token, None)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self.lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="mv-job-bus", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self.lock:
+                tickers = list(self._tickers.values())
+            for fn in tickers:
+                try:
+                    fn()
+                except Exception:
+                    pass
+            self.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+    def _streamed(self, job: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if job is None:
+            return None
+        return {k: v for k, v in job.items() if k not in self.stream_omit}
+
+    def _publish(self, job_id: str, job: Optional[Dict[str, Any]]) -> None:
+        with self.lock:
+            subscribers = [s for s in self._subscribers if s.job_id in (None, job_id)]
+        if not subscribers:
+            return
+        job = self._streamed(job)
+        for sub in subscribers:
+            sub.offer(job_id, job)
+
+    def subscriber_count(self) -> int:
+        with self.lock:
+            return len(self._subscribers)
+
+    async def stream(
+        self,
+        job_id: Optional[str] = None,
+        heartbeat: float = 15.0,
+        min_interval: float = 0.25,
+    ) -> AsyncIterator[Optional[Dict[str, Optional[Dict[str, Any]]]]]:
+        """
+        Yield {job_id: job or None (deleted)} batches, starting with the
+        current state of the job (or all jobs). Updates arriving within
+        min_interval of each other are merged. Yields None after heartbeat
+        seconds of inactivity so transports can send keep-alives.
+        """
+        sub = _Subscriber(asyncio.get_running_loop(), job_id)
+        with self.lock:
+            self._subscribers.append(sub)
+            if job_id is None:
+                initial = {jid: self._streamed(j) for jid, j in self.jobs.items() if isinstance(j, dict)}
+            else:
+                initial = {job_id: self._streamed(self.get(job_id))}
+        try:
+            yield initial
+            while True:
+                try:
+                    await asyncio.wait_for(sub.event.wait(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                await asyncio.sleep(min_interval)
+                changes = sub.drain()
+                if changes:
+                    yield changes
+        finally:
+            with self.lock:
+                self._subscribers = [s for s in self._subscribers if s is not sub]
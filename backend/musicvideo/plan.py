@@ -0,0 +1,75 @@
+"""Scene plans carried from one music-video job to a rerun.
+
+A plan is the list of scenes (start/end, section, seed and an optional
+prompt override) plus the analysis it was derived from. Reusing it on a
+retry keeps every unchanged scene's generate cache key, and with it the
+keys of its interpolate/transcode outputs (they hash the generated clip), so
+only edited scenes render again.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, Mapping, Optional
+
+# Job fields the worker reads instead of re-analyzing when reuse_plan is set
+PLAN_JOB_FIELDS = ("bpm", "mood", "theme", "analysis")
+# Scene fields that define what gets rendered (progress fields are not carried over)
+PLAN_SCENE_FIELDS = ("index", "start", "end", "section", "seed", "prompt")
+
+
+def generate_cache_params(
+    prompt: str,
+    negative_prompt: str,
+    seed: int,
+    backend: str,
+    duration_s: float,
+    fps: int,
+    **backend_params: Any,
+) -> Dict[str, Any]:
+    """RenderCache params of a scene's "generate" stage"""
+    params = {
+        "prompt": prompt,
+        "negative_prompt": negative_prompt,
+        "seed": seed,
+        "backend": backend,
+        "duration_s": round(duration_s, 3),
+        "fps": fps,
+    }
+    params.update(backend_params)
+    return params
+
+
+def retry_plan(source_job: Mapping[str, Any], scene_prompts: Optional[Mapping[Any, str]] = None) -> Dict[str, Any]:
+    """Job fields that make a retry reuse source_job's scene plan.
+
+    scene_prompts maps scene index (int or numeric string) to a new prompt;
+    an empty prompt reverts that scene to the generated default. Returns {}
+    when the source job never got as far as planning (a fresh run is needed).
+    Raises ValueError for edits that do not name a planned scene.
+    """
+    scenes = source_job.get("scenes") or []
+    if not scenes or any(sc.get("seed") is None for sc in scenes):
+        if scene_prompts:
+            raise ValueError("Source job has no scene plan to edit")
+        return {}
+
+    planned = [{k: copy.deepcopy(sc[k]) for k in PLAN_SCENE_FIELDS if k in sc} for sc in scenes]
+    for key, prompt in (scene_prompts or {}).items():
+        try:
+            index = int(key)
+        except (TypeError, ValueError):
+            raise ValueError(f"Scene index {key!r} is not a number") from None
+        if not 0 <= index < len(planned):
+            raise ValueError(f"Scene index {index} out of range (0-{len(planned) - 1})")
+        prompt = str(prompt or "").strip()
+        if prompt:
+            planned[index]["prompt"] = prompt
+        else:
+            planned[index].pop("prompt", None)
+
+    fields: Dict[str, Any] = {"scenes": planned, "reuse_plan": True}
+    for name in PLAN_JOB_FIELDS:
+        if source_job.get(name) is not None:
+            fields[name] = copy.deepcopy(source_job[name])
+    return fields
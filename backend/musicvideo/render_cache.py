@@ -0,0 +1,183 @@
+"""Content-addressed render cache for Music Video pipeline stages.
+
+Every stage output (generated clip, interpolated clip, transcoded clip) is
+stored under a key hashing everything that determines it: the prompt,
+seed, backend, duration and fps for generation, and the content hash of
+the source clip plus the ffmpeg settings for the later stages. Re-running a
+job where only some scenes changed reuses the unchanged clips from disk; a
+changed generated clip changes its source hash, so only its own
+interpolation/transcode are redone.
+
+Layout: <root>/<stage>/<key[:2]>/<key>.mp4 (+ .json with the key params).
+Entries are reflinked (copy-on-write clones, on filesystems that support
+them) or copied in and out of the cache, never hard-linked: the ffmpeg
+helpers write their outputs in place with -y, and an output sharing an
+inode with a cache entry would overwrite the entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+CACHE_VERSION = 1
+
+_digest_lock = threading.Lock()
+_digest_memo: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's content, memoized by (path, size, mtime)"""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _digest_lock:
+        cached = _digest_memo.get(memo_key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _digest_lock:
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# linux/fs.h FICLONE: share extents copy-on-write (btrfs, xfs, ...)
+_FICLONE = 0x40049409
+
+
+def _reflink(src: str, dst: str) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        _remove(dst)
+        return False
+
+
+def _clone_or_copy(src: str, dst: str) -> None:
+    """Give dst its own inode with src's content"""
+    Path(dst).parent.mkdir(parents=True, exist_ok=True)
+    _remove(dst)
+    if not _reflink(src, dst):
+        shutil.copyfile(src, dst)
+
+
+class RenderCache:
+    """
+        cache = RenderCache(MEDIA_ROOT / "_cache" / "musicvideo")
+        out = cache.render("transcode", {"source": file_digest(src), "crf": 18, ...},
+                           "clip_000_1080p.mp4", lambda: run_ffmpeg(...))
+        out == {"path": "clip_000_1080p.mp4", "cached": True | False, "key": "..."}
+    """
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = Path(root)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(stage: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps({"v": CACHE_VERSION, "stage": stage, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry(self, stage: str, key: str) -> Path:
+        return self.root / stage / key[:2] / f"{key}.mp4"
+
+    def fetch(self, stage: str, key: str, output_path: str) -> bool:
+        """Materialize a cached entry at output_path; False on a miss"""
+        if not self.enabled:
+            return False
+        entry = self._entry(stage, key)
+        if not entry.is_file() or entry.stat().st_size == 0:
+            return False
+        _clone_or_copy(str(entry), output_path)
+        # Recently used entries survive prune()
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return True
+
+    def store(self, stage: str, key: str, path: str, params: Optional[Dict[str, Any]] = None) -> None:
+        if not self.enabled or not os.path.isfile(path):
+            return
+        entry = self._entry(stage, key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            _clone_or_copy(path, str(tmp))
+            os.replace(tmp, entry)
+            with open(entry.with_suffix(".json"), "w", encoding="utf-8") as fh:
+                json.dump({"stage": stage, "params": params, "stored_at": time.time()}, fh, default=str)
+        except OSError:
+            _remove(str(tmp))
+
+    def render(
+        self,
+        stage: str,
+        params: Dict[str, Any],
+        output_path: str,
+        render: Callable[[], Optional[str]],
+    ) -> Dict[str, Any]:
+        """
+        Reuse the cached output for params, or run render() and cache its
+        result. render() writes output_path (or returns the path it wrote
+        instead) and raises on failure.
+        """
+        key = self.key(stage, params)
+        if self.fetch(stage, key, output_path):
+            self.hits += 1
+            return {"path": output_path, "cached": True, "key": key}
+        self.misses += 1
+        _remove(output_path)
+        produced = render() or output_path
+        if not os.path.isfile(produced):
+            raise RuntimeError(f"{stage} produced no output at {produced}")
+        self.store(stage, key, produced, params)
+        return {"path": produced, "cached": False, "key": key}
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.root.rglob("*.mp4") if p.is_file())
+
+    def prune(self, max_bytes: int) -> int:
+        """Delete least recently used entries until the cache fits max_bytes; returns entries removed"""
+        entries = []
+        for p in self.root.rglob("*.mp4"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= max_bytes:
+                break
+            _remove(str(p))
+            _remove(str(p.with_suffix(".json")))
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,274 @@
+"""Job DAG executor for the Music Video pipeline.
+
+A music video is a graph of small steps: every scene is generated
+(ComfyUI / cloud), optionally interpolated and then transcoded, and the
+transcoded clips are concatenated and muxed with the audio. Running the
+scenes one after another leaves the GPU idle while ffmpeg works and ffmpeg
+idle while the GPU renders. DagScheduler runs every node whose dependencies
+are done, with a concurrency limit per resource class:
+
+- "generate": ComfyUI / cloud generation (usually 1-2 at a time)
+- "cpu": ffmpeg interpolation and transcoding
+- "io": concat / mux (stream copies, mostly disk bound)
+
+so scene N+1 generates while scene N interpolates and transcodes.
+
+Failed nodes are retried on their own (with backoff) up to max_attempts.
+Node state is written to a JSON file after every transition; a scheduler
+created over the same file skips nodes that already finished (and whose
+output still exists), so a job interrupted by a crash resumes mid-way.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+RESOURCE_CLASSES = ("generate", "cpu", "io")
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+@dataclass
+class DagNode:
+    """One step of a job. fn() returns a JSON-serializable dict or raises."""
+
+    id: str
+    resource: str
+    fn: Callable[[], Dict[str, Any]]
+    deps: List[str] = field(default_factory=list)
+    max_attempts: int = 1
+    # Lower runs first among ready nodes of the same resource class (e.g. scene index)
+    priority: float = 0.0
+    status: str = PENDING
+    attempts: int = 0
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "resource": self.resource,
+            "deps": list(self.deps),
+            "status": self.status,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _outputs_exist(node: DagNode, result: Optional[Dict[str, Any]]) -> bool:
+    path = (result or {}).get("path")
+    return not path or os.path.exists(str(path))
+
+
+class DagScheduler:
+    """
+    Run DagNodes with bounded concurrency per resource class.
+
+        scheduler = DagScheduler(nodes, limits={"generate": 1, "cpu": 2, "io": 1},
+                                 state_path=".../dag_state.json", cancel=lambda: job_cancelled())
+        summary = scheduler.run()   # {"status": "completed" | "failed" | "cancelled", ...}
+
+    A node failing after all its attempts stops new nodes from starting
+    (running ones finish), since every music video node feeds the output.
+    """
+
+    def __init__(
+        self,
+        nodes: List[DagNode],
+        limits: Optional[Dict[str, int]] = None,
+        state_path: Optional[str] = None,
+        cancel: Optional[Callable[[], bool]] = None,
+        on_update: Optional[Callable[["DagScheduler", DagNode], None]] = None,
+        retry_backoff_s: float = 2.0,
+        is_complete: Callable[[DagNode, Optional[Dict[str, Any]]], bool] = _outputs_exist,
+    ):
+        self.nodes: Dict[str, DagNode] = {}
+        for node in nodes:
+            if node.id in self.nodes:
+                raise ValueError(f"Duplicate node id: {node.id}")
+            if node.resource not in RESOURCE_CLASSES:
+                raise ValueError(f"Unknown resource class for {node.id}: {node.resource}")
+            self.nodes[node.id] = node
+        for node in nodes:
+            missing = [d for d in node.deps if d not in self.nodes]
+            if missing:
+                raise ValueError(f"{node.id} depends on unknown nodes: {missing}")
+        self._check_acyclic()
+
+        self.limits = {r: max(1, int((limits or {}).get(r, 1))) for r in RESOURCE_CLASSES}
+        self.state_path = state_path
+        self.cancel = cancel or (lambda: False)
+        self.on_update = on_update
+        self.retry_backoff_s = retry_backoff_s
+        self._lock = threading.Lock()
+        self._retry_at: Dict[str, float] = {}
+        if state_path:
+            self._load_state(is_complete)
+
+    def _check_acyclic(self) -> None:
+        visiting, visited = set(), set()
+
+        def visit(node_id: str) -> None:
+            if node_id in visited:
+                return
+            if node_id in visiting:
+                raise ValueError(f"Dependency cycle through {node_id}")
+            visiting.add(node_id)
+            for dep in self.nodes[node_id].deps:
+                visit(dep)
+            visiting.discard(node_id)
+            visited.add(node_id)
+
+        for node_id in self.nodes:
+            visit(node_id)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load_state(self, is_complete) -> None:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as fh:
+                saved = json.load(fh).get("nodes") or {}
+        except (OSError, ValueError):
+            return
+        for node_id, state in saved.items():
+            node = self.nodes.get(node_id)
+            if node is None or state.get("status") != DONE:
+                continue
+            if is_complete(node, state.get("result")):
+                node.status = DONE
+                node.result = state.get("result")
+                node.attempts = int(state.get("attempts") or 1)
+                node.started_at = state.get("started_at")
+                node.finished_at = state.get("finished_at")
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        with self._lock:
+            data = {"updated_at": time.time(), "nodes": {n.id: n.to_dict() for n in self.nodes.values()}}
+        tmp = f"{self.state_path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, self.state_path)
+        except OSError:
+            pass
+
+    def _changed(self, node: DagNode) -> None:
+        self._save_state()
+        if self.on_update:
+            try:
+                self.on_update(self, node)
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    def counts(self) -> Dict[str, int]:
+        """Number of nodes per status"""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for node in self.nodes.values():
+                counts[node.status] = counts.get(node.status, 0) + 1
+            return counts
+
+    def result(self, node_id: str) -> Optional[Dict[str, Any]]:
+        return self.nodes[node_id].result
+
+    def _ready(self, running: Dict[str, int], now: float) -> List[DagNode]:
+        ready = []
+        for node in self.nodes.values():
+            if node.status != PENDING or self._retry_at.get(node.id, 0) > now:
+                continue
+            if all(self.nodes[d].status == DONE for d in node.deps):
+                ready.append(node)
+        ready.sort(key=lambda n: (n.priority, n.id))
+        picked = []
+        for node in ready:
+            if running[node.resource] < self.limits[node.resource]:
+                running[node.resource] += 1
+                picked.append(node)
+        return picked
+
+    def _run_node(self, node: DagNode) -> Dict[str, Any]:
+        result = node.fn()
+        return result if isinstance(result, dict) else {"value": result}
+
+    def run(self) -> Dict[str, Any]:
+        running: Dict[str, int] = {r: 0 for r in RESOURCE_CLASSES}
+        futures: Dict[Future, DagNode] = {}
+        stopping: Optional[str] = None
+        workers = sum(self.limits.values())
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mv-dag") as pool:
+            while True:
+                if stopping is None and self.cancel():
+                    stopping = "cancelled"
+                if stopping is None:
+                    for node in self._ready(running, time.time()):
+                        with self._lock:
+                            node.status = RUNNING
+                            node.attempts += 1
+                            node.started_at = time.time()
+                            node.error = None
+                        futures[pool.submit(self._run_node, node)] = node
+                        self._changed(node)
+
+                if not futures:
+                    pending = [n for n in self.nodes.values() if n.status == PENDING]
+                    if stopping or not pending:
+                        break
+                    # Only nodes waiting out a retry backoff remain
+                    wake = min(self._retry_at.get(n.id, 0) for n in pending)
+                    time.sleep(min(0.5, max(0.0, wake - time.time())))
+                    continue
+
+                done, _ = wait(list(futures), timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = futures.pop(future)
+                    running[node.resource] -= 1
+                    error = future.exception()
+                    with self._lock:
+                        node.finished_at = time.time()
+                        if error is None:
+                            node.status = DONE
+                            node.result = future.result()
+                        elif node.attempts < node.max_attempts:
+                            node.status = PENDING
+                            node.error = str(error)[:800]
+                            self._retry_at[node.id] = time.time() + self.retry_backoff_s * (2 ** (node.attempts - 1))
+                        else:
+                            node.status = FAILED
+                            node.error = str(error)[:800]
+                            stopping = stopping or "failed"
+                    self._changed(node)
+
+        with self._lock:
+            for node in self.nodes.values():
+                if node.status == PENDING:
+                    node.status = SKIPPED
+            failed = [n.id for n in self.nodes.values() if n.status == FAILED]
+        self._save_state()
+        status = "completed" if not failed and stopping is None else (stopping or "failed")
+        return {
+            "status": status,
+            "failed": failed,
+            "errors": {n: self.nodes[n].error for n in failed},
+            "counts": self.counts(),
+        }
@@ -15,6 +15,7 @@ Exposes AI-assisted Canvas capabilities:
 """
 
 from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
 import logging
@@ -115,7 +116,7 @@ async def ai_discuss(request: DiscussRequest):
     """
     try:
         position = request.position.dict() if request.position else None
-        result = canvas_ai_assist.discuss(request.topic, position)
+        result = await run_in_threadpool(canvas_ai_assist.discuss, request.topic, position)
         commands = canvas_controller.get_pending_commands()
         return {**result, "commands": commands}
     except Exception as e:
@@ -132,7 +133,7 @@ async def ai_draw(request: DrawRequest):
     """
     try:
         position = request.position.dict() if request.position else None
-        result = canvas_ai_assist.draw(request.description, position)
+        result = await run_in_threadpool(canvas_ai_assist.draw, request.description, position)
         commands = canvas_controller.get_pending_commands()
         return {**result, "commands": commands}
     except Exception as e:
@@ -149,7 +150,8 @@ async def ai_plan(request: PlanRequest):
     """
     try:
         position = request.position.dict() if request.position else None
-        result = canvas_ai_assist.plan(
+        result = await run_in_threadpool(
+            canvas_ai_assist.plan,
             request.goal,
             request.steps,
             position
@@ -170,7 +172,8 @@ async def ai_design(request: DesignRequest):
     """
     try:
         position = request.position.dict() if request.position else None
-        result = canvas_ai_assist.design(
+        result = await run_in_threadpool(
+            canvas_ai_assist.design,
             request.design_type,
             request.specs,
             position
@@ -191,7 +194,8 @@ async def ai_brainstorm(request: BrainstormRequest):
     """
     try:
         position = request.position.dict() if request.position else None
-        result = canvas_ai_assist.brainstorm(
+        result = await run_in_threadpool(
+            canvas_ai_assist.brainstorm,
             request.central_idea,
             request.branches,
             position
@@ -213,7 +217,8 @@ async def ai_annotate(request: AnnotateRequest):
     Creates a labeled note box with AI insights.
     """
     try:
-        result = canvas_ai_assist.annotate(
+        result = await run_in_threadpool(
+            canvas_ai_assist.annotate,
             request.target,
             request.note,
             request.position.dict()
@@ -233,7 +238,8 @@ async def ai_highlight(request: HighlightRequest):
     Draws a semi-transparent highlight box.
     """
     try:
-        result = canvas_ai_assist.highlight(
+        result = await run_in_threadpool(
+            canvas_ai_assist.highlight,
             request.area.dict(),
             request.color
         )
@@ -253,7 +259,8 @@ async def ai_ask_question(request: AskQuestionRequest):
     """
     try:
         position = request.position.dict() if request.position else None
-        result = canvas_ai_assist.ask_question(
+        result = await run_in_threadpool(
+            canvas_ai_assist.ask_question,
             request.question,
             request.options,
             position
@@ -269,7 +276,8 @@ async def ai_ask_question(request: AskQuestionRequest):
 async def ai_floor_plan(request: CreateFloorPlanRequest):
     """Generate a technical floor plan."""
     try:
-        result = canvas_ai_assist.create_floor_plan(
+        result = await run_in_threadpool(
+            canvas_ai_assist.create_floor_plan,
             rooms=request.rooms,
             description=request.description,
             scale=request.scale
@@ -286,7 +294,8 @@ async def ai_visual(request: GenerateVisualRequest):
     """Generate a visual image."""
     try:
         position = request.position.dict() if request.position else None
-        result = canvas_ai_assist.generate_visual(
+        result = await run_in_threadpool(
+            canvas_ai_assist.generate_visual,
             prompt=request.prompt,
             position=position
         )
@@ -386,7 +395,7 @@ async def show_startup_note():
     Displays a small corner message indicating AI is ready.
     """
     try:
-        result = canvas_ai_assist.show_startup_note()
+        result = await run_in_threadpool(canvas_ai_assist.show_startup_note)
         if result is None:
             return {"success": True, "already_shown": True}
         return {"success": True, "command_id": result}
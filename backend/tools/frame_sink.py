@@ -0,0 +1,212 @@
+"""Frame sinks: stream generated video frames straight into an encoder.
+
+Procedural generators produce frames one at a time. Collecting them in a list
+for moviepy keeps the whole clip in RAM (duration x fps x width x height x 3
+bytes). An FfmpegPipeSink instead writes each frame as raw RGB to the stdin
+of an `ffmpeg -f rawvideo` process, so memory stays at one frame and ffmpeg
+encodes while the next frames are generated.
+
+    with open_frame_sink("out.mp4", 1280, 720, fps=24) as sink:
+        for frame in frames():
+            sink.write(frame)      # HxWx3 uint8 array or PIL RGB image
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Any, List, Optional
+
+
+def find_ffmpeg() -> Optional[str]:
+    """ffmpeg from PATH, else the binary bundled with imageio-ffmpeg (a moviepy dependency)."""
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+def frame_bytes(frame: Any, width: int, height: int) -> bytes:
+    """Raw rgb24 bytes of a frame, checking it matches the sink size."""
+    if hasattr(frame, "tobytes") and hasattr(frame, "mode"):
+        # PIL image
+        if frame.size != (width, height):
+            raise ValueError(f"Frame is {frame.size[0]}x{frame.size[1]}, expected {width}x{height}")
+        if frame.mode != "RGB":
+            frame = frame.convert("RGB")
+        return frame.tobytes()
+
+    shape = getattr(frame, "shape", None)
+    if shape != (height, width, 3):
+        raise ValueError(f"Frame shape {shape}, expected {(height, width, 3)}")
+    if str(frame.dtype) != "uint8":
+        raise ValueError(f"Frame dtype {frame.dtype}, expected uint8")
+    return frame.tobytes()
+
+
+class FrameSink(ABC):
+    """Accepts frames of a fixed size and produces a video file on close()."""
+
+    def __init__(self, output_path: str, width: int, height: int, fps: float):
+        self.output_path = str(output_path)
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = fps
+        self.frames_written = 0
+
+    @abstractmethod
+    def write(self, frame: Any) -> None:
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finish encoding; raises RuntimeError if the video could not be written."""
+
+    def abort(self) -> None:
+        """Stop without producing output."""
+
+    def __enter__(self) -> "FrameSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class FfmpegPipeSink(FrameSink):
+    """Encode frames with ffmpeg reading rawvideo from a pipe."""
+
+    def __init__(
+        self,
+        output_path: str,
+        width: int,
+        height: int,
+        fps: float,
+        codec: str = "libx264",
+        preset: str = "medium",
+        crf: int = 20,
+        pix_fmt: str = "yuv420p",
+        threads: Optional[int] = None,
+        extra_args: Optional[List[str]] = None,
+        ffmpeg: Optional[str] = None,
+    ):
+        super().__init__(output_path, width, height, fps)
+        ffmpeg = ffmpeg or find_ffmpeg()
+        if not ffmpeg:
+            raise RuntimeError("ffmpeg not found in PATH")
+        Path(self.output_path).parent.mkdir(parents=True, exist_ok=True)
+
+        cmd = [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "-s", f"{self.width}x{self.height}", "-r", str(fps),
+            "-i", "-",
+            "-an", "-c:v", codec, "-preset", preset, "-crf", str(crf), "-pix_fmt", pix_fmt,
+        ]
+        if threads:
+            cmd += ["-threads", str(threads)]
+        cmd += list(extra_args or []) + [self.output_path]
+        self.command = cmd
+
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        # Drain stderr so a chatty ffmpeg never blocks on a full pipe
+        self._stderr: deque = deque(maxlen=50)
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+
+    def _drain_stderr(self) -> None:
+        for line in iter(self._proc.stderr.readline, b""):
+            self._stderr.append(line.decode("utf-8", "replace").rstrip())
+
+    def _error(self) -> str:
+        self._stderr_thread.join(timeout=5)
+        return "\n".join(self._stderr)[-2000:] or f"ffmpeg exited with code {self._proc.returncode}"
+
+    def write(self, frame: Any) -> None:
+        data = frame_bytes(frame, self.width, self.height)
+        try:
+            self._proc.stdin.write(data)
+        except (BrokenPipeError, OSError):
+            self._proc.wait()
+            raise RuntimeError(f"ffmpeg stopped accepting frames: {self._error()}")
+        self.frames_written += 1
+
+    def close(self) -> None:
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        if self._proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed: {self._error()}")
+        self._stderr_thread.join(timeout=5)
+
+    def abort(self) -> None:
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+
+class ClipFrameSink(FrameSink):
+    """Fallback without an ffmpeg binary: buffer frames for moviepy's ImageSequenceClip."""
+
+    def __init__(self, output_path: str, width: int, height: int, fps: float,
+                 codec: str = "libx264", preset: str = "medium", crf: int = 20, threads: Optional[int] = None):
+        super().__init__(output_path, width, height, fps)
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+        self._frames: List[Any] = []
+
+    def write(self, frame: Any) -> None:
+        import numpy as np
+        frame_bytes(frame, self.width, self.height)
+        # Producers may reuse one buffer between frames (KenBurnsRenderer.frames)
+        self._frames.append(np.array(frame, copy=True))
+        self.frames_written += 1
+
+    def close(self) -> None:
+        from moviepy.editor import ImageSequenceClip
+
+        clip = ImageSequenceClip(self._frames, fps=self.fps)
+        try:
+            clip.write_videofile(
+                self.output_path,
+                fps=self.fps,
+                codec=self.codec,
+                audio=False,
+                preset=self.preset,
+                threads=self.threads,
+                ffmpeg_params=["-crf", str(self.crf)],
+                logger=None,
+            )
+        finally:
+            clip.close()
+            self._frames = []
+
+    def abort(self) -> None:
+        self._frames = []
+
+
+def open_frame_sink(output_path: str, width: int, height: int, fps: float, **kwargs) -> FrameSink:
+    """Streaming ffmpeg sink when an ffmpeg binary is available, else the moviepy fallback."""
+    ffmpeg = find_ffmpeg()
+    if ffmpeg:
+        return FfmpegPipeSink(output_path, width, height, fps, ffmpeg=ffmpeg, **kwargs)
+    kwargs.pop("pix_fmt", None)
+    kwargs.pop("extra_args", None)
+    return ClipFrameSink(output_path, width, height, fps, **kwargs)
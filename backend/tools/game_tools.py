@@ -15,6 +15,11 @@ from datetime import datetime
 
 import psutil
 
+from ..trainer.memory_backend import as_backend
+from ..trainer.memory_writer import write_batch
+from ..trainer.pattern_scanner import MultiPatternScanner, parse_pattern
+from ..trainer.scan_session import ScanCancelled, ScanSession
+
 
 def _unsafe_tools_enabled() -> bool:
     """Return True only when explicitly opted-in to unsafe capabilities.
@@ -152,12 +157,16 @@ class GameTrainer:
         self.process_id = None
         self.process_name = None
         self.attached = False
-        self.scan_results = []
+        self.scan_session = None
+        # One scan at a time owns scan_session; detach cancels it and waits for it
+        self.scan_lock = threading.Lock()
+        self.scan_abort = threading.Event()
         self.scan_history = []
         self.last_scan_type = None
         self.frozen_values = {}
         self.freeze_thread = None
         self.freeze_running = False
+        self.freeze_wake = threading.Event()
         self.modules = {}
         self.base_address = 0
         self.cheat_tables = {}
@@ -333,13 +342,20 @@ def deactivate():
 
     def detach_from_process(self) -> dict:
         self._stop_freeze_thread()
-        if self.process_handle: kernel32.CloseHandle(self.process_handle)
-        old = self.process_name
-        self.process_handle = self.process_id = self.process_name = None
-        self.attached = False
-        self.scan_results, self.modules, self.frozen_values = [], {}, {}
+        self.scan_abort.set()
+        with self.scan_lock:
+            self.scan_abort.clear()
+            if self.process_handle: kernel32.CloseHandle(self.process_handle)
+            old = self.process_name
+            self.process_handle = self.process_id = self.process_name = None
+            self.attached = False
+            if self.scan_session: self.scan_session.close()
+            self.scan_session, self.modules, self.frozen_values = None, {}, {}
         return {"success": True, "message": f"Detached from {old}"}
 
+    def _scan_cancel(self, cancel=None):
+        return lambda: self.scan_abort.is_set() or bool(cancel and cancel())
+
     def _enumerate_modules(self):
         if not self.attached: return
         self.modules = {}
@@ -378,17 +394,22 @@ def deactivate():
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    def _pack_value(self, value, data_type: str) -> bytes:
+        fmt = {'int': '<i', 'uint': '<I', 'short': '<h', 'ushort': '<H', 'byte': '<B',
+               'float': '<f', 'double': '<d', 'long': '<q', 'ulong': '<Q'}
+        if data_type == "bytes":
+            return bytes.fromhex(value.replace(" ", "")) if isinstance(value, str) else bytes(value)
+        if data_type in fmt:
+            return struct.pack(fmt[data_type], float(value) if 'float' in data_type or 'double' in data_type else int(value))
+        raise ValueError(f"Unknown type: {data_type}")
+
     def write_memory(self, address: int, value, data_type: str = "int") -> dict:
         if not self.attached: return {"success": False, "error": "Not attached"}
         try:
-            fmt = {'int': '<i', 'uint': '<I', 'short': '<h', 'ushort': '<H', 'byte': '<B',
-                   'float': '<f', 'double': '<d', 'long': '<q', 'ulong': '<Q'}
-            if data_type == "bytes":
-                buf = bytes.fromhex(value.replace(" ", "")) if isinstance(value, str) else bytes(value)
-            elif data_type in fmt:
-                buf = struct.pack(fmt[data_type], float(value) if 'float' in data_type or 'double' in data_type else int(value))
-            else:
-                return {"success": False, "error": f"Unknown type: {data_type}"}
+            try:
+                buf = self._pack_value(value, data_type)
+            except ValueError as e:
+                return {"success": False, "error": str(e)}
             old = wintypes.DWORD()
             kernel32.VirtualProtectEx(self.process_handle, ctypes.c_void_p(address), len(buf), PAGE_EXECUTE_READWRITE, ctypes.byref(old))
             written = ctypes.c_size_t()
@@ -412,83 +433,88 @@ def deactivate():
             addr = mbi.BaseAddress + mbi.RegionSize
         return regions
 
-    def scan_memory_for_value(self, value, data_type: str = "int", scan_type: str = "exact") -> dict:
+    def _read_region(self, base: int, size: int):
+        buf = ctypes.create_string_buffer(size)
+        read = ctypes.c_size_t()
+        if not kernel32.ReadProcessMemory(self.process_handle, ctypes.c_void_p(base), buf, size, ctypes.byref(read)):
+            return None
+        return buf.raw[:read.value]
+
+    def _scan_preview(self, limit: int = 100, offset: int = 0) -> list:
+        if not self.scan_session: return []
+        return [{"address": r["address"], "value": r["value"], "data_type": self.last_scan_type}
+                for r in self.scan_session.page(offset, limit)]
+
+    def scan_memory_for_value(self, value, data_type: str = "int", scan_type: str = "exact", alignment: int = 1,
+                              progress=None, cancel=None) -> dict:
+        """First scan ("exact", or "unknown" to snapshot every slot) in parallel chunks.
+
+        progress(done_bytes, total_bytes) and cancel() -> bool let a background job
+        report and stop the scan.
+        """
         if not self.attached: return {"success": False, "error": "Not attached"}
+        if not self.scan_lock.acquire(blocking=False): return self._scan_busy()
         try:
-            sizes = {"byte": 1, "short": 2, "ushort": 2, "int": 4, "uint": 4, "float": 4, "long": 8, "ulong": 8, "double": 8}
-            vsize = sizes.get(data_type, 4)
-            fmt = {'int': '<i', 'uint': '<I', 'short': '<h', 'ushort': '<H', 'byte': '<B', 'float': '<f', 'double': '<d', 'long': '<q', 'ulong': '<Q'}
-            search = struct.pack(fmt.get(data_type, '<i'), float(value) if 'float' in data_type or 'double' in data_type else int(value))
-            results, scanned = [], 0
-            for region in self._get_memory_regions():
-                try:
-                    buf = ctypes.create_string_buffer(region["size"])
-                    read = ctypes.c_size_t()
-                    if not kernel32.ReadProcessMemory(self.process_handle, ctypes.c_void_p(region["base"]), buf, region["size"], ctypes.byref(read)):
-                        continue
-                    scanned += read.value
-                    data = buf.raw[:read.value]
-                    if scan_type == "exact":
-                        off = 0
-                        while True:
-                            pos = data.find(search, off)
-                            if pos == -1: break
-                            results.append({"address": region["base"] + pos, "value": value, "data_type": data_type})
-                            off = pos + 1
-                            if len(results) >= 50000: break
-                except: continue
-                if len(results) >= 50000: break
-            self.scan_results, self.last_scan_type = results, data_type
-            self.scan_history.append({"time": datetime.now().isoformat(), "value": value, "count": len(results)})
-            return {"success": True, "count": len(results), "results": results[:100], "scanned_mb": round(scanned/(1024*1024), 2)}
+            if self.scan_session: self.scan_session.close()
+            self.scan_session = ScanSession(self.process_id, self._read_region, data_type, alignment=alignment)
+            self.last_scan_type = data_type
+            scanned = [0]
+            def on_progress(done, total):
+                scanned[0] = done
+                if progress: progress(done, total)
+            count = self.scan_session.first_scan(self._get_memory_regions(), None if scan_type == "unknown" else value,
+                                                 on_progress, self._scan_cancel(cancel))
+            self.scan_history.append({"time": datetime.now().isoformat(), "value": value, "count": count})
+            return {"success": True, "count": count, "results": self._scan_preview(100), "scanned_mb": round(scanned[0]/(1024*1024), 2)}
+        except ScanCancelled:
+            self.scan_session = None
+            return {"success": False, "cancelled": True, "error": "Scan cancelled"}
         except Exception as e:
             return {"success": False, "error": str(e)}
+        finally:
+            self.scan_lock.release()
 
-    def next_scan(self, new_value, scan_type: str = "exact") -> dict:
+    def next_scan(self, new_value, scan_type: str = "exact", progress=None, cancel=None) -> dict:
         if not self.attached: return {"success": False, "error": "Not attached"}
-        if not self.scan_results: return {"success": False, "error": "No previous scan"}
+        if not self.scan_lock.acquire(blocking=False): return self._scan_busy()
         try:
-            new_results = []
-            for entry in self.scan_results:
-                cur = self.read_memory(entry["address"], 4, self.last_scan_type)
-                if not cur["success"]: continue
-                cv, ov = cur["value"], entry["value"]
-                match = (scan_type == "exact" and cv == new_value) or \
-                        (scan_type == "changed" and cv != ov) or \
-                        (scan_type == "unchanged" and cv == ov) or \
-                        (scan_type == "increased" and cv > ov) or \
-                        (scan_type == "decreased" and cv < ov)
-                if match:
-                    new_results.append({"address": entry["address"], "value": cv, "previous": ov, "data_type": self.last_scan_type})
-            self.scan_results = new_results
-            return {"success": True, "count": len(new_results), "results": new_results[:100]}
+            if not self.scan_session: return {"success": False, "error": "No previous scan"}
+            count = self.scan_session.next_scan(scan_type, new_value, progress, self._scan_cancel(cancel))
+            return {"success": True, "count": count, "results": self._scan_preview(100)}
+        except ScanCancelled:
+            self.scan_session = None
+            return {"success": False, "cancelled": True, "error": "Scan cancelled"}
         except Exception as e:
             return {"success": False, "error": str(e)}
+        finally:
+            self.scan_lock.release()
+
+    def _scan_busy(self) -> dict:
+        return {"success": False, "busy": True, "error": "A scan is already running"}
 
-    def get_scan_results(self, limit: int = 100) -> dict:
-        """Get current scan results."""
+    def get_scan_results(self, limit: int = 100, offset: int = 0) -> dict:
+        """Get a page of current scan results."""
         if not self.attached:
             return {"success": False, "error": "Not attached to any process"}
-        return {
-            "success": True,
-            "count": len(self.scan_results),
-            "results": [
-                {"address": r["address"], "value": r["value"], "data_type": r.get("data_type", self.last_scan_type or "int")}
-                for r in self.scan_results[:limit]
-            ]
-        }
+        if not self.scan_lock.acquire(blocking=False): return self._scan_busy()
+        try:
+            return {
+                "success": True,
+                "count": self.scan_session.count if self.scan_session else 0,
+                "offset": offset,
+                "results": self._scan_preview(limit, offset),
+            }
+        finally:
+            self.scan_lock.release()
 
-    def aob_scan(self, pattern: str, module: str = None) -> dict:
+    def aob_scan(self, pattern, module: str = None) -> dict:
+        """Scan for one AOB pattern, or a list of them in a single pass over memory."""
         if not self.attached: return {"success": False, "error": "Not attached"}
         try:
-            parts = pattern.upper().split()
-            search, mask = [], []
-            for p in parts:
-                if p in ("??", "?"):
-                    search.append(0); mask.append(False)
-                else:
-                    search.append(int(p, 16)); mask.append(True)
-            results = []
+            patterns = [pattern] if isinstance(pattern, str) else list(pattern)
+            scanner = MultiPatternScanner(patterns)
+            found = {p: [] for p in scanner.patterns}
+            lengths = {p: len(parse_pattern(p)[0]) for p in scanner.patterns}
             regions = [{"base": self.modules[module]["base"], "size": self.modules[module]["size"]}] if module and module in self.modules else self._get_memory_regions()
             for region in regions:
                 try:
@@ -497,13 +523,16 @@ def deactivate():
                     if not kernel32.ReadProcessMemory(self.process_handle, ctypes.c_void_p(region["base"]), buf, region["size"], ctypes.byref(read)):
                         continue
                     data = buf.raw[:read.value]
-                    for i in range(len(data) - len(search) + 1):
-                        if all(not m or data[i+j] == s for j, (s, m) in enumerate(zip(search, mask))):
-                            results.append({"address": region["base"] + i, "bytes": ' '.join(f'{b:02X}' for b in data[i:i+len(search)])})
-                            if len(results) >= 1000: break
+                    for p, offsets in scanner.find_all(data).items():
+                        for i in offsets[:1000 - len(found[p])]:
+                            found[p].append({"address": region["base"] + i, "bytes": ' '.join(f'{b:02X}' for b in data[i:i+lengths[p]])})
                 except: continue
-                if len(results) >= 1000: break
-            return {"success": True, "pattern": pattern, "count": len(results), "results": results[:50]}
+                if all(len(r) >= 1000 for r in found.values()): break
+            if isinstance(pattern, str):
+                results = found[pattern]
+                return {"success": True, "pattern": pattern, "count": len(results), "results": results[:50]}
+            return {"success": True, "patterns": {p: {"count": len(r), "results": r[:50]} for p, r in found.items()},
+                    "count": sum(len(r) for r in found.values())}
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -543,32 +572,53 @@ def deactivate():
 
     def _stop_freeze_thread(self):
         self.freeze_running = False
+        self.freeze_wake.set()
         if self.freeze_thread: self.freeze_thread.join(timeout=1)
 
     def _freeze_loop(self):
+        # One read per page of frozen values; only values the game changed are
+        # rewritten. Ticks every 50 ms while the game fights back, backing off to
+        # 200 ms while it does not; freeze/unfreeze wake the loop immediately.
+        backend = as_backend(self.process_handle)
+        backoff = 1
         while self.freeze_running and self.attached:
+            frozen = []
             for addr, info in list(self.frozen_values.items()):
-                if not self.attached: break
-                self.write_memory(int(addr, 16), info["value"], info["type"])
-            time.sleep(0.05)
+                try: frozen.append((int(addr, 16), info, self._pack_value(info["value"], info["type"])))
+                except (ValueError, TypeError, struct.error): continue
+            if not frozen:
+                self.freeze_wake.wait(1.0)
+                self.freeze_wake.clear()
+                continue
+            result = write_batch(backend, [(address, data) for address, _, data in frozen])
+            for i in result["failed"]:
+                # e.g. read-only pages: write_memory lifts the protection first
+                address, info, _ = frozen[i]
+                self.write_memory(address, info["value"], info["type"])
+            backoff = 1 if result["written"] or result["failed"] else min(backoff * 2, 4)
+            self.freeze_wake.wait(0.05 * backoff)
+            self.freeze_wake.clear()
 
     def freeze_value(self, address: int, value, data_type: str = "int", name: str = None) -> dict:
         if not self.attached: return {"success": False, "error": "Not attached"}
         res = self.write_memory(address, value, data_type)
         if not res["success"]: return res
         self.frozen_values[hex(address)] = {"value": value, "type": data_type, "name": name or f"Value_{len(self.frozen_values)+1}"}
+        self.freeze_wake.set()
         return {"success": True, "message": f"Frozen {hex(address)} to {value}", "frozen_count": len(self.frozen_values)}
 
     def unfreeze_value(self, address: int) -> dict:
         addr = hex(address)
         if addr in self.frozen_values:
             del self.frozen_values[addr]
+            self.freeze_wake.set()
             return {"success": True, "message": f"Unfrozen {addr}"}
         return {"success": False, "error": "Not frozen"}
 
     def unfreeze_all(self) -> dict:
         c = len(self.frozen_values)
         self.frozen_values = {}
+        self.freeze_wake.set()
         return {"success": True, "message": f"Unfroze {c} values"}
 
     def list_frozen_values(self) -> dict:
@@ -577,7 +627,7 @@ def deactivate():
     def save_cheat_table(self, name: str, description: str = "") -> dict:
         try:
             table = {"name": name, "desc": description, "process": self.process_name, "created": datetime.now().isoformat(),
-                     "entries": [{"addr": hex(r["address"]), "val": r["value"], "type": r.get("data_type", "int")} for r in self.scan_results[:100]],
+                     "entries": [{"addr": hex(r["address"]), "val": r["value"], "type": r.get("data_type", "int")} for r in self._scan_preview(100)],
                      "frozen": dict(self.frozen_values)}
             path = os.path.join(self.tables_dir, f"{name.replace(' ', '_')}.json")
             with open(path, 'w') as f: json.dump(table, f, indent=2)
@@ -623,7 +673,7 @@ def deactivate():
     def get_status(self) -> dict:
         return {"attached": self.attached, "process": self.process_name, "pid": self.process_id,
                 "base": hex(self.base_address) if self.base_address else None, "modules": len(self.modules),
-                "results": len(self.scan_results), "frozen": len(self.frozen_values)}
+                "results": self.scan_session.count if self.scan_session else 0, "frozen": len(self.frozen_values)}
 
     def nop_instruction(self, address: int, length: int = 1) -> dict:
         return self.write_memory(address, "90" * length, "bytes")
@@ -17,6 +17,8 @@ from datetime import datetime
 from typing import List, Optional, Tuple, Dict, Any
 import logging
 
+from .frame_sink import find_ffmpeg, open_frame_sink
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -1147,6 +1149,8 @@ class MediaTools:
         duration_per_image: float = 1.0,
         transition: str = "crossfade",  # "none", "crossfade", "fade"
         transition_duration: float = 0.5,
+        quality: str = "high",  # "low", "medium", "high"
+        streaming: bool = True,
     ) -> Dict[str, Any]:
         """
         Concatenate images into a high-quality mp4 with optional transitions.
@@ -1159,129 +1163,158 @@ class MediaTools:
             duration_per_image: How long each image displays (seconds)
             transition: Transition type between images
             transition_duration: Duration of transition effect (seconds)
+            quality: Encoder tier; the x264 preset and threads also follow the host's core count
+            streaming: Decode images one at a time and stream them to ffmpeg
+                (False, or no ffmpeg binary: build moviepy clips in memory)
         """
         if not image_paths:
             return {"success": False, "error": "image_paths cannot be empty"}
         _lazy_import_video_libs()
         _lazy_import_image_libs()
-        if not VIDEO_LIBS_AVAILABLE or not IMAGE_LIBS_AVAILABLE:
+        streaming = streaming and bool(find_ffmpeg())
+        if not IMAGE_LIBS_AVAILABLE or not (streaming or VIDEO_LIBS_AVAILABLE):
             return {
                 "success": False,
                 "error": "Video libraries missing. Install: pip install moviepy numpy pillow",
             }
 
+        from .slideshow import encode_concat_slideshow, encoder_settings, fit_to_frame, slideshow_frames
+
         width, height = self._parse_resolution(resolution)
         
         try:
-            from moviepy.editor import concatenate_videoclips, CompositeVideoClip
-            
-            clips = []
-            print(f"[MediaTools] Processing {len(image_paths)} images...")
-            
-            for idx, path in enumerate(image_paths):
+            paths = []
+            for path in image_paths:
                 if not os.path.exists(path):
                     print(f"[MediaTools] Warning: Image not found, skipping: {path}")
                     continue
-                    
-                # Load and resize with HIGH QUALITY
-                img = Image.open(path).convert("RGB")
-                orig_w, orig_h = img.size
-                
-                # Calculate aspect-aware resize to fill frame
-                img_aspect = orig_w / orig_h
-                target_aspect = width / height
-                
-                if img_aspect > target_aspect:
-                    # Image is wider - fit height, crop width
-                    new_h = height
-                    new_w = int(height * img_aspect)
-                else:
-                    # Image is taller - fit width, crop height
-                    new_w = width
-                    new_h = int(width / img_aspect)
-                
-                # Use high-quality upscaling method
-                img = self._upscale_image_hq(img, new_w, new_h)
-                
-                # Center crop to exact dimensions
-                left = (new_w - width) // 2
-                top = (new_h - height) // 2
-                img = img.crop((left, top, left + width, top + height))
-                
-                img_array = np.array(img)
-                clip = ImageClip(img_array).set_duration(duration_per_image)
-                clips.append(clip)
-                
-                print(f"[MediaTools] Processed image {idx + 1}/{len(image_paths)}")
-            
-            if not clips:
+                paths.append(path)
+            if not paths:
                 return {"success": False, "error": "No valid images found"}
-            
-            # Apply transitions
-            if transition == "crossfade" and len(clips) > 1 and transition_duration > 0:
-                # Create crossfade effect
-                processed_clips = []
-                for i, clip in enumerate(clips):
-                    if i == 0:
-                        processed_clips.append(clip.crossfadeout(transition_duration))
-                    elif i == len(clips) - 1:
-                        processed_clips.append(clip.crossfadein(transition_duration))
-                    else:
-                        processed_clips.append(clip.crossfadein(transition_duration).crossfadeout(transition_duration))
-                
-                # Concatenate with overlap
-                final_clip = concatenate_videoclips(processed_clips, method="compose", padding=-transition_duration)
-            elif transition == "fade" and len(clips) > 1:
-                # Fade to black between clips
-                processed_clips = []
-                for clip in clips:
-                    processed_clips.append(clip.fadein(transition_duration).fadeout(transition_duration))
-                final_clip = concatenate_videoclips(processed_clips, method="compose")
-            else:
-                # No transition
-                final_clip = concatenate_videoclips(clips, method="compose")
-            
+            print(f"[MediaTools] Processing {len(paths)} images...")
+
+            def load(path: str) -> "Image.Image":
+                # Load and resize with HIGH QUALITY, aspect-aware fill and center crop
+                with Image.open(path) as img:
+                    return fit_to_frame(img, width, height, resize=self._upscale_image_hq)
+
+            loaded = [0]
+
+            def load_with_progress(path: str) -> "Image.Image":
+                img = load(path)
+                loaded[0] += 1
+                print(f"[MediaTools] Processed image {loaded[0]}/{len(paths)}")
+                return img
+
             output_file = (
                 Path(output_path)
                 if output_path
                 else self.video_output_dir / f"video_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.mp4"
             )
             output_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            print(f"[MediaTools] Encoding video...")
-            
-            final_clip.write_videofile(
-                str(output_file),
-                fps=fps,
-                codec="libx264",
-                audio=False,
-                preset="slow",  # Better quality encoding
-                bitrate="6000k",  # Good bitrate for quality
-                threads=4,
-                ffmpeg_params=["-crf", "20"],  # High quality
-                logger=None
-            )
-            final_clip.close()
-            for clip in clips:
-                clip.close()
-                
-            total_duration = duration_per_image * len(clips)
-            if transition == "crossfade" and len(clips) > 1:
-                total_duration -= transition_duration * (len(clips) - 1)
-                
+
+            blended = transition in ("crossfade", "fade") and len(paths) > 1 and transition_duration > 0
+            if not streaming:
+                mode = "moviepy"
+                encoder = encoder_settings(quality)
+                self._encode_slideshow_clips(
+                    [np.array(load_with_progress(p)) for p in paths], output_file, fps,
+                    duration_per_image, transition, transition_duration, encoder,
+                )
+                total_duration = duration_per_image * len(paths)
+                if transition == "crossfade" and len(paths) > 1:
+                    total_duration -= transition_duration * (len(paths) - 1)
+            elif blended:
+                # Frames are blended here and piped to ffmpeg; keep a core for this process
+                mode = "pipe"
+                encoder = encoder_settings(quality, reserve_cores=1)
+                print(f"[MediaTools] Encoding video ({encoder['preset']}, {encoder['threads']} threads)...")
+                with open_frame_sink(str(output_file), width, height, fps, **encoder) as sink:
+                    for frame in slideshow_frames(
+                        paths, load_with_progress, fps, duration_per_image, transition, transition_duration
+                    ):
+                        sink.write(frame)
+                total_duration = sink.frames_written / fps
+            else:
+                # No blending: ffmpeg's concat demuxer holds each image for its duration
+                mode = "concat"
+                encoder = encoder_settings(quality)
+                print(f"[MediaTools] Encoding video ({encoder['preset']}, {encoder['threads']} threads)...")
+                encode_concat_slideshow(
+                    paths, load_with_progress, str(output_file), fps, duration_per_image, find_ffmpeg(), encoder
+                )
+                total_duration = duration_per_image * len(paths)
+
             return {
                 "success": True,
                 "video_path": str(output_file),
-                "frame_count": len(clips),
+                "frame_count": len(paths),
                 "fps": fps,
                 "resolution": f"{width}x{height}",
                 "duration": total_duration,
                 "transition": transition,
+                "mode": mode,
+                "encoder": encoder,
             }
         except Exception as exc:
             import traceback
             return {"success": False, "error": str(exc), "traceback": traceback.format_exc()}
 
+    def _encode_slideshow_clips(
+        self,
+        frames: List[Any],
+        output_file: Path,
+        fps: int,
+        duration_per_image: float,
+        transition: str,
+        transition_duration: float,
+        encoder: Dict[str, Any],
+    ) -> None:
+        """Encode fitted frames with moviepy clips (holds every image in memory)"""
+        from moviepy.editor import concatenate_videoclips
+
+        clips = [ImageClip(frame).set_duration(duration_per_image) for frame in frames]
+
+        # Apply transitions
+        if transition == "crossfade" and len(clips) > 1 and transition_duration > 0:
+            # Create crossfade effect
+            processed_clips = []
+            for i, clip in enumerate(clips):
+                if i == 0:
+                    processed_clips.append(clip.crossfadeout(transition_duration))
+                elif i == len(clips) - 1:
+                    processed_clips.append(clip.crossfadein(transition_duration))
+                else:
+                    processed_clips.append(clip.crossfadein(transition_duration).crossfadeout(transition_duration))
+            
+            # Concatenate with overlap
+            final_clip = concatenate_videoclips(processed_clips, method="compose", padding=-transition_duration)
+        elif transition == "fade" and len(clips) > 1:
+            # Fade to black between clips
+            processed_clips = []
+            for clip in clips:
+                processed_clips.append(clip.fadein(transition_duration).fadeout(transition_duration))
+            final_clip = concatenate_videoclips(processed_clips, method="compose")
+        else:
+            # No transition
+            final_clip = concatenate_videoclips(clips, method="compose")
+
+        print(f"[MediaTools] Encoding video...")
+
+        final_clip.write_videofile(
+            str(output_file),
+            fps=fps,
+            codec="libx264",
+            audio=False,
+            preset=encoder["preset"],
+            threads=encoder["threads"],
+            ffmpeg_params=["-crf", str(encoder["crf"])],
+            logger=None
+        )
+        final_clip.close()
+        for clip in clips:
+            clip.close()
+
     def animate_image(
         self,
         image_path: str,
@@ -1294,7 +1327,8 @@ class MediaTools:
     ) -> Dict[str, Any]:
         """
         Create a high-quality Ken Burns style video from a single still image.
-        Uses frame-by-frame rendering with high-quality interpolation for crisp output.
+        Frames are sampled from a cached source pyramid (tools.kenburns) and
+        streamed to the encoder as they are rendered.
         
         Args:
             image_path: Path to source image
@@ -1307,7 +1341,8 @@ class MediaTools:
         """
         _lazy_import_video_libs()
         _lazy_import_image_libs()
-        if not VIDEO_LIBS_AVAILABLE or not IMAGE_LIBS_AVAILABLE:
+        # Frames stream to an ffmpeg pipe; moviepy is only needed without an ffmpeg binary
+        if not IMAGE_LIBS_AVAILABLE or not (find_ffmpeg() or VIDEO_LIBS_AVAILABLE):
             return {
                 "success": False,
                 "error": "Video libraries missing. Install: pip install moviepy numpy pillow",
@@ -1315,128 +1350,50 @@ class MediaTools:
         if not os.path.exists(image_path):
             return {"success": False, "error": f"Image not found: {image_path}"}
 
+        from .kenburns import KenBurnsRenderer, SourcePyramid, crop_windows, get_pyramid
+
         width, height = self._parse_resolution(resolution)
         
         try:
-            # Load and prepare the source image at HIGHER resolution for quality
-            base_image = Image.open(image_path).convert("RGB")
-            orig_w, orig_h = base_image.size
-            
-            print(f"[MediaTools] Source image: {orig_w}x{orig_h}")
-            
-            # Calculate working resolution - use larger canvas for zoom headroom
-            # This prevents blur by starting with more pixels than needed
+            # Working canvas with headroom for the zoom, so frames are never upscaled further
             max_zoom = max(zoom_factor, 1.0 / zoom_factor) if zoom_factor != 1.0 else 1.0
             work_scale = max_zoom + 0.15  # Extra 15% headroom
             work_w = int(width * work_scale)
             work_h = int(height * work_scale)
-            
-            # Use high-quality upscaling method
-            base_image = self._upscale_image_hq(base_image, work_w, work_h)
-            
-            work_w, work_h = base_image.size
+
+            def build_pyramid() -> SourcePyramid:
+                base_image = Image.open(image_path).convert("RGB")
+                print(f"[MediaTools] Source image: {base_image.size[0]}x{base_image.size[1]}")
+                # Use high-quality upscaling method
+                return SourcePyramid(self._upscale_image_hq(base_image, work_w, work_h))
+
+            # Re-rendering the same image (other durations, pans, resolutions) reuses the pyramid
+            pyramid = get_pyramid(
+                (os.path.abspath(image_path), os.path.getmtime(image_path), work_w, work_h), build_pyramid
+            )
+            work_w, work_h = pyramid.width, pyramid.height
             print(f"[MediaTools] Working canvas: {work_w}x{work_h}")
-            
-            # Generate frames with smooth Ken Burns effect
+
+            # Every frame's crop window is computed up front; frames stream straight to the encoder
             total_frames = int(duration * fps)
-            frames = []
-            
-            print(f"[MediaTools] Generating {total_frames} high-quality frames...")
-            
-            for frame_idx in range(total_frames):
-                t = frame_idx / total_frames  # Progress 0.0 to 1.0
-                
-                # Calculate current zoom level (smooth interpolation)
-                if zoom_factor >= 1.0:
-                    # Zooming in: start at 1.0, end at zoom_factor
-                    current_zoom = 1.0 + (zoom_factor - 1.0) * t
-                else:
-                    # Zooming out: start at 1/zoom_factor, end at 1.0
-                    current_zoom = (1.0 / zoom_factor) - ((1.0 / zoom_factor) - 1.0) * t
-                
-                # Calculate crop size based on zoom (smaller crop = more zoomed in)
-                crop_w = int(width / current_zoom)
-                crop_h = int(height / current_zoom)
-                
-                # Calculate pan offset based on direction
-                max_offset_x = (work_w - crop_w) // 2
-                max_offset_y = (work_h - crop_h) // 2
-                
-                # Start from center
-                center_x = work_w // 2
-                center_y = work_h // 2
-                
-                # Apply pan direction
-                pan_amount = t  # How far along the pan (0 to 1)
-                if pan_direction == "left":
-                    offset_x = int(max_offset_x * (1 - pan_amount * 2))  # Pan from right to left
-                    offset_y = 0
-                elif pan_direction == "right":
-                    offset_x = int(-max_offset_x * (1 - pan_amount * 2))  # Pan from left to right
-                    offset_y = 0
-                elif pan_direction == "up":
-                    offset_x = 0
-                    offset_y = int(max_offset_y * (1 - pan_amount * 2))  # Pan from bottom to top
-                elif pan_direction == "down":
-                    offset_x = 0
-                    offset_y = int(-max_offset_y * (1 - pan_amount * 2))  # Pan from top to bottom
-                else:  # center - just zoom, no pan
-                    offset_x = 0
-                    offset_y = 0
-                
-                # Calculate crop box
-                left = center_x - crop_w // 2 + offset_x
-                top = center_y - crop_h // 2 + offset_y
-                right = left + crop_w
-                bottom = top + crop_h
-                
-                # Clamp to valid bounds
-                left = max(0, min(left, work_w - crop_w))
-                top = max(0, min(top, work_h - crop_h))
-                right = left + crop_w
-                bottom = top + crop_h
-                
-                # Crop and resize to final output resolution with HIGH QUALITY
-                frame = base_image.crop((left, top, right, bottom))
-                
-                # Only resize if the crop is not already the exact target size
-                if frame.size != (width, height):
-                    frame = frame.resize((width, height), Image.Resampling.LANCZOS)
-                    # Apply sharpening after resize to maintain crispness
-                    frame = frame.filter(ImageFilter.UnsharpMask(radius=1.5, percent=80, threshold=2))
-                
-                # Convert to numpy array for moviepy
-                frames.append(np.array(frame))
-                
-                # Progress indicator
-                if frame_idx % (total_frames // 4) == 0:
-                    print(f"[MediaTools] Progress: {int((frame_idx / total_frames) * 100)}%")
-            
-            print(f"[MediaTools] Encoding video...")
-            
-            # Create video from frame sequence
-            clip = ImageSequenceClip(frames, fps=fps)
-            
+            windows = crop_windows(work_w, work_h, width, height, total_frames, zoom_factor, pan_direction)
+            renderer = KenBurnsRenderer(pyramid, windows, width, height)
+
             output_file = (
                 Path(output_path)
                 if output_path
                 else self.video_output_dir / f"kenburns_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.mp4"
             )
             output_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Write with high quality settings
-            clip.write_videofile(
-                str(output_file),
-                fps=fps,
-                codec="libx264",
-                audio=False,
-                preset="slow",  # Better quality encoding
-                bitrate="8000k",  # High bitrate for quality
-                threads=4,
-                ffmpeg_params=["-crf", "18"],  # High quality (lower = better, 18 is visually lossless)
-                logger=None
-            )
-            clip.close()
+
+            print(f"[MediaTools] Rendering and encoding {total_frames} frames...")
+            report_every = max(1, total_frames // 4)
+            # crf 18 is visually lossless; "slow" trades encode time for quality
+            with open_frame_sink(str(output_file), width, height, fps, preset="slow", crf=18, threads=4) as sink:
+                for frame_idx, frame in enumerate(renderer.frames()):
+                    sink.write(frame)
+                    if frame_idx % report_every == 0:
+                        print(f"[MediaTools] Progress: {int((frame_idx / total_frames) * 100)}%")
             
             return {
                 "success": True,
@@ -3414,7 +3371,8 @@ class MediaTools:
         try:
             _lazy_import_image_libs()
             _lazy_import_video_libs()
-            if not IMAGE_LIBS_AVAILABLE or not VIDEO_LIBS_AVAILABLE:
+            # Frames stream to an ffmpeg pipe; moviepy is only needed without an ffmpeg binary
+            if not IMAGE_LIBS_AVAILABLE or not (find_ffmpeg() or VIDEO_LIBS_AVAILABLE):
                 # Last resort fallback
                 res = self.animate_image(
                     image_path=image_path,
@@ -3448,68 +3406,56 @@ class MediaTools:
             new_base = self._grade_restored_photo(fitted, paint_hint=paint_hint, intensity_hint=intensity_hint)
 
             total_frames = int(max(12, round(duration * fps)))
-            frames = []
+            backdrop = Image.new("RGB", (tw, th), (8, 8, 12))
 
-            for i in range(total_frames):
-                t = 0.0 if total_frames <= 1 else (i / (total_frames - 1))
+            # Each frame is encoded as soon as it is built; memory stays at one frame
+            with open_frame_sink(str(Path(output_path)), tw, th, fps, preset="medium", crf=20) as sink:
+                for i in range(total_frames):
+                    t = 0.0 if total_frames <= 1 else (i / (total_frames - 1))
 
-                # Smooth easing for nicer motion
-                ease = self._ease_in_out(t)
+                    # Smooth easing for nicer motion
+                    ease = self._ease_in_out(t)
 
-                # Fade scratches/dust out over time
-                scratch_alpha = int(max(0, min(255, round(220 * (1.0 - ease)))))
+                    # Fade scratches/dust out over time
+                    scratch_alpha = int(max(0, min(255, round(220 * (1.0 - ease)))))
 
-                # Build an in-between graded image
-                graded = Image.blend(old_base, new_base, alpha=ease)
+                    # Build an in-between graded image
+                    graded = Image.blend(old_base, new_base, alpha=ease)
 
-                # Wipe reveal: left remains older longer, right reveals restored
-                wipe_start = 0.18
-                wipe_end = 0.82
-                wipe_t = 0.0
-                if t <= wipe_start:
+                    # Wipe reveal: left remains older longer, right reveals restored
+                    wipe_start = 0.18
+                    wipe_end = 0.82
                     wipe_t = 0.0
-                elif t >= wipe_end:
-                    wipe_t = 1.0
-                else:
-                    wipe_t = (t - wipe_start) / (wipe_end - wipe_start)
-                wipe_t = self._ease_in_out(wipe_t)
-                wipe_x = int(tw * wipe_t)
-                wipe_mask = Image.new("L", (tw, th), 0)
-                draw = ImageDraw.Draw(wipe_mask)
-                draw.rectangle([0, 0, max(0, wipe_x), th], fill=255)
-                revealed = Image.composite(new_base, old_base, wipe_mask)
-                base_frame = Image.blend(graded, revealed, alpha=0.55)
-
-                # Apply vignette subtly
-                base_frame = Image.composite(base_frame, Image.new("RGB", (tw, th), (8, 8, 12)), vignette)
-
-                # Apply scratches overlay
-                if scratch_alpha > 0:
-                    sc = scratches.copy()
-                    sc.putalpha(scratch_alpha)
-                    base_frame = Image.alpha_composite(base_frame.convert("RGBA"), sc).convert("RGB")
-
-                # Final polish: slight glow and sharpen near the end
-                if t > 0.78:
-                    polish = ImageEnhance.Contrast(base_frame).enhance(1.08)
-                    polish = ImageEnhance.Color(polish).enhance(1.06)
-                    base_frame = polish.filter(ImageFilter.UnsharpMask(radius=2, percent=140, threshold=3))
-
-                frames.append(np.array(base_frame))
-
-            clip = ImageSequenceClip(frames, fps=fps)
-            clip.write_videofile(
-                str(Path(output_path)),
-                fps=fps,
-                codec="libx264",
-                audio=False,
-                preset="medium",
-                bitrate="6000k",
-                threads=4,
-                ffmpeg_params=["-crf", "20"],
-                logger=None,
-            )
-            clip.close()
+                    if t <= wipe_start:
+                        wipe_t = 0.0
+                    elif t >= wipe_end:
+                        wipe_t = 1.0
+                    else:
+                        wipe_t = (t - wipe_start) / (wipe_end - wipe_start)
+                    wipe_t = self._ease_in_out(wipe_t)
+                    wipe_x = int(tw * wipe_t)
+                    wipe_mask = Image.new("L", (tw, th), 0)
+                    draw = ImageDraw.Draw(wipe_mask)
+                    draw.rectangle([0, 0, max(0, wipe_x), th], fill=255)
+                    revealed = Image.composite(new_base, old_base, wipe_mask)
+                    base_frame = Image.blend(graded, revealed, alpha=0.55)
+
+                    # Apply vignette subtly
+                    base_frame = Image.composite(base_frame, backdrop, vignette)
+
+                    # Apply scratches overlay
+                    if scratch_alpha > 0:
+                        sc = scratches.copy()
+                        sc.putalpha(scratch_alpha)
+                        base_frame = Image.alpha_composite(base_frame.convert("RGBA"), sc).convert("RGB")
+
+                    # Final polish: slight glow and sharpen near the end
+                    if t > 0.78:
+                        polish = ImageEnhance.Contrast(base_frame).enhance(1.08)
+                        polish = ImageEnhance.Color(polish).enhance(1.06)
+                        base_frame = polish.filter(ImageFilter.UnsharpMask(radius=2, percent=140, threshold=3))
+
+                    sink.write(base_frame)
 
             outp = Path(output_path)
             name = outp.name
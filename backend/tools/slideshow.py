@@ -0,0 +1,189 @@
+"""Lazy slideshow encoding: one decoded image in memory at a time.
+
+create_video_from_images used to build a moviepy ImageClip per image, so a
+hundred-image slideshow held every decoded frame in RAM before encoding.
+Here images are opened, fitted and released one at a time:
+
+- without transitions, each fitted image is saved once to a temp dir and
+  ffmpeg's concat demuxer holds it for its duration
+- with crossfade / fade, slideshow_frames() yields frames (at most two
+  images decoded at once) for a FrameSink to pipe into ffmpeg
+
+encoder_settings() picks the x264 preset, crf and thread count from the
+quality tier and the host's core count.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .kenburns import crossfade
+
+# Fastest to slowest
+X264_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"]
+
+QUALITY_TIERS = {
+    "low": {"crf": 28, "preset": "veryfast"},
+    "medium": {"crf": 23, "preset": "medium"},
+    "high": {"crf": 20, "preset": "slow"},
+}
+
+TRANSITIONS = ("none", "crossfade", "fade")
+
+
+def encoder_settings(quality: str = "high", cores: Optional[int] = None, reserve_cores: int = 0) -> Dict[str, Any]:
+    """
+    x264 preset, crf and threads for a quality tier on this host.
+
+    The tier fixes crf (the quality target); the preset is stepped one notch
+    faster on 3-4 cores and two on 1-2 cores, since a slow preset there
+    costs minutes per clip for a small size saving. reserve_cores are left
+    for the process rendering frames into the pipe.
+    """
+    tier = QUALITY_TIERS.get(quality, QUALITY_TIERS["high"])
+    cores = cores or os.cpu_count() or 1
+    step = 2 if cores <= 2 else 1 if cores <= 4 else 0
+    preset_index = max(0, X264_PRESETS.index(tier["preset"]) - step)
+    return {
+        "preset": X264_PRESETS[preset_index],
+        "crf": tier["crf"],
+        "threads": max(1, cores - reserve_cores),
+    }
+
+
+def fit_to_frame(image: Any, width: int, height: int, resize: Optional[Callable[[Any, int, int], Any]] = None) -> Any:
+    """Scale a PIL image to cover width x height and center-crop the overflow"""
+    from PIL import Image
+
+    image = image.convert("RGB")
+    orig_w, orig_h = image.size
+    if orig_w / orig_h > width / height:
+        # Image is wider - fit height, crop width
+        new_w, new_h = max(width, int(height * orig_w / orig_h)), height
+    else:
+        # Image is taller - fit width, crop height
+        new_w, new_h = width, max(height, int(width * orig_h / orig_w))
+    if resize is None:
+        image = image.resize((new_w, new_h), Image.Resampling.LANCZOS)
+    else:
+        image = resize(image, new_w, new_h)
+    left = (new_w - width) // 2
+    top = (new_h - height) // 2
+    return image.crop((left, top, left + width, top + height))
+
+
+def slideshow_frame_count(count: int, fps: float, duration_per_image: float,
+                          transition: str = "none", transition_duration: float = 0.0) -> int:
+    hold, overlap = _hold_and_overlap(count, fps, duration_per_image, transition, transition_duration)
+    if transition == "crossfade":
+        return count * hold - (count - 1) * overlap
+    return count * hold
+
+
+def _hold_and_overlap(count: int, fps: float, duration_per_image: float, transition: str, transition_duration: float):
+    hold = max(1, int(round(duration_per_image * fps)))
+    if transition not in ("crossfade", "fade") or count < 2 or transition_duration <= 0:
+        return hold, 0
+    # Each image is fully visible for at least a frame between its fade in and fade out
+    return hold, min(int(round(transition_duration * fps)), (hold - 1) // 2)
+
+
+def slideshow_frames(
+    paths: List[str],
+    load: Callable[[str], Any],
+    fps: float,
+    duration_per_image: float,
+    transition: str = "crossfade",
+    transition_duration: float = 0.5,
+) -> Iterator[np.ndarray]:
+    """
+    Yield HxWx3 uint8 frames for the slideshow. load(path) returns a frame
+    sized image (see fit_to_frame); it is called once per path, in order,
+    just before the image is needed. Yielded arrays may be reused, so
+    consume (write) each frame before asking for the next.
+    """
+    if transition not in TRANSITIONS:
+        raise ValueError(f"Unknown transition: {transition}")
+    hold, overlap = _hold_and_overlap(len(paths), fps, duration_per_image, transition, transition_duration)
+    if not paths:
+        return
+
+    current = np.asarray(load(paths[0]), dtype=np.uint8)
+    out = np.empty_like(current)
+    scratch = np.empty((2,) + current.shape, dtype=np.uint16)
+    black = np.zeros_like(current) if transition == "fade" else None
+
+    for index in range(len(paths)):
+        following = None
+        if transition == "fade" and overlap:
+            # Fade in from black and out to black over `overlap` frames
+            for k in range(hold):
+                level = min(1.0, (k + 1) / (overlap + 1), (hold - k) / (overlap + 1))
+                yield current if level >= 1.0 else crossfade(black, current, level, out, scratch)
+        elif transition == "crossfade" and overlap:
+            # The first `overlap` frames of this image were blended into the previous one
+            solo = hold - overlap * (index > 0) - overlap * (index < len(paths) - 1)
+            for _ in range(solo):
+                yield current
+            if index < len(paths) - 1:
+                following = np.asarray(load(paths[index + 1]), dtype=np.uint8)
+                for k in range(overlap):
+                    yield crossfade(current, following, (k + 1) / (overlap + 1), out, scratch)
+        else:
+            for _ in range(hold):
+                yield current
+
+        if index < len(paths) - 1:
+            current = following if following is not None else np.asarray(load(paths[index + 1]), dtype=np.uint8)
+
+
+def encode_concat_slideshow(
+    paths: List[str],
+    load: Callable[[str], Any],
+    output_path: str,
+    fps: float,
+    duration_per_image: float,
+    ffmpeg: str,
+    encoder: Dict[str, Any],
+    on_image: Optional[Callable[[int], None]] = None,
+) -> None:
+    """
+    Encode a transition-free slideshow with ffmpeg's concat demuxer. Each
+    fitted image is written once to a temp dir, so neither this process
+    nor ffmpeg holds more than one decoded image.
+    """
+    with tempfile.TemporaryDirectory(prefix="slideshow_") as tmp:
+        lines = ["ffconcat version 1.0"]
+        frame_path = ""
+        for index, path in enumerate(paths):
+            frame_path = os.path.join(tmp, f"{index:05d}.png")
+            load(path).save(frame_path, compress_level=1)
+            lines += [f"file '{_concat_quote(frame_path)}'", f"duration {duration_per_image}"]
+            if on_image:
+                on_image(index)
+        # The demuxer only honours a duration that is followed by another entry
+        lines.append(f"file '{_concat_quote(frame_path)}'")
+        list_path = os.path.join(tmp, "slides.ffconcat")
+        with open(list_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+        total = len(paths) * duration_per_image
+        cmd = [
+            ffmpeg, "-y", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-vf", f"fps={fps},format=yuv420p", "-t", f"{total:.3f}",
+            "-an", "-c:v", "libx264", "-preset", encoder["preset"], "-crf", str(encoder["crf"]),
+            "-threads", str(encoder["threads"]),
+            output_path,
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {proc.stderr[-2000:]}")
+
+
+def _concat_quote(path: str) -> str:
+    return path.replace("\\", "/").replace("'", "'\\''")
@@ -1,5 +1,6 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
+import os
 import re
 
 from fastapi import APIRouter, HTTPException
@@ -7,7 +8,8 @@ import psutil
 from pydantic import BaseModel
 
 from . import process_manager
-from .memory_scanner import scan_exact_value, scan_next as scan_next_internal, scan_pattern as scan_pattern_internal
+from .memory_backend import FileSnapshotBackend
+from .memory_scanner import scan_exact_value, scan_unknown_value, get_scan_results, scan_next as scan_next_internal, scan_pattern as scan_pattern_internal, scan_pointer_paths, rescan_pointer_paths
 from .memory_writer import read_memory, write_memory, freeze_memory, unfreeze_memory, get_frozen_registry
 from .game_state_models import GameWorldState, PlayerState
 from .trainer_engine import TrainerEngine
@@ -23,6 +25,10 @@ _engine = TrainerEngine()
 _ai = AIController(_engine)
 _session: Dict[str, Any] = {}
 
+SCAN_PAGE_LIMIT = 1000
+# /attach/snapshot only opens dump directories placed here, addressed by name
+SNAPSHOT_DIR = os.path.join(profile_store.TRAINER_DATA_DIR, "snapshots")
+
 
 def _normalize_game_id(name: str, platform: str) -> str:
     base = f"{name.strip()}-{platform.strip()}".lower()
@@ -198,9 +204,36 @@ class AttachPidRequest(BaseModel):
     pid: int
 
 
+class PointerScanRequest(BaseModel):
+    address: int
+    max_offset: int = 0x1000
+    max_depth: int = 5
+    save_map: Optional[str] = None
+
+
+class PointerRescanRequest(BaseModel):
+    map_name: str
+    previous_address: int
+    address: int
+    max_offset: int = 0x1000
+    max_depth: int = 5
+    save_map: Optional[str] = None
+
+
+class AttachSnapshotRequest(BaseModel):
+    snapshot: str
+    name: Optional[str] = None
+
+
 class ScanValueRequest(BaseModel):
-    value: int
+    value: Union[int, float]
     type: str = "int"
+    alignment: Optional[int] = None
+
+
+class UnknownScanRequest(BaseModel):
+    type: str = "int"
+    alignment: Optional[int] = None
 
 
 class PatternScanRequest(BaseModel):
@@ -209,7 +242,7 @@ class PatternScanRequest(BaseModel):
 
 class NextScanRequest(BaseModel):
     mode: str = "exact"
-    value: Optional[float] = None
+    value: Optional[Union[int, float]] = None
     type: str = "int"
 
 
@@ -418,17 +451,48 @@ async def attach_pid(req: AttachPidRequest) -> Dict[str, Any]:
     return {"pid": proc.pid, "name": proc.name}
 
 
+@router.post("/attach/snapshot")
+async def attach_snapshot(req: AttachSnapshotRequest) -> Dict[str, Any]:
+    """Attach to a directory of dump_memory files (under SNAPSHOT_DIR) instead of a live process"""
+    try:
+        directory = profile_store.data_path(SNAPSHOT_DIR, req.snapshot)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not os.path.isdir(directory):
+        raise HTTPException(status_code=404, detail="Snapshot directory not found")
+    backend = FileSnapshotBackend.from_directory(directory)
+    if not backend.regions():
+        raise HTTPException(status_code=400, detail="No dump files in directory")
+    proc = process_manager.attach_backend(backend, req.name or req.snapshot.strip())
+    return {"pid": proc.pid, "name": proc.name, "regions": len(backend.regions())}
+
+
 @router.post("/detach")
 async def detach() -> Dict[str, Any]:
     removed = process_manager.detach_process()
     return {"detached": removed}
 
 
+def _first_page() -> List[int]:
+    # Scans can match millions of addresses; responses carry the first page
+    # and the rest is read through /scan/results
+    return [entry["address"] for entry in get_scan_results(0, SCAN_PAGE_LIMIT)["results"]]
+
+
 @router.post("/scan/value")
 async def scan_value(req: ScanValueRequest) -> Dict[str, Any]:
     try:
-        matches = scan_exact_value(req.value, req.type)
-        return {"count": len(matches), "addresses": matches}
+        count = scan_exact_value(req.value, req.type, req.alignment)
+        return {"count": count, "addresses": _first_page()}
+    except (RuntimeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.post("/scan/unknown")
+async def scan_unknown(req: UnknownScanRequest) -> Dict[str, Any]:
+    try:
+        count = scan_unknown_value(type=req.type, alignment=req.alignment)
+        return {"count": count, "addresses": _first_page()}
     except (RuntimeError, ValueError) as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
@@ -436,15 +500,44 @@ async def scan_value(req: ScanValueRequest) -> Dict[str, Any]:
 @router.post("/scan/next")
 async def scan_next(req: NextScanRequest) -> Dict[str, Any]:
     try:
-        matches = scan_next_internal(req.mode, req.value, req.type)
-        return {"count": len(matches), "addresses": matches}
+        count = scan_next_internal(req.mode, req.value, req.type)
+        return {"count": count, "addresses": _first_page()}
     except (RuntimeError, ValueError) as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
 
+@router.get("/scan/results")
+async def scan_results(offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    try:
+        return get_scan_results(max(0, offset), max(1, min(limit, SCAN_PAGE_LIMIT)))
+    except RuntimeError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _pointer_page(results) -> Dict[str, Any]:
+    return {"count": len(results), "paths": [r.to_dict() for r in results[:SCAN_PAGE_LIMIT]]}
+
+
+@router.post("/pointer/scan")
+async def pointer_scan(req: PointerScanRequest) -> Dict[str, Any]:
+    try:
+        return _pointer_page(scan_pointer_paths(req.address, req.max_offset, req.max_depth, req.save_map))
+    except (RuntimeError, ValueError, OSError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.post("/pointer/rescan")
+async def pointer_rescan(req: PointerRescanRequest) -> Dict[str, Any]:
+    try:
+        results = rescan_pointer_paths(req.map_name, req.previous_address, req.address,
+                                       req.max_offset, req.max_depth, req.save_map)
+        return _pointer_page(results)
+    except (RuntimeError, ValueError, OSError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
 @router.post("/scan/pattern")
 async def scan_pattern(req: PatternScanRequest) -> Dict[str, Any]:
-    # For now this delegates to a generic scan and returns previous matches.
     try:
         matches = scan_pattern_internal(req.pattern)
         return {"count": len(matches), "addresses": matches}
@@ -0,0 +1,380 @@
+"""
+Memory backends - pluggable access to a target's address space
+
+Scanners and writers only need three things from a target: its regions,
+reads and writes. A MemoryBackend provides them for:
+
+- WindowsMemoryBackend: VirtualQueryEx / ReadProcessMemory / WriteProcessMemory
+- LinuxProcBackend: /proc/<pid>/maps and pread/pwrite on /proc/<pid>/mem
+- FileSnapshotBackend: offline dumps (e.g. dump_memory's dump_0x<base>_<size>.bin)
+  mapped at their original addresses, so scans can run and be tested anywhere
+
+Reads are safe to issue from several threads at once.
+"""
+import bisect
+import ctypes
+import mmap
+import os
+import re
+import sys
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple, Union
+
+
+PROCESS_QUERY_INFORMATION = 0x0400
+PROCESS_VM_READ = 0x0010
+PROCESS_VM_WRITE = 0x0020
+PROCESS_VM_OPERATION = 0x0008
+
+MEM_COMMIT = 0x1000
+PAGE_NOACCESS = 0x01
+PAGE_GUARD = 0x100
+_PAGE_READABLE = 0x02 | 0x04 | 0x08 | 0x20 | 0x40 | 0x80
+_PAGE_WRITABLE = 0x04 | 0x08 | 0x40 | 0x80
+_PAGE_EXECUTABLE = 0x10 | 0x20 | 0x40 | 0x80
+
+# Kernel mappings listed in /proc/<pid>/maps that cannot be read through mem
+_LINUX_UNREADABLE = ("[vvar]", "[vvar_vclock]", "[vsyscall]")
+
+# File names written by GameTrainer.dump_memory
+_DUMP_NAME = re.compile(r"dump_(0x[0-9a-fA-F]+)_(\d+)\.bin$")
+
+
+class MemoryRegion:
+    def __init__(self, base: int, size: int, readable: bool = True, writable: bool = False,
+                 executable: bool = False, path: str = ""):
+        self.base = base
+        self.size = size
+        self.readable = readable
+        self.writable = writable
+        self.executable = executable
+        self.path = path
+
+    @property
+    def end(self) -> int:
+        return self.base + self.size
+
+    def __repr__(self):
+        perms = ("r" if self.readable else "-") + ("w" if self.writable else "-") + ("x" if self.executable else "-")
+        return f"MemoryRegion(base={hex(self.base)}, size={self.size}, perms='{perms}')"
+
+
+class MemoryBackend(ABC):
+    """
+    Interface every backend implements.
+
+    read() returns the readable prefix of the range (None if nothing could
+    be read), like a partial ReadProcessMemory.
+    """
+
+    pid = 0
+
+    @abstractmethod
+    def regions(self, writable: bool = False, executable: bool = False) -> List[MemoryRegion]:
+        """Readable regions, optionally only writable and/or executable ones"""
+
+    @abstractmethod
+    def read(self, address: int, size: int) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def write(self, address: int, data: bytes) -> bool:
+        ...
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _filter(regions: List[MemoryRegion], writable: bool, executable: bool) -> List[MemoryRegion]:
+        return [
+            r for r in regions
+            if r.readable and (r.writable or not writable) and (r.executable or not executable)
+        ]
+
+
+# ═══════════════════════════════════════════════════════════════
+# WINDOWS
+# ═══════════════════════════════════════════════════════════════
+
+class MEMORY_BASIC_INFORMATION(ctypes.Structure):
+    _fields_ = [
+        ("BaseAddress", ctypes.c_void_p),
+        ("AllocationBase", ctypes.c_void_p),
+        ("AllocationProtect", ctypes.c_ulong),
+        ("RegionSize", ctypes.c_size_t),
+        ("State", ctypes.c_ulong),
+        ("Protect", ctypes.c_ulong),
+        ("Type", ctypes.c_ulong),
+    ]
+
+
+_kernel32 = None
+
+
+def get_kernel32():
+    """kernel32 with argtypes set, loaded on first use (Windows only)"""
+    global _kernel32
+    if _kernel32 is None:
+        if sys.platform != "win32":
+            raise OSError("kernel32 is only available on Windows")
+        k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        k32.OpenProcess.restype = ctypes.c_void_p
+        k32.VirtualQueryEx.argtypes = [ctypes.c_void_p, ctypes.c_void_p,
+                                       ctypes.POINTER(MEMORY_BASIC_INFORMATION), ctypes.c_size_t]
+        k32.VirtualQueryEx.restype = ctypes.c_size_t
+        k32.ReadProcessMemory.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+                                          ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t)]
+        k32.WriteProcessMemory.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+                                           ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t)]
+        k32.CloseHandle.argtypes = [ctypes.c_void_p]
+        _kernel32 = k32
+    return _kernel32
+
+
+class WindowsMemoryBackend(MemoryBackend):
+    """Process memory through a Windows process handle"""
+
+    def __init__(self, handle, pid: int = 0, owns_handle: bool = False):
+        self.handle = handle
+        self.pid = pid
+        self.owns_handle = owns_handle
+
+    @classmethod
+    def open(cls, pid: int) -> "WindowsMemoryBackend":
+        access = PROCESS_QUERY_INFORMATION | PROCESS_VM_READ | PROCESS_VM_WRITE | PROCESS_VM_OPERATION
+        handle = get_kernel32().OpenProcess(access, False, pid)
+        if not handle:
+            raise OSError(f"Failed to open process {pid}: {ctypes.get_last_error()}")
+        return cls(handle, pid, owns_handle=True)
+
+    def regions(self, writable: bool = False, executable: bool = False) -> List[MemoryRegion]:
+        k32 = get_kernel32()
+        regions: List[MemoryRegion] = []
+        mbi = MEMORY_BASIC_INFORMATION()
+        address = 0
+        while k32.VirtualQueryEx(self.handle, ctypes.c_void_p(address), ctypes.byref(mbi), ctypes.sizeof(mbi)):
+            base = int(mbi.BaseAddress or 0)
+            size = int(mbi.RegionSize)
+            protect = int(mbi.Protect)
+            if mbi.State == MEM_COMMIT and not protect & (PAGE_GUARD | PAGE_NOACCESS):
+                regions.append(MemoryRegion(
+                    base, size,
+                    readable=bool(protect & _PAGE_READABLE),
+                    writable=bool(protect & _PAGE_WRITABLE),
+                    executable=bool(protect & _PAGE_EXECUTABLE),
+                ))
+            if size == 0:
+                break
+            address = base + size
+        return self._filter(regions, writable, executable)
+
+    def read(self, address: int, size: int) -> Optional[bytes]:
+        buffer = ctypes.create_string_buffer(size)
+        bytes_read = ctypes.c_size_t()
+        success = get_kernel32().ReadProcessMemory(
+            self.handle, ctypes.c_void_p(address), buffer, size, ctypes.byref(bytes_read)
+        )
+        if not success or bytes_read.value == 0:
+            return None
+        return buffer.raw[:bytes_read.value]
+
+    def write(self, address: int, data: bytes) -> bool:
+        written = ctypes.c_size_t()
+        success = get_kernel32().WriteProcessMemory(
+            self.handle, ctypes.c_void_p(address), data, len(data), ctypes.byref(written)
+        )
+        return bool(success) and written.value == len(data)
+
+    def close(self):
+        if self.owns_handle and self.handle:
+            try:
+                get_kernel32().CloseHandle(self.handle)
+            except Exception:
+                pass
+        self.handle = None
+
+
+# ═══════════════════════════════════════════════════════════════
+# LINUX
+# ═══════════════════════════════════════════════════════════════
+
+class LinuxProcBackend(MemoryBackend):
+    """
+    Process memory through /proc/<pid>/maps and /proc/<pid>/mem.
+
+    Needs ptrace access to the target (same user with ptrace_scope 0, or
+    CAP_SYS_PTRACE). Falls back to read-only if mem cannot be opened for
+    writing.
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        path = f"/proc/{pid}/mem"
+        try:
+            self._fd = os.open(path, os.O_RDWR)
+            self.read_only = False
+        except PermissionError:
+            self._fd = os.open(path, os.O_RDONLY)
+            self.read_only = True
+
+    def regions(self, writable: bool = False, executable: bool = False) -> List[MemoryRegion]:
+        regions: List[MemoryRegion] = []
+        with open(f"/proc/{self.pid}/maps") as f:
+            for line in f:
+                parts = line.split(None, 5)
+                if len(parts) < 5:
+                    continue
+                path = parts[5].strip() if len(parts) > 5 else ""
+                if path in _LINUX_UNREADABLE:
+                    continue
+                start, end = (int(x, 16) for x in parts[0].split("-"))
+                perms = parts[1]
+                regions.append(MemoryRegion(
+                    start, end - start,
+                    readable=perms[0] == "r",
+                    writable=perms[1] == "w",
+                    executable=perms[2] == "x",
+                    path=path,
+                ))
+        return self._filter(regions, writable, executable)
+
+    def read(self, address: int, size: int) -> Optional[bytes]:
+        chunks = []
+        done = 0
+        while done < size:
+            try:
+                chunk = os.pread(self._fd, size - done, address + done)
+            except (OSError, OverflowError):
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+            done += len(chunk)
+        if not done:
+            return None
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+    def write(self, address: int, data: bytes) -> bool:
+        if self.read_only:
+            return False
+        try:
+            return os.pwrite(self._fd, data, address) == len(data)
+        except (OSError, OverflowError):
+            return False
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+# ═══════════════════════════════════════════════════════════════
+# FILE SNAPSHOTS
+# ═══════════════════════════════════════════════════════════════
+
+class FileSnapshotBackend(MemoryBackend):
+    """
+    Offline memory images placed at their original base addresses.
+
+    Files are mapped copy-on-write: writes change this backend's view of
+    memory but never the dump on disk.
+    """
+
+    def __init__(self, pid: int = 0):
+        self.pid = pid
+        self._bases: List[int] = []
+        self._segments: List[Tuple[MemoryRegion, Union[mmap.mmap, bytearray]]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, directory: str, pid: int = 0) -> "FileSnapshotBackend":
+        """Load every dump_0x<base>_<size>.bin file in a directory"""
+        backend = cls(pid)
+        for name in sorted(os.listdir(directory)):
+            if _DUMP_NAME.search(name):
+                backend.add_file(os.path.join(directory, name))
+        return backend
+
+    def add_file(self, path: str, base: Optional[int] = None, writable: bool = True,
+                 executable: bool = False) -> MemoryRegion:
+        """Map a dump file; base defaults to the address in its dump_memory name"""
+        if base is None:
+            match = _DUMP_NAME.search(os.path.basename(path))
+            if not match:
+                raise ValueError(f"Cannot infer base address from file name: {path}")
+            base = int(match.group(1), 16)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) if size else bytearray()
+        return self._add(MemoryRegion(base, size, True, writable, executable, path), data)
+
+    def add_bytes(self, base: int, data: bytes, writable: bool = True,
+                  executable: bool = False) -> MemoryRegion:
+        """Place an in-memory image at base"""
+        return self._add(MemoryRegion(base, len(data), True, writable, executable), bytearray(data))
+
+    def _add(self, region: MemoryRegion, data) -> MemoryRegion:
+        with self._lock:
+            index = bisect.bisect_left(self._bases, region.base)
+            neighbours = self._segments[max(index - 1, 0):index + 1]
+            if any(r.base < region.end and region.base < r.end for r, _ in neighbours):
+                raise ValueError(f"Snapshot at {hex(region.base)} overlaps an existing one")
+            self._bases.insert(index, region.base)
+            self._segments.insert(index, (region, data))
+        return region
+
+    def _locate(self, address: int):
+        index = bisect.bisect_right(self._bases, address) - 1
+        if index < 0:
+            return None
+        region, data = self._segments[index]
+        if address >= region.end:
+            return None
+        return region, data
+
+    def regions(self, writable: bool = False, executable: bool = False) -> List[MemoryRegion]:
+        return self._filter([region for region, _ in self._segments], writable, executable)
+
+    def read(self, address: int, size: int) -> Optional[bytes]:
+        found = self._locate(address)
+        if found is None or size <= 0:
+            return None
+        region, data = found
+        offset = address - region.base
+        return bytes(data[offset:offset + size])
+
+    def write(self, address: int, data: bytes) -> bool:
+        found = self._locate(address)
+        if found is None:
+            return False
+        region, image = found
+        offset = address - region.base
+        if not region.writable or offset + len(data) > region.size:
+            return False
+        image[offset:offset + len(data)] = data
+        return True
+
+    def close(self):
+        with self._lock:
+            for _, data in self._segments:
+                if isinstance(data, mmap.mmap):
+                    data.close()
+            self._bases.clear()
+            self._segments.clear()
+
+
+def open_process_backend(pid: int) -> MemoryBackend:
+    """Backend for a live process on this platform"""
+    if sys.platform == "win32":
+        return WindowsMemoryBackend.open(pid)
+    if os.path.exists(f"/proc/{pid}/mem"):
+        return LinuxProcBackend(pid)
+    raise OSError(f"No memory backend for process {pid} on {sys.platform}")
+
+
+def as_backend(process) -> MemoryBackend:
+    """Accept either a MemoryBackend or a raw Windows process handle"""
+    if isinstance(process, MemoryBackend):
+        return process
+    return WindowsMemoryBackend(process)
@@ -1,41 +1,19 @@
-import ctypes
+import os
 from typing import Any, Dict, List, Optional
 
-from .process_manager import get_attached_process, kernel32, PROCESS_QUERY_INFORMATION, PROCESS_VM_READ
+from .process_manager import get_attached_process
+from .memory_backend import MemoryBackend
+from .pattern_scanner import scan_pattern as _scan_aob
+from .pointer_scanner import PointerMap, PointerScanResult, compare_pointer_maps
+from .profile_store import TRAINER_DATA_DIR, data_path
+from .scan_session import CancelCheck, ProgressCallback, ScanSession
 
 
-PAGE_READWRITE = 0x04
-MEM_COMMIT = 0x1000
+# Saved pointer maps, addressed by name (<name>.npz) through the API
+POINTER_MAP_DIR = os.path.join(TRAINER_DATA_DIR, "pointer_maps")
 
-
-class MEMORY_BASIC_INFORMATION(ctypes.Structure):
-    _fields_ = [
-        ("BaseAddress", ctypes.c_void_p),
-        ("AllocationBase", ctypes.c_void_p),
-        ("AllocationProtect", ctypes.c_ulong),
-        ("RegionSize", ctypes.c_size_t),
-        ("State", ctypes.c_ulong),
-        ("Protect", ctypes.c_ulong),
-        ("Type", ctypes.c_ulong),
-    ]
-
-
-VirtualQueryEx = kernel32.VirtualQueryEx
-VirtualQueryEx.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(MEMORY_BASIC_INFORMATION), ctypes.c_size_t]
-VirtualQueryEx.restype = ctypes.c_size_t
-
-ReadProcessMemory = kernel32.ReadProcessMemory
-
-
-_last_scan_results: List[int] = []
-
-_SCAN_TYPES = {
-    "int": ctypes.c_int,
-    "uint": ctypes.c_uint,
-    "float": ctypes.c_float,
-    "double": ctypes.c_double,
-    "byte": ctypes.c_ubyte,
-}
+# Scan sessions per process id, so re-attaching keeps each game's candidates
+_sessions: Dict[int, ScanSession] = {}
 
 
 def _ensure_attached():
@@ -45,136 +23,173 @@ def _ensure_attached():
     return proc
 
 
-def enumerate_memory_regions(max_regions: int = 2048) -> List[Dict[str, Any]]:
-    """Return a coarse list of readable, committed memory regions.
+def enumerate_memory_regions(max_regions: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Return a coarse list of readable, writable memory regions.
 
-    This is a best-effort enumeration used by scan helpers.
+    This is a best-effort enumeration used by scan helpers; pass
+    max_regions to stop early.
     """
 
     proc = _ensure_attached()
-    regions: List[Dict[str, Any]] = []
-
-    mbi = MEMORY_BASIC_INFORMATION()
-    address = 0
-    size_mbi = ctypes.sizeof(mbi)
+    regions = [{"base": r.base, "size": r.size} for r in proc.backend.regions(writable=True)]
+    return regions if max_regions is None else regions[:max_regions]
 
-    while len(regions) < max_regions:
-        result = VirtualQueryEx(proc.handle, ctypes.c_void_p(address), ctypes.byref(mbi), size_mbi)
-        if not result:
-            break
 
-        if mbi.State == MEM_COMMIT and (mbi.Protect & PAGE_READWRITE):
-            regions.append({
-                "base": ctypes.addressof(mbi) and int(mbi.BaseAddress),
-                "size": int(mbi.RegionSize),
-            })
+def _read_region(backend: MemoryBackend, base: int, size: int) -> Optional[bytes]:
+    return backend.read(base, size)
 
-        address = int(mbi.BaseAddress) + int(mbi.RegionSize)
 
-    return regions
+def _read_attached(base: int, size: int) -> Optional[bytes]:
+    # Sessions outlive detach/re-attach, and detaching closes the backend, so
+    # look up the current backend on every read instead of keeping one.
+    return _ensure_attached().backend.read(base, size)
 
 
-def _read_region(proc_handle: int, base: int, size: int) -> Optional[bytes]:
-    buffer = (ctypes.c_char * size)()
-    bytes_read = ctypes.c_size_t()
-    success = ReadProcessMemory(proc_handle, ctypes.c_void_p(base), buffer, size, ctypes.byref(bytes_read))
-    if not success or bytes_read.value == 0:
-        return None
-    return bytes(buffer[: bytes_read.value])
+def _new_session(proc, type: str, alignment: Optional[int]) -> ScanSession:
+    previous = _sessions.pop(proc.pid, None)
+    if previous is not None:
+        previous.close()
+    session = ScanSession(
+        proc.pid,
+        _read_attached,
+        value_type=type,
+        alignment=alignment,
+    )
+    _sessions[proc.pid] = session
+    return session
 
 
-def scan_exact_value(value: Any, type: str) -> List[int]:
-    """Exact-value scan across readable regions for basic primitive types."""
+def get_scan_session() -> Optional[ScanSession]:
+    """Scan session of the attached process, if a first scan was run."""
 
     proc = _ensure_attached()
+    return _sessions.get(proc.pid)
 
-    if type not in _SCAN_TYPES:
-        raise ValueError(f"scan_exact_value unsupported type '{type}'")
 
-    if value is None:
-        raise ValueError("scan_value requires a numeric value")
+def clear_scan_session(pid: Optional[int] = None) -> bool:
+    """Drop the scan session (and its snapshot files) of a process."""
 
-    ctype_cls = _SCAN_TYPES[type]
-    try:
-        if type == "float" or type == "double":
-            numeric = float(value)
-        else:
-            numeric = int(value)
-    except (TypeError, ValueError):
-        raise ValueError("scan_value must be numeric")
+    if pid is None:
+        pid = _ensure_attached().pid
+    session = _sessions.pop(pid, None)
+    if session is not None:
+        session.close()
+    return session is not None
 
-    target = ctype_cls(numeric)
 
-    target_b = bytes(target)
+def get_scan_results(offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """One page of the attached process's candidates with their last values."""
 
-    matches: List[int] = []
+    session = get_scan_session()
+    if session is None:
+        return {"count": 0, "offset": offset, "results": []}
+    return {"count": session.count, "offset": offset, "results": session.page(offset, limit)}
 
-    for region in enumerate_memory_regions():
-        base = region["base"]
-        size = region["size"]
-        data = _read_region(proc.handle, base, size)
-        if not data:
-            continue
-        idx = data.find(target_b)
-        while idx != -1:
-            matches.append(base + idx)
-            idx = data.find(target_b, idx + 1)
 
-    global _last_scan_results
-    _last_scan_results = matches
-    return matches
+def scan_exact_value(value: Any, type: str, alignment: Optional[int] = None,
+                     progress: Optional[ProgressCallback] = None, cancel: Optional[CancelCheck] = None) -> int:
+    """First scan for an exact value across readable regions.
+
+    Slots are `alignment` bytes apart (defaults to the type's size).
+    Regions are read and searched in parallel chunks; progress and cancel
+    are passed through to ScanSession.first_scan.
+    Returns the match count; read matches with get_scan_results().
+    """
+
+    proc = _ensure_attached()
+    session = _new_session(proc, type, alignment)
+    return session.first_scan(enumerate_memory_regions(), value, progress, cancel)
 
 
-def scan_next(mode: str, value: Optional[Any] = None, type: str = "int") -> List[int]:
-    """Next-scan refinement stub.
+def scan_unknown_value(start_filter: str = "any", type: str = "int", alignment: Optional[int] = None,
+                       progress: Optional[ProgressCallback] = None, cancel: Optional[CancelCheck] = None) -> int:
+    """First scan with an unknown initial value: snapshot every slot.
 
-    For now, only supports exact scans when a value is provided. Other modes
-    return the last scan results (placeholder for future refinements).
+    Returns the number of candidate slots; narrow them with scan_next().
     """
 
-    mode = (mode or "").lower().strip()
-    if mode in {"exact", "value"} and value is not None:
-        return scan_exact_value(value, type)
-    if mode == "increased":
-        return scan_increased()
-    if mode == "decreased":
-        return scan_decreased()
-    if mode == "changed":
-        return scan_changed()
-    if mode == "unchanged":
-        return scan_unchanged()
-    return _last_scan_results
+    proc = _ensure_attached()
+    session = _new_session(proc, type, alignment)
+    return session.first_scan(enumerate_memory_regions(), None, progress, cancel)
 
 
-# Change-based scans are intentionally stubbed for now but wired for future use.
+def scan_next(mode: str, value: Optional[Any] = None, type: str = "int",
+              progress: Optional[ProgressCallback] = None, cancel: Optional[CancelCheck] = None) -> int:
+    """Refine the attached process's candidates and return how many remain.
 
+    Modes: exact (needs value), changed, unchanged, increased, decreased.
+    An exact scan without a previous scan (or with a different type)
+    starts a new first scan.
+    """
 
-def scan_unknown_value(start_filter: str = "any") -> List[int]:
-    global _last_scan_results
-    _last_scan_results = []
-    return _last_scan_results
+    mode = (mode or "").lower().strip()
+    if mode == "value":
+        mode = "exact"
+    session = get_scan_session()
+    if mode == "exact" and (session is None or session.value_type != type):
+        return scan_exact_value(value, type, progress=progress, cancel=cancel)
+    if session is None:
+        raise RuntimeError("No previous scan; run a first scan")
+    return session.next_scan(mode, value, progress, cancel)
 
 
-def scan_increased() -> List[int]:
-    return _last_scan_results
+def scan_increased() -> int:
+    return scan_next("increased")
 
 
-def scan_decreased() -> List[int]:
-    return _last_scan_results
+def scan_decreased() -> int:
+    return scan_next("decreased")
 
 
-def scan_changed() -> List[int]:
-    return _last_scan_results
+def scan_changed() -> int:
+    return scan_next("changed")
 
 
-def scan_unchanged() -> List[int]:
-    return _last_scan_results
+def scan_unchanged() -> int:
+    return scan_next("unchanged")
 
 
 def scan_pattern(pattern: str) -> List[int]:
-    """Delegates to AoB pattern scanner where implemented.
+    """AoB scan of the attached process's executable regions."""
 
-    For now, this is a thin wrapper and returns previous scan results.
-    """
+    proc = _ensure_attached()
+    return [match.address for match in _scan_aob(proc.backend, pattern)]
+
+
+def pointer_map_path(name: str) -> str:
+    """Where the pointer map called `name` lives (ValueError for unsafe names)."""
+
+    return data_path(POINTER_MAP_DIR, name, ".npz")
+
+
+def _save_pointer_map(pointer_map: PointerMap, name: str):
+    path = pointer_map_path(name)
+    os.makedirs(POINTER_MAP_DIR, exist_ok=True)
+    pointer_map.save(path)
 
-    return _last_scan_results
+
+def scan_pointer_paths(address: int, max_offset: int = 0x1000, max_depth: int = 5,
+                       save_map: Optional[str] = None) -> List[PointerScanResult]:
+    """Pointer scan of the attached process; optionally keep its map as `save_map`."""
+
+    proc = _ensure_attached()
+    if save_map:
+        pointer_map_path(save_map)  # reject a bad name before the slow build
+    pointer_map = PointerMap.build(proc.backend)
+    if save_map:
+        _save_pointer_map(pointer_map, save_map)
+    return pointer_map.find_paths(address, max_offset, max_depth)
+
+
+def rescan_pointer_paths(map_name: str, previous_address: int, address: int, max_offset: int = 0x1000,
+                         max_depth: int = 5, save_map: Optional[str] = None) -> List[PointerScanResult]:
+    """Paths from the saved map `map_name` that still lead to `address` after a restart."""
+
+    proc = _ensure_attached()
+    old_map = PointerMap.load(pointer_map_path(map_name))
+    if save_map:
+        pointer_map_path(save_map)
+    new_map = PointerMap.build(proc.backend, pointer_size=old_map.pointer_size)
+    if save_map:
+        _save_pointer_map(new_map, save_map)
+    return compare_pointer_maps(old_map, previous_address, new_map, address, max_offset, max_depth)
@@ -1,7 +1,15 @@
 import ctypes
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
-from .process_manager import get_attached_process, PROCESS_VM_READ, PROCESS_VM_WRITE, PROCESS_VM_OPERATION, kernel32
+from .memory_backend import MemoryBackend
+from .process_manager import get_attached_process
+
+
+# Batched reads cover at most this many bytes per span
+PAGE_SIZE = 4096
+# An idle freeze loop (nothing needed rewriting) slows to this multiple of its interval
+FREEZE_MAX_BACKOFF = 4
 
 
 TYPE_SIZES = {
@@ -25,68 +33,254 @@ def _resolve_ctype(type_name: str):
     return TYPE_SIZES[type_name]
 
 
+def _encode(type_name: str, value: Any) -> bytes:
+    return bytes(_resolve_ctype(type_name)(value))
+
+
+def _decode(type_name: str, data: Optional[bytes]) -> Any:
+    ctype_cls = _resolve_ctype(type_name)
+    if data is None or len(data) != ctypes.sizeof(ctype_cls):
+        return None
+    return ctype_cls.from_buffer_copy(data).value
+
+
+# ═══════════════════════════════════════════════════════════════
+# BATCHED ACCESS
+# ═══════════════════════════════════════════════════════════════
+
+def coalesce(ranges: List[Tuple[int, int]], page_size: int = PAGE_SIZE) -> List[Tuple[int, int, List[int]]]:
+    """Group (address, size) ranges by the page they start in.
+
+    Returns (start, size, indices into ranges) per span, in address order.
+    A span covers its ranges from the lowest start to the highest end.
+    """
+
+    spans: List[Tuple[int, int, List[int]]] = []
+    page = start = end = 0
+    members: List[int] = []
+    for index in sorted(range(len(ranges)), key=lambda i: ranges[i][0]):
+        address, size = ranges[index]
+        if members and address // page_size == page:
+            end = max(end, address + size)
+            members.append(index)
+            continue
+        if members:
+            spans.append((start, end - start, members))
+        page, start, end, members = address // page_size, address, address + size, [index]
+    if members:
+        spans.append((start, end - start, members))
+    return spans
+
+
+def read_batch(backend: MemoryBackend, ranges: List[Tuple[int, int]],
+               page_size: int = PAGE_SIZE) -> List[Optional[bytes]]:
+    """Read many (address, size) ranges with one read per span.
+
+    Spans that cannot be read in full fall back to one read per range.
+    Entries are None where the range could not be read in full.
+    """
+
+    results: List[Optional[bytes]] = [None] * len(ranges)
+    for start, size, members in coalesce(ranges, page_size):
+        data = backend.read(start, size)
+        if data is None or len(data) < size:
+            for index in members:
+                chunk = backend.read(*ranges[index])
+                if chunk is not None and len(chunk) == ranges[index][1]:
+                    results[index] = chunk
+            continue
+        for index in members:
+            address, length = ranges[index]
+            chunk = data[address - start:address - start + length]
+            if len(chunk) == length:
+                results[index] = chunk
+    return results
+
+
+def write_batch(backend: MemoryBackend, writes: List[Tuple[int, bytes]], skip_matching: bool = True,
+                page_size: int = PAGE_SIZE) -> Dict[str, Any]:
+    """Write many (address, data) pairs, grouped by span.
+
+    With skip_matching, each span is read once and values already in
+    memory are not written again. Byte-adjacent values are written
+    together; nothing else between them is touched. Returns counts of
+    written and skipped values plus the indices of failed writes.
+    """
+
+    written = skipped = 0
+    failed: List[int] = []
+    for start, size, members in coalesce([(address, len(data)) for address, data in writes], page_size):
+        current = backend.read(start, size) if skip_matching else None
+        pending = []
+        for index in members:
+            address, data = writes[index]
+            offset = address - start
+            if current is not None and current[offset:offset + len(data)] == data:
+                skipped += 1
+            else:
+                pending.append(index)
+
+        run: List[int] = []
+        for index in pending + [None]:
+            if run and index is not None and writes[index][0] == writes[run[-1]][0] + len(writes[run[-1]][1]):
+                run.append(index)
+                continue
+            if run:
+                ok = backend.write(writes[run[0]][0], b"".join(writes[i][1] for i in run))
+                if ok:
+                    written += len(run)
+                else:
+                    failed.extend(run)
+            run = [index] if index is not None else []
+    return {"written": written, "skipped": skipped, "failed": failed}
+
+
 def read_memory(address: int, type: str) -> Dict[str, Any]:
     proc = _ensure_attached()
     ctype_cls = _resolve_ctype(type)
-    buffer = ctype_cls()
-    bytes_read = ctypes.c_size_t()
+    size = ctypes.sizeof(ctype_cls)
 
-    success = kernel32.ReadProcessMemory(
-        proc.handle,
-        ctypes.c_void_p(address),
-        ctypes.byref(buffer),
-        ctypes.sizeof(buffer),
-        ctypes.byref(bytes_read),
-    )
+    data = proc.backend.read(address, size)
+    if data is None or len(data) != size:
+        raise OSError(f"Memory read failed at 0x{address:X}")
 
-    if not success:
-        raise OSError(f"ReadProcessMemory failed at 0x{address:X}")
-
-    return {"address": address, "type": type, "value": buffer.value}
+    return {"address": address, "type": type, "value": ctype_cls.from_buffer_copy(data).value}
 
 
 def write_memory(address: int, type: str, new_value: Any) -> Dict[str, Any]:
     proc = _ensure_attached()
     ctype_cls = _resolve_ctype(type)
     buffer = ctype_cls(new_value)
-    bytes_written = ctypes.c_size_t()
-
-    success = kernel32.WriteProcessMemory(
-        proc.handle,
-        ctypes.c_void_p(address),
-        ctypes.byref(buffer),
-        ctypes.sizeof(buffer),
-        ctypes.byref(bytes_written),
-    )
 
-    if not success:
-        raise OSError(f"WriteProcessMemory failed at 0x{address:X}")
+    if not proc.backend.write(address, bytes(buffer)):
+        raise OSError(f"Memory write failed at 0x{address:X}")
 
     return {"address": address, "type": type, "value": new_value}
 
 
+def read_memory_batch(requests: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    """read_memory for many (address, type) pairs; value is None where a read failed."""
+
+    proc = _ensure_attached()
+    ranges = [(address, ctypes.sizeof(_resolve_ctype(type))) for address, type in requests]
+    data = read_batch(proc.backend, ranges)
+    return [
+        {"address": address, "type": type, "value": _decode(type, chunk)}
+        for (address, type), chunk in zip(requests, data)
+    ]
+
+
+def write_memory_batch(writes: List[Tuple[int, str, Any]], skip_matching: bool = False) -> Dict[str, Any]:
+    """write_memory for many (address, type, value) triples.
+
+    Returns write_batch's counts with failed indices mapped to addresses.
+    """
+
+    proc = _ensure_attached()
+    encoded = [(address, _encode(type, value)) for address, type, value in writes]
+    result = write_batch(proc.backend, encoded, skip_matching)
+    result["failed"] = [writes[i][0] for i in result["failed"]]
+    return result
+
+
 _frozen_values: Dict[int, Dict[str, Any]] = {}
+# Encoded bytes of each frozen value, so freeze passes do not re-encode
+_frozen_data: Dict[int, bytes] = {}
+_freeze_lock = threading.Lock()
+_freeze_wake = threading.Event()
+_freeze_thread: Optional[threading.Thread] = None
 
 
 def freeze_memory(address: int, type: str, value: Any, interval_ms: int = 100):
-    """Record a frozen memory value.
+    """Record a frozen memory value and make sure the freeze loop runs.
 
-    The trainer engine is responsible for periodically re-applying freezes
-    using this registry.
+    The loop re-applies every frozen value of the attached process, at
+    the smallest interval_ms among them. Freezes belong to the process
+    attached when they were made and are dropped when it is detached or
+    another one is attached.
     """
 
-    _frozen_values[address] = {
-        "type": type,
-        "value": value,
-        "interval_ms": interval_ms,
-    }
+    proc = get_attached_process()
+    encoded = _encode(type, value)
+    with _freeze_lock:
+        _frozen_values[address] = {
+            "pid": proc.pid if proc is not None else None,
+            "type": type,
+            "value": value,
+            "interval_ms": interval_ms,
+        }
+        _frozen_data[address] = encoded
+    _start_freeze_loop()
     return {"address": address, "type": type, "value": value, "interval_ms": interval_ms}
 
 
 def unfreeze_memory(address: int):
-    _frozen_values.pop(address, None)
+    with _freeze_lock:
+        _frozen_values.pop(address, None)
+        _frozen_data.pop(address, None)
+    _freeze_wake.set()
     return {"address": address, "unfrozen": True}
 
 
+def apply_frozen() -> Dict[str, Any]:
+    """One freeze pass: rewrite the frozen values the game has changed."""
+
+    proc = _ensure_attached()
+    with _freeze_lock:
+        writes = [
+            (address, data) for address, data in _frozen_data.items()
+            if _frozen_values[address]["pid"] == proc.pid
+        ]
+    return write_batch(proc.backend, writes)
+
+
+def clear_frozen():
+    """Drop every freeze; the loop exits on its next pass."""
+
+    with _freeze_lock:
+        _frozen_values.clear()
+        _frozen_data.clear()
+    _freeze_wake.set()
+
+
+def _start_freeze_loop():
+    global _freeze_thread
+    with _freeze_lock:
+        if _freeze_thread is None or not _freeze_thread.is_alive():
+            _freeze_thread = threading.Thread(target=_freeze_loop, name="trainer-freeze", daemon=True)
+            _freeze_thread.start()
+    _freeze_wake.set()
+
+
+def _freeze_loop():
+    """Re-apply freezes until the registry is empty.
+
+    Runs at the smallest interval while the game keeps changing frozen
+    values and backs off up to FREEZE_MAX_BACKOFF times when it does not;
+    freeze/unfreeze wake it immediately.
+    """
+
+    global _freeze_thread
+    backoff = 1
+    while True:
+        with _freeze_lock:
+            if not _frozen_values:
+                _freeze_thread = None
+                return
+            interval = min(meta["interval_ms"] for meta in _frozen_values.values()) / 1000.0
+
+        if get_attached_process() is None:
+            backoff = FREEZE_MAX_BACKOFF
+        else:
+            try:
+                result = apply_frozen()
+                backoff = 1 if result["written"] else min(backoff * 2, FREEZE_MAX_BACKOFF)
+            except RuntimeError:
+                backoff = FREEZE_MAX_BACKOFF
+
+        _freeze_wake.wait(interval * backoff)
+        _freeze_wake.clear()
+
+
 def get_frozen_registry() -> Dict[int, Dict[str, Any]]:
     return _frozen_values
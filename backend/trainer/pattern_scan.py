@@ -1,7 +1,8 @@
 from typing import List, Tuple
 
-from .process_manager import get_attached_process, kernel32
+from .process_manager import get_attached_process
 from .memory_scanner import enumerate_memory_regions, _read_region
+from .pattern_scanner import find_pattern
 
 
 def parse_pattern(pattern: str) -> Tuple[bytes, bytes]:
@@ -26,19 +27,7 @@ def parse_pattern(pattern: str) -> Tuple[bytes, bytes]:
 
 
 def _find_pattern_in_data(data: bytes, pat: bytes, mask: bytes) -> List[int]:
-    matches: List[int] = []
-    plen = len(pat)
-    dlen = len(data)
-
-    for i in range(0, dlen - plen + 1):
-        ok = True
-        for j in range(plen):
-            if mask[j] and data[i + j] != pat[j]:
-                ok = False
-                break
-        if ok:
-            matches.append(i)
-    return matches
+    return find_pattern(data, pat, mask)
 
 
 def find_pattern_in_module(module_name: str, pattern: str) -> List[int]:
@@ -52,7 +41,7 @@ def find_pattern_in_module(module_name: str, pattern: str) -> List[int]:
     for region in enumerate_memory_regions():
         base = region["base"]
         size = region["size"]
-        data = _read_region(proc.handle, base, size)
+        data = _read_region(proc.backend, base, size)
         if not data:
             continue
 
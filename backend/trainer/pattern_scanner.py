@@ -2,9 +2,21 @@
 Pattern Scanner (AOB Scanner) - Find code signatures in memory
 Standard game trainer feature for finding code locations via byte patterns
 """
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import re
 
+import numpy as np
+
+from .memory_backend import as_backend
+
+# Anchors shorter than this are located with numpy instead of bytes.find
+_MIN_FIND_ANCHOR = 3
+# Positions per block when a multi-pattern scan builds its bigram keys
+_MULTI_BLOCK = 8 * 1024 * 1024
+# Below this many patterns separate find_pattern calls beat the shared
+# prefilter (aob_bench: 3 patterns on 64 MB take 0.16 s apart, 0.23 s combined)
+_MULTI_MIN_PATTERNS = 5
+
 
 class PatternMatch:
     def __init__(self, address: int, pattern: str):
@@ -60,7 +72,7 @@ def scan_pattern(
     Scan for byte pattern in process memory
     
     Args:
-        process_handle: Handle to target process
+        process_handle: MemoryBackend (or Windows handle) of the target process
         pattern: Pattern string like "48 8B ?? 24 ?? FF"
         start_address: Start of scan range (None = all memory)
         end_address: End of scan range (None = all memory)
@@ -87,37 +99,58 @@ def scan_pattern(
     return results
 
 
+def scan_patterns(
+    process_handle,
+    patterns: List[str],
+    start_address: Optional[int] = None,
+    end_address: Optional[int] = None,
+    first_only: bool = False
+) -> Dict[str, List[PatternMatch]]:
+    """
+    Scan for several byte patterns, reading each memory region only once
+    
+    Args:
+        process_handle: MemoryBackend (or Windows handle) of the target process
+        patterns: Pattern strings like "48 8B ?? 24 ?? FF"
+        start_address: Start of scan range (None = all memory)
+        end_address: End of scan range (None = all memory)
+        first_only: Keep only the first match of each pattern
+    
+    Returns:
+        Pattern string -> list of matches (every pattern is present)
+    """
+    scanner = MultiPatternScanner(patterns)
+    results: Dict[str, List[PatternMatch]] = {p: [] for p in scanner.patterns}
+    
+    if start_address is not None and end_address is not None:
+        regions = [(start_address, end_address)]
+    else:
+        regions = _get_executable_regions(process_handle)
+    
+    pending = set(scanner.patterns)
+    for region_start, region_end in regions:
+        if first_only and not pending:
+            break
+        data = _read_region_bytes(process_handle, region_start, region_end)
+        if not data:
+            continue
+        for pattern, offsets in scanner.find_all(data).items():
+            if not offsets or (first_only and pattern not in pending):
+                continue
+            if first_only:
+                offsets = offsets[:1]
+                pending.discard(pattern)
+            results[pattern].extend(PatternMatch(region_start + o, pattern) for o in offsets)
+    
+    return results
+
+
 def _get_executable_regions(process_handle) -> List[Tuple[int, int]]:
     """Get all executable memory regions"""
-    regions = []
     try:
-        import ctypes
-        
-        MEMORY_BASIC_INFORMATION = ctypes.c_ulonglong * 7
-        mbi = MEMORY_BASIC_INFORMATION()
-        address = 0
-        
-        while address < 0x7FFFFFFFFFFF:
-            result = ctypes.windll.kernel32.VirtualQueryEx(
-                process_handle, address, ctypes.byref(mbi), ctypes.sizeof(mbi)
-            )
-            if not result:
-                break
-            
-            base = mbi[0]
-            size = mbi[2]
-            protect = mbi[4]
-            
-            # Check if executable (PAGE_EXECUTE = 0x10, PAGE_EXECUTE_READ = 0x20, etc.)
-            if protect in [0x10, 0x20, 0x40, 0x80]:
-                regions.append((base, base + size))
-            
-            address = base + size
-            
+        return [(r.base, r.end) for r in as_backend(process_handle).regions(executable=True)]
     except Exception:
-        pass
-    
-    return regions
+        return []
 
 
 def _scan_region(
@@ -128,35 +161,21 @@ def _scan_region(
     mask: bytes
 ) -> List[int]:
     """Scan a memory region for pattern"""
-    matches = []
-    
+    data = _read_region_bytes(process_handle, start, end)
+    if not data:
+        return []
+    return [start + offset for offset in find_pattern(data, pattern, mask)]
+
+
+def _read_region_bytes(process_handle, start: int, end: int) -> Optional[bytes]:
+    """Read a memory region (None if unreadable or over 100MB)"""
+    size = end - start
+    if size > 100 * 1024 * 1024:  # Limit to 100MB per region
+        return None
     try:
-        import ctypes
-        
-        size = end - start
-        if size > 100 * 1024 * 1024:  # Limit to 100MB per region
-            return matches
-        
-        buffer = ctypes.create_string_buffer(size)
-        bytes_read = ctypes.c_size_t()
-        
-        success = ctypes.windll.kernel32.ReadProcessMemory(
-            process_handle, start, buffer, size, ctypes.byref(bytes_read)
-        )
-        
-        if not success:
-            return matches
-        
-        # Scan buffer for pattern
-        pattern_len = len(pattern)
-        for i in range(bytes_read.value - pattern_len + 1):
-            if _matches_pattern(buffer.raw[i:i+pattern_len], pattern, mask):
-                matches.append(start + i)
-        
+        return as_backend(process_handle).read(start, size)
     except Exception:
-        pass
-    
-    return matches
+        return None
 
 
 def _matches_pattern(data: bytes, pattern: bytes, mask: bytes) -> bool:
@@ -167,6 +186,143 @@ def _matches_pattern(data: bytes, pattern: bytes, mask: bytes) -> bool:
     return True
 
 
+def _anchor(pattern: bytes, mask: bytes) -> Tuple[int, bytes]:
+    """Longest fully-specified byte run in the pattern as (offset, bytes)"""
+    best_start, best_len = 0, 0
+    run_start = None
+    for i, m in enumerate(mask + b"\x00"):
+        if m == 0xFF:
+            if run_start is None:
+                run_start = i
+        elif run_start is not None:
+            if i - run_start > best_len:
+                best_start, best_len = run_start, i - run_start
+            run_start = None
+    return best_start, pattern[best_start:best_start + best_len]
+
+
+def find_pattern(data: bytes, pattern: bytes, mask: bytes) -> List[int]:
+    """
+    Find every offset in data where pattern matches under mask
+    
+    Candidates come from bytes.find on the longest exact run (C speed), the
+    remaining exact bytes are then checked column by column with numpy so
+    each pass only looks at the candidates that survived the previous one.
+    """
+    pattern_len = len(pattern)
+    last = len(data) - pattern_len
+    if pattern_len == 0 or last < 0:
+        return []
+    
+    anchor_offset, anchor = _anchor(pattern, mask)
+    if not anchor:
+        # All wildcards: every offset matches
+        return list(range(last + 1))
+    
+    haystack = np.frombuffer(data, dtype=np.uint8)
+    if len(anchor) < _MIN_FIND_ANCHOR:
+        # Short anchors hit too often for a find() loop; seed from one byte
+        # and let the column checks below verify the rest of the anchor
+        candidates = np.flatnonzero(haystack == anchor[0]) - anchor_offset
+        verified = {anchor_offset}
+    else:
+        found = []
+        idx = data.find(anchor)
+        while idx != -1:
+            found.append(idx)
+            idx = data.find(anchor, idx + 1)
+        candidates = np.asarray(found, dtype=np.int64) - anchor_offset
+        verified = set(range(anchor_offset, anchor_offset + len(anchor)))
+    
+    return _verify(haystack, candidates, pattern, mask, verified).tolist()
+
+
+def _verify(haystack: np.ndarray, candidates: np.ndarray, pattern: bytes, mask: bytes,
+            verified=()) -> np.ndarray:
+    """Keep the candidate offsets where every exact byte not in verified matches"""
+    candidates = candidates[(candidates >= 0) & (candidates <= len(haystack) - len(pattern))]
+    for j in range(len(pattern)):
+        if candidates.size == 0:
+            break
+        if mask[j] != 0xFF or j in verified:
+            continue
+        candidates = candidates[haystack[candidates + j] == pattern[j]]
+    return candidates
+
+
+class MultiPatternScanner:
+    """
+    Finds many AOB signatures with one shared prefilter pass over a buffer
+    
+    Each pattern is reduced to its anchor (longest exact byte run). One
+    vectorized pass keeps the positions holding any anchor's first byte, a
+    65536-entry bigram table narrows those to positions where some anchor's
+    first two bytes occur, and each pattern then verifies its own share of
+    the candidates with masked numpy comparisons. This is a two-byte
+    prefilter, not a full automaton: the cost of the shared pass only pays
+    off once there are _MULTI_MIN_PATTERNS or more patterns, so smaller sets
+    are scanned with find_pattern one by one.
+    """
+    
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(dict.fromkeys(patterns))
+        # pattern -> (bytes, mask, anchor offset, anchor)
+        self._compiled: Dict[str, Tuple[bytes, bytes, int, bytes]] = {}
+        self._first_bytes = np.zeros(256, dtype=bool)
+        self._bigrams = np.zeros(1 << 16, dtype=bool)
+        self._unigrams = np.zeros(256, dtype=bool)
+        
+        for text in self.patterns:
+            pattern, mask = parse_pattern(text)
+            anchor_offset, anchor = _anchor(pattern, mask)
+            self._compiled[text] = (pattern, mask, anchor_offset, anchor)
+            if anchor:
+                self._first_bytes[anchor[0]] = True
+            if len(anchor) == 1:
+                self._unigrams[anchor[0]] = True
+            elif anchor:
+                self._bigrams[anchor[0] | (anchor[1] << 8)] = True
+    
+    def find_all(self, data: bytes) -> Dict[str, List[int]]:
+        """Offsets of every pattern in data"""
+        if len(self._compiled) < _MULTI_MIN_PATTERNS:
+            return {
+                text: find_pattern(data, pattern, mask)
+                for text, (pattern, mask, _, _) in self._compiled.items()
+            }
+        
+        haystack = np.frombuffer(data, dtype=np.uint8)
+        positions, keys = [], []
+        
+        for start in range(0, len(haystack), _MULTI_BLOCK):
+            hits = np.flatnonzero(self._first_bytes[haystack[start:start + _MULTI_BLOCK]]) + start
+            # Past the end the "second byte" repeats the last one; such
+            # candidates cannot fit a 2+ byte pattern and fail verification
+            following = np.minimum(hits + 1, len(haystack) - 1)
+            hit_keys = haystack[hits].astype(np.uint16) | (haystack[following].astype(np.uint16) << 8)
+            keep = self._bigrams[hit_keys] | self._unigrams[hit_keys & 0xFF]
+            positions.append(hits[keep])
+            keys.append(hit_keys[keep])
+        
+        positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.uint16)
+        
+        results: Dict[str, List[int]] = {}
+        for text, (pattern, mask, anchor_offset, anchor) in self._compiled.items():
+            if not anchor:
+                results[text] = list(range(len(data) - len(pattern) + 1)) if pattern else []
+                continue
+            if len(anchor) == 1:
+                starts = positions[(keys & 0xFF) == anchor[0]]
+                verified = {anchor_offset}
+            else:
+                starts = positions[keys == (anchor[0] | (anchor[1] << 8))]
+                verified = {anchor_offset, anchor_offset + 1}
+            results[text] = _verify(haystack, starts - anchor_offset, pattern, mask, verified).tolist()
+        
+        return results
+
+
 def pattern_to_regex(pattern: str) -> str:
     """Convert AOB pattern to regex for text search"""
     parts = pattern.upper().replace(",", " ").split()
@@ -1,9 +1,28 @@
 """
 Pointer Scanner - Find static pointers to dynamic addresses
 Standard game trainer feature for finding permanent memory addresses
+
+Scans work from a PointerMap: every aligned pointer-sized slot whose value
+lands inside a readable region, read once and sorted by value. Each level
+of a chain is then a searchsorted range query instead of another pass over
+memory. Maps can be saved, so after a game restart the chains found in an
+old map are checked against a new map rather than rescanning.
 """
-from typing import List, Dict, Any, Optional, Set
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 import struct
+import threading
+
+import numpy as np
+
+from .memory_backend import as_backend
+from .memory_writer import read_batch
+from .scan_session import CHUNK_SIZE, CancelCheck, ProgressCallback, ScanCancelled, plan_chunks, typed_view
+
+# Paths returned by one scan; chain counts grow exponentially with depth
+MAX_RESULTS = 10000
+
+_POINTER_DTYPES = {4: np.dtype("<u4"), 8: np.dtype("<u8")}
 
 
 class PointerScanResult:
@@ -13,156 +32,267 @@ class PointerScanResult:
         self.final_value = final_value
         self.path = f"[{hex(base_address)}]" + "".join(f" + {hex(o)}" for o in offsets)
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"base_address": self.base_address, "offsets": self.offsets,
+                "final_value": self.final_value, "path": self.path}
+
+
+class PointerMap:
+    """
+    Sorted (value -> address) pairs of every slot that holds a pointer.
+
+    values is ascending; addresses[i] is the slot holding values[i].
+    region_starts/region_ends are the readable ranges a value had to fall
+    in to count as a pointer.
+    """
+
+    def __init__(self, values: np.ndarray, addresses: np.ndarray,
+                 region_starts: np.ndarray, region_ends: np.ndarray, pointer_size: int = 8):
+        self.values = values
+        self.addresses = addresses
+        self.region_starts = region_starts
+        self.region_ends = region_ends
+        self.pointer_size = pointer_size
+        self._by_address: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @classmethod
+    def build(
+        cls,
+        process_handle,
+        scan_range: Optional[tuple] = None,
+        pointer_size: int = 8,
+        chunk_size: int = CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[CancelCheck] = None,
+    ) -> "PointerMap":
+        """
+        Read every readable region once and collect its pointers.
+
+        scan_range limits where pointers are looked for; their values may
+        still point anywhere readable.
+        """
+        if pointer_size not in _POINTER_DTYPES:
+            raise ValueError("pointer_size must be 4 or 8")
+        dtype = _POINTER_DTYPES[pointer_size]
+        backend = as_backend(process_handle)
+
+        readable = sorted((r.base, r.end) for r in backend.regions())
+        region_starts = np.array([start for start, _ in readable], dtype=np.uint64)
+        region_ends = np.array([end for _, end in readable], dtype=np.uint64)
+
+        sources = readable
+        if scan_range:
+            low, high = scan_range
+            sources = [(max(start, low), min(end, high)) for start, end in readable if start < high and low < end]
+        chunks = plan_chunks([{"base": start, "size": end - start} for start, end in sources],
+                             pointer_size, pointer_size, chunk_size)
+
+        values, addresses = [], []
+        total = sum(size for _, size in chunks)
+        done = 0
+        for base, size in chunks:
+            if cancel is not None and cancel():
+                raise ScanCancelled("Pointer map build cancelled")
+            data = backend.read(base, size)
+            if data:
+                view = typed_view(data, dtype, pointer_size).astype(np.uint64)
+                index = np.searchsorted(region_starts, view, side="right") - 1
+                valid = (index >= 0) & (view < region_ends[np.maximum(index, 0)])
+                slots = np.flatnonzero(valid)
+                values.append(view[slots])
+                addresses.append(np.uint64(base) + slots.astype(np.uint64) * np.uint64(pointer_size))
+            done += size
+            if progress is not None:
+                progress(done, total)
+
+        values = np.concatenate(values) if values else np.empty(0, dtype=np.uint64)
+        addresses = np.concatenate(addresses) if addresses else np.empty(0, dtype=np.uint64)
+        order = np.argsort(values, kind="stable")
+        return cls(values[order], addresses[order], region_starts, region_ends, pointer_size)
+
+    # ═══════════════════════════════════════════════════════════════
+    # QUERIES
+    # ═══════════════════════════════════════════════════════════════
+
+    def pointers_into(self, low: int, high: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(values, addresses) of pointers with low <= value <= high"""
+        lo = np.searchsorted(self.values, np.uint64(low), side="left")
+        hi = np.searchsorted(self.values, np.uint64(high), side="right")
+        return self.values[lo:hi], self.addresses[lo:hi]
+
+    def read_pointer(self, address: int) -> Optional[int]:
+        """Value of the pointer stored at address, if that slot holds one"""
+        if self._by_address is None:
+            self._by_address = np.argsort(self.addresses, kind="stable")
+        sorted_addresses = self.addresses[self._by_address]
+        i = int(np.searchsorted(sorted_addresses, np.uint64(address)))
+        if i < len(sorted_addresses) and int(sorted_addresses[i]) == address:
+            return int(self.values[self._by_address[i]])
+        return None
+
+    def resolve(self, base_address: int, offsets: List[int]) -> Optional[int]:
+        """Follow a chain through the map (no memory reads)"""
+        current = base_address
+        for offset in offsets:
+            value = self.read_pointer(current)
+            if value is None:
+                return None
+            current = value + offset
+        return current
+
+    def find_paths(self, target_address: int, max_offset: int = 0x1000, max_depth: int = 5,
+                   max_results: int = MAX_RESULTS) -> List[PointerScanResult]:
+        """
+        Chains [base] + o1 ... + on that end at target_address.
+
+        Level n holds pointers into [node - max_offset, node] of level n-1
+        nodes, found for the whole level at once with searchsorted. A slot
+        already reached at a shallower level is not expanded again, but a
+        slot that leads to several nodes of the level below keeps an edge to
+        each of them, so every chain through it is reported.
+        """
+        frontier = np.array([target_address], dtype=np.uint64)
+        seen = frontier
+        # Chains ending at each frontier node (float: counts grow exponentially)
+        chain_counts = np.ones(1)
+        # Per level: (nodes, first edge of each node + end, edge parents, edge offsets)
+        levels: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        found = 0
+        max_offset = np.uint64(max(max_offset - 1, 0))
+
+        for _ in range(max_depth):
+            if not len(frontier) or found >= max_results:
+                break
+            lows = np.where(frontier > max_offset, frontier - max_offset, np.uint64(0))
+            lo = np.searchsorted(self.values, lows, side="left")
+            hi = np.searchsorted(self.values, frontier, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if not total:
+                break
+
+            parents = np.repeat(np.arange(len(frontier)), counts)
+            starts = np.cumsum(counts) - counts
+            index = np.arange(total) - np.repeat(starts, counts) + np.repeat(lo, counts)
+            addresses = self.addresses[index]
+            offsets = frontier[parents] - self.values[index]
+
+            fresh = ~np.isin(addresses, seen)
+            addresses, parents, offsets = addresses[fresh], parents[fresh], offsets[fresh]
+            if not len(addresses):
+                break
+
+            # Nodes in order of first appearance; edges grouped by node
+            nodes, first, edge_nodes = np.unique(addresses, return_index=True, return_inverse=True)
+            order = np.argsort(first, kind="stable")
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            nodes, edge_nodes = nodes[order], rank[edge_nodes.ravel()]
+            node_chains = np.bincount(edge_nodes, weights=chain_counts[parents], minlength=len(nodes))
+
+            # Only expand as many nodes as the remaining result budget needs
+            keep = min(len(nodes), int(np.searchsorted(np.cumsum(node_chains), max_results - found)) + 1)
+            nodes, node_chains = nodes[:keep], node_chains[:keep]
+            edges = np.flatnonzero(edge_nodes < keep)
+            edges = edges[np.argsort(edge_nodes[edges], kind="stable")]
+            edge_starts = np.searchsorted(edge_nodes[edges], np.arange(keep + 1))
+
+            levels.append((nodes, edge_starts, parents[edges], offsets[edges]))
+            seen = np.concatenate([seen, nodes])
+            frontier, chain_counts = nodes, node_chains
+            found += int(node_chains.sum())
+
+        results = []
+        for depth, (nodes, _, _, _) in enumerate(levels):
+            for node in range(len(nodes)):
+                for chain in self._chains(levels, depth, node):
+                    if len(results) >= max_results:
+                        return results
+                    results.append(PointerScanResult(int(nodes[node]), chain, target_address))
+        return results
+
+    @classmethod
+    def _chains(cls, levels, depth: int, node: int):
+        """Offset lists from a level `depth` node down to the target"""
+        if depth < 0:
+            yield []
+            return
+        _, edge_starts, parents, offsets = levels[depth]
+        for edge in range(edge_starts[node], edge_starts[node + 1]):
+            for rest in cls._chains(levels, depth - 1, int(parents[edge])):
+                yield [int(offsets[edge])] + rest
+
+    # ═══════════════════════════════════════════════════════════════
+    # PERSISTENCE
+    # ═══════════════════════════════════════════════════════════════
+
+    def save(self, path: str):
+        """Write the map as a .npz file"""
+        with open(path, "wb") as f:
+            np.savez(f, values=self.values, addresses=self.addresses,
+                     region_starts=self.region_starts, region_ends=self.region_ends,
+                     pointer_size=np.array(self.pointer_size))
+
+    @classmethod
+    def load(cls, path: str) -> "PointerMap":
+        with np.load(path) as data:
+            return cls(data["values"], data["addresses"], data["region_starts"],
+                       data["region_ends"], int(data["pointer_size"]))
+
 
 def scan_pointers(
     process_handle,
     target_address: int,
     max_offset: int = 0x1000,
     max_depth: int = 5,
-    scan_range: Optional[tuple] = None
+    scan_range: Optional[tuple] = None,
+    pointer_map: Optional[PointerMap] = None,
+    max_results: int = MAX_RESULTS,
 ) -> List[PointerScanResult]:
     """
     Find static pointers that lead to target_address
     
     Args:
-        process_handle: Handle to target process
+        process_handle: MemoryBackend (or Windows handle) of the target process
         target_address: Address we want to find pointers to
         max_offset: Maximum offset to check at each level
         max_depth: Maximum pointer chain depth
         scan_range: (start, end) memory range to scan, None for all
+        pointer_map: Previously built map to query instead of reading memory
+        max_results: Stop after this many paths
     
     Returns:
         List of pointer paths that resolve to target_address
     """
-    results = []
-    
-    # Get memory regions to scan
-    if scan_range:
-        regions = [scan_range]
-    else:
-        regions = _get_readable_regions(process_handle)
-    
-    # Level 1: Direct pointers
-    for region_start, region_end in regions:
-        pointers = _find_direct_pointers(process_handle, region_start, region_end, target_address)
-        for ptr_addr in pointers:
-            results.append(PointerScanResult(ptr_addr, [], target_address))
-    
-    # Recursive pointer chains (multi-level)
-    if max_depth > 1:
-        checked: Set[int] = set()
-        for depth in range(1, max_depth):
-            new_targets = [r.base_address for r in results if len(r.offsets) == depth - 1]
-            for target in new_targets:
-                if target in checked:
-                    continue
-                checked.add(target)
-                
-                for region_start, region_end in regions:
-                    pointers = _find_direct_pointers(process_handle, region_start, region_end, target)
-                    for ptr_addr in pointers:
-                        # Try offsets
-                        for offset in range(0, max_offset, 4):
-                            test_result = PointerScanResult(ptr_addr, [offset], target_address)
-                            if _validate_pointer_path(process_handle, test_result):
-                                results.append(test_result)
-    
-    return results
+    if pointer_map is None:
+        pointer_map = PointerMap.build(process_handle, scan_range)
+    return pointer_map.find_paths(target_address, max_offset, max_depth, max_results)
 
 
-def _get_readable_regions(process_handle) -> List[tuple]:
-    """Get all readable memory regions"""
-    regions = []
-    try:
-        import ctypes
-        from ctypes import wintypes
-        
-        MEMORY_BASIC_INFORMATION = ctypes.c_ulonglong * 7
-        mbi = MEMORY_BASIC_INFORMATION()
-        address = 0
-        
-        while True:
-            result = ctypes.windll.kernel32.VirtualQueryEx(
-                process_handle, address, ctypes.byref(mbi), ctypes.sizeof(mbi)
-            )
-            if not result:
-                break
-            
-            base = mbi[0]
-            size = mbi[2]
-            protect = mbi[4]
-            
-            # Check if readable (PAGE_READONLY = 2, PAGE_READWRITE = 4)
-            if protect in [2, 4, 0x20, 0x40]:
-                regions.append((base, base + size))
-            
-            address = base + size
-            
-    except Exception:
-        pass
-    
-    return regions
+def rescan_pointers(results: List[PointerScanResult], pointer_map: PointerMap,
+                    target_address: int) -> List[PointerScanResult]:
+    """Keep the paths that still lead to target_address in another map"""
+    return [
+        PointerScanResult(r.base_address, r.offsets, target_address)
+        for r in results
+        if pointer_map.resolve(r.base_address, r.offsets) == target_address
+    ]
 
 
-def _find_direct_pointers(process_handle, start: int, end: int, target_address: int) -> List[int]:
-    """Find addresses that point directly to target_address"""
-    pointers = []
-    try:
-        import ctypes
-        
-        # Read memory region
-        size = end - start
-        buffer = ctypes.create_string_buffer(size)
-        bytes_read = ctypes.c_size_t()
-        
-        success = ctypes.windll.kernel32.ReadProcessMemory(
-            process_handle, start, buffer, size, ctypes.byref(bytes_read)
-        )
-        
-        if not success:
-            return pointers
-        
-        # Scan for target address as pointer value
-        for i in range(0, bytes_read.value - 8, 8):  # 8-byte aligned scan
-            try:
-                value = struct.unpack("<Q", buffer.raw[i:i+8])[0]
-                if value == target_address:
-                    pointers.append(start + i)
-            except struct.error:
-                continue
-                
-    except Exception:
-        pass
-    
-    return pointers
-
+def compare_pointer_maps(old_map: PointerMap, old_target: int, new_map: PointerMap, new_target: int,
+                         max_offset: int = 0x1000, max_depth: int = 5,
+                         max_results: int = MAX_RESULTS) -> List[PointerScanResult]:
+    """
+    Paths to old_target in old_map that lead to new_target in new_map.
 
-def _validate_pointer_path(process_handle, result: PointerScanResult) -> bool:
-    """Verify that pointer path resolves correctly"""
-    try:
-        import ctypes
-        
-        current_addr = result.base_address
-        
-        for offset in result.offsets:
-            # Read pointer at current address
-            buffer = ctypes.c_ulonglong()
-            bytes_read = ctypes.c_size_t()
-            
-            success = ctypes.windll.kernel32.ReadProcessMemory(
-                process_handle, current_addr, ctypes.byref(buffer), 8, ctypes.byref(bytes_read)
-            )
-            
-            if not success or bytes_read.value != 8:
-                return False
-            
-            current_addr = buffer.value + offset
-        
-        # Final address should match target
-        return current_addr == result.final_value
-        
-    except Exception:
-        return False
+    Run after a game restart: the value moved, but paths that survive both
+    maps are the stable ones.
+    """
+    candidates = old_map.find_paths(old_target, max_offset, max_depth, max_results)
+    return rescan_pointers(candidates, new_map, new_target)
 
 
 def format_pointer_path(result: PointerScanResult) -> str:
@@ -222,24 +352,128 @@ def parse_pointer_path(path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def resolve_pointer_chain(process_handle, base_addr: int, offsets: List[int]) -> Optional[int]:
+def _read_pointer(backend, address: int) -> Optional[int]:
+    data = backend.read(address, 8)
+    if data is None or len(data) != 8:
+        return None
+    return struct.unpack("<Q", data)[0]
+
+
+def _walk_chain(backend, first_pointer: int, offsets: List[int]) -> Optional[int]:
+    """Follow offsets once the pointer at the chain's base is known"""
+    current_addr = first_pointer + offsets[0]
+    for offset in offsets[1:]:
+        pointer = _read_pointer(backend, current_addr)
+        if pointer is None:
+            return None
+        current_addr = pointer + offset
+    return current_addr
+
+
+def resolve_pointer_chain(process_handle, base_addr: int, offsets: List[int],
+                          cache: Optional["PointerChainCache"] = None) -> Optional[int]:
     """
     Resolve a pointer chain starting at base_addr with given offsets.
+
+    With a cache, chains whose first pointer has not changed resolve in
+    one read.
     """
-    import ctypes
-    current_addr = base_addr
+    if cache is not None:
+        return cache.resolve(process_handle, base_addr, offsets)
+    if not offsets:
+        return base_addr
     
     try:
-        for offset in offsets:
-            buffer = ctypes.c_uint64()
-            bytes_read = ctypes.c_size_t()
-            success = ctypes.windll.kernel32.ReadProcessMemory(
-                process_handle, current_addr, ctypes.byref(buffer), 8, ctypes.byref(bytes_read)
-            )
-            if not success or bytes_read.value != 8:
-                return None
-            current_addr = buffer.value + offset
-            
-        return current_addr
+        backend = as_backend(process_handle)
+        first_pointer = _read_pointer(backend, base_addr)
+        if first_pointer is None:
+            return None
+        return _walk_chain(backend, first_pointer, offsets)
     except Exception:
         return None
+
+
+class PointerChainCache:
+    """
+    Resolved pointer chains keyed by (base address, offsets).
+
+    Each entry remembers the first-level pointer it was resolved through.
+    A lookup re-reads only that pointer (the guard) and walks the chain
+    again when it changed. Base addresses include the module base, so a
+    module reloaded at another address misses on its own. Deeper levels
+    are trusted while the guard holds; call invalidate() when the game is
+    known to have rebuilt them (level load, respawn).
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, Tuple[int, ...]], Tuple[int, Optional[int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def resolve(self, process_handle, base_addr: int, offsets: List[int]) -> Optional[int]:
+        if not offsets:
+            return base_addr
+        backend = as_backend(process_handle)
+        try:
+            first_pointer = _read_pointer(backend, base_addr)
+        except Exception:
+            first_pointer = None
+        return self._resolve_with_guard(backend, base_addr, offsets, first_pointer)
+
+    def resolve_many(self, process_handle, chains: List[Tuple[int, List[int]]]) -> List[Optional[int]]:
+        """Resolve (base_addr, offsets) chains, batching the guard reads by page"""
+        backend = as_backend(process_handle)
+        walked = [i for i, (_, offsets) in enumerate(chains) if offsets]
+        guards = read_batch(backend, [(chains[i][0], 8) for i in walked])
+        results: List[Optional[int]] = [base for base, _ in chains]
+        for i, data in zip(walked, guards):
+            base_addr, offsets = chains[i]
+            first_pointer = struct.unpack("<Q", data)[0] if data is not None else None
+            results[i] = self._resolve_with_guard(backend, base_addr, offsets, first_pointer)
+        return results
+
+    def _resolve_with_guard(self, backend, base_addr: int, offsets: List[int],
+                            first_pointer: Optional[int]) -> Optional[int]:
+        key = (base_addr, tuple(offsets))
+        with self._lock:
+            if first_pointer is None:
+                self._entries.pop(key, None)
+                return None
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == first_pointer:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        try:
+            final_addr = _walk_chain(backend, first_pointer, offsets)
+        except Exception:
+            final_addr = None
+
+        with self._lock:
+            if final_addr is None:
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = (first_pointer, final_addr)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return final_addr
+
+    def invalidate(self, base_addr: Optional[int] = None):
+        """Forget every chain, or only those rooted at base_addr"""
+        with self._lock:
+            if base_addr is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == base_addr]:
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -1,30 +1,34 @@
-import ctypes
-import ctypes.wintypes as wintypes
 from typing import List, Optional, Dict, Any
 
 import psutil
 
-
-PROCESS_QUERY_INFORMATION = 0x0400
-PROCESS_VM_READ = 0x0010
-PROCESS_VM_WRITE = 0x0020
-PROCESS_VM_OPERATION = 0x0008
-
-
-kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+from .memory_backend import (
+    MemoryBackend,
+    open_process_backend,
+    PROCESS_QUERY_INFORMATION,
+    PROCESS_VM_READ,
+    PROCESS_VM_WRITE,
+    PROCESS_VM_OPERATION,
+)
 
 
 class AttachedProcess:
     """Represents an attached game process.
 
-    This is a lightweight wrapper used by other trainer modules.
+    This is a lightweight wrapper used by other trainer modules; all
+    memory access goes through its backend.
     """
 
-    def __init__(self, pid: int, handle: int, name: str):
+    def __init__(self, pid: int, backend: MemoryBackend, name: str):
         self.pid = pid
-        self.handle = handle
+        self.backend = backend
         self.name = name
 
+    @property
+    def handle(self):
+        """Windows process handle (None for other backends)"""
+        return getattr(self.backend, "handle", None)
+
 
 _attached_process: Optional[AttachedProcess] = None
 
@@ -63,12 +67,20 @@ def list_processes() -> List[Dict[str, Any]]:
     return processes
 
 
-def _open_process(pid: int) -> int:
-    access = PROCESS_QUERY_INFORMATION | PROCESS_VM_READ | PROCESS_VM_WRITE | PROCESS_VM_OPERATION
-    handle = kernel32.OpenProcess(access, False, pid)
-    if not handle:
-        raise OSError(f"Failed to open process {pid}: {ctypes.get_last_error()}")
-    return handle
+def _clear_frozen():
+    # memory_writer imports this module; freezes never carry over to another target
+    from .memory_writer import clear_frozen
+
+    clear_frozen()
+
+
+def _set_attached(proc: AttachedProcess) -> AttachedProcess:
+    global _attached_process
+    _clear_frozen()
+    if _attached_process is not None and _attached_process.backend is not proc.backend:
+        _attached_process.backend.close()
+    _attached_process = proc
+    return proc
 
 
 def attach_to_process(process_name: str) -> Optional[AttachedProcess]:
@@ -77,8 +89,6 @@ def attach_to_process(process_name: str) -> Optional[AttachedProcess]:
     Returns AttachedProcess on success, or None if not found.
     """
 
-    global _attached_process
-
     candidates = [
         p for p in psutil.process_iter(["pid", "name"]) if (p.info.get("name") or "").lower() == process_name.lower()
     ]
@@ -86,38 +96,44 @@ def attach_to_process(process_name: str) -> Optional[AttachedProcess]:
         return None
 
     proc = candidates[0]
-    handle = _open_process(proc.pid)
-    _attached_process = AttachedProcess(pid=proc.pid, handle=handle, name=proc.info.get("name") or "")
-    return _attached_process
+    backend = open_process_backend(proc.pid)
+    return _set_attached(AttachedProcess(pid=proc.pid, backend=backend, name=proc.info.get("name") or ""))
 
 
 def attach_to_pid(pid: int) -> Optional[AttachedProcess]:
     """Attach to a process by PID."""
 
-    global _attached_process
-
     try:
         proc = psutil.Process(int(pid))
     except Exception:
         return None
 
     try:
-        handle = _open_process(proc.pid)
+        backend = open_process_backend(proc.pid)
     except Exception:
         return None
 
-    _attached_process = AttachedProcess(pid=proc.pid, handle=handle, name=proc.name() or "")
-    return _attached_process
+    return _set_attached(AttachedProcess(pid=proc.pid, backend=backend, name=proc.name() or ""))
+
+
+def attach_backend(backend: MemoryBackend, name: str = "") -> AttachedProcess:
+    """Attach to an already opened backend, e.g. a FileSnapshotBackend of dumps.
+
+    Scans, reads and writes then run against it like a live process.
+    """
+
+    return _set_attached(AttachedProcess(pid=backend.pid, backend=backend, name=name))
 
 
 def detach_process() -> bool:
     """Detach from any currently attached process."""
 
     global _attached_process
+    _clear_frozen()
     if _attached_process is None:
         return False
     try:
-        kernel32.CloseHandle(_attached_process.handle)
+        _attached_process.backend.close()
     except Exception:
         pass
     _attached_process = None
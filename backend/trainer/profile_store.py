@@ -10,6 +10,20 @@ def _safe_name(name: str) -> str:
     return "".join(c for c in name if c.isalnum() or c in ("-", "_", ".")) or "default"
 
 
+def data_path(root: str, name: str, suffix: str = "") -> str:
+    """Path of the entry called `name` directly inside `root`.
+
+    Names come from API requests, so anything that could step outside root
+    (separators, "..", drive prefixes) is rejected with ValueError.
+    """
+    name = (name or "").strip()
+    if not name or ".." in name or any(c in name for c in "/\\:\0"):
+        raise ValueError(f"Invalid name {name!r}: use a plain file name without separators or '..'")
+    if suffix and not name.endswith(suffix):
+        name += suffix
+    return os.path.join(root, name)
+
+
 def _profile_path(game_id: str) -> str:
     safe = _safe_name(game_id)
     return os.path.join(TRAINER_DATA_DIR, f"{safe}.json")
@@ -0,0 +1,167 @@
+"""
+Scan result sets: (address, value) columns in numpy arrays
+
+First scans of common values can hit millions of addresses. A
+ScanResultSet keeps them as uint64 addresses plus typed values instead of
+Python ints, switches to memory-mapped temporary files once it grows past
+a threshold, and is narrowed in place by next scans so memory stays
+bounded. Results are read back a page at a time.
+"""
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+# Bytes held in RAM (addresses + values) before a result set spills to disk
+SPILL_THRESHOLD = 64 * 1024 * 1024
+# Entries handed to a refine predicate at a time
+REFINE_CHUNK = 1 << 20
+
+_INITIAL_CAPACITY = 4096
+
+# predicate(addresses, values) -> (keep mask, new values or None)
+RefinePredicate = Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, Optional[np.ndarray]]]
+
+
+class ScanResultSet:
+    """
+    Growable (address, value) columns that spill to mmap and filter in place.
+
+    Arrays returned by addresses()/values() are views; they are only valid
+    until the next append or refine.
+    """
+
+    def __init__(self, value_dtype, spill_threshold: int = SPILL_THRESHOLD,
+                 directory: Optional[str] = None):
+        self.value_dtype = np.dtype(value_dtype)
+        self.spill_threshold = spill_threshold
+        self.directory = directory
+
+        self._length = 0
+        self._addresses = np.empty(_INITIAL_CAPACITY, dtype=np.uint64)
+        self._values = np.empty(_INITIAL_CAPACITY, dtype=self.value_dtype)
+        self._tempdir: Optional[str] = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def spilled(self) -> bool:
+        return self._tempdir is not None
+
+    @property
+    def entry_size(self) -> int:
+        return 8 + self.value_dtype.itemsize
+
+    # ═══════════════════════════════════════════════════════════════
+    # WRITING
+    # ═══════════════════════════════════════════════════════════════
+
+    def append(self, addresses: np.ndarray, values: np.ndarray):
+        """Append matching address and value arrays"""
+        n = len(addresses)
+        if n != len(values):
+            raise ValueError("addresses and values must have the same length")
+        if not n:
+            return
+        self._reserve(self._length + n)
+        self._addresses[self._length:self._length + n] = addresses
+        self._values[self._length:self._length + n] = values
+        self._length += n
+
+    def refine(self, segments: Iterable[Tuple[int, int, RefinePredicate]]) -> List[int]:
+        """
+        Keep entries a predicate accepts, compacting the columns in place.
+
+        segments are ascending, non-overlapping (start, stop, predicate)
+        ranges; entries outside every segment are dropped. Predicates see
+        at most REFINE_CHUNK entries at a time and may return replacement
+        values for them. Returns the number of entries kept per segment.
+        """
+        write = 0
+        kept_per_segment = []
+        for start, stop, predicate in segments:
+            kept_here = 0
+            for chunk_start in range(start, min(stop, self._length), REFINE_CHUNK):
+                chunk_stop = min(stop, self._length, chunk_start + REFINE_CHUNK)
+                addresses = self._addresses[chunk_start:chunk_stop]
+                values = self._values[chunk_start:chunk_stop]
+                mask, new_values = predicate(addresses, values)
+                # Boolean indexing copies, so writing behind the read position is safe
+                kept_addresses = addresses[mask]
+                kept_values = (values if new_values is None else new_values)[mask]
+                n = len(kept_addresses)
+                self._addresses[write:write + n] = kept_addresses
+                self._values[write:write + n] = kept_values
+                write += n
+                kept_here += n
+            kept_per_segment.append(kept_here)
+        self._length = write
+        return kept_per_segment
+
+    def _reserve(self, needed: int):
+        capacity = len(self._addresses)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        if self.spilled or new_capacity * self.entry_size > self.spill_threshold:
+            self._remap(new_capacity)
+        else:
+            self._addresses = np.resize(self._addresses, new_capacity)
+            self._values = np.resize(self._values, new_capacity)
+
+    def _remap(self, capacity: int):
+        """Move (or grow) the columns into memory-mapped files"""
+        in_memory = None
+        if self._tempdir is None:
+            self._tempdir = tempfile.mkdtemp(prefix="scan_results_", dir=self.directory)
+            in_memory = (self._addresses[:self._length], self._values[:self._length])
+        else:
+            self._addresses.flush()
+            self._values.flush()
+        # Drop the old mappings before resizing the files underneath them
+        self._addresses = self._values = None
+
+        self._addresses = self._map_column("addresses", np.dtype(np.uint64), capacity)
+        self._values = self._map_column("values", self.value_dtype, capacity)
+        if in_memory is not None:
+            self._addresses[:self._length] = in_memory[0]
+            self._values[:self._length] = in_memory[1]
+
+    def _map_column(self, name: str, dtype: np.dtype, capacity: int) -> np.memmap:
+        path = os.path.join(self._tempdir, f"{name}.bin")
+        with open(path, "ab") as f:
+            f.truncate(capacity * dtype.itemsize)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=(capacity,))
+
+    # ═══════════════════════════════════════════════════════════════
+    # READING
+    # ═══════════════════════════════════════════════════════════════
+
+    def addresses(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        stop = self._length if stop is None else min(stop, self._length)
+        return self._addresses[start:stop]
+
+    def values(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        stop = self._length if stop is None else min(stop, self._length)
+        return self._values[start:stop]
+
+    def page(self, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Entries [offset, offset + limit) as {"address", "value"} dicts"""
+        stop = offset + limit
+        return [
+            {"address": address, "value": value}
+            for address, value in zip(self.addresses(offset, stop).tolist(), self.values(offset, stop).tolist())
+        ]
+
+    def close(self):
+        """Release the columns and delete any spill files"""
+        self._addresses = np.empty(0, dtype=np.uint64)
+        self._values = np.empty(0, dtype=self.value_dtype)
+        self._length = 0
+        if self._tempdir:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            self._tempdir = None
@@ -0,0 +1,408 @@
+"""
+Snapshot-based value scanning (first scan / next scan)
+
+A ScanSession remembers which aligned slots are still candidates and the
+value each held at the previous scan. Regions are processed in chunks on a
+thread pool; next scans re-read the chunks and filter the candidates with
+one vectorized comparison per chunk (changed / unchanged / increased /
+decreased / exact). Candidates are kept in a ScanResultSet; an
+unknown-initial-value scan keeps chunk snapshots instead, which spill to
+memory-mapped temporary files once they get large.
+
+Memory access goes through a `read_region(base, size) -> bytes | None`
+callable, so the engine itself does not depend on any OS API.
+"""
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .scan_results import SPILL_THRESHOLD, ScanResultSet
+
+
+VALUE_TYPES = {
+    "int8": "<i1",
+    "uint8": "<u1",
+    "byte": "<u1",
+    "int16": "<i2",
+    "short": "<i2",
+    "uint16": "<u2",
+    "ushort": "<u2",
+    "int32": "<i4",
+    "int": "<i4",
+    "uint32": "<u4",
+    "uint": "<u4",
+    "int64": "<i8",
+    "long": "<i8",
+    "uint64": "<u8",
+    "ulong": "<u8",
+    "float": "<f4",
+    "double": "<f8",
+}
+
+NEXT_SCAN_MODES = ("exact", "changed", "unchanged", "increased", "decreased")
+
+# Whole-region snapshots beyond this many bytes go to memory-mapped files
+SNAPSHOT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# Regions are read and searched in chunks of about this many bytes
+CHUNK_SIZE = 16 * 1024 * 1024
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+RegionReader = Callable[[int, int], Optional[bytes]]
+ProgressCallback = Callable[[int, int], None]
+CancelCheck = Callable[[], bool]
+
+
+class ScanCancelled(RuntimeError):
+    pass
+
+
+def resolve_value_type(type_name: str) -> np.dtype:
+    if type_name not in VALUE_TYPES:
+        raise ValueError(f"Unsupported scan type '{type_name}'")
+    return np.dtype(VALUE_TYPES[type_name])
+
+
+def coerce_value(value: Any, dtype: np.dtype):
+    """Convert a user-supplied number to a numpy scalar of dtype"""
+    if value is None:
+        raise ValueError("scan requires a numeric value")
+    try:
+        if dtype.kind == "f":
+            return dtype.type(float(value))
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("scan value must be numeric")
+    info = np.iinfo(dtype)
+    if not info.min <= number <= info.max:
+        raise ValueError(f"{number} is out of range for {dtype.name}")
+    return dtype.type(number)
+
+
+def typed_view(data, dtype: np.dtype, alignment: int) -> np.ndarray:
+    """Values at every `alignment` bytes of data, without copying"""
+    if len(data) < dtype.itemsize:
+        return np.empty(0, dtype=dtype)
+    count = (len(data) - dtype.itemsize) // alignment + 1
+    return np.ndarray((count,), dtype=dtype, buffer=data, strides=(alignment,))
+
+
+def plan_chunks(regions: List[Dict[str, int]], alignment: int, itemsize: int,
+                chunk_size: int = CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    Split regions into (base, read_size) chunks in address order.
+
+    Chunk starts stay on the slot grid, and every chunk but a region's last
+    reads itemsize - 1 extra bytes so values straddling the boundary are
+    seen exactly once: by the chunk where they start.
+    """
+    step = max(alignment, chunk_size - chunk_size % alignment)
+    chunks = []
+    for region in sorted(regions, key=lambda r: int(r["base"])):
+        base, size = int(region["base"]), int(region["size"])
+        for offset in range(0, size, step):
+            chunks.append((base + offset, min(size - offset, step + itemsize - 1)))
+    return chunks
+
+
+def compare(mode: str, new: np.ndarray, old: Optional[np.ndarray], target=None) -> np.ndarray:
+    """Boolean mask of slots that satisfy a next-scan mode"""
+    if mode == "exact":
+        return new == target
+    if mode == "changed":
+        return new != old
+    if mode == "unchanged":
+        return new == old
+    if mode == "increased":
+        return new > old
+    if mode == "decreased":
+        return new < old
+    raise ValueError(f"Unsupported next scan mode '{mode}'")
+
+
+class _Snapshot:
+    """Whole-region values from an unknown-initial-value scan"""
+
+    __slots__ = ("base", "size", "values", "path")
+
+    def __init__(self, base: int, size: int, values: np.ndarray, path: Optional[str] = None):
+        self.base = base
+        self.size = size
+        self.values = values
+        self.path = path
+
+
+class ScanSession:
+    """
+    First/next scan state for one process.
+
+    Candidates live in a ScanResultSet (address + last value, spilling to
+    disk when large); `spans` remembers which slice of it belongs to which
+    chunk so next scans re-read one chunk at a time.
+    """
+
+    def __init__(self, pid: int, read_region: RegionReader, value_type: str = "int",
+                 alignment: Optional[int] = None, memory_limit: int = SNAPSHOT_MEMORY_LIMIT,
+                 spill_threshold: int = SPILL_THRESHOLD, workers: Optional[int] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        self.pid = pid
+        self.read_region = read_region
+        self.value_type = value_type
+        self.dtype = resolve_value_type(value_type)
+        self.alignment = alignment or self.dtype.itemsize
+        if self.alignment < 1:
+            raise ValueError("alignment must be positive")
+        self.memory_limit = memory_limit
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.chunk_size = chunk_size
+        self.results = ScanResultSet(self.dtype, spill_threshold)
+        # (base, size, start, stop) of each chunk's slice of results
+        self.spans: List[Tuple[int, int, int, int]] = []
+        self.snapshots: List[_Snapshot] = []
+        self.scans = 0
+
+        self._snapshot_bytes = 0
+        self._tempdir: Optional[str] = None
+
+    # ═══════════════════════════════════════════════════════════════
+    # SCANNING
+    # ═══════════════════════════════════════════════════════════════
+
+    def first_scan(self, regions: List[Dict[str, int]], value: Any = None,
+                   progress: Optional[ProgressCallback] = None,
+                   cancel: Optional[CancelCheck] = None) -> int:
+        """
+        Scan regions for an exact value, or snapshot them when value is None
+        (unknown initial value). Returns the candidate count.
+
+        Regions are split into chunks that worker threads read and search;
+        progress(done_bytes, total_bytes) is called as chunks complete and
+        cancel() is polled between them (raising ScanCancelled).
+        """
+        self.close()
+        target = None if value is None else coerce_value(value, self.dtype)
+        chunks = plan_chunks(regions, self.alignment, self.dtype.itemsize, self.chunk_size)
+        total = sum(size for _, size in chunks)
+
+        def read_and_search(chunk):
+            data = self.read_region(*chunk)
+            if not data or target is None:
+                return data, None
+            view = typed_view(data, self.dtype, self.alignment)
+            slots = np.flatnonzero(view == target)
+            return None, (len(data), slots, view[slots])
+
+        done = 0
+        try:
+            for (base, size), (data, found) in zip(chunks, self._ordered_map(read_and_search, chunks, cancel)):
+                if found is not None:
+                    self._append_found(base, *found)
+                elif data:
+                    self.snapshots.append(self._snapshot(base, data))
+                done += size
+                if progress:
+                    progress(done, total)
+        except ScanCancelled:
+            self.close()
+            raise
+
+        self.scans = 1
+        return self.count
+
+    def next_scan(self, mode: str, value: Any = None,
+                  progress: Optional[ProgressCallback] = None,
+                  cancel: Optional[CancelCheck] = None) -> int:
+        """
+        Re-read candidate chunks and keep slots matching mode. Returns the count.
+
+        A cancelled next scan leaves the session unusable (ScanCancelled is
+        raised after it is cleared), since candidates are filtered in place.
+        """
+        mode = (mode or "").lower().strip()
+        if mode not in NEXT_SCAN_MODES:
+            raise ValueError(f"Unsupported next scan mode '{mode}'")
+        target = coerce_value(value, self.dtype) if mode == "exact" else None
+
+        try:
+            if self.snapshots:
+                self._refine_snapshots(mode, target, progress, cancel)
+            else:
+                self._refine_results(mode, target, progress, cancel)
+        except ScanCancelled:
+            self.close()
+            raise
+
+        self.scans += 1
+        return self.count
+
+    def _append_found(self, base: int, size: int, slots: np.ndarray, values: np.ndarray):
+        if not slots.size:
+            return
+        start = len(self.results)
+        addresses = slots.astype(np.uint64) * np.uint64(self.alignment) + np.uint64(base)
+        self.results.append(addresses, values)
+        self.spans.append((base, size, start, len(self.results)))
+
+    def _refine_snapshots(self, mode: str, target, progress, cancel):
+        snapshots, self.snapshots = self.snapshots, []
+        total = sum(snapshot.size for snapshot in snapshots)
+
+        def read_and_compare(snapshot):
+            data = self.read_region(snapshot.base, snapshot.size)
+            if not data:
+                return None
+            view = typed_view(data, self.dtype, self.alignment)
+            # Compare every slot both reads cover
+            n = min(len(view), len(snapshot.values))
+            slots = np.flatnonzero(compare(mode, view[:n], snapshot.values[:n], target))
+            return len(data), slots, view[slots]
+
+        done = 0
+        for snapshot, found in zip(snapshots, self._ordered_map(read_and_compare, snapshots, cancel)):
+            if found is not None:
+                self._append_found(snapshot.base, *found)
+            self._release(snapshot)
+            done += snapshot.size
+            if progress:
+                progress(done, total)
+
+    def _refine_results(self, mode: str, target, progress, cancel):
+        spans = list(self.spans)
+        total = sum(size for _, size, _, _ in spans)
+        readable = []
+
+        def segments():
+            done = 0
+            reads = self._ordered_map(lambda span: self.read_region(span[0], span[1]), spans, cancel)
+            for (base, size, start, stop), data in zip(spans, reads):
+                done += size
+                if progress:
+                    progress(done, total)
+                if not data:
+                    # Unreadable now: its candidates are dropped
+                    continue
+                readable.append((base, size))
+                yield start, stop, self._slot_predicate(base, typed_view(data, self.dtype, self.alignment), mode, target)
+
+        kept = self.results.refine(segments())
+
+        self.spans = []
+        position = 0
+        for (base, size), n in zip(readable, kept):
+            if n:
+                self.spans.append((base, size, position, position + n))
+            position += n
+
+    def _ordered_map(self, fn, items, cancel: Optional[CancelCheck]):
+        """
+        Yield fn(item) for items in order, running up to `workers` calls
+        ahead on a thread pool. Reads release the GIL, and so do numpy's
+        comparisons, so chunks overlap I/O and search.
+        """
+        items = iter(items)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan") as pool:
+            pending = deque(pool.submit(fn, item) for item in islice(items, self.workers * 2))
+            try:
+                while pending:
+                    if cancel is not None and cancel():
+                        raise ScanCancelled("Scan cancelled")
+                    result = pending.popleft().result()
+                    for item in islice(items, 1):
+                        pending.append(pool.submit(fn, item))
+                    yield result
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _slot_predicate(self, base: int, view: np.ndarray, mode: str, target):
+        alignment = np.uint64(self.alignment)
+
+        def predicate(addresses: np.ndarray, values: np.ndarray):
+            slots = ((addresses - np.uint64(base)) // alignment).astype(np.int64)
+            in_range = slots < len(view)
+            current = np.zeros(len(values), dtype=self.dtype)
+            current[in_range] = view[slots[in_range]]
+            return in_range & compare(mode, current, values, target), current
+
+        return predicate
+
+    # ═══════════════════════════════════════════════════════════════
+    # RESULTS
+    # ═══════════════════════════════════════════════════════════════
+
+    @property
+    def count(self) -> int:
+        return len(self.results) + sum(len(s.values) for s in self.snapshots)
+
+    def page(self, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Candidates [offset, offset + limit) with the value seen at the last scan"""
+        if not self.snapshots:
+            return self.results.page(offset, limit)
+
+        out: List[Dict[str, Any]] = []
+        for snapshot in self.snapshots:
+            n = len(snapshot.values)
+            if offset >= n:
+                offset -= n
+                continue
+            stop = min(n, offset + limit - len(out))
+            for slot, value in zip(range(offset, stop), snapshot.values[offset:stop].tolist()):
+                out.append({"address": snapshot.base + slot * self.alignment, "value": value})
+            offset = 0
+            if len(out) >= limit:
+                break
+        return out
+
+    def addresses(self, offset: int = 0, limit: Optional[int] = None) -> List[int]:
+        """Candidate addresses [offset, offset + limit); all of them when limit is None"""
+        if limit is None:
+            limit = self.count
+        if not self.snapshots:
+            return self.results.addresses(offset, offset + limit).tolist()
+        return [entry["address"] for entry in self.page(offset, limit)]
+
+    # ═══════════════════════════════════════════════════════════════
+    # SNAPSHOT STORAGE
+    # ═══════════════════════════════════════════════════════════════
+
+    def _snapshot(self, base: int, data: bytes) -> _Snapshot:
+        path = None
+        if self._snapshot_bytes + len(data) > self.memory_limit:
+            if self._tempdir is None:
+                self._tempdir = tempfile.mkdtemp(prefix=f"scan_{self.pid}_")
+            path = os.path.join(self._tempdir, f"{base:x}.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+            buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            buffer = data
+            self._snapshot_bytes += len(data)
+        return _Snapshot(base, len(data), typed_view(buffer, self.dtype, self.alignment), path)
+
+    def _release(self, snapshot: _Snapshot):
+        snapshot.values = None
+        if snapshot.path:
+            try:
+                os.remove(snapshot.path)
+            except OSError:
+                pass
+        else:
+            self._snapshot_bytes -= snapshot.size
+
+    def close(self):
+        """Drop all candidates, snapshots and spill files"""
+        for snapshot in self.snapshots:
+            snapshot.values = None
+        self.snapshots = []
+        self.results.close()
+        self.spans = []
+        self._snapshot_bytes = 0
+        if self._tempdir:
+            shutil.rmtree(self._tempdir, ignore_errors=True)
+            self._tempdir = None
@@ -7,8 +7,8 @@ from datetime import datetime
 
 from . import process_manager
 from .cheat_manager import get_cheat_manager, CheatTable, Cheat
-from .pattern_scanner import scan_pattern
-from .pointer_scanner import parse_pointer_path, resolve_pointer_chain
+from .pattern_scanner import scan_pattern, scan_patterns
+from .pointer_scanner import PointerChainCache, parse_pointer_path, resolve_pointer_chain
 from .memory_writer import read_memory
 
 logger = logging.getLogger(__name__)
@@ -23,6 +23,9 @@ class TableWatchdog:
         self.manager = get_cheat_manager()
         self.current_table: Optional[CheatTable] = None
         self.last_fix_attempt: Dict[str, datetime] = {}
+        # Pointer paths of the attached process; reset when another one attaches
+        self.chain_cache = PointerChainCache()
+        self._chain_cache_pid: Optional[int] = None
 
     def auto_attach_table(self) -> Optional[CheatTable]:
         """
@@ -69,16 +72,21 @@ class TableWatchdog:
 
         updated = False
         
+        broken = []
         for cheat in table.cheats:
-            status = self._check_cheat_validity(cheat)
-            
-            if status == "valid":
+            if self._check_cheat_validity(cheat) == "valid":
                 fix_results["valid"] += 1
                 cheat.validation_status = "valid"
-                continue
-            
+            else:
+                broken.append(cheat)
+        
+        # One pass over process memory for every signature instead of one per cheat
+        patterns = [c.aob_pattern for c in broken if c.aob_pattern]
+        aob_matches = scan_patterns(proc.backend, patterns, first_only=True) if patterns else {}
+        
+        for cheat in broken:
             # Try to fix
-            new_address = self._attempt_fix(cheat)
+            new_address = self._attempt_fix(cheat, aob_matches)
             if new_address:
                 logger.info(f"Fixed cheat '{cheat.name}': {hex(cheat.address or 0)} -> {hex(new_address)}")
                 cheat.address = new_address
@@ -114,9 +122,12 @@ class TableWatchdog:
             
         return "invalid"
 
-    def _attempt_fix(self, cheat: Cheat) -> Optional[int]:
+    def _attempt_fix(self, cheat: Cheat, aob_matches: Optional[Dict[str, list]] = None) -> Optional[int]:
         """
         Tries to find a new address for the cheat using AOB or Pointer Path.
+        
+        aob_matches holds results of a batched scan_patterns() call; without
+        it the cheat's pattern is scanned on its own.
         """
         proc = process_manager.get_attached_process()
         if not proc:
@@ -124,7 +135,10 @@ class TableWatchdog:
 
         # 1. Try AOB Pattern if available
         if cheat.aob_pattern:
-            matches = scan_pattern(proc.handle, cheat.aob_pattern, first_only=True)
+            if aob_matches is not None and cheat.aob_pattern in aob_matches:
+                matches = aob_matches[cheat.aob_pattern]
+            else:
+                matches = scan_pattern(proc.backend, cheat.aob_pattern, first_only=True)
             if matches:
                 return matches[0].address
 
@@ -140,7 +154,11 @@ class TableWatchdog:
                     if base_module:
                         base_addr = process_manager.get_module_base(base_module) or 0
                     
-                    final_addr = resolve_pointer_chain(proc.handle, base_addr + path_data["offset"], path_data["offsets"])
+                    if self._chain_cache_pid != proc.pid:
+                        self.chain_cache.invalidate()
+                        self._chain_cache_pid = proc.pid
+                    final_addr = resolve_pointer_chain(proc.backend, base_addr + path_data["offset"], path_data["offsets"],
+                                                       cache=self.chain_cache)
                     if final_addr:
                         return final_addr
             except Exception as e:
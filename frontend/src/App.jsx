@@ -1731,6 +1731,8 @@ const MediaConsole = ({
   const [mvComfyMsg, setMvComfyMsg] = useState("");
   const [mvShowSteps, setMvShowSteps] = useState(true);
   const mvLastOutputUrlRef = useRef("");
+  const mvEventsConnectedRef = useRef(false);
+  const mvActiveJobIdRef = useRef("");
   const vehicleRestoreCompareVideoRef = useRef(null);
 
   // ═══════════════════════════════════════════════════════════════
@@ -2157,14 +2159,73 @@ const MediaConsole = ({
           await fetchDeepFaceLabJobs();
           await fetchDeepFaceLabLogs();
         }
-        await fetchMusicVideoJobs();
+        // Job updates arrive over SSE; poll them only while it is down.
+        if (!mvEventsConnectedRef.current) {
+          await fetchMusicVideoJobs();
+          if (mvActiveJobId) await fetchMusicVideoJob(mvActiveJobId);
+        }
         await fetchMusicVideoStatus();
-        if (mvActiveJobId) await fetchMusicVideoJob(mvActiveJobId);
       }, 5000);
       return () => clearInterval(poll);
     }
   }, [isOpen, mvActiveJobId, activeTab]);
 
+  // Live MV job updates pushed by the backend job bus.
+  useEffect(() => {
+    if (!isOpen || typeof EventSource === "undefined") return;
+    const source = new EventSource(`${backendUrl}/media/musicvideo/events`);
+    source.onopen = () => {
+      mvEventsConnectedRef.current = true;
+    };
+    source.onerror = () => {
+      // EventSource reconnects on its own; fall back to polling meanwhile.
+      mvEventsConnectedRef.current = false;
+    };
+    source.addEventListener("job", (ev) => {
+      let job;
+      try {
+        job = JSON.parse(ev.data);
+      } catch (e) {
+        return;
+      }
+      if (!job?.id) return;
+      setMvJobs((prev) => {
+        const rest = (prev || []).filter((j) => j.id !== job.id);
+        return [job, ...rest].sort(
+          (a, b) => (b.created_at || 0) - (a.created_at || 0),
+        );
+      });
+      if (job.id === mvActiveJobIdRef.current) {
+        setMvActiveJob(job);
+        if (
+          job.status === "completed" &&
+          job.output_url &&
+          mvLastOutputUrlRef.current !== job.output_url
+        ) {
+          mvLastOutputUrlRef.current = job.output_url;
+          fetchMedia();
+        }
+      }
+    });
+    source.addEventListener("deleted", (ev) => {
+      try {
+        const { id } = JSON.parse(ev.data);
+        setMvJobs((prev) => (prev || []).filter((j) => j.id !== id));
+      } catch (e) {
+        // ignore malformed events
+      }
+    });
+    return () => {
+      mvEventsConnectedRef.current = false;
+      source.close();
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [isOpen, backendUrl]);
+
+  useEffect(() => {
+    mvActiveJobIdRef.current = mvActiveJobId;
+  }, [mvActiveJobId]);
+
   useEffect(() => {
     if (!isOpen) return;
     if (!mvActiveJobId) return;
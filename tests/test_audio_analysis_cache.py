@@ -0,0 +1,75 @@
+import threading
+import time
+
+from musicvideo import audio_analysis
+from musicvideo.audio_analysis import ANALYSIS_VERSION, analyze_in_subprocess, cached_analysis
+
+
+def counting_analyzer(monkeypatch, calls, delay=0.0, result=None):
+    def analyze(path):
+        calls.append(path)
+        time.sleep(delay)
+        return dict(result or {"bpm": 128.0, "duration_s": 3.0, "sections": []})
+
+    monkeypatch.setattr(audio_analysis, "analyze_audio", analyze)
+
+
+def test_second_analysis_comes_from_disk(tmp_path, monkeypatch):
+    song = tmp_path / "song.mp3"
+    song.write_bytes(b"ID3 fake audio")
+    calls = []
+    counting_analyzer(monkeypatch, calls)
+    cache = str(tmp_path / "cache")
+
+    first = cached_analysis(str(song), cache, isolate=False)
+    second = cached_analysis(str(song), cache, isolate=False)
+    assert len(calls) == 1
+    assert first == second and second["bpm"] == 128.0
+    assert second["analysis_version"] == ANALYSIS_VERSION
+    assert list((tmp_path / "cache").glob(f"v{ANALYSIS_VERSION}/*/*.json"))
+
+    # Same content under another name is a hit; new content is a miss
+    copy = tmp_path / "copy.mp3"
+    copy.write_bytes(song.read_bytes())
+    cached_analysis(str(copy), cache, isolate=False)
+    assert len(calls) == 1
+    song.write_bytes(b"ID3 remastered")
+    cached_analysis(str(song), cache, isolate=False)
+    assert len(calls) == 2
+
+
+def test_failed_analysis_is_not_cached(tmp_path, monkeypatch):
+    song = tmp_path / "song.wav"
+    song.write_bytes(b"RIFF")
+    calls = []
+    counting_analyzer(monkeypatch, calls, result={"bpm": 120.0, "error": "decoder missing"})
+    for _ in range(2):
+        assert cached_analysis(str(song), str(tmp_path / "cache"), isolate=False)["error"] == "decoder missing"
+    assert len(calls) == 2
+
+
+def test_concurrent_requests_share_one_run(tmp_path, monkeypatch):
+    song = tmp_path / "song.flac"
+    song.write_bytes(b"fLaC")
+    calls = []
+    counting_analyzer(monkeypatch, calls, delay=0.2)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cached_analysis(str(song), str(tmp_path / "c"), isolate=False)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len(results) == 4 and all(r["bpm"] == 128.0 for r in results)
+
+
+def test_child_process_returns_the_analysis(tmp_path):
+    # Undecodable input: the child still answers with the fallback analysis
+    song = tmp_path / "song.mp3"
+    song.write_bytes(b"not audio")
+    analysis = analyze_in_subprocess(str(song), timeout_s=120)
+    assert analysis["bpm"] == 120.0
+    assert "sections" in analysis and "mood" in analysis
@@ -0,0 +1,52 @@
+import threading
+
+from canvas.canvas_ai_assist import CanvasAIAssist, iter_json_array
+
+
+class _Reply:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeEngine:
+    """Mimics AgentEngine.process, which is a coroutine."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = 0
+        self.threads = set()
+
+    async def process(self, messages, require_approval=True):
+        self.calls += 1
+        self.threads.add(threading.get_ident())
+        return _Reply(self.reply(messages[-1].content) if callable(self.reply) else self.reply)
+
+
+def test_iter_json_array_yields_complete_elements_from_chunks():
+    text = 'Sure!\n```json\n[{"type": "text", "text": "a, ]b"}, {"type": "line"}, {"type": "rect'
+    chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+    assert list(iter_json_array(chunks)) == [{"type": "text", "text": "a, ]b"}, {"type": "line"}]
+
+
+def test_cached_request_reuses_response_for_same_canvas():
+    assist = CanvasAIAssist()
+    assist.set_agent_engine(FakeEngine("hello"))
+    ctx = [{"id": "obj_1", "revision": 3}]
+
+    assert assist._cached_request("discuss", "Topic:  Cats", "sys", ctx) == "hello"
+    assert assist._cached_request("discuss", "topic: cats", "sys", ctx) == "hello"
+    assert assist.agent_engine.calls == 1
+
+    assist._cached_request("discuss", "topic: cats", "sys", [{"id": "obj_1", "revision": 4}])
+    assert assist.agent_engine.calls == 2
+
+
+def test_rooms_given_by_name_are_sized_in_parallel_and_packed():
+    assist = CanvasAIAssist()
+    assist.set_agent_engine(FakeEngine('{"width": 10, "height": 8, "doors": [{"x": 2, "y": 8, "width": 3}]}'))
+
+    rooms = assist._complete_rooms(["Kitchen", "Bedroom", {"name": "Hall", "width": 4, "height": 8, "x": 0, "y": 0}], "flat")
+    by_name = {r["name"]: r for r in rooms}
+    assert by_name["Kitchen"]["x"] == 4 and by_name["Bedroom"]["x"] == 14
+    assert by_name["Bedroom"]["doors"] == [{"x": 16, "y": 8, "width": 3}]
+    assert assist.agent_engine.calls == 2  # one sub-plan per unsized room
@@ -0,0 +1,58 @@
+import pytest
+
+from canvas.canvas_controller import draw_command_to_object
+from canvas.canvas_models import CanvasObject
+from canvas.canvas_state import CanvasStateManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return CanvasStateManager(str(tmp_path))
+
+
+def test_batch_is_one_undo_step(manager):
+    session = manager.create_session()
+    sid = session.session_id
+    keep = manager.add_object(sid, CanvasObject(type="rectangle", x=0, y=0))
+
+    touched = manager.apply_batch(sid, [
+        {"op": "add", "object": {"id": "a", "type": "line"}},
+        {"op": "add", "object": {"id": "b", "type": "text", "text": "hi"}},
+        {"op": "update", "object_id": keep.id, "updates": {"x": 42}},
+        {"op": "delete", "object_id": "b"},
+    ])
+    assert touched == ["a", "b", keep.id]
+    assert [o.id for o in session.objects] == [keep.id, "a"]
+    assert session.objects[0].x == 42
+
+    assert manager.undo(sid)
+    assert [o.id for o in session.objects] == [keep.id]
+    assert session.objects[0].x == 0
+
+    assert manager.redo(sid)
+    assert [o.id for o in session.objects] == [keep.id, "a"]
+    assert session.objects[0].x == 42
+
+
+def test_invalid_batch_changes_nothing(manager):
+    session = manager.create_session()
+    revision = session.revision
+    with pytest.raises(ValueError):
+        manager.apply_batch(session.session_id, [
+            {"op": "add", "object": {"id": "a", "type": "line"}},
+            {"op": "delete", "object_id": "missing"},
+        ])
+    assert session.objects == []
+    assert session.revision == revision
+    assert not manager.can_undo(session.session_id)
+
+
+def test_draw_command_to_object_matches_frontend_mapping():
+    fields = draw_command_to_object({
+        "command_type": "draw_ellipse",
+        "parameters": {"cx": 100, "cy": 50, "rx": 20, "ry": 10, "strokeColor": "#fff"},
+        "layer_id": "ai_assist_layer",
+    })
+    assert fields["type"] == "ellipse"
+    assert (fields["x"], fields["y"], fields["width"], fields["height"]) == (80, 40, 40, 20)
+    assert draw_command_to_object({"command_type": "set_mode", "parameters": {}}) is None
@@ -0,0 +1,56 @@
+from canvas.canvas_events import CanvasEventBus
+from canvas.canvas_models import CanvasObject
+from canvas.canvas_state import CanvasStateManager
+
+
+def test_deltas_carry_increasing_revisions(tmp_path):
+    bus = CanvasEventBus()
+    manager = CanvasStateManager(str(tmp_path), events=bus)
+    session = manager.create_session()
+    obj = manager.add_object(session.session_id, CanvasObject(type="line", x1=0, y1=0, x2=1, y2=1))
+    manager.delete_object(session.session_id, obj.id)
+
+    events = bus.replay(session.session_id, 0, session.revision)
+    assert [e["op"] for e in events] == ["upsert", "remove"]
+    assert events[0]["rev"] < events[1]["rev"] == session.revision
+
+
+def test_replay_reports_gap_after_eviction():
+    bus = CanvasEventBus(backlog_size=2)
+    for rev in range(1, 5):
+        bus.publish("s", rev, rev - 1, "clear", {})
+
+    assert [e["rev"] for e in bus.replay("s", 2, 4)] == [3, 4]
+    assert bus.replay("s", 1, 4) is None
+    assert bus.replay("s", 4, 4) == []
+
+
+def test_replay_ahead_of_the_session_asks_for_resync():
+    bus = CanvasEventBus()
+    bus.publish("s", 3, 2, "clear", {})
+    assert bus.replay("s", 5, 3) is None
+
+
+def test_command_revisions_survive_a_restart(tmp_path):
+    manager = CanvasStateManager(str(tmp_path), events=CanvasEventBus())
+    session = manager.create_session()
+    manager.publish_command(session.session_id, "mcp", {"action": "set_mode"})
+    seen = manager.get_session(session.session_id).revision
+
+    reloaded = CanvasStateManager(str(tmp_path), events=CanvasEventBus())
+    assert reloaded.get_session(session.session_id).revision == seen
+    obj = reloaded.add_object(session.session_id, CanvasObject(type="line", x1=0, y1=0, x2=1, y2=1))
+    assert obj.revision > seen
+
+
+def test_concurrent_touches_get_distinct_revisions(tmp_path):
+    import threading
+
+    manager = CanvasStateManager(str(tmp_path), events=CanvasEventBus())
+    objects = [CanvasObject(type="line", x1=0, y1=0, x2=1, y2=1) for _ in range(2000)]
+    threads = [threading.Thread(target=lambda part=objects[i::4]: [manager._touch(o) for o in part]) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({o.revision for o in objects}) == len(objects)
@@ -0,0 +1,46 @@
+import asyncio
+
+from canvas.canvas_models import CanvasObject, ExportFormat, ExportRequest
+from canvas.canvas_router import export_canvas, generate_svg, _svg_fragment_cache
+from canvas.canvas_state import CanvasStateManager
+
+
+def test_revision_bumps_and_svg_reflects_edit(tmp_path):
+    manager = CanvasStateManager(str(tmp_path))
+    session = manager.create_session()
+    obj = manager.add_object(session.session_id, CanvasObject(type="rectangle", x=1, y=2, width=3, height=4))
+    first = obj.revision
+    assert first > 0
+
+    svg = generate_svg(session.objects, 100, 100, "#000", cache=True)
+    assert 'x="1.0"' in svg
+    assert (obj.id, first) in _svg_fragment_cache
+
+    manager.update_object(session.session_id, obj.id, {"x": 50})
+    assert obj.revision > first
+    assert 'x="50' in generate_svg(session.objects, 100, 100, "#000", cache=True)
+
+    # Undo restores content under a brand new revision, never a reused one
+    manager.undo(session.session_id)
+    assert obj.revision > first + 1
+    assert 'x="1.0"' in generate_svg(session.objects, 100, 100, "#000", cache=True)
+
+
+def test_svg_text_is_escaped():
+    obj = CanvasObject(type="text", text="a < b & c", x=0, y=0)
+    assert "a &lt; b &amp; c" in generate_svg([obj], 10, 10, "#000")
+
+
+def test_posted_objects_bypass_the_fragment_cache():
+    saved = CanvasObject(id="shape", revision=7, type="rectangle", x=1, y=2, width=3, height=4)
+    assert 'x="1.0"' in generate_svg([saved], 100, 100, "#000", cache=True)
+
+    # A client's unsaved edit keeps the revision it loaded the object with
+    edited = saved.model_copy(update={"x": 90})
+
+    async def export():
+        response = await export_canvas(ExportRequest(format=ExportFormat.SVG, objects=[edited]))
+        return "".join([chunk.decode() async for chunk in response.body_iterator])
+
+    svg = asyncio.run(export())
+    assert 'x="90' in svg and 'x="1.0"' not in svg
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+
+import pytest
+
+from musicvideo import ffmpeg_utils
+from musicvideo.ffmpeg_utils import FfmpegRunner, parse_duration, parse_progress_block
+from tools.frame_sink import find_ffmpeg
+
+
+def test_progress_block_reports_percent():
+    block = {"frame": "48", "fps": "24.0", "out_time_us": "2000000", "speed": "1.5x", "progress": "continue"}
+    p = parse_progress_block(block, duration_s=4.0)
+    assert (p.frame, p.out_time_s, p.speed, p.percent) == (48, 2.0, 1.5, 50.0)
+    assert parse_progress_block({"out_time_us": "N/A", "progress": "continue"}, None).percent is None
+    assert parse_progress_block({"progress": "end"}, None).percent == 100.0
+
+
+def test_duration_parsed_from_input_header():
+    assert parse_duration("  Duration: 00:01:02.50, start: 0.000000, bitrate: 1 kb/s") == 62.5
+    assert parse_duration("Stream #0:0: Video: h264") is None
+
+
+needs_ffmpeg = pytest.mark.skipif(find_ffmpeg() is None, reason="ffmpeg not available")
+
+
+@pytest.fixture
+def ffmpeg(monkeypatch):
+    monkeypatch.setattr(ffmpeg_utils, "which_ffmpeg", find_ffmpeg)
+
+
+def lavfi_clip(seconds, out):
+    return ["-y", "-f", "lavfi", "-i", f"testsrc=duration={seconds}:size=96x64:rate=10",
+            "-c:v", "libx264", "-preset", "ultrafast", str(out)]
+
+
+@needs_ffmpeg
+def test_encode_reports_progress_to_completion(tmp_path, ffmpeg):
+    updates = []
+    ok, msg = FfmpegRunner(1).run(lavfi_clip(2, tmp_path / "a.mp4"), duration_s=2.0, on_progress=updates.append)
+    assert ok, msg
+    assert updates[-1].done and updates[-1].percent == 100.0
+    assert updates[-1].frame == 20
+
+    # Without a duration it is read from the input header
+    updates.clear()
+    ok, msg = ffmpeg_utils.transcode_h264(
+        str(tmp_path / "a.mp4"), str(tmp_path / "b.mp4"), 64, 48, 10, preset="ultrafast", on_progress=updates.append,
+    )
+    assert ok, msg
+    assert updates and all(u.duration_s == pytest.approx(2.0, abs=0.1) for u in updates)
+
+
+@needs_ffmpeg
+def test_cancel_stops_a_running_encode(tmp_path, ffmpeg):
+    started = threading.Event()
+    t0 = time.monotonic()
+    ok, msg = FfmpegRunner(1).run(
+        ["-re"] + lavfi_clip(60, tmp_path / "long.mp4"),
+        on_progress=lambda p: started.set(),
+        cancel=started.is_set,
+    )
+    assert (ok, msg) == (False, "cancelled")
+    assert time.monotonic() - t0 < 20
+
+
+@needs_ffmpeg
+def test_semaphore_serializes_encodes(tmp_path, ffmpeg):
+    runner = FfmpegRunner(1)
+    spans = {}
+
+    def encode(name):
+        marks = []
+        ok, _ = runner.run(lavfi_clip(3, tmp_path / f"{name}.mp4"), on_progress=lambda p: marks.append(time.monotonic()))
+        assert ok
+        spans[name] = (marks[0], marks[-1])
+
+    threads = [threading.Thread(target=encode, args=(n,)) for n in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    (a0, a1), (b0, b1) = sorted(spans.values())
+    assert b0 >= a1
+
+
+@needs_ffmpeg
+def test_failure_returns_stderr_tail(tmp_path, ffmpeg):
+    ok, msg = FfmpegRunner(1).run(["-y", "-i", str(tmp_path / "missing.mp4"), str(tmp_path / "x.mp4")])
+    assert not ok and "missing.mp4" in msg
+
+
+@needs_ffmpeg
+def test_mux_replaces_the_output_instead_of_writing_through_links(tmp_path, ffmpeg):
+    video = tmp_path / "video.mp4"
+    assert ffmpeg_utils.run_ffmpeg(lavfi_clip(1, video))[0]
+    audio = tmp_path / "song.m4a"
+    assert ffmpeg_utils.run_ffmpeg(["-y", "-f", "lavfi", "-i", "sine=duration=1", "-c:a", "aac", str(audio)])[0]
+
+    out = tmp_path / "videos" / "song_anime_video.mp4"
+    out.parent.mkdir()
+    out.write_bytes(b"previous job")
+    other_name = tmp_path / "cache_entry.mp4"
+    os.link(out, other_name)
+
+    ok, msg = ffmpeg_utils.mux_audio(str(video), str(audio), str(out))
+    assert ok, msg
+    assert other_name.read_bytes() == b"previous job"
+    assert out.stat().st_size > 1000
+    assert sorted(p.name for p in out.parent.iterdir()) == ["song_anime_video.mp4"]
@@ -0,0 +1,62 @@
+import subprocess
+
+import pytest
+
+from musicvideo import ffmpeg_utils
+from musicvideo.filtergraph import compile_assembly, single_pass_unsupported
+from tools.frame_sink import find_ffmpeg
+
+
+def test_graph_normalizes_each_clip_then_concats_and_maps_audio():
+    args = compile_assembly(["a.mp4", "b.mp4"], "song.mp3", "out.mp4", 1920, 1080, 30, interpolate=True)
+    assert args[:7] == ["-y", "-i", "a.mp4", "-i", "b.mp4", "-i", "song.mp3"]
+    graph = args[args.index("-filter_complex") + 1].split(";")
+    assert graph[0].startswith("[0:v]minterpolate=fps=30") and graph[0].endswith("[v0]")
+    assert "scale=1920:1080" in graph[1] and graph[1].endswith("[v1]")
+    assert graph[2] == "[v0][v1]concat=n=2:v=1:a=0[vout]"
+    assert args[args.index("-map", args.index("[vout]")) + 1] == "2:a:0"
+    assert args[-1] == "out.mp4"
+
+
+def test_interpolation_can_be_off():
+    args = compile_assembly(["a.mp4"], "song.mp3", "out.mp4", 64, 48, 24, interpolate=True, engine="none")
+    assert "minterpolate" not in args[args.index("-filter_complex") + 1]
+
+
+def test_unsupported_inputs_fall_back(monkeypatch):
+    assert single_pass_unsupported(3, interpolate=True, engine="ffmpeg-minterpolate") is None
+    assert "RIFE" in single_pass_unsupported(3, interpolate=True, engine="rife")
+    assert single_pass_unsupported(3, interpolate=False, engine="rife") is None
+    monkeypatch.setenv("MV_SINGLE_PASS_MAX_CLIPS", "2")
+    assert "exceed" in single_pass_unsupported(3, interpolate=False, engine="none")
+    with pytest.raises(ValueError):
+        compile_assembly(["a", "b", "c"], "s", "o", 64, 48, 24)
+
+
+@pytest.mark.skipif(find_ffmpeg() is None, reason="ffmpeg not available")
+def test_single_pass_output_has_every_clip_and_the_audio(tmp_path, monkeypatch):
+    monkeypatch.setattr(ffmpeg_utils, "which_ffmpeg", find_ffmpeg)
+    ffmpeg = find_ffmpeg()
+    clips = []
+    # Mismatched sizes and rates, as different generation backends produce
+    for n, (size, rate) in enumerate([("64x48", 6), ("80x40", 12)]):
+        clip = tmp_path / f"clip{n}.mp4"
+        subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "lavfi", "-i",
+                        f"testsrc=duration=1:size={size}:rate={rate}", "-c:v", "libx264", "-preset", "ultrafast",
+                        str(clip)], check=True)
+        clips.append(str(clip))
+    audio = tmp_path / "song.m4a"
+    subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "lavfi", "-i", "sine=duration=3",
+                    "-c:a", "aac", str(audio)], check=True)
+
+    out = tmp_path / "out.mp4"
+    args = compile_assembly(clips, str(audio), str(out), 64, 48, 12, interpolate=True, preset="ultrafast")
+    updates = []
+    ok, msg = ffmpeg_utils.run_ffmpeg(args, duration_s=2.0, on_progress=updates.append)
+    assert ok, msg
+    assert updates[-1].percent == 100.0
+
+    probe = subprocess.run([ffmpeg, "-i", str(out), "-f", "null", "-"], capture_output=True, text=True).stderr
+    assert "Video: h264" in probe and "64x48" in probe and "Audio: aac" in probe
+    # 2 x 1s at 12 fps; -shortest stops at the video end
+    assert "frame=   24" in probe
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from tools.frame_sink import ClipFrameSink, FfmpegPipeSink, FrameSink, find_ffmpeg, frame_bytes
+from tools.kenburns import KenBurnsRenderer, SourcePyramid, crop_windows
+
+
+def test_frame_bytes_accepts_arrays_and_pil_images():
+    frame = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+    assert frame_bytes(frame, 6, 4) == frame.tobytes()
+
+    Image = pytest.importorskip("PIL.Image")
+    assert frame_bytes(Image.fromarray(frame), 6, 4) == frame.tobytes()
+    assert frame_bytes(Image.fromarray(frame).convert("RGBA"), 6, 4) == frame.tobytes()
+
+
+def test_frame_bytes_rejects_mismatched_frames():
+    with pytest.raises(ValueError):
+        frame_bytes(np.zeros((4, 6, 3), dtype=np.uint8), 4, 6)
+    with pytest.raises(ValueError):
+        frame_bytes(np.zeros((4, 6, 3), dtype=np.float32), 6, 4)
+
+
+@pytest.mark.skipif(find_ffmpeg() is None, reason="ffmpeg not available")
+def test_pipe_sink_encodes_streamed_frames(tmp_path):
+    output = tmp_path / "out.mp4"
+    with FfmpegPipeSink(str(output), 64, 48, fps=12, preset="ultrafast") as sink:
+        for i in range(12):
+            sink.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    assert sink.frames_written == 12
+    assert output.stat().st_size > 0
+
+
+@pytest.mark.skipif(find_ffmpeg() is None, reason="ffmpeg not available")
+def test_pipe_sink_removes_output_on_error(tmp_path):
+    output = tmp_path / "out.mp4"
+    with pytest.raises(ValueError):
+        with FfmpegPipeSink(str(output), 64, 48, fps=12, preset="ultrafast") as sink:
+            sink.write(np.zeros((48, 64, 3), dtype=np.uint8))
+            sink.write(np.zeros((10, 10, 3), dtype=np.uint8))
+    assert not output.exists()
+
+
+def test_clip_sink_keeps_each_frame_of_a_reused_buffer(tmp_path):
+    image = np.arange(60 * 80 * 3, dtype=np.uint8).reshape(60, 80, 3)
+    renderer = KenBurnsRenderer(SourcePyramid(image, sharpen=False), crop_windows(80, 60, 40, 30, 5), 40, 30)
+    sink = ClipFrameSink(str(tmp_path / "out.mp4"), 40, 30, fps=12)
+    for frame in renderer.frames():
+        sink.write(frame)
+    assert sink.frames_written == 5
+    assert len({id(frame) for frame in sink._frames}) == 5
+    for index, frame in enumerate(sink._frames):
+        assert (frame == renderer.render(index)).all()
+    sink.abort()
+
+
+def test_incomplete_sink_fails_at_construction(tmp_path):
+    class WriteOnly(FrameSink):
+        def write(self, frame):
+            pass
+
+    with pytest.raises(TypeError):
+        WriteOnly(str(tmp_path / "out.mp4"), 4, 4, fps=1)
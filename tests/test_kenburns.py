@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from tools.kenburns import (
+    KenBurnsRenderer, SourcePyramid, clear_pyramid_cache, crop_windows, crossfade, get_pyramid,
+)
+
+
+def test_windows_zoom_and_pan_stay_on_canvas():
+    windows = crop_windows(150, 120, 100, 80, 10, zoom_factor=1.25, pan_direction="left")
+    assert windows.shape == (10, 4)
+    left, top, crop_w, crop_h = windows.T
+    assert crop_w[0] == 100 and crop_w[-1] < crop_w[0]
+    assert (left >= 0).all() and (left + crop_w <= 150).all()
+    assert (top >= 0).all() and (top + crop_h <= 120).all()
+    # Panning left: the window starts at the right edge and moves left
+    assert left[0] > left[-1]
+
+    zoom_out = crop_windows(150, 120, 100, 80, 10, zoom_factor=0.8)
+    assert zoom_out[0, 2] == pytest.approx(80) and zoom_out[-1, 2] > zoom_out[0, 2]
+
+    with pytest.raises(ValueError):
+        crop_windows(150, 120, 100, 80, 10, easing="bounce")
+
+
+def test_integer_window_at_output_size_is_an_exact_crop():
+    image = np.arange(60 * 80 * 3, dtype=np.uint8).reshape(60, 80, 3)
+    renderer = KenBurnsRenderer(SourcePyramid(image, sharpen=False), [[10, 5, 40, 30]], 40, 30)
+    assert (renderer.render(0) == image[5:35, 10:50]).all()
+
+
+def test_downscaled_windows_sample_a_smaller_level():
+    image = np.full((256, 256, 3), 200, dtype=np.uint8)
+    pyramid = SourcePyramid(image, sharpen=False)
+    assert [level.shape[0] for level in pyramid.levels] == [256, 128, 64, 32]
+    renderer = KenBurnsRenderer(pyramid, [[0, 0, 256, 256]], 40, 40)
+    assert renderer._level_for(256, 256) == 2
+    assert (renderer.render(0) == 200).all()
+
+
+def test_pyramid_cache_builds_once():
+    clear_pyramid_cache()
+    builds = []
+    image = np.zeros((64, 64, 3), dtype=np.uint8)
+
+    def build():
+        builds.append(1)
+        return SourcePyramid(image, sharpen=False)
+
+    assert get_pyramid(("a.png", 1.0), build) is get_pyramid(("a.png", 1.0), build)
+    assert len(builds) == 1
+    clear_pyramid_cache()
+
+
+def test_crossfade_matches_pil_blend():
+    Image = pytest.importorskip("PIL.Image")
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 256, (16, 24, 3), dtype=np.uint8)
+    b = rng.integers(0, 256, (16, 24, 3), dtype=np.uint8)
+    assert (crossfade(a, b, 0.0) == a).all()
+    assert (crossfade(a, b, 1.0) == b).all()
+    expected = np.asarray(Image.blend(Image.fromarray(a), Image.fromarray(b), 0.3)).astype(np.int16)
+    assert np.abs(crossfade(a, b, 0.3) - expected).max() <= 1
@@ -0,0 +1,144 @@
+import asyncio
+import ctypes
+import os
+import sys
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from trainer import main as trainer_api, memory_scanner, memory_writer, process_manager
+from trainer.memory_backend import FileSnapshotBackend, LinuxProcBackend, MemoryBackend
+from trainer.pattern_scanner import scan_pattern
+
+
+def write_dump(directory, base, data):
+    # Same naming as GameTrainer.dump_memory
+    path = os.path.join(directory, f"dump_{hex(base)}_{len(data)}.bin")
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def test_snapshot_reads_writes_and_regions(tmp_path):
+    path = write_dump(tmp_path, 0x10000, bytes(range(256)))
+    write_dump(tmp_path, 0x40000, b"\x90" * 64)
+    backend = FileSnapshotBackend.from_directory(str(tmp_path))
+
+    assert [(r.base, r.size) for r in backend.regions()] == [(0x10000, 256), (0x40000, 64)]
+    assert backend.read(0x10010, 4) == bytes([16, 17, 18, 19])
+    # Reads past the end of a region return the readable prefix
+    assert backend.read(0x100FE, 8) == bytes([254, 255])
+    assert backend.read(0x20000, 4) is None
+
+    assert backend.write(0x10000, b"\xAA\xBB")
+    assert backend.read(0x10000, 2) == b"\xAA\xBB"
+    assert not backend.write(0x100FF, b"\x00\x00")
+    backend.close()
+    # Dumps on disk are never modified
+    with open(path, "rb") as f:
+        assert f.read(2) == b"\x00\x01"
+
+
+def test_snapshot_rejects_overlaps():
+    backend = FileSnapshotBackend()
+    backend.add_bytes(0x1000, b"\x00" * 0x100)
+    with pytest.raises(ValueError):
+        backend.add_bytes(0x10F0, b"\x00" * 0x20)
+
+
+def test_scanners_run_against_attached_snapshot():
+    values = np.zeros(1024, dtype="<i4")
+    values[[3, 500, 1000]] = 1337
+    backend = FileSnapshotBackend(pid=4242)
+    backend.add_bytes(0x200000, values.tobytes())
+    backend.add_bytes(0x400000, b"\x00" * 32 + b"\x48\x8B\x05\x11\x22\xC3" + b"\x00" * 26, writable=False, executable=True)
+    process_manager.attach_backend(backend, "snapshot")
+    try:
+        assert memory_scanner.scan_exact_value(1337, "int") == 3
+        memory_writer.write_memory(0x200000 + 500 * 4, "int", 1338)
+        assert memory_scanner.scan_next("increased") == 1
+        assert memory_scanner.get_scan_results()["results"] == [{"address": 0x200000 + 500 * 4, "value": 1338}]
+        assert memory_writer.read_memory(0x200000 + 1000 * 4, "int")["value"] == 1337
+
+        assert [m.address for m in scan_pattern(backend, "48 8B ?? ?? 22 C3")] == [0x400020]
+    finally:
+        memory_scanner.clear_scan_session()
+        process_manager.detach_process()
+
+
+def test_next_scan_reads_the_backend_attached_now():
+    def snapshot(changed=()):
+        values = np.arange(1024, dtype="<i4")
+        values[list(changed)] += 1
+        backend = FileSnapshotBackend()
+        backend.add_bytes(0x200000, values.tobytes())
+        return backend
+
+    process_manager.attach_backend(snapshot(), "first")
+    try:
+        assert memory_scanner.scan_unknown_value(type="int") == 1024
+        process_manager.detach_process()
+
+        # Re-attached dumps of the same process: candidates carry over and
+        # are compared against the new backend, not the closed one
+        process_manager.attach_backend(snapshot(), "second")
+        assert memory_scanner.scan_next("unchanged") == 1024
+        process_manager.attach_backend(snapshot(changed=[7, 9]), "third")
+        assert memory_scanner.scan_next("changed") == 2
+    finally:
+        memory_scanner.clear_scan_session()
+        process_manager.detach_process()
+
+
+def test_snapshot_attach_only_opens_the_snapshots_dir(tmp_path, monkeypatch):
+    root = tmp_path / "snapshots"
+    (root / "level1").mkdir(parents=True)
+    write_dump(root / "level1", 0x10000, b"\x01" * 64)
+    write_dump(tmp_path, 0x10000, b"\x02" * 64)
+    monkeypatch.setattr(trainer_api, "SNAPSHOT_DIR", str(root))
+
+    def attach(snapshot):
+        return asyncio.run(trainer_api.attach_snapshot(trainer_api.AttachSnapshotRequest(snapshot=snapshot)))
+
+    try:
+        assert attach("level1")["regions"] == 1
+        for outside in ["..", "../snapshots/level1", str(root / "level1"), "level1\\.."]:
+            with pytest.raises(HTTPException) as exc:
+                attach(outside)
+            assert exc.value.status_code == 400
+        with pytest.raises(HTTPException) as exc:
+            attach("level2")
+        assert exc.value.status_code == 404
+    finally:
+        process_manager.detach_process()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="/proc backend is Linux only")
+def test_proc_backend_reads_own_memory():
+    buffer = ctypes.create_string_buffer(b"agent amigos trainer", 32)
+    address = ctypes.addressof(buffer)
+    try:
+        backend = LinuxProcBackend(os.getpid())
+    except OSError:
+        pytest.skip("/proc/self/mem is not accessible")
+    try:
+        assert any(r.base <= address < r.end and r.writable for r in backend.regions())
+        assert backend.read(address, 20) == b"agent amigos trainer"
+        if not backend.read_only:
+            assert backend.write(address, b"AGENT")
+            assert buffer.value.startswith(b"AGENT amigos")
+    finally:
+        backend.close()
+
+
+def test_incomplete_backend_fails_at_construction():
+    class ReadOnly(MemoryBackend):
+        def regions(self, writable=False, executable=False):
+            return []
+
+        def read(self, address, size):
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnly()
@@ -0,0 +1,105 @@
+import struct
+import time
+
+from trainer import memory_writer, process_manager
+from trainer.memory_backend import FileSnapshotBackend
+from trainer.memory_writer import coalesce, read_batch, write_batch
+
+
+class CountingBackend(FileSnapshotBackend):
+    def __init__(self):
+        super().__init__(pid=4343)
+        self.reads = 0
+        self.writes = []
+
+    def read(self, address, size):
+        self.reads += 1
+        return super().read(address, size)
+
+    def write(self, address, data):
+        self.writes.append((address, bytes(data)))
+        return super().write(address, data)
+
+
+def test_coalesce_groups_by_page():
+    spans = coalesce([(0x1010, 4), (0x2000, 8), (0x1000, 4), (0x1FFE, 4)])
+    assert spans == [(0x1000, 0x1002, [2, 0, 3]), (0x2000, 8, [1])]
+
+
+def test_read_batch_one_read_per_page_with_fallback():
+    backend = CountingBackend()
+    backend.add_bytes(0x1000, bytes(range(256)) * 16)
+    values = read_batch(backend, [(0x1000, 2), (0x1100, 2), (0x1800, 2)])
+    assert values == [b"\x00\x01", b"\x00\x01", b"\x00\x01"]
+    assert backend.reads == 1
+
+    # The page's span runs past the region, so each range is read on its own
+    assert read_batch(backend, [(0x1FFC, 4), (0x1FFE, 4)]) == [bytes([252, 253, 254, 255]), None]
+
+
+def test_write_batch_skips_matching_and_merges_adjacent():
+    backend = CountingBackend()
+    backend.add_bytes(0x1000, bytes(0x1000))
+    writes = [(0x1000, b"\x00\x00\x00\x00"), (0x1008, b"\x01\x00"), (0x100A, b"\x02\x00"), (0x1100, b"\x03")]
+    result = write_batch(backend, writes)
+    assert result == {"written": 3, "skipped": 1, "failed": []}
+    assert backend.reads == 1
+    assert backend.writes == [(0x1008, b"\x01\x00\x02\x00"), (0x1100, b"\x03")]
+
+    assert write_batch(backend, [(0x5000, b"\x01")])["failed"] == [0]
+
+
+def test_freeze_loop_restores_values_only_when_changed():
+    backend = CountingBackend()
+    backend.add_bytes(0x1000, bytes(0x100))
+    process_manager.attach_backend(backend, "freeze")
+    try:
+        memory_writer.freeze_memory(0x1000, "int", 99, interval_ms=5)
+        time.sleep(0.1)
+        assert memory_writer.read_memory(0x1000, "int")["value"] == 99
+        assert len(backend.writes) == 1
+
+        backend.write(0x1000, struct.pack("<i", 1))
+        time.sleep(0.1)
+        assert memory_writer.read_memory(0x1000, "int")["value"] == 99
+        assert len(backend.writes) == 3
+    finally:
+        memory_writer.unfreeze_memory(0x1000)
+        process_manager.detach_process()
+
+
+def test_freezes_do_not_follow_a_new_attach():
+    first = CountingBackend()
+    first.add_bytes(0x1000, bytes(0x100))
+    process_manager.attach_backend(first, "first")
+    try:
+        memory_writer.freeze_memory(0x1000, "int", 99, interval_ms=5)
+        assert memory_writer.get_frozen_registry()[0x1000]["pid"] == 4343
+
+        second = CountingBackend()
+        second.add_bytes(0x1000, bytes(0x100))
+        process_manager.attach_backend(second, "second")
+        assert memory_writer.get_frozen_registry() == {}
+        time.sleep(0.05)
+        assert second.writes == []
+
+        memory_writer.freeze_memory(0x1000, "int", 7, interval_ms=5)
+        process_manager.detach_process()
+        assert memory_writer.get_frozen_registry() == {}
+    finally:
+        memory_writer.clear_frozen()
+        process_manager.detach_process()
+
+
+def test_apply_frozen_skips_other_pids():
+    backend = CountingBackend()
+    backend.add_bytes(0x1000, bytes(0x100))
+    process_manager.attach_backend(backend, "pids")
+    try:
+        with memory_writer._freeze_lock:
+            memory_writer._frozen_values[0x1000] = {"pid": 1, "type": "int", "value": 5, "interval_ms": 100}
+            memory_writer._frozen_data[0x1000] = struct.pack("<i", 5)
+        assert memory_writer.apply_frozen()["written"] == 0
+        assert backend.writes == []
+    finally:
+        process_manager.detach_process()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+
+from musicvideo.job_bus import JobProgressBus
+
+
+def journal_lines(bus):
+    with open(bus.journal_path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def test_progress_updates_are_coalesced(tmp_path):
+    bus = JobProgressBus(str(tmp_path / "jobs.json"), flush_interval=60)
+    bus.update("a", status="running", progress=0)
+    for p in range(100):
+        bus.update("a", progress=p)
+    bus.flush()
+    lines = journal_lines(bus)
+    # One line for the creation/status change, one for all 100 progress updates
+    assert len(lines) == 2
+    assert lines[-1] == {"id": "a", "set": {"progress": 99}}
+    bus.close()
+
+
+def test_journal_replays_over_snapshot(tmp_path):
+    path = str(tmp_path / "jobs.json")
+    bus = JobProgressBus(path, flush_interval=60)
+    bus.update("a", status="running", progress=10)
+    bus.update("b", status="queued")
+    bus.compact()
+    bus.update("a", progress=55)
+    bus.delete("b")
+    bus.flush()
+    with open(bus.journal_path, "a", encoding="utf-8") as fh:
+        fh.write('{"id": "a", "set": {"progr')  # torn write
+    bus.close()
+
+    reloaded = JobProgressBus(path, flush_interval=60)
+    reloaded.load()
+    assert reloaded.get("a")["progress"] == 55
+    assert reloaded.get("b") is None
+    # load() compacts: the journal is empty and the snapshot holds everything
+    assert journal_lines(reloaded) == []
+    with open(path, encoding="utf-8") as fh:
+        assert set(json.load(fh)) == {"a"}
+
+
+def test_status_changes_flush_immediately(tmp_path):
+    bus = JobProgressBus(str(tmp_path / "jobs.json"), flush_interval=60)
+    bus.update("a", status="running")
+    bus.update("a", progress=40)
+    bus.update("a", status="completed")
+    assert journal_lines(bus)[-1]["set"]["status"] == "completed"
+    bus.close()
+
+
+def test_journal_compacts_after_threshold(tmp_path):
+    bus = JobProgressBus(str(tmp_path / "jobs.json"), flush_interval=60, compact_after=3)
+    for n in range(4):
+        bus.update(f"job{n}", status="queued")
+    assert len(journal_lines(bus)) < 3
+    with open(bus.snapshot_path, encoding="utf-8") as fh:
+        assert len(json.load(fh)) >= 3
+    bus.close()
+
+
+def test_tickers_share_the_flusher_thread(tmp_path):
+    bus = JobProgressBus(str(tmp_path / "jobs.json"), flush_interval=0.01)
+    ticks = []
+    done = threading.Event()
+
+    def tick():
+        ticks.append(threading.current_thread().name)
+        if len(ticks) >= 3:
+            done.set()
+
+    tokens = [bus.add_ticker(tick) for _ in range(5)]
+    assert done.wait(2)
+    for token in tokens:
+        bus.remove_ticker(token)
+    assert set(ticks) == {"mv-job-bus"}
+    bus.close()
+
+
+def test_stream_sends_current_state_then_latest_changes(tmp_path):
+    bus = JobProgressBus(str(tmp_path / "jobs.json"), flush_interval=60)
+    bus.update("a", status="running", progress=1)
+
+    async def consume():
+        stream = bus.stream("a", heartbeat=5, min_interval=0.05)
+        first = await stream.__anext__()
+        for p in range(2, 50):
+            bus.update("a", progress=p)
+        bus.update("b", status="queued")
+        second = await stream.__anext__()
+        await stream.aclose()
+        return first, second
+
+    first, second = asyncio.run(consume())
+    assert first["a"]["progress"] == 1
+    assert list(second) == ["a"] and second["a"]["progress"] == 49
+    assert bus.subscriber_count() == 0
+    bus.close()
+
+
+def test_stream_omits_static_fields(tmp_path):
+    bus = JobProgressBus(str(tmp_path / "jobs.json"), flush_interval=60, stream_omit=("analysis",))
+    bus.update("a", status="running", analysis={"beats": list(range(1000))})
+
+    async def consume():
+        stream = bus.stream(heartbeat=5, min_interval=0.05)
+        first = await stream.__anext__()
+        bus.update("a", analysis={"beats": []})  # nothing streamed changes
+        bus.update("a", progress=40)
+        second = await stream.__anext__()
+        await stream.aclose()
+        return first, second
+
+    first, second = asyncio.run(consume())
+    assert first == {"a": {"id": "a", "status": "running"}}
+    assert second == {"a": {"id": "a", "status": "running", "progress": 40}}
+    assert bus.get("a")["analysis"] == {"beats": []}
+    bus.close()
@@ -0,0 +1,56 @@
+import pytest
+
+from musicvideo.plan import generate_cache_params, retry_plan
+from musicvideo.render_cache import RenderCache
+
+
+def source_job(count=4):
+    scenes = [{"index": i, "start": 4.0 * i, "end": 4.0 * (i + 1), "section": "Verse", "seed": 1000 + i,
+               "status": "done"} for i in range(count)]
+    return {"scenes": scenes, "bpm": 128.0, "mood": "dreamy", "theme": "neon", "analysis": {"bpm": 128.0}}
+
+
+def render_all(cache, tmp_path, job, run):
+    """Generate stage as the worker runs it: scene prompt override, else the default prompt"""
+    for sc in job["scenes"]:
+        prompt = sc.get("prompt") or f"{job['theme']} {sc['section']} scene"
+        params = generate_cache_params(prompt, "blurry", sc["seed"], "cloud:fal", sc["end"] - sc["start"], 12)
+        out = str(tmp_path / run / f"clip_{sc['index']:03d}_raw.mp4")
+
+        def render(out=out, prompt=prompt):
+            with open(out, "w") as fh:
+                fh.write(prompt)
+            return out
+
+        (tmp_path / run).mkdir(exist_ok=True)
+        cache.render("generate", params, out, render)
+
+
+def test_rerun_with_one_edited_scene_renders_only_that_scene(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    first = source_job()
+    render_all(cache, tmp_path, first, "first")
+    assert (cache.hits, cache.misses) == (0, 4)
+
+    retry = retry_plan(first, {"2": "a lighthouse in a storm"})
+    assert retry["reuse_plan"] is True
+    assert [sc["seed"] for sc in retry["scenes"]] == [1000, 1001, 1002, 1003]
+    assert retry["scenes"][2]["prompt"] == "a lighthouse in a storm"
+    assert "status" not in retry["scenes"][0]
+    assert (retry["bpm"], retry["mood"], retry["theme"]) == (128.0, "dreamy", "neon")
+
+    render_all(cache, tmp_path, dict(first, **retry), "retry")
+    assert (cache.hits, cache.misses) == (3, 5)
+
+
+def test_retry_plan_needs_a_planned_source():
+    assert retry_plan({"scenes": []}) == {}
+    with pytest.raises(ValueError):
+        retry_plan({"scenes": []}, {"0": "x"})
+    with pytest.raises(ValueError):
+        retry_plan(source_job(), {"7": "x"})
+    with pytest.raises(ValueError):
+        retry_plan(source_job(), {"first": "x"})
+    # An empty prompt reverts a scene to the generated default
+    edited = dict(source_job(), scenes=retry_plan(source_job(), {0: "x"})["scenes"])
+    assert "prompt" not in retry_plan(edited, {"0": ""})["scenes"][0]
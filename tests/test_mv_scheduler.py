@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from musicvideo.scheduler import DagNode, DagScheduler
+
+
+def scene_dag(scenes, calls, fail=None, work_s=0.05):
+    """generate -> transcode per scene, then concat; records (node, start, end)"""
+    lock = threading.Lock()
+
+    def step(node_id):
+        def fn():
+            start = time.monotonic()
+            if fail and fail(node_id):
+                raise RuntimeError(f"{node_id} broke")
+            time.sleep(work_s)
+            with lock:
+                calls.append((node_id, start, time.monotonic()))
+            return {"value": node_id}
+        return fn
+
+    nodes = []
+    for i in range(scenes):
+        nodes.append(DagNode(f"generate_{i}", "generate", step(f"generate_{i}"), priority=i))
+        nodes.append(DagNode(f"transcode_{i}", "cpu", step(f"transcode_{i}"), deps=[f"generate_{i}"], priority=i))
+    nodes.append(DagNode("concat", "io", step("concat"), deps=[f"transcode_{i}" for i in range(scenes)]))
+    return nodes
+
+
+def test_next_scene_generates_while_previous_transcodes():
+    calls = []
+    summary = DagScheduler(scene_dag(3, calls), limits={"generate": 1, "cpu": 1, "io": 1}).run()
+    assert summary["status"] == "completed"
+    spans = {name: (start, end) for name, start, end in calls}
+    assert spans["generate_1"][0] < spans["transcode_0"][1]
+    assert spans["concat"][0] >= max(end for name, _, end in calls if name != "concat")
+    # Generation stays serial under a limit of 1
+    assert spans["generate_1"][0] >= spans["generate_0"][1]
+
+
+def test_failed_node_retries_on_its_own():
+    calls, failures = [], []
+
+    def fail(node_id):
+        if node_id == "generate_1" and not failures:
+            failures.append(node_id)
+            return True
+        return False
+
+    nodes = scene_dag(2, calls, fail=fail)
+    for node in nodes:
+        node.max_attempts = 2
+    scheduler = DagScheduler(nodes, retry_backoff_s=0)
+    assert scheduler.run()["status"] == "completed"
+    assert scheduler.nodes["generate_1"].attempts == 2
+    assert scheduler.nodes["generate_0"].attempts == 1
+
+
+def test_exhausted_retries_fail_the_job_and_skip_dependents():
+    calls = []
+    scheduler = DagScheduler(scene_dag(2, calls, fail=lambda n: n == "transcode_0"), retry_backoff_s=0)
+    summary = scheduler.run()
+    assert summary["status"] == "failed"
+    assert summary["failed"] == ["transcode_0"]
+    assert "transcode_0 broke" in summary["errors"]["transcode_0"]
+    assert scheduler.nodes["concat"].status == "skipped"
+
+
+def test_resume_skips_finished_nodes(tmp_path):
+    state = str(tmp_path / "dag_state.json")
+    calls = []
+    first = DagScheduler(scene_dag(2, calls, fail=lambda n: n == "concat"), state_path=state)
+    assert first.run()["status"] == "failed"
+    finished_before = {name for name, _, _ in calls}
+    assert finished_before == {"generate_0", "generate_1", "transcode_0", "transcode_1"}
+
+    calls.clear()
+    second = DagScheduler(scene_dag(2, calls), state_path=state)
+    assert second.run()["status"] == "completed"
+    assert [name for name, _, _ in calls] == ["concat"]
+    assert second.result("transcode_1") == {"value": "transcode_1"}
+
+
+def test_resume_reruns_nodes_whose_output_is_gone(tmp_path):
+    state = str(tmp_path / "dag_state.json")
+    output = tmp_path / "clip.mp4"
+    output.write_bytes(b"x")
+    runs = []
+
+    def make():
+        return [DagNode("generate_0", "generate", lambda: runs.append(1) or {"path": str(output)})]
+
+    DagScheduler(make(), state_path=state).run()
+    DagScheduler(make(), state_path=state).run()
+    assert len(runs) == 1
+    output.unlink()
+    DagScheduler(make(), state_path=state).run()
+    assert len(runs) == 2
+
+
+def test_cancel_stops_new_nodes():
+    calls = []
+    cancelled = threading.Event()
+    nodes = scene_dag(3, calls)
+    nodes[0].fn = lambda: cancelled.set() or {}
+    summary = DagScheduler(nodes, cancel=cancelled.is_set).run()
+    assert summary["status"] == "cancelled"
+    assert not any(name.startswith("transcode") for name, _, _ in calls)
+
+
+def test_rejects_cycles_and_unknown_resources():
+    with pytest.raises(ValueError):
+        DagScheduler([DagNode("a", "cpu", dict, deps=["b"]), DagNode("b", "cpu", dict, deps=["a"])])
+    with pytest.raises(ValueError):
+        DagScheduler([DagNode("a", "gpu", dict)])
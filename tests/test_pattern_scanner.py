@@ -0,0 +1,51 @@
+import random
+
+from trainer.pattern_scanner import MultiPatternScanner, _matches_pattern, find_pattern, parse_pattern
+
+
+def _reference(data, pattern, mask):
+    return [i for i in range(len(data) - len(pattern) + 1)
+            if _matches_pattern(data[i:i + len(pattern)], pattern, mask)]
+
+
+def test_find_pattern_matches_byte_loop():
+    rng = random.Random(7)
+    # Small alphabet so anchors and partial matches occur often
+    data = bytes(rng.choice(b"\x00\x01\x48\x8b") for _ in range(20000))
+    for text in ["48 8B ?? 01", "?? 00 00 ?? 8B", "48", "00 ?? ?? 48 8B 00 01", "?? ??", "01 48 8B 00 8B 01 01 01"]:
+        pattern, mask = parse_pattern(text)
+        assert find_pattern(data, pattern, mask) == _reference(data, pattern, mask), text
+
+
+def test_find_pattern_edges():
+    pattern, mask = parse_pattern("AA ?? CC")
+    assert find_pattern(b"\xaa\x00\xcc", pattern, mask) == [0]
+    assert find_pattern(b"\xaa\x00", pattern, mask) == []
+    # Anchor found at the very start/end must not produce out-of-range candidates
+    pattern, mask = parse_pattern("?? CC DD EE")
+    assert find_pattern(b"\xcc\xdd\xee\x00", pattern, mask) == []
+    assert find_pattern(b"\x00\xcc\xdd\xee", pattern, mask) == [0]
+
+
+def test_multi_pattern_scanner_matches_single_scans():
+    rng = random.Random(11)
+    data = bytes(rng.choice(b"\x00\x01\x48\x8b\xff") for _ in range(50000))
+    patterns = ["48 8B ?? 01", "?? 00 00 ?? 8B", "FF", "8B 48 ?? ?? FF 00", "?? ??", "48 8B ?? 01"]
+    scanner = MultiPatternScanner(patterns)
+    found = scanner.find_all(data)
+
+    assert list(found) == scanner.patterns == patterns[:-1]
+    for text in scanner.patterns:
+        pattern, mask = parse_pattern(text)
+        assert found[text] == _reference(data, pattern, mask), text
+
+
+def test_multi_pattern_scanner_small_sets_scan_separately(monkeypatch):
+    data = bytes(range(256)) * 4
+    calls = []
+    monkeypatch.setattr("trainer.pattern_scanner.find_pattern",
+                        lambda d, p, m: calls.append(p) or find_pattern(d, p, m))
+    found = MultiPatternScanner(["10 11 ?? 13", "FE FF"]).find_all(data)
+
+    assert len(calls) == 2
+    assert found == {"10 11 ?? 13": [16, 272, 528, 784], "FE FF": [254, 510, 766, 1022]}
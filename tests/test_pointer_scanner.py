@@ -0,0 +1,127 @@
+import struct
+
+import pytest
+
+from trainer import memory_scanner, process_manager
+from trainer.memory_backend import FileSnapshotBackend
+from trainer.pointer_scanner import (
+    PointerChainCache, PointerMap, compare_pointer_maps, resolve_pointer_chain, scan_pointers,
+)
+
+STATIC = 0x400000
+
+
+def game_memory(heap):
+    """[STATIC + 0x40] + 0x18 + 0x30 leads to heap + 0x2030 wherever the heap lands"""
+    static, data = bytearray(0x1000), bytearray(0x10000)
+    struct.pack_into("<Q", static, 0x40, heap + 0x100)
+    struct.pack_into("<Q", data, 0x118, heap + 0x2000)
+    # Values that do not point into any region are not pointers
+    struct.pack_into("<Q", static, 0x80, 0xDEADBEEF0000)
+    backend = FileSnapshotBackend()
+    backend.add_bytes(STATIC, bytes(static))
+    backend.add_bytes(heap, bytes(data))
+    return backend
+
+
+def test_map_keeps_only_values_inside_regions():
+    pointer_map = PointerMap.build(game_memory(0x10000000))
+    assert sorted(pointer_map.values.tolist()) == [0x10000100, 0x10002000]
+    assert pointer_map.read_pointer(STATIC + 0x40) == 0x10000100
+    assert pointer_map.read_pointer(STATIC + 0x80) is None
+
+
+def test_scan_finds_each_level_and_paths_resolve():
+    backend = game_memory(0x10000000)
+    results = scan_pointers(backend, 0x10002030, max_depth=3)
+    assert [(r.base_address, r.offsets) for r in results] == [
+        (0x10000118, [0x30]),
+        (STATIC + 0x40, [0x18, 0x30]),
+    ]
+    for result in results:
+        assert resolve_pointer_chain(backend, result.base_address, result.offsets) == 0x10002030
+
+    assert scan_pointers(backend, 0x10002030, max_offset=0x20, max_depth=3) == []
+
+
+def test_slot_reaching_several_parents_keeps_every_chain():
+    heap = 0x10000000
+    backend = game_memory(heap)
+    # A second heap pointer near the first: [STATIC + 0x40] + 0x28 + 0x20 also ends at the target
+    backend.write(heap + 0x128, struct.pack("<Q", heap + 0x2010))
+
+    results = scan_pointers(backend, heap + 0x2030, max_depth=3)
+    assert sorted((r.base_address, r.offsets) for r in results) == [
+        (STATIC + 0x40, [0x18, 0x30]),
+        (STATIC + 0x40, [0x28, 0x20]),
+        (heap + 0x118, [0x30]),
+        (heap + 0x128, [0x20]),
+    ]
+    for result in results:
+        assert resolve_pointer_chain(backend, result.base_address, result.offsets) == heap + 0x2030
+    assert len(scan_pointers(backend, heap + 0x2030, max_depth=3, max_results=3)) == 3
+
+
+def test_saved_map_compares_after_restart(tmp_path):
+    path = str(tmp_path / "before.npz")
+    PointerMap.build(game_memory(0x10000000)).save(path)
+    before = PointerMap.load(path)
+    after = PointerMap.build(game_memory(0x20000000))
+
+    stable = compare_pointer_maps(before, 0x10002030, after, 0x20002030)
+    assert [(r.base_address, r.offsets) for r in stable] == [(STATIC + 0x40, [0x18, 0x30])]
+
+
+def test_saved_maps_are_named_files_under_the_data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_scanner, "POINTER_MAP_DIR", str(tmp_path / "maps"))
+    process_manager.attach_backend(game_memory(0x10000000), "before")
+    try:
+        memory_scanner.scan_pointer_paths(0x10002030, max_depth=3, save_map="run1")
+        assert (tmp_path / "maps" / "run1.npz").is_file()
+
+        process_manager.attach_backend(game_memory(0x20000000), "after")
+        stable = memory_scanner.rescan_pointer_paths("run1.npz", 0x10002030, 0x20002030, max_depth=3)
+        assert [(r.base_address, r.offsets) for r in stable] == [(STATIC + 0x40, [0x18, 0x30])]
+
+        for name in ["../run1", str(tmp_path / "maps" / "run1"), "maps\\run1", "C:run1", "..", ""]:
+            with pytest.raises(ValueError):
+                memory_scanner.rescan_pointer_paths(name, 0x10002030, 0x20002030)
+        with pytest.raises(ValueError):
+            memory_scanner.scan_pointer_paths(0x20002030, save_map="../escape")
+        assert sorted(p.name for p in tmp_path.rglob("*.npz")) == ["run1.npz"]
+    finally:
+        process_manager.detach_process()
+
+
+class CountingSnapshot(FileSnapshotBackend):
+    reads = 0
+
+    def read(self, address, size):
+        self.reads += 1
+        return super().read(address, size)
+
+
+def test_chain_cache_uses_guard_read():
+    backend = CountingSnapshot()
+    static, data = bytearray(0x100), bytearray(0x10000)
+    struct.pack_into("<Q", static, 0x40, 0x10000100)
+    struct.pack_into("<Q", data, 0x118, 0x10002000)
+    backend.add_bytes(STATIC, bytes(static))
+    backend.add_bytes(0x10000000, bytes(data))
+    cache = PointerChainCache()
+
+    assert resolve_pointer_chain(backend, STATIC + 0x40, [0x18, 0x30], cache=cache) == 0x10002030
+    assert backend.reads == 2
+    assert resolve_pointer_chain(backend, STATIC + 0x40, [0x18, 0x30], cache=cache) == 0x10002030
+    assert backend.reads == 3
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    # The first-level pointer moved: the guard misses and the chain is walked again
+    backend.write(STATIC + 0x40, struct.pack("<Q", 0x10000200))
+    backend.write(0x10000218, struct.pack("<Q", 0x10003000))
+    assert cache.resolve_many(backend, [(STATIC + 0x40, [0x18, 0x30]), (0x1234, [])]) == [0x10003030, 0x1234]
+    assert cache.misses == 2
+
+    backend.write(STATIC + 0x40, struct.pack("<Q", 0))
+    assert resolve_pointer_chain(backend, STATIC + 0x40, [0x18, 0x30], cache=cache) is None
+    assert len(cache) == 0
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from musicvideo.render_cache import RenderCache, file_digest
+
+
+def writer(path, payload, calls):
+    def render():
+        calls.append(path)
+        with open(path, "wb") as fh:
+            fh.write(payload)
+        return path
+    return render
+
+
+def test_unchanged_params_reuse_the_cached_clip(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    calls = []
+    params = {"prompt": "neon city", "seed": 7, "backend": "cloud:fal", "duration_s": 4.0, "fps": 12}
+
+    first = cache.render("generate", params, str(tmp_path / "job1" / "raw.mp4"), writer(str(tmp_path / "job1_raw"), b"a", calls))
+    assert first["cached"] is False and calls
+
+    out = str(tmp_path / "job2" / "clip_000_raw.mp4")
+    second = cache.render("generate", dict(params), out, writer(out, b"b", calls))
+    assert second["cached"] is True and second["key"] == first["key"]
+    assert len(calls) == 1
+    with open(out, "rb") as fh:
+        assert fh.read() == b"a"
+
+    edited = dict(params, prompt="neon city at dawn")
+    third = cache.render("generate", edited, out, writer(out, b"c", calls))
+    assert third["cached"] is False and len(calls) == 2
+
+
+def test_rerender_does_not_write_through_into_the_cache(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    out = str(tmp_path / "clip.mp4")
+    cache.render("transcode", {"source": "x"}, out, writer(out, b"old", []))
+    cache.render("transcode", {"source": "y"}, out, writer(out, b"new", []))
+    hit = str(tmp_path / "again.mp4")
+    assert cache.render("transcode", {"source": "x"}, hit, writer(hit, b"-", []))["cached"]
+    with open(hit, "rb") as fh:
+        assert fh.read() == b"old"
+
+
+def test_in_place_writes_to_outputs_leave_entries_intact(tmp_path):
+    # ffmpeg -y truncates and rewrites an existing output on the same inode
+    cache = RenderCache(str(tmp_path / "cache"))
+    first = str(tmp_path / "first.mp4")
+    cache.render("assemble", {"job": 1}, first, writer(first, b"cached", []))
+    hit = str(tmp_path / "hit.mp4")
+    assert cache.render("assemble", {"job": 1}, hit, writer(hit, b"-", []))["cached"]
+    for path in (first, hit):
+        with open(path, "wb") as fh:
+            fh.write(b"overwritten")
+
+    again = str(tmp_path / "again.mp4")
+    assert cache.render("assemble", {"job": 1}, again, writer(again, b"-", []))["cached"]
+    with open(again, "rb") as fh:
+        assert fh.read() == b"cached"
+    assert os.stat(again).st_ino != os.stat(first).st_ino
+
+
+def test_failed_render_is_not_cached(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+
+    def broken():
+        raise RuntimeError("ffmpeg failed")
+
+    with pytest.raises(RuntimeError):
+        cache.render("interpolate", {"source": "x"}, str(tmp_path / "i.mp4"), broken)
+    out = str(tmp_path / "i.mp4")
+    assert cache.render("interpolate", {"source": "x"}, out, writer(out, b"ok", []))["cached"] is False
+
+
+def test_disabled_cache_always_renders(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), enabled=False)
+    calls = []
+    out = str(tmp_path / "c.mp4")
+    for _ in range(2):
+        cache.render("generate", {"seed": 1}, out, writer(out, b"z", calls))
+    assert len(calls) == 2
+
+
+def test_file_digest_tracks_content(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"one")
+    first = file_digest(str(path))
+    assert file_digest(str(path)) == first
+    path.write_bytes(b"two!")
+    assert file_digest(str(path)) != first
+
+
+def test_prune_drops_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    for n in range(3):
+        out = str(tmp_path / f"{n}.mp4")
+        cache.render("transcode", {"n": n}, out, writer(out, b"x" * 100, []))
+        entry = cache._entry("transcode", cache.key("transcode", {"n": n}))
+        os.utime(entry, (1000 + n, 1000 + n))
+    assert cache.prune(max_bytes=150) == 2
+    assert cache.size_bytes() == 100
+    out = str(tmp_path / "keep.mp4")
+    assert cache.render("transcode", {"n": 2}, out, writer(out, b"", []))["cached"]
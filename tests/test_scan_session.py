@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from trainer.scan_results import ScanResultSet
+from trainer.scan_session import ScanCancelled, ScanSession
+
+
+class FakeMemory:
+    def __init__(self, regions):
+        self.regions = {base: bytearray(data) for base, data in regions.items()}
+
+    def read(self, address, size):
+        for base, data in self.regions.items():
+            if base <= address < base + len(data):
+                return bytes(data[address - base:address - base + size])
+        return None
+
+    def write(self, address, value, dtype):
+        for base, data in self.regions.items():
+            if base <= address < base + len(data):
+                raw = np.array([value], dtype=dtype).tobytes()
+                data[address - base:address - base + len(raw)] = raw
+                return
+        raise KeyError(address)
+
+    def layout(self):
+        return [{"base": base, "size": len(data)} for base, data in self.regions.items()]
+
+
+def test_exact_then_next_scans():
+    memory = FakeMemory({0x1000: np.array([5, 100, 5, 7], "<i4").tobytes(), 0x9000: np.array([5, 5], "<i4").tobytes()})
+    session = ScanSession(1, memory.read, "int")
+    assert session.first_scan(memory.layout(), 5) == 4
+    assert session.addresses() == [0x1000, 0x1008, 0x9000, 0x9004]
+
+    memory.write(0x1000, 6, "<i4")
+    memory.write(0x9004, 4, "<i4")
+    assert session.next_scan("increased") == 1
+    assert session.addresses() == [0x1000]
+    assert session.page() == [{"address": 0x1000, "value": 6}]
+
+    assert session.next_scan("unchanged") == 1
+    assert session.next_scan("exact", 7) == 0
+
+
+@pytest.mark.parametrize("memory_limit", [1 << 30, 0])
+def test_unknown_initial_value_with_unaligned_floats(memory_limit):
+    data = bytearray(64)
+    memory = FakeMemory({0x2000: bytes(data)})
+    session = ScanSession(2, memory.read, "float", alignment=1, memory_limit=memory_limit)
+    assert session.first_scan(memory.layout()) == 61
+
+    memory.write(0x2003, 1.5, "<f4")
+    session.next_scan("changed")
+    # 1.5f is 00 00 C0 3F: windows covering its non-zero bytes changed
+    assert session.addresses() == list(range(0x2002, 0x2007))
+    memory.write(0x2003, 0.5, "<f4")
+    session.next_scan("decreased")
+    assert 0x2003 in session.addresses()
+    session.close()
+
+
+def test_rejects_out_of_range_and_unknown_modes():
+    memory = FakeMemory({0: bytes(8)})
+    session = ScanSession(3, memory.read, "int8")
+    with pytest.raises(ValueError):
+        session.first_scan(memory.layout(), 300)
+    session.first_scan(memory.layout(), 0)
+    with pytest.raises(ValueError):
+        session.next_scan("sideways")
+
+
+def test_result_set_spills_and_refines_in_place():
+    results = ScanResultSet("<i4", spill_threshold=4096)
+    for start in range(0, 5000, 500):
+        results.append(np.arange(start, start + 500, dtype=np.uint64), np.arange(500, dtype="<i4"))
+    assert len(results) == 5000 and results.spilled
+
+    kept = results.refine([
+        (0, 1000, lambda a, v: (a % 2 == 0, None)),
+        (3000, 5000, lambda a, v: (v < 3, v + 1)),
+    ])
+    assert kept == [500, 12]
+    assert results.page(499, 3) == [{"address": 998, "value": 498},
+                                    {"address": 3000, "value": 1},
+                                    {"address": 3001, "value": 2}]
+    results.close()
+    assert len(results) == 0
+
+
+def test_large_first_scan_pages_from_spilled_results():
+    memory = FakeMemory({0x10000: bytes(4 * 10000)})
+    session = ScanSession(4, memory.read, "int", spill_threshold=1024)
+    assert session.first_scan(memory.layout(), 0) == 10000
+    assert session.results.spilled
+    assert session.addresses(9998, 5) == [0x10000 + 4 * 9998, 0x10000 + 4 * 9999]
+    memory.write(0x10000 + 4 * 1234, 9, "<i4")
+    assert session.next_scan("changed") == 1
+    assert session.page() == [{"address": 0x10000 + 4 * 1234, "value": 9}]
+
+
+def test_chunked_parallel_scan_sees_values_across_chunk_boundaries():
+    values = np.arange(4096, dtype="<i4") % 7
+    data = values.tobytes()
+    memory = FakeMemory({0x4000: data})
+    seen = []
+    # Unaligned slots with 64-byte chunks: many values straddle a boundary
+    session = ScanSession(5, memory.read, "int", alignment=1, workers=4, chunk_size=64)
+    count = session.first_scan(memory.layout(), 3, progress=lambda done, total: seen.append((done, total)))
+
+    expected = [0x4000 + i for i in range(len(data) - 3)
+                if int.from_bytes(data[i:i + 4], "little", signed=True) == 3]
+    assert count == len(expected)
+    assert session.addresses() == expected
+    assert seen[-1][0] == seen[-1][1]
+
+
+def test_cancelled_scan_raises_and_clears():
+    memory = FakeMemory({0x1000: bytes(4096)})
+    session = ScanSession(6, memory.read, "int", chunk_size=256)
+    with pytest.raises(ScanCancelled):
+        session.first_scan(memory.layout(), 0, cancel=lambda: True)
+    assert session.count == 0
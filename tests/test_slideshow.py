@@ -0,0 +1,73 @@
+import subprocess
+
+import numpy as np
+import pytest
+
+from tools.frame_sink import find_ffmpeg
+from tools.slideshow import (
+    encode_concat_slideshow, encoder_settings, fit_to_frame, slideshow_frame_count, slideshow_frames,
+)
+
+
+def test_encoder_settings_follow_tier_and_cores():
+    assert encoder_settings("high", cores=16) == {"preset": "slow", "crf": 20, "threads": 16}
+    assert encoder_settings("high", cores=4, reserve_cores=1) == {"preset": "medium", "crf": 20, "threads": 3}
+    assert encoder_settings("low", cores=1, reserve_cores=1) == {"preset": "ultrafast", "crf": 28, "threads": 1}
+    assert encoder_settings("unknown", cores=8)["crf"] == 20
+
+
+def test_fit_to_frame_fills_and_crops():
+    Image = pytest.importorskip("PIL.Image")
+    wide = Image.new("RGB", (400, 100), (10, 20, 30))
+    assert fit_to_frame(wide, 64, 48).size == (64, 48)
+    assert fit_to_frame(Image.new("L", (50, 300)), 64, 48).size == (64, 48)
+
+
+def solid(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_images_load_lazily_in_order():
+    events = []
+
+    def load(path):
+        events.append(("load", path))
+        return solid(int(path))
+
+    for frame in slideshow_frames(["10", "200", "50"], load, fps=4, duration_per_image=1.0, transition="none"):
+        events.append(("frame", int(frame[0, 0, 0])))
+    assert events == [("load", "10")] + [("frame", 10)] * 4 + [("load", "200")] + [("frame", 200)] * 4 + \
+        [("load", "50")] + [("frame", 50)] * 4
+
+
+def test_crossfade_blends_between_images():
+    frames = [int(f[0, 0, 0]) for f in slideshow_frames(
+        ["0", "250"], lambda p: solid(int(p)), fps=10, duration_per_image=1.0,
+        transition="crossfade", transition_duration=0.4,
+    )]
+    assert len(frames) == slideshow_frame_count(2, 10, 1.0, "crossfade", 0.4) == 16
+    assert frames[:6] == [0] * 6 and frames[-6:] == [250] * 6
+    blend = frames[6:10]
+    assert blend == sorted(blend) and 0 < blend[0] < blend[-1] < 250
+
+
+def test_fade_dips_to_black():
+    frames = [int(f[0, 0, 0]) for f in slideshow_frames(
+        ["200", "200"], lambda p: solid(int(p)), fps=10, duration_per_image=1.0,
+        transition="fade", transition_duration=0.2,
+    )]
+    assert len(frames) == 20
+    assert frames[0] < 200 and frames[5] == 200 and frames[9] < 200 and frames[10] < 200
+
+
+@pytest.mark.skipif(find_ffmpeg() is None, reason="ffmpeg not available")
+def test_concat_slideshow_holds_each_image(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    output = tmp_path / "slides.mp4"
+    encoder = encoder_settings("low", cores=1)
+    encode_concat_slideshow(
+        ["1", "2", "3"], lambda p: Image.new("RGB", (64, 48), (80 * int(p), 0, 0)),
+        str(output), fps=10, duration_per_image=0.5, ffmpeg=find_ffmpeg(), encoder=encoder,
+    )
+    probe = subprocess.run([find_ffmpeg(), "-i", str(output), "-f", "null", "-"], capture_output=True, text=True)
+    assert "frame=   15" in probe.stderr
@@ -0,0 +1,106 @@
+import asyncio
+import importlib.util
+import os
+
+# video-engine is a separate app (its `backend` package would clash with ours);
+# these modules are dependency-free, so load them straight from their files.
+_VIDEO_BACKEND = os.path.join(os.path.dirname(__file__), "..", "video-engine", "backend")
+
+
+def load(name):
+    spec = importlib.util.spec_from_file_location(f"video_engine_{name}", os.path.join(_VIDEO_BACKEND, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+job_store = load("job_store")
+scene_pipeline = load("scene_pipeline")
+
+
+def test_jobs_round_trip_and_survive_reopening(tmp_path):
+    db = tmp_path / "jobs.db"
+    store = job_store.JobStore(db)
+    store.create({"id": "a", "status": "pending", "progress": 0.0, "created_at": "2026-01-01T00:00:00"})
+    store.create({"id": "b", "status": "completed", "created_at": "2026-01-02T00:00:00"})
+    assert store.update("a", status="processing", progress=0.5)["progress"] == 0.5
+    assert store.update("missing", status="failed") is None
+
+    reopened = job_store.JobStore(db)
+    assert reopened.get("a")["status"] == "processing"
+    assert [job["id"] for job in reopened.list()] == ["b", "a"]
+    assert reopened.delete("b")["id"] == "b"
+    assert reopened.delete("b") is None and "b" not in reopened and "a" in reopened
+
+
+def test_restart_fails_active_jobs_and_their_scenes(tmp_path):
+    store = job_store.JobStore(tmp_path / "jobs.db")
+    store.create({"id": "run", "status": "processing", "created_at": "1",
+                  "scenes": [{"status": "completed"}, {"status": "animating"}, {"status": "pending"}]})
+    store.create({"id": "wait", "status": "pending", "created_at": "2"})
+    store.create({"id": "done", "status": "completed", "created_at": "3"})
+
+    assert job_store.JobStore(tmp_path / "jobs.db").fail_interrupted() == 2
+    run = store.get("run")
+    assert run["status"] == "failed" and "restart" in run["error"]
+    assert [scene["status"] for scene in run["scenes"]] == ["completed", "failed", "failed"]
+    assert store.get("wait")["status"] == "failed"
+    assert store.get("done")["status"] == "completed"
+
+
+def test_debounced_updates_coalesce_into_few_writes(tmp_path):
+    store = job_store.JobStore(tmp_path / "jobs.db")
+    store.create({"id": "j", "status": "pending", "created_at": "1"})
+    writes = []
+    update = store.update
+    store.update = lambda job_id, **kw: writes.append(kw) or update(job_id, **kw)
+
+    async def run():
+        updates = job_store.DebouncedJobUpdates(store, "j", interval=0.05)
+        scenes = [{"status": "pending"}]
+        for step in range(50):
+            scenes[0]["status"] = f"step {step}"
+            updates.update(progress=step / 50, scenes=scenes)
+        await updates.flush()
+
+    asyncio.run(run())
+    assert len(writes) == 1
+    assert store.get("j")["scenes"] == [{"status": "step 49"}]
+
+
+def test_scenes_render_concurrently_and_merge_in_order():
+    active = {"now": 0, "peak": 0}
+
+    async def generate_keyframe(prompt):
+        await asyncio.sleep(0.01 * (5 - int(prompt[-1])))  # later scenes finish their keyframes first
+        if prompt == "scene 2":
+            return {"success": False, "error": "blocked prompt"}
+        return {"success": True, "image_path": f"{prompt}.png"}
+
+    async def animate(image_path, prompt):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.02)
+        active["now"] -= 1
+        return {"success": True, "video_path": image_path.replace(".png", ".mp4"), "model_used": "stub"}
+
+    updates = []
+
+    async def run():
+        return await scene_pipeline.render_scenes(
+            [f"scene {i}" for i in range(5)], generate_keyframe, animate,
+            keyframe_slots=asyncio.Semaphore(8), animation_slots=asyncio.Semaphore(2),
+            on_update=lambda fraction, step, states: updates.append(fraction),
+        )
+
+    clips, states = asyncio.run(run())
+    assert clips == ["scene 0.mp4", "scene 1.mp4", None, "scene 3.mp4", "scene 4.mp4"]
+    assert active["peak"] == 2
+    assert states[2]["status"] == "failed" and states[2]["error"] == "blocked prompt"
+    assert updates == sorted(updates) and updates[-1] == 1.0
+
+    timings = scene_pipeline.scene_timings(states)
+    assert [t["index"] for t in timings] == list(range(5))
+    for t in timings:
+        assert t["keyframe_s"] is not None and t["total_s"] >= t["keyframe_s"]
+        assert (t["animation_s"] is None) == (t["status"] == "failed")
@@ -54,6 +54,11 @@ class Settings(BaseSettings):
     USE_GPU: bool = os.getenv("USE_GPU", "true").lower() == "true"
     MAX_CONCURRENT_JOBS: int = 3
     JOB_TIMEOUT: int = 300  # 5 minutes
+    # Multi-scene: keyframes for every scene start together; animations are
+    # the expensive step, so they share a process-wide limit across jobs
+    MAX_CONCURRENT_KEYFRAMES: int = int(os.getenv("MAX_CONCURRENT_KEYFRAMES", "8"))
+    MAX_CONCURRENT_ANIMATIONS: int = int(os.getenv("MAX_CONCURRENT_ANIMATIONS", "2"))
+    JOB_DB_PATH: str = os.getenv("JOB_DB_PATH", str(OUTPUT_DIR / "jobs.db"))
     
     # Watermark
     WATERMARK_TEXT: str = "#darrellbuttigieg #thesoldiersdream"
@@ -3,6 +3,7 @@ Image Generator - Generate keyframe images for video
 Uses free/open-source APIs: Pollinations, Replicate, Local SDXL
 """
 import os
+import uuid
 import base64
 import urllib.request
 import urllib.parse
@@ -116,7 +117,7 @@ class ImageGenerator:
                 url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width={width}&height={height}&nologo=true&seed={seed}"
                 
                 timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-                filename = self.output_dir / f"keyframe_{timestamp}.png"
+                filename = self.output_dir / f"keyframe_{timestamp}_{uuid.uuid4().hex[:6]}.png"
                 
                 # Create SSL context that handles certificate issues
                 ctx = ssl.create_default_context()
@@ -215,7 +216,7 @@ class ImageGenerator:
             
             # Download image
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            filename = self.output_dir / f"keyframe_{timestamp}.png"
+            filename = self.output_dir / f"keyframe_{timestamp}_{uuid.uuid4().hex[:6]}.png"
             
             await loop.run_in_executor(
                 None,
@@ -294,7 +295,7 @@ class ImageGenerator:
                         image_url = output[0] if isinstance(output, list) else output
                         
                         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-                        filename = self.output_dir / f"keyframe_{timestamp}.png"
+                        filename = self.output_dir / f"keyframe_{timestamp}_{uuid.uuid4().hex[:6]}.png"
                         
                         await loop.run_in_executor(
                             None,
@@ -359,7 +360,7 @@ class ImageGenerator:
             
             # Save
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            filename = self.output_dir / f"keyframe_{timestamp}.png"
+            filename = self.output_dir / f"keyframe_{timestamp}_{uuid.uuid4().hex[:6]}.png"
             img.save(str(filename), quality=95)
             
             return {
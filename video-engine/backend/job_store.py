@@ -0,0 +1,146 @@
+"""
+Job Store - SQLite persistence for video generation jobs
+
+Jobs used to live only in an in-memory dict and vanished on restart. Each
+job is now one row (its JSON document plus status/timestamps for listing)
+in a local SQLite database, written through on every update. Jobs that
+were still pending/processing when the server stopped are marked failed
+on startup so clients polling them get an answer.
+
+DebouncedJobUpdates batches the frequent progress updates of a running
+job into one write per interval, done on an executor thread so SQLite
+commits never block the event loop.
+"""
+import asyncio
+import copy
+import functools
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ACTIVE_STATUSES = ("pending", "processing")
+
+
+class JobStore:
+    """Dict-like job storage backed by SQLite (safe to use from any thread)"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    data TEXT NOT NULL
+                )
+                """
+            )
+
+    def _write(self, job: Dict[str, Any]):
+        now = datetime.utcnow().isoformat()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?)",
+            (job["id"], job.get("status", "pending"), job.get("created_at", now), now, json.dumps(job, default=str)),
+        )
+
+    def create(self, job: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._write(job)
+
+    def update(self, job_id: str, **kwargs) -> Optional[Dict[str, Any]]:
+        """Merge kwargs into a job; returns the updated job (None if unknown)"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = json.loads(row[0])
+            job.update(kwargs)
+            self._write(job)
+            return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM jobs ORDER BY created_at DESC").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def delete(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a job; returns it (None if unknown)"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return json.loads(row[0])
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is not None
+
+    def fail_interrupted(self, reason: str = "Interrupted by a server restart") -> int:
+        """Mark jobs left pending/processing by a previous process as failed"""
+        interrupted = 0
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT data FROM jobs WHERE status IN ({','.join('?' * len(ACTIVE_STATUSES))})",
+                ACTIVE_STATUSES,
+            ).fetchall()
+            for (data,) in rows:
+                job = json.loads(data)
+                job.update(status="failed", error=job.get("error") or reason)
+                for scene in job.get("scenes") or []:
+                    if scene.get("status") not in ("completed", "failed"):
+                        scene["status"] = "failed"
+                self._write(job)
+                interrupted += 1
+        return interrupted
+
+
+class DebouncedJobUpdates:
+    """Coalesces updates to one job into a write per `interval`, off the event loop"""
+
+    def __init__(self, store: JobStore, job_id: str, interval: float = 0.5):
+        self.store = store
+        self.job_id = job_id
+        self.interval = interval
+        self._pending: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def update(self, **kwargs):
+        """Queue fields for the next write (call from the event loop)"""
+        # Snapshot now: callers keep mutating e.g. the scene states in place
+        self._pending.update(copy.deepcopy(kwargs))
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        await self._write()
+
+    async def _write(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, functools.partial(self.store.update, self.job_id, **pending))
+
+    async def flush(self):
+        """Write everything queued so far; later direct store writes land after it"""
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self._write()
@@ -0,0 +1,255 @@
+"""Vectorized Ken Burns / crossfade renderer.
+
+Shared with backend/tools/kenburns.py in the main app (the video engine is
+deployed on its own); keep the two copies in sync.
+
+The PIL path crops and LANCZOS-resizes the working canvas once per frame and
+then sharpens every frame. This renderer does the expensive work once:
+
+- crop_windows() computes every frame's zoom/pan window up front as arrays
+- SourcePyramid holds the (sharpened) working canvas plus 2x box-filtered
+  levels, cached by key so repeated renders of the same image reuse it
+- KenBurnsRenderer samples each window with separable bilinear filtering
+  from the pyramid level that keeps the resample under 2x, blending the
+  taps in place in float32
+- crossfade() blends two frames with in-place fixed-point arithmetic
+
+    pyramid = get_pyramid(key, lambda: SourcePyramid(work_image))
+    renderer = KenBurnsRenderer(pyramid, crop_windows(...), 1080, 1080)
+    with open_frame_sink(path, 1080, 1080, fps) as sink:
+        for frame in renderer.frames():
+            sink.write(frame)
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, List, Optional
+
+import numpy as np
+
+PYRAMID_CACHE_SIZE = 4
+MIN_LEVEL_SIZE = 32
+
+
+def ease(t: np.ndarray, easing: str = "linear") -> np.ndarray:
+    """Map progress 0..1 through an easing curve ("linear" or "cosine")"""
+    if easing == "cosine":
+        return 0.5 - 0.5 * np.cos(t * np.pi)
+    if easing != "linear":
+        raise ValueError(f"Unknown easing: {easing}")
+    return t
+
+
+def crop_windows(
+    work_w: int,
+    work_h: int,
+    out_w: int,
+    out_h: int,
+    total_frames: int,
+    zoom_factor: float = 1.25,
+    pan_direction: str = "center",
+    easing: str = "linear",
+) -> np.ndarray:
+    """
+    (total_frames, 4) array of (left, top, crop_w, crop_h) windows on the
+    working canvas, with the same motion as the PIL loop in animate_image:
+    zoom_factor > 1 zooms in from 1.0, < 1 zooms out to 1.0, and the pan
+    sweeps from one edge of the headroom to the other.
+    """
+    t = ease(np.arange(total_frames, dtype=np.float64) / max(total_frames, 1), easing)
+    if zoom_factor >= 1.0:
+        zoom = 1.0 + (zoom_factor - 1.0) * t
+    else:
+        zoom = (1.0 / zoom_factor) - ((1.0 / zoom_factor) - 1.0) * t
+
+    crop_w = np.minimum(out_w / zoom, work_w)
+    crop_h = np.minimum(out_h / zoom, work_h)
+    max_x = (work_w - crop_w) / 2
+    max_y = (work_h - crop_h) / 2
+    sweep = 1 - t * 2
+    offset_x = np.zeros_like(t)
+    offset_y = np.zeros_like(t)
+    if pan_direction == "left":
+        offset_x = max_x * sweep
+    elif pan_direction == "right":
+        offset_x = -max_x * sweep
+    elif pan_direction == "up":
+        offset_y = max_y * sweep
+    elif pan_direction == "down":
+        offset_y = -max_y * sweep
+
+    left = np.clip(work_w / 2 - crop_w / 2 + offset_x, 0, work_w - crop_w)
+    top = np.clip(work_h / 2 - crop_h / 2 + offset_y, 0, work_h - crop_h)
+    return np.stack([left, top, crop_w, crop_h], axis=1)
+
+
+def _halve(level: np.ndarray) -> np.ndarray:
+    """2x box downsample of an HxWx3 uint8 array"""
+    h, w = (level.shape[0] // 2) * 2, (level.shape[1] // 2) * 2
+    acc = level[0:h:2, 0:w:2].astype(np.uint16)
+    acc += level[1:h:2, 0:w:2]
+    acc += level[0:h:2, 1:w:2]
+    acc += level[1:h:2, 1:w:2]
+    acc += 2
+    acc >>= 2
+    return acc.astype(np.uint8)
+
+
+class SourcePyramid:
+    """A working canvas and its 2x downsampled levels, as HxWx3 uint8 arrays"""
+
+    def __init__(self, image: Any, sharpen: bool = True, min_size: int = MIN_LEVEL_SIZE):
+        base = image if isinstance(image, np.ndarray) else np.asarray(image.convert("RGB"))
+        if base.ndim != 3 or base.shape[2] != 3 or base.dtype != np.uint8:
+            raise ValueError(f"Expected an HxWx3 uint8 image, got {base.shape} {base.dtype}")
+        levels = [np.ascontiguousarray(base)]
+        while min(levels[-1].shape[:2]) >= 2 * min_size:
+            levels.append(_halve(levels[-1]))
+        if sharpen:
+            # The PIL path sharpens every resized frame; sharpening each level once is equivalent
+            levels = [_unsharp(level) for level in levels]
+        self.levels: List[np.ndarray] = levels
+
+    @property
+    def width(self) -> int:
+        return self.levels[0].shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.levels[0].shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(level.nbytes for level in self.levels)
+
+
+def _unsharp(level: np.ndarray) -> np.ndarray:
+    try:
+        from PIL import Image, ImageFilter
+    except ImportError:
+        return level
+    sharpened = Image.fromarray(level).filter(ImageFilter.UnsharpMask(radius=1.5, percent=80, threshold=2))
+    return np.asarray(sharpened)
+
+
+_pyramid_cache: "OrderedDict[Hashable, SourcePyramid]" = OrderedDict()
+_pyramid_lock = threading.Lock()
+
+
+def get_pyramid(key: Hashable, build: Callable[[], SourcePyramid]) -> SourcePyramid:
+    """Cached pyramid for key (e.g. path, mtime and working size), built on a miss"""
+    with _pyramid_lock:
+        pyramid = _pyramid_cache.get(key)
+        if pyramid is not None:
+            _pyramid_cache.move_to_end(key)
+            return pyramid
+    pyramid = build()
+    with _pyramid_lock:
+        _pyramid_cache[key] = pyramid
+        while len(_pyramid_cache) > PYRAMID_CACHE_SIZE:
+            _pyramid_cache.popitem(last=False)
+    return pyramid
+
+
+def clear_pyramid_cache() -> None:
+    with _pyramid_lock:
+        _pyramid_cache.clear()
+
+
+def _axis_samples(start: float, span: float, out_size: int, src_size: int):
+    """Bilinear source indices and weights for out_size samples of [start, start + span)"""
+    coords = start + (np.arange(out_size, dtype=np.float64) + 0.5) * (span / out_size) - 0.5
+    np.clip(coords, 0, src_size - 1, out=coords)
+    i0 = np.floor(coords).astype(np.intp)
+    i1 = np.minimum(i0 + 1, src_size - 1)
+    weight = (coords - i0).astype(np.float32)
+    return i0, i1, weight
+
+
+class KenBurnsRenderer:
+    """Renders crop windows of a SourcePyramid to out_w x out_h uint8 frames"""
+
+    def __init__(self, pyramid: SourcePyramid, windows: np.ndarray, out_w: int, out_h: int):
+        self.pyramid = pyramid
+        self.windows = np.asarray(windows, dtype=np.float64)
+        self.out_w = int(out_w)
+        self.out_h = int(out_h)
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def _level_for(self, crop_w: float, crop_h: float) -> int:
+        scale = min(crop_w / self.out_w, crop_h / self.out_h)
+        if scale < 2:
+            return 0
+        return min(int(math.log2(scale)), len(self.pyramid.levels) - 1)
+
+    def render_float(self, index: int) -> np.ndarray:
+        """Frame `index` as an HxWx3 float32 array"""
+        left, top, crop_w, crop_h = self.windows[index]
+        k = self._level_for(crop_w, crop_h)
+        src = self.pyramid.levels[k]
+        factor = float(1 << k)
+        src_h, src_w = src.shape[:2]
+        y0, y1, wy = _axis_samples(top / factor, crop_h / factor, self.out_h, src_h)
+        x0, x1, wx = _axis_samples(left / factor, crop_w / factor, self.out_w, src_w)
+
+        # Vertical pass over only the columns this window touches
+        xs, xe = int(x0[0]), int(x1[-1]) + 1
+        rows = src[y0, xs:xe].astype(np.float32)
+        below = src[y1, xs:xe].astype(np.float32)
+        below -= rows
+        below *= wy[:, None, None]
+        rows += below
+
+        # Horizontal pass (np.take along an axis is much faster than fancy indexing here)
+        out = np.take(rows, x0 - xs, axis=1)
+        right = np.take(rows, x1 - xs, axis=1)
+        right -= out
+        right *= wx[None, :, None]
+        out += right
+        return out
+
+    def render(self, index: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Frame `index` as an HxWx3 uint8 array"""
+        return to_uint8(self.render_float(index), out)
+
+    def frames(self) -> Iterator[np.ndarray]:
+        """Yield every frame; the same uint8 buffer is reused between frames"""
+        out = np.empty((self.out_h, self.out_w, 3), dtype=np.uint8)
+        for index in range(len(self.windows)):
+            yield self.render(index, out)
+
+
+def to_uint8(frame: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Round and clip a float frame into uint8 (frame is modified in place)"""
+    if out is None:
+        out = np.empty(frame.shape, dtype=np.uint8)
+    frame += 0.5
+    np.clip(frame, 0, 255, out=frame)
+    np.copyto(out, frame, casting="unsafe")
+    return out
+
+
+def crossfade(a: np.ndarray, b: np.ndarray, alpha: float, out: Optional[np.ndarray] = None,
+              scratch: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    a * (1 - alpha) + b * alpha for uint8 frames, in 8-bit fixed point
+    (as Image.blend does). scratch is an optional (2,) + a.shape uint16
+    buffer reused across calls.
+    """
+    if out is None:
+        out = np.empty(a.shape, dtype=np.uint8)
+    if scratch is None:
+        scratch = np.empty((2,) + a.shape, dtype=np.uint16)
+    weight = min(max(int(round(alpha * 256)), 0), 256)
+    acc, other = scratch[0], scratch[1]
+    np.multiply(a, 256 - weight, out=acc, dtype=np.uint16)
+    np.multiply(b, weight, out=other, dtype=np.uint16)
+    acc += other
+    acc += 128
+    acc >>= 8
+    np.copyto(out, acc, casting="unsafe")
+    return out
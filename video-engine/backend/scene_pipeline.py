@@ -0,0 +1,93 @@
+"""
+Scene Pipeline - concurrent keyframe + animation rendering for multi-scene videos
+
+Every scene's keyframe is requested at once (bounded by keyframe_slots) and
+each scene moves on to animation as soon as its own keyframe lands, bounded
+by animation_slots (shared across jobs by the caller). A failed scene does
+not stop the others; its clip is None and its state says why.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Share of a scene's work done once its keyframe exists (animation is the rest)
+KEYFRAME_WEIGHT = 0.3
+
+
+def new_scene_state(index: int, prompt: str) -> Dict[str, Any]:
+    return {"index": index, "prompt": prompt, "status": "pending", "keyframe_s": None,
+            "animation_s": None, "total_s": None, "model_used": None, "error": None}
+
+
+def scene_timings(states: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-scene timing summary for job results"""
+    return [
+        {key: state[key] for key in ("index", "status", "keyframe_s", "animation_s", "total_s")}
+        for state in states
+    ]
+
+
+async def render_scenes(
+    prompts: List[str],
+    generate_keyframe: Callable[[str], Awaitable[Dict[str, Any]]],
+    animate: Callable[[str, str], Awaitable[Dict[str, Any]]],
+    keyframe_slots: asyncio.Semaphore,
+    animation_slots: asyncio.Semaphore,
+    on_update: Optional[Callable[[float, str, List[Dict[str, Any]]], None]] = None,
+) -> Tuple[List[Optional[str]], List[Dict[str, Any]]]:
+    """
+    Render every scene; returns (clip path or None per scene, scene states).
+
+    generate_keyframe(prompt) and animate(image_path, prompt) return the
+    generators' result dicts ({"success", "image_path" / "video_path", ...}).
+    on_update(fraction_done, step, states) is called on every transition.
+    """
+    total = len(prompts)
+    states = [new_scene_state(i, prompt) for i, prompt in enumerate(prompts)]
+    done = {"keyframes": 0, "scenes": 0}
+
+    def report(step: str):
+        if on_update:
+            fraction = (KEYFRAME_WEIGHT * done["keyframes"] + (1 - KEYFRAME_WEIGHT) * done["scenes"]) / total
+            on_update(fraction, step, states)
+
+    async def render_scene(state: Dict[str, Any]) -> Optional[str]:
+        started = time.perf_counter()
+        label = f"Scene {state['index'] + 1}/{total}"
+        try:
+            async with keyframe_slots:
+                state["status"] = "keyframe"
+                report(f"{label}: generating keyframe")
+                image_result = await generate_keyframe(state["prompt"])
+            state["keyframe_s"] = round(time.perf_counter() - started, 2)
+            done["keyframes"] += 1
+            if not image_result.get("success"):
+                raise Exception(image_result.get("error") or "Keyframe generation failed")
+
+            state["status"] = "queued"
+            report(f"{label}: waiting to animate")
+            async with animation_slots:
+                state["status"] = "animating"
+                report(f"{label}: animating")
+                animation_started = time.perf_counter()
+                video_result = await animate(image_result["image_path"], state["prompt"])
+            state["animation_s"] = round(time.perf_counter() - animation_started, 2)
+            state["model_used"] = video_result.get("model_used")
+            if not video_result.get("success"):
+                raise Exception(video_result.get("error") or "Animation failed")
+            state["status"] = "completed"
+            return video_result["video_path"]
+        except Exception as e:
+            state["status"] = "failed"
+            state["error"] = str(e)
+            return None
+        finally:
+            state["total_s"] = round(time.perf_counter() - started, 2)
+            # A failed scene has no work left either way
+            if state["keyframe_s"] is None:
+                done["keyframes"] += 1
+            done["scenes"] += 1
+            report(f"{done['scenes']}/{total} scenes finished")
+
+    clips = await asyncio.gather(*(render_scene(state) for state in states))
+    return list(clips), states
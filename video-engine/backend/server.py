@@ -20,7 +20,7 @@ from loguru import logger
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.config import settings, detect_gpu, get_best_model, OUTPUT_DIR, VideoMode, VIDEO_MODES
-from backend.video_router import router as video_router
+from backend.video_router import router as video_router, jobs as video_jobs
 
 # Configure logging
 logger.add(
@@ -45,6 +45,11 @@ async def lifespan(app: FastAPI):
     (OUTPUT_DIR / "videos").mkdir(exist_ok=True)
     (OUTPUT_DIR / "images").mkdir(exist_ok=True)
     
+    # Background tasks do not survive a restart; fail what they left behind
+    interrupted = video_jobs.fail_interrupted()
+    if interrupted:
+        logger.warning(f"Marked {interrupted} interrupted job(s) as failed")
+    
     yield
     
     # Shutdown
@@ -3,6 +3,7 @@ Video Generator - Generate videos from images with AI motion
 Uses free/open-source APIs: Replicate, HuggingFace, Stability AI, Local models
 """
 import os
+import uuid
 import base64
 import urllib.request
 import urllib.parse
@@ -175,7 +176,7 @@ class VideoGenerator:
                         
                         # Download video
                         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-                        output_path = self.output_dir / f"video_{timestamp}.mp4"
+                        output_path = self.output_dir / f"video_{timestamp}_{uuid.uuid4().hex[:6]}.mp4"
                         
                         await loop.run_in_executor(
                             None,
@@ -230,7 +231,7 @@ class VideoGenerator:
             
             # Save video
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            output_path = self.output_dir / f"video_{timestamp}.mp4"
+            output_path = self.output_dir / f"video_{timestamp}_{uuid.uuid4().hex[:6]}.mp4"
             
             with open(output_path, "wb") as f:
                 f.write(video_data)
@@ -323,7 +324,7 @@ class VideoGenerator:
                         video_data = response.read()
                         
                         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-                        output_path = self.output_dir / f"video_{timestamp}.mp4"
+                        output_path = self.output_dir / f"video_{timestamp}_{uuid.uuid4().hex[:6]}.mp4"
                         
                         with open(output_path, "wb") as f:
                             f.write(video_data)
@@ -382,7 +383,7 @@ class VideoGenerator:
             
             if result.get("video_url"):
                 timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-                output_path = self.output_dir / f"video_{timestamp}.mp4"
+                output_path = self.output_dir / f"video_{timestamp}_{uuid.uuid4().hex[:6]}.mp4"
                 
                 await loop.run_in_executor(
                     None,
@@ -447,7 +448,7 @@ class VideoGenerator:
             
             # Save video
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            output_path = self.output_dir / f"video_{timestamp}.mp4"
+            output_path = self.output_dir / f"video_{timestamp}_{uuid.uuid4().hex[:6]}.mp4"
             
             # Export frames to video using moviepy
             from moviepy.editor import ImageSequenceClip
@@ -477,16 +478,12 @@ class VideoGenerator:
     async def _generate_kenburns(self, image_path: str, motion_prompt: str, duration: int) -> Dict[str, Any]:
         """Fallback: Enhanced Ken Burns effect with dramatic motion"""
         try:
-            from PIL import Image, ImageFilter, ImageEnhance
-            from moviepy.editor import ImageSequenceClip
-            import numpy as np
+            from PIL import Image, ImageFilter
+            from backend.frame_sink import open_frame_sink
+            from backend.kenburns import KenBurnsRenderer, SourcePyramid, crop_windows, get_pyramid
             
             logger.info("Generating enhanced Ken Burns video...")
             
-            # Load image
-            img = Image.open(image_path).convert("RGB")
-            orig_w, orig_h = img.size
-            
             # Target resolution
             target_w, target_h = 1080, 1080
             
@@ -508,80 +505,36 @@ class VideoGenerator:
             work_w = int(target_w * work_scale)
             work_h = int(target_h * work_scale)
             
-            # High-quality resize
-            img = img.resize((work_w, work_h), Image.Resampling.LANCZOS)
-            img = img.filter(ImageFilter.UnsharpMask(radius=2, percent=150, threshold=2))
+            def build_pyramid() -> SourcePyramid:
+                # High-quality resize
+                img = Image.open(image_path).convert("RGB")
+                img = img.resize((work_w, work_h), Image.Resampling.LANCZOS)
+                img = img.filter(ImageFilter.UnsharpMask(radius=2, percent=150, threshold=2))
+                return SourcePyramid(img)
             
-            # Generate frames
             fps = settings.DEFAULT_FPS
             total_frames = int(duration * fps)
-            frames = []
-            
-            for frame_idx in range(total_frames):
-                t = frame_idx / total_frames
-                
-                # Smooth easing function
-                t_eased = 0.5 - 0.5 * np.cos(t * np.pi)  # Smooth start/end
-                
-                # Calculate zoom
-                current_zoom = 1.0 + (zoom_factor - 1.0) * t_eased
-                
-                # Calculate crop size
-                crop_w = int(target_w / current_zoom)
-                crop_h = int(target_h / current_zoom)
-                
-                # Calculate pan
-                max_offset_x = (work_w - crop_w) // 2
-                max_offset_y = (work_h - crop_h) // 2
-                
-                center_x = work_w // 2
-                center_y = work_h // 2
-                
-                if pan_direction == "left":
-                    offset_x = int(max_offset_x * (1 - t_eased * 2))
-                    offset_y = 0
-                elif pan_direction == "right":
-                    offset_x = int(-max_offset_x * (1 - t_eased * 2))
-                    offset_y = 0
-                elif pan_direction == "up":
-                    offset_x = 0
-                    offset_y = int(max_offset_y * (1 - t_eased * 2))
-                elif pan_direction == "down":
-                    offset_x = 0
-                    offset_y = int(-max_offset_y * (1 - t_eased * 2))
-                else:
-                    offset_x = 0
-                    offset_y = 0
-                
-                # Crop
-                left = max(0, min(center_x - crop_w // 2 + offset_x, work_w - crop_w))
-                top = max(0, min(center_y - crop_h // 2 + offset_y, work_h - crop_h))
-                
-                frame = img.crop((left, top, left + crop_w, top + crop_h))
-                
-                # Resize to target
-                if frame.size != (target_w, target_h):
-                    frame = frame.resize((target_w, target_h), Image.Resampling.LANCZOS)
-                    frame = frame.filter(ImageFilter.UnsharpMask(radius=1.5, percent=80, threshold=2))
-                
-                frames.append(np.array(frame))
-            
-            # Create video
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            output_path = self.output_dir / f"video_{timestamp}.mp4"
+            output_path = self.output_dir / f"video_{timestamp}_{uuid.uuid4().hex[:6]}.mp4"
             
-            clip = ImageSequenceClip(frames, fps=fps)
-            clip.write_videofile(
-                str(output_path),
-                fps=fps,
-                codec="libx264",
-                audio=False,
-                preset="slow",
-                bitrate=settings.VIDEO_BITRATE,
-                ffmpeg_params=["-crf", str(settings.VIDEO_CRF)],
-                logger=None
-            )
-            clip.close()
+            def render():
+                pyramid = get_pyramid(
+                    (os.path.abspath(image_path), os.path.getmtime(image_path), work_w, work_h), build_pyramid
+                )
+                # Cosine easing for a smooth start/end
+                windows = crop_windows(
+                    work_w, work_h, target_w, target_h, total_frames, zoom_factor, pan_direction, easing="cosine"
+                )
+                renderer = KenBurnsRenderer(pyramid, windows, target_w, target_h)
+                with open_frame_sink(
+                    str(output_path), target_w, target_h, fps, preset="slow", crf=settings.VIDEO_CRF
+                ) as sink:
+                    for frame in renderer.frames():
+                        sink.write(frame)
+            
+            # Rendering and encoding are CPU-bound; keep the event loop free meanwhile
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, render)
             
             return {
                 "success": True,
@@ -4,6 +4,7 @@ Video Router - API endpoints for video generation
 import os
 import uuid
 import asyncio
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List, Literal
@@ -17,6 +18,8 @@ from backend.config import settings, OUTPUT_DIR, VideoMode, VIDEO_MODES, get_bes
 from backend.image_generator import ImageGenerator
 from backend.video_generator import VideoGenerator
 from backend.editor import VideoEditor
+from backend.job_store import DebouncedJobUpdates, JobStore
+from backend.scene_pipeline import render_scenes, scene_timings
 
 router = APIRouter()
 
@@ -75,18 +78,19 @@ class JobStatus(BaseModel):
     current_step: Optional[str] = None
     result: Optional[dict] = None
     error: Optional[str] = None
+    scenes: Optional[List[dict]] = None  # multi-scene: per-scene status and timings
 
 
 # ============== Job Tracking ==============
 
-# Simple in-memory job storage (use Redis in production)
-jobs = {}
+# Jobs persist in SQLite so status survives a restart
+jobs = JobStore(Path(settings.JOB_DB_PATH))
 
 
 def create_job(prompt: str) -> str:
     """Create a new job and return its ID"""
     job_id = str(uuid.uuid4())[:8]
-    jobs[job_id] = {
+    jobs.create({
         "id": job_id,
         "status": "pending",
         "progress": 0.0,
@@ -94,14 +98,13 @@ def create_job(prompt: str) -> str:
         "created_at": datetime.utcnow().isoformat(),
         "result": None,
         "error": None
-    }
+    })
     return job_id
 
 
 def update_job(job_id: str, **kwargs):
     """Update job status"""
-    if job_id in jobs:
-        jobs[job_id].update(kwargs)
+    jobs.update(job_id, **kwargs)
 
 
 # ============== Video Generation Endpoints ==============
@@ -345,6 +348,10 @@ async def create_multi_scene_video(request: MultiSceneRequest, background_tasks:
     )
 
 
+# Animations are the slow, GPU/API-bound step: cap them across all jobs
+_animation_slots = asyncio.Semaphore(max(1, settings.MAX_CONCURRENT_ANIMATIONS))
+
+
 async def process_multi_scene(
     job_id: str,
     scenes: List[str],
@@ -353,43 +360,57 @@ async def process_multi_scene(
     add_intro: bool,
     add_outro: bool
 ):
-    """Process multi-scene video creation"""
+    """Process multi-scene video creation
+    
+    Scenes render concurrently (see scene_pipeline.render_scenes); clips are
+    merged in the original scene order and failed scenes are skipped.
+    Progress goes through a DebouncedJobUpdates, so the many per-scene
+    transitions cost one SQLite write per interval, off the event loop.
+    """
+    updates = DebouncedJobUpdates(jobs, job_id)
     try:
-        update_job(job_id, status="processing", progress=0.1)
-        
         image_gen = ImageGenerator()
         video_gen = VideoGenerator()
         editor = VideoEditor()
         
-        video_clips = []
         total_scenes = len(scenes)
+        updates.update(status="processing", progress=0.1)
         
-        for i, scene_prompt in enumerate(scenes):
-            update_job(
-                job_id,
-                progress=0.1 + (0.7 * i / total_scenes),
-                current_step=f"Processing scene {i+1}/{total_scenes}"
-            )
-            
-            # Generate keyframe
-            image_result = await image_gen.generate_keyframe(scene_prompt)
-            if not image_result.get("success"):
-                continue
-            
-            # Animate
-            video_result = await video_gen.generate_from_image(
-                image_path=image_result["image_path"],
-                motion_prompt=scene_prompt,
+        def on_update(fraction: float, step: str, states: List[dict]):
+            updates.update(progress=round(0.1 + 0.7 * fraction, 3), current_step=step, scenes=states)
+        
+        async def animate(image_path: str, prompt: str) -> dict:
+            return await video_gen.generate_from_image(
+                image_path=image_path,
+                motion_prompt=prompt,
                 duration=duration_per_scene
             )
-            if video_result.get("success"):
-                video_clips.append(video_result["video_path"])
+        
+        scenes_started = time.perf_counter()
+        clip_paths, states = await render_scenes(
+            scenes,
+            image_gen.generate_keyframe,
+            animate,
+            keyframe_slots=asyncio.Semaphore(max(1, settings.MAX_CONCURRENT_KEYFRAMES)),
+            animation_slots=_animation_slots,
+            on_update=on_update,
+        )
+        scenes_elapsed = time.perf_counter() - scenes_started
+        video_clips = [path for path in clip_paths if path]
+        for state in states:
+            if state["status"] == "failed":
+                logger.warning(f"Job {job_id} scene {state['index'] + 1}/{total_scenes} failed: {state['error']}")
         
         if not video_clips:
             raise Exception("No scenes could be generated")
         
+        logger.info(
+            f"Job {job_id}: {len(video_clips)}/{total_scenes} scenes in {scenes_elapsed:.1f}s "
+            f"(sequential sum {sum(st['total_s'] or 0 for st in states):.1f}s)"
+        )
+        
         # Merge all clips
-        update_job(job_id, progress=0.85, current_step="Merging scenes...")
+        updates.update(progress=0.85, current_step="Merging scenes...")
         final_video = await editor.merge_clips(
             video_clips,
             transition=transitions,
@@ -402,20 +423,24 @@ async def process_multi_scene(
         if add_outro:
             final_video = await editor.add_outro(final_video)
         
-        update_job(
-            job_id,
+        updates.update(
             status="completed",
             progress=1.0,
+            scenes=states,
             result={
                 "video_path": final_video,
                 "video_url": f"/output/videos/{Path(final_video).name}",
                 "scenes_generated": len(video_clips),
-                "total_duration": len(video_clips) * duration_per_scene
+                "total_duration": len(video_clips) * duration_per_scene,
+                "scenes_seconds": round(scenes_elapsed, 2),
+                "scene_timings": scene_timings(states)
             }
         )
         
     except Exception as e:
-        update_job(job_id, status="failed", error=str(e))
+        updates.update(status="failed", error=str(e))
+    finally:
+        await updates.flush()
 
 
 # ============== Job Management ==============
@@ -423,36 +448,36 @@ async def process_multi_scene(
 @router.get("/status/{job_id}", response_model=JobStatus)
 async def get_job_status(job_id: str):
     """Get the status of a video generation job"""
-    if job_id not in jobs:
+    job = jobs.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = jobs[job_id]
     return JobStatus(
         job_id=job["id"],
         status=job["status"],
         progress=job["progress"],
         current_step=job.get("current_step"),
         result=job.get("result"),
-        error=job.get("error")
+        error=job.get("error"),
+        scenes=job.get("scenes")
     )
 
 
 @router.get("/jobs")
 async def list_jobs():
     """List all video generation jobs"""
-    return {"jobs": list(jobs.values())}
+    return {"jobs": jobs.list()}
 
 
 @router.delete("/jobs/{job_id}")
 async def delete_job(job_id: str):
     """Delete a job and its output"""
-    if job_id not in jobs:
+    job = jobs.delete(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = jobs.pop(job_id)
-    
     # Clean up output files
-    if job.get("result", {}).get("video_path"):
+    if (job.get("result") or {}).get("video_path"):
         try:
             os.remove(job["result"]["video_path"])
         except: